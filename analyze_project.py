@@ -1,12 +1,16 @@
 import os
+import sys
 import json
 from pathlib import Path
 
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), 'scripts'))
+from auditkit import ProjectIndex
+
 # --- 設定忽略的資料夾 (根據你的專案調整) ---
 IGNORED_DIRS = {'.git', 'node_modules', '.next', 'dist', '__pycache__', '.venv', '.vscode', '.idea'}
 IGNORED_EXTS = {'.DS_Store', '.log'}
 
-def analyze_project(root_path):
+def analyze_project(root_path, index=None):
     stats = {
         "total_files": 0,
         "total_size_kb": 0,
@@ -17,10 +21,11 @@ def analyze_project(root_path):
     }
     
     structure_map = []
+    index = index or ProjectIndex.shared(root_path)
 
-    for root, dirs, files in os.walk(root_path):
-        # 過濾忽略的資料夾
-        dirs[:] = [d for d in dirs if d not in IGNORED_DIRS]
+    # 使用共用索引的走訪結果（已過濾忽略的資料夾），不再重新掃描磁碟
+    for rel_dir, dirs, files in index.walk(exclude_dirs=IGNORED_DIRS):
+        root = os.path.join(root_path, rel_dir) if rel_dir else root_path
         
         current_depth = root.count(os.sep)
         if current_depth > 5:
@@ -36,7 +41,7 @@ def analyze_project(root_path):
                 
             stats["total_files"] += 1
             try:
-                size = file_path.stat().st_size / 1024 # KB
+                size = index.get(file_path).size / 1024 # KB
                 stats["total_size_kb"] += size
                 
                 # 統計檔案類型
@@ -1,38 +1,46 @@
+import argparse
 import os
-import re
+import sys
 
-# 定義要掃描的危險關鍵字
-PATTERNS = {
-    "LOCALHOST_IP": r"127\.0\.0\.1",
-    "LOCALHOST_URL": r"localhost",
-    "DEBUG_PORT": r":7242",
-    "CONSOLE_LOG": r"console\.log\(",
-    "HARDCODED_R2": r"r2\.dev", # 檢查是否硬編碼 R2 網址
-    "TODO_FIXME": r"(TODO|FIXME)"
-}
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), 'scripts'))
+from auditkit import ProjectIndex, Rule, RuleSet, load_patterns, parse_rule_ids
+
+# 定義要掃描的危險關鍵字（逐行比對，規則 ID 即報告標籤）
+RULES = RuleSet([
+    Rule("LOCALHOST_IP", r"127\.0\.0\.1", "warning", "本機 IP", mode="each"),
+    Rule("LOCALHOST_URL", r"localhost", "warning", "localhost 網址", mode="each"),
+    Rule("DEBUG_PORT", r":7242", "warning", "除錯埠", mode="each"),
+    Rule("CONSOLE_LOG", r"console\.log\(", "info", "console.log 呼叫", mode="each"),
+    Rule("HARDCODED_R2", r"r2\.dev", "warning", "硬編碼 R2 網址", mode="each"), # 檢查是否硬編碼 R2 網址
+    Rule("TODO_FIXME", r"(TODO|FIXME)", "info", "TODO / FIXME", mode="each"),
+])
 
 IGNORE_DIRS = {'.git', 'node_modules', '.next', 'dist', '__pycache__', 'images-original'}
 IGNORE_EXTS = {'.png', '.jpg', '.jpeg', '.gif', '.webp', '.svg', '.json', '.map'}
 
-def deep_content_scan(root_path):
+def deep_content_scan(root_path, index=None, rules=None):
     print(f"🔍 Starting Deep Content Scan in: {root_path}\n")
-    findings = {k: [] for k in PATTERNS.keys()}
+    rules = rules or RULES
+    index = index or ProjectIndex.shared(root_path)
+    # 所有啟用的規則編譯成單一 alternation，每個檔案只串流掃描一次
+    scanner = rules.line_scanner()
+    findings = {label: [] for label in scanner.labels}
     
-    for root, dirs, files in os.walk(root_path):
-        dirs[:] = [d for d in dirs if d not in IGNORE_DIRS]
+    for rel_dir, dirs, files in index.walk(exclude_dirs=IGNORE_DIRS):
+        root = os.path.join(root_path, rel_dir) if rel_dir else root_path
         
         for file in files:
-            if any(file.endswith(ext) for ext in IGNORE_EXTS):
+            # 副檔名不分大小寫（.JPG 等）；沒有副檔名或副檔名不符的二進位檔（.DS_Store 等）只讀開頭區塊判斷後略過
+            if os.path.splitext(file)[1].lower() in IGNORE_EXTS:
                 continue
                 
             file_path = os.path.join(root, file)
             try:
-                with open(file_path, 'r', encoding='utf-8', errors='ignore') as f:
-                    lines = f.readlines()
-                    for i, line in enumerate(lines):
-                        for label, pattern in PATTERNS.items():
-                            if re.search(pattern, line):
-                                findings[label].append(f"{file_path} (Line {i+1}): {line.strip()[:60]}...")
+                if index.is_binary(f"{rel_dir}/{file}" if rel_dir else file):
+                    continue
+                for line_no, line, labels in scanner.scan_file(file_path):
+                    for label in labels:
+                        findings[label].append(f"{file_path} (Line {line_no}): {line.strip()[:60]}...")
             except Exception as e:
                 pass # Skip unreadable files
 
@@ -48,4 +56,22 @@ def deep_content_scan(root_path):
             print(f"✅ No issues found for [{label}]")
 
 if __name__ == "__main__":
-    deep_content_scan(os.getcwd())
+    parser = argparse.ArgumentParser(description='掃描專案內容中的危險關鍵字')
+    parser.add_argument('--patterns', metavar='FILE',
+                        help='額外規則的 JSON 設定檔（{"LABEL": "regex"}，與內建規則合併）')
+    parser.add_argument('--disable-rules', action='append', metavar='ID[,ID...]',
+                        help='停用指定的規則（可重複指定，規則 ID 見 --list-rules）')
+    parser.add_argument('--list-rules', action='store_true', help='列出所有規則後退出')
+    args = parser.parse_args()
+
+    if args.patterns:
+        for label, pattern in load_patterns(args.patterns).items():
+            RULES.add(Rule(label, pattern, "warning", label, mode="each"), replace=True)
+    try:
+        RULES.disable(parse_rule_ids(args.disable_rules))
+    except ValueError as e:
+        parser.error(str(e))
+    if args.list_rules:
+        print("\n".join(RULES.describe()))
+        sys.exit(0)
+    deep_content_scan(os.getcwd(), rules=RULES)
@@ -8,6 +8,8 @@ import re
 from pathlib import Path
 from typing import List, Tuple
 
+from auditkit import list_files
+
 PROJECT_ROOT = Path(__file__).parent.parent
 
 # 排除的目錄
@@ -144,16 +146,13 @@ def main():
     print("🧹 積極清理註釋掉的代碼...\n")
     
     # 收集所有代碼文件
+    # 單次走訪，排除目錄與被忽略的路徑不會進入
     files_to_check = []
-    for ext in ['.py', '.js', '.mjs', '.css', '.njk']:
-        for file_path in PROJECT_ROOT.rglob(f'*{ext}'):
-            # 跳過排除目錄
-            if any(excluded in str(file_path) for excluded in EXCLUDE_DIRS):
-                continue
-            # 跳過備份文件
-            if '.backup' in str(file_path) or file_path.name.startswith('.'):
-                continue
-            files_to_check.append(file_path)
+    for file_path in list_files(PROJECT_ROOT, ['.py', '.js', '.mjs', '.css', '.njk'], prune_dirs=EXCLUDE_DIRS):
+        # 跳過備份文件
+        if '.backup' in str(file_path) or file_path.name.startswith('.'):
+            continue
+        files_to_check.append(file_path)
     
     print(f"📁 掃描 {len(files_to_check)} 個文件...\n")
     
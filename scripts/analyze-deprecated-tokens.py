@@ -7,7 +7,9 @@ import re
 
 from pathlib import Path
 from collections import defaultdict, Counter
-from typing import Dict, List
+from typing import Any, Dict, List
+
+from auditkit import LineIndex
 
 # 專案根目錄
 PROJECT_ROOT = Path(__file__).parent.parent
@@ -84,6 +86,7 @@ def find_deprecated_token_usage() -> Dict[str, List[Dict]]:
                 with open(file_path, 'r', encoding='utf-8') as f:
                     content = f.read()
                     relative_path = file_path.relative_to(PROJECT_ROOT)
+                    lines = LineIndex(content)
                     
                     # 查找每個 deprecated token
                     for token, info in DEPRECATED_TOKENS.items():
@@ -92,8 +95,8 @@ def find_deprecated_token_usage() -> Dict[str, List[Dict]]:
                         for match in re.finditer(pattern, content, re.IGNORECASE):
                             usage[token].append({
                                 'file': str(relative_path),
-                                'line': content[:match.start()].count('\n') + 1,
-                                'context': content[max(0, match.start()-30):match.end()+30],
+                                'line': lines.line_of(match.start()),
+                                'context': lines.context(match.start(), match.end(), 30),
                                 'type': 'tailwind-class'
                             })
                         
@@ -102,8 +105,8 @@ def find_deprecated_token_usage() -> Dict[str, List[Dict]]:
                         for match in re.finditer(pattern, content, re.IGNORECASE):
                             usage[token].append({
                                 'file': str(relative_path),
-                                'line': content[:match.start()].count('\n') + 1,
-                                'context': content[max(0, match.start()-30):match.end()+30],
+                                'line': lines.line_of(match.start()),
+                                'context': lines.context(match.start(), match.end(), 30),
                                 'type': 'css-variable'
                             })
                         
@@ -115,8 +118,8 @@ def find_deprecated_token_usage() -> Dict[str, List[Dict]]:
                                 continue
                             usage[token].append({
                                 'file': str(relative_path),
-                                'line': content[:match.start()].count('\n') + 1,
-                                'context': content[max(0, match.start()-30):match.end()+30],
+                                'line': lines.line_of(match.start()),
+                                'context': lines.context(match.start(), match.end(), 30),
                                 'type': 'js-object'
                             })
             except Exception as e:
@@ -0,0 +1,421 @@
+#!/usr/bin/env python3
+"""
+稽核診斷伺服器（Language Server Protocol）
+常駐行程只載入一次 SEO、設計系統、移動端與遷移測試的規則，保留已預熱的 ProjectIndex 與各稽核的全站狀態
+（其他頁面的標題 / 描述、全部檔案的設計值），編輯器開啟或修改檔案時只分析該檔案，以毫秒回覆診斷；
+不必在每次存檔時啟動直譯器並重新掃描整個專案。分析邏輯直接沿用各稽核腳本的類別與函數
+
+用法:
+    python3 scripts/audit-server.py                          # 以 stdio 與編輯器溝通（LSP）
+    python3 scripts/audit-server.py --socket /tmp/audit.sock # 以 Unix socket 提供給多個編輯器工作階段
+    python3 scripts/audit-server.py --check src/index.njk    # 不啟動伺服器，直接輸出檔案的診斷
+"""
+
+import argparse
+import contextlib
+import io
+import json
+import os
+import re
+import socket
+import sys
+import time
+import urllib.parse
+from pathlib import Path
+from typing import Any, BinaryIO, Callable, Dict, List, Optional, Tuple
+
+from audit import load_auditor
+from auditkit import Issue, ProjectIndex
+
+# 專案根目錄
+PROJECT_ROOT = Path(__file__).parent.parent
+SRC_DIR = PROJECT_ROOT / "src"
+
+# LSP 診斷嚴重度（1 錯誤、2 警告、3 資訊）
+DIAGNOSTIC_SEVERITY = {
+    'critical': 1, 'error': 1, 'high': 1,
+    'warning': 2, 'medium': 2,
+    'info': 3, 'low': 3,
+}
+
+# SEO 問題沒有行號，依分析項目定位到 front matter 的鍵或內文的第一個標籤（找不到時為第一行）
+SEO_ANCHORS = {
+    'title': re.compile(r'^\s*title\s*:', re.MULTILINE),
+    'duplicate_title': re.compile(r'^\s*title\s*:', re.MULTILINE),
+    'description': re.compile(r'^\s*description\s*:', re.MULTILINE),
+    'duplicate_description': re.compile(r'^\s*description\s*:', re.MULTILINE),
+    'keywords': re.compile(r'^\s*keywords\s*:', re.MULTILINE),
+    'url': re.compile(r'^\s*permalink\s*:', re.MULTILINE),
+    'h1': re.compile(r'<h1\b', re.IGNORECASE),
+    'heading_structure': re.compile(r'<h[1-6]\b', re.IGNORECASE),
+    'images': re.compile(r'<img\b', re.IGNORECASE),
+    'internal_links': re.compile(r'<a\b', re.IGNORECASE),
+    'external_links': re.compile(r'<a\b[^>]*href=["\']https?:', re.IGNORECASE),
+}
+
+# JSON-RPC 錯誤碼
+METHOD_NOT_FOUND = -32601
+INTERNAL_ERROR = -32603
+SERVER_NOT_INITIALIZED = -32002
+
+
+class RpcError(Exception):
+    """回覆給編輯器的 JSON-RPC 錯誤"""
+
+    def __init__(self, code: int, message: str):
+        super().__init__(message)
+        self.code = code
+
+
+class AuditWorkspace:
+    """已預熱的稽核狀態：一次載入各稽核腳本並完成全站分析，之後逐檔更新並回傳診斷"""
+
+    def __init__(self, root: Path = PROJECT_ROOT):
+        self.root = root
+        self.index = ProjectIndex.shared(root)
+        seo = load_auditor('comprehensive-seo-audit.py')
+        mobile = load_auditor('mobile-responsive-audit.py')
+        self.design = load_auditor('design-system-audit.py')
+        self.migration = load_auditor('test-migration.py')
+        self.seo_auditor = seo.ComprehensiveSEOAuditor(SRC_DIR, seo.load_site_url(), index=self.index)
+        self.mobile_auditor = mobile.MobileResponsiveAuditor(str(root), index=self.index)
+        self.migration_tester = self.migration.MigrationTester()
+        self.design_results: Dict[str, Any] = {}
+        self.design_tokens: Dict[str, Any] = {}
+        # 全站狀態每次更新遞增；同一檔案、同一內容且狀態未變時直接沿用上次的結果（例如 didChange 後的 pull 請求）
+        self.generation = 0
+        self._last: Dict[str, Tuple[int, Optional[str], List[Tuple[str, Issue]]]] = {}
+
+    def warm(self) -> str:
+        """掃描專案並執行一次全站 SEO 分析與設計值提取（沿用 .cache/audits/ 的結果快取），回傳摘要"""
+        start = time.perf_counter()
+        with contextlib.redirect_stdout(io.StringIO()):
+            self.index.scan()
+            self.seo_auditor.audit()
+            cache = self.design.ResultCache(self.index, 'design-system-audit')
+            self.design_results, self.design_tokens = self.design.scan_project(self.index, cache)
+            cache.save()
+        return (f"索引 {len(self.index.files())} 個檔案，{len(self.seo_auditor.pages)} 個頁面，"
+                f"設計值 {len(self.design_results['files_scanned'])} 個檔案"
+                f"（{(time.perf_counter() - start) * 1000:.0f} ms）")
+
+    def rel_of(self, path: Path) -> Optional[str]:
+        """專案內檔案的相對路徑（專案外回傳 None）"""
+        try:
+            return path.resolve().relative_to(self.root.resolve()).as_posix()
+        except ValueError:
+            return None
+
+    def diagnose(self, rel: str, content: Optional[str]) -> List[Tuple[str, Issue]]:
+        """以傳入的內容分析單一檔案並更新全站狀態，回傳 (來源, 問題)；content 為 None 表示檔案已刪除"""
+        last = self._last.get(rel)
+        if last is not None and last[0] == self.generation and last[1] == content:
+            return last[2]
+        path = self.root / rel
+        found: List[Tuple[str, Issue]] = []
+        if self.seo_auditor.is_page(path):
+            found.extend(('seo', issue) for issue in self.seo_auditor.check_page(path, content))
+        if self.design.is_scanned_file(rel):
+            self.design.update_file(self.design_results, rel, content)
+            if content is not None:
+                issues = self.design.collect_issues(self.design_results, self.design_tokens)
+                found.extend(('design-system', issue) for issue in issues if issue.file == rel)
+        if content is not None:
+            found.extend(('mobile', issue) for issue in self.mobile_auditor.check_content(rel, content))
+            if path.suffix == '.njk' and rel.startswith('src/') and not rel.startswith('src/_includes/macros/'):
+                results = self.migration_tester.test_content(path, content)
+                found.extend(('migration', issue) for issue in self.migration_tester.collect_issues(results))
+        self.generation += 1
+        self._last[rel] = (self.generation, content, found)
+        return found
+
+    def refresh(self, rels: List[str]):
+        """磁碟上的檔案異動（非編輯中的檔案）：更新索引並以磁碟內容更新全站狀態"""
+        for rel in self.index.update([self.root / rel for rel in rels]):
+            entry = self.index.get(self.root / rel)
+            content = None
+            if entry is not None:
+                try:
+                    content = self.index.read_text(entry)
+                except (OSError, UnicodeDecodeError):
+                    continue
+            with contextlib.redirect_stdout(io.StringIO()):
+                self.diagnose(rel, content)
+
+
+def to_diagnostics(found: List[Tuple[str, Issue]], content: str) -> List[Dict[str, Any]]:
+    """問題轉成 LSP Diagnostic（行號從 0 起算，範圍為整行）"""
+    diagnostics = []
+    for source, issue in found:
+        line = issue.line
+        if line is None and source == 'seo' and issue.rule in SEO_ANCHORS:
+            match = SEO_ANCHORS[issue.rule].search(content)
+            if match:
+                line = content.count('\n', 0, match.start()) + 1
+        line = max((line or 1) - 1, 0)
+        diagnostics.append({
+            'range': {'start': {'line': line, 'character': 0}, 'end': {'line': line + 1, 'character': 0}},
+            'severity': DIAGNOSTIC_SEVERITY.get(issue.severity, 3),
+            'code': issue.rule,
+            'source': source,
+            'message': issue.message,
+        })
+    return diagnostics
+
+
+def uri_to_path(uri: str) -> Optional[Path]:
+    parsed = urllib.parse.urlparse(uri)
+    if parsed.scheme != 'file':
+        return None
+    return Path(urllib.parse.unquote(parsed.path))
+
+
+class JsonRpcConnection:
+    """LSP 的 JSON-RPC 訊息框架（Content-Length 標頭 + JSON 內容）"""
+
+    def __init__(self, reader: BinaryIO, writer: BinaryIO):
+        self.reader = reader
+        self.writer = writer
+        self._next_id = 0
+
+    def read(self) -> Optional[Dict[str, Any]]:
+        """讀取一則訊息，連線結束時回傳 None"""
+        length = None
+        while True:
+            line = self.reader.readline()
+            if not line:
+                return None
+            line = line.strip()
+            if not line:
+                break
+            name, _, value = line.decode('ascii').partition(':')
+            if name.lower() == 'content-length':
+                length = int(value)
+        if length is None:
+            return None
+        return json.loads(self.reader.read(length).decode('utf-8'))
+
+    def send(self, message: Dict[str, Any]):
+        body = json.dumps({'jsonrpc': '2.0', **message}, ensure_ascii=False).encode('utf-8')
+        self.writer.write(f"Content-Length: {len(body)}\r\n\r\n".encode('ascii') + body)
+        self.writer.flush()
+
+    def notify(self, method: str, params: Any):
+        self.send({'method': method, 'params': params})
+
+    def request(self, method: str, params: Any):
+        """送出請求給編輯器（不等待回應，回應在 serve 迴圈中略過）"""
+        self._next_id += 1
+        self.send({'id': f"audit-server-{self._next_id}", 'method': method, 'params': params})
+
+
+class DiagnosticsServer:
+    """單一編輯器連線的 LSP 工作階段（稽核狀態由所有連線共用）"""
+
+    def __init__(self, workspace: AuditWorkspace, connection: JsonRpcConnection, log: Callable[[str], None]):
+        self.workspace = workspace
+        self.connection = connection
+        self.log = log
+        # 編輯中的文件：uri -> 目前內容（可能尚未儲存）
+        self.documents: Dict[str, str] = {}
+        self.initialized = False
+        self.shutdown = False
+        self.watch_files = False
+
+    def serve(self) -> bool:
+        """處理訊息直到 exit 或連線結束，回傳是否正常結束（收到 shutdown 後才 exit）"""
+        while True:
+            message = self.connection.read()
+            if message is None:
+                return self.shutdown
+            method = message.get('method')
+            if method is None:
+                # 編輯器對我們送出的請求（registerCapability）的回應
+                continue
+            if method == 'exit':
+                return self.shutdown
+            try:
+                result = self.dispatch(method, message.get('params') or {})
+            except Exception as e:
+                if not isinstance(e, RpcError):
+                    self.log(f"❌ {method} 失敗: {e!r}")
+                if 'id' in message:
+                    code = e.code if isinstance(e, RpcError) else INTERNAL_ERROR
+                    self.connection.send({'id': message['id'], 'error': {'code': code, 'message': str(e)}})
+                continue
+            if 'id' in message:
+                self.connection.send({'id': message['id'], 'result': result})
+
+    def dispatch(self, method: str, params: Dict[str, Any]) -> Any:
+        if method == 'initialize':
+            self.initialized = True
+            watched = params.get('capabilities', {}).get('workspace', {}).get('didChangeWatchedFiles', {})
+            self.watch_files = bool(watched.get('dynamicRegistration'))
+            return {
+                'capabilities': {
+                    # 1 = 每次變更傳送完整內容
+                    'textDocumentSync': {'openClose': True, 'change': 1, 'save': {'includeText': False}},
+                    'diagnosticProvider': {'interFileDependencies': True, 'workspaceDiagnostics': False},
+                },
+                'serverInfo': {'name': 'audit-server'},
+            }
+        if not self.initialized:
+            raise RpcError(SERVER_NOT_INITIALIZED, '尚未 initialize')
+        if method == 'initialized':
+            if self.watch_files:
+                # 請編輯器回報專案檔案的異動，其他頁面的標題 / 設計值改變時跨檔案診斷才會更新
+                self.connection.request('client/registerCapability', {'registrations': [{
+                    'id': 'audit-server-watch',
+                    'method': 'workspace/didChangeWatchedFiles',
+                    'registerOptions': {'watchers': [{'globPattern': '**/*.{njk,css,js,html}'}]},
+                }]})
+            return None
+        if method == 'shutdown':
+            self.shutdown = True
+            return None
+        if method == 'textDocument/didOpen':
+            document = params['textDocument']
+            self.documents[document['uri']] = document['text']
+            self.publish(document['uri'])
+            return None
+        if method == 'textDocument/didChange':
+            uri = params['textDocument']['uri']
+            changes = params.get('contentChanges') or []
+            if changes:
+                self.documents[uri] = changes[-1]['text']
+                self.publish(uri)
+            return None
+        if method == 'textDocument/didSave':
+            uri = params['textDocument']['uri']
+            path = uri_to_path(uri)
+            if path is not None:
+                self.workspace.index.update([path])
+            self.publish(uri)
+            return None
+        if method == 'textDocument/didClose':
+            uri = params['textDocument']['uri']
+            self.documents.pop(uri, None)
+            # 關閉時以磁碟內容恢復全站狀態（捨棄未儲存的修改）
+            rel = self._rel(uri)
+            if rel is not None:
+                self.workspace.refresh([rel])
+            self.connection.notify('textDocument/publishDiagnostics', {'uri': uri, 'diagnostics': []})
+            return None
+        if method == 'textDocument/diagnostic':
+            return {'kind': 'full', 'items': self.diagnostics(params['textDocument']['uri'])}
+        if method == 'workspace/didChangeWatchedFiles':
+            rels = [rel for rel in (self._rel(change['uri']) for change in params.get('changes', []))
+                    if rel is not None]
+            # 編輯中的文件以編輯器的內容為準
+            open_rels = {self._rel(uri) for uri in self.documents}
+            self.workspace.refresh([rel for rel in rels if rel not in open_rels])
+            for uri in self.documents:
+                self.publish(uri)
+            return None
+        if method.startswith('$/'):
+            return None
+        raise RpcError(METHOD_NOT_FOUND, f"不支援的方法: {method}")
+
+    def _rel(self, uri: str) -> Optional[str]:
+        path = uri_to_path(uri)
+        return self.workspace.rel_of(path) if path is not None else None
+
+    def diagnostics(self, uri: str) -> List[Dict[str, Any]]:
+        rel = self._rel(uri)
+        if rel is None:
+            return []
+        content = self.documents.get(uri)
+        if content is None:
+            path = uri_to_path(uri)
+            try:
+                content = path.read_text(encoding='utf-8')
+            except (OSError, UnicodeDecodeError):
+                return []
+        start = time.perf_counter()
+        found = self.workspace.diagnose(rel, content)
+        self.log(f"🔎 {rel}: {len(found)} 個問題（{(time.perf_counter() - start) * 1000:.1f} ms）")
+        return to_diagnostics(found, content)
+
+    def publish(self, uri: str):
+        self.connection.notify('textDocument/publishDiagnostics',
+                               {'uri': uri, 'diagnostics': self.diagnostics(uri)})
+
+
+def serve_socket(workspace: AuditWorkspace, socket_path: Path, log: Callable[[str], None]):
+    """在 Unix socket 上依序接受編輯器連線，全部連線共用同一份已預熱的稽核狀態"""
+    if socket_path.exists():
+        socket_path.unlink()
+    server = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    server.bind(str(socket_path))
+    server.listen(1)
+    log(f"🔌 監聽 {socket_path}，按 Ctrl+C 結束")
+    try:
+        while True:
+            conn, _ = server.accept()
+            with conn, conn.makefile('rb') as reader, conn.makefile('wb') as writer:
+                log("🔗 編輯器已連線")
+                DiagnosticsServer(workspace, JsonRpcConnection(reader, writer), log).serve()
+                log("👋 編輯器已中斷連線")
+    except KeyboardInterrupt:
+        log("\n👋 結束伺服器")
+    finally:
+        server.close()
+        socket_path.unlink(missing_ok=True)
+
+
+def check_files(workspace: AuditWorkspace, files: List[str]) -> int:
+    """--check：輸出檔案的診斷（file:line: [來源/規則] 訊息），回傳錯誤數"""
+    errors = 0
+    for name in files:
+        path = Path(os.path.abspath(name))
+        rel = workspace.rel_of(path)
+        if rel is None:
+            print(f"⚠️  不在專案內: {name}")
+            continue
+        try:
+            content = path.read_text(encoding='utf-8')
+        except (OSError, UnicodeDecodeError) as e:
+            print(f"⚠️  無法讀取 {name}: {e}")
+            continue
+        start = time.perf_counter()
+        diagnostics = to_diagnostics(workspace.diagnose(rel, content), content)
+        elapsed = (time.perf_counter() - start) * 1000
+        for diagnostic in diagnostics:
+            severity = {1: 'error', 2: 'warning'}.get(diagnostic['severity'], 'info')
+            errors += diagnostic['severity'] == 1
+            print(f"{rel}:{diagnostic['range']['start']['line'] + 1}: {severity} "
+                  f"[{diagnostic['source']}/{diagnostic['code']}] {diagnostic['message']}")
+        print(f"🔎 {rel}: {len(diagnostics)} 個問題（{elapsed:.1f} ms）")
+    return errors
+
+
+def main():
+    """主函數"""
+    parser = argparse.ArgumentParser(description='稽核診斷伺服器（LSP），供編輯器即時取得單一檔案的診斷')
+    parser.add_argument('--socket', type=Path, metavar='PATH', help='在 Unix socket 上提供服務（預設使用 stdio）')
+    parser.add_argument('--check', nargs='+', metavar='FILE', help='不啟動伺服器，預熱後直接輸出這些檔案的診斷')
+    args = parser.parse_args()
+
+    if args.check:
+        workspace = AuditWorkspace()
+        print(f"🧰 {workspace.warm()}")
+        return 1 if check_files(workspace, args.check) else 0
+
+    if args.socket is None:
+        # stdio 模式：stdout 專供 LSP 訊息，稽核腳本的輸出一律導向 stderr
+        reader, writer = sys.stdin.buffer, sys.stdout.buffer
+        sys.stdout = sys.stderr
+
+    def log(message: str):
+        print(message, file=sys.stderr, flush=True)
+
+    workspace = AuditWorkspace()
+    log(f"🧰 稽核診斷伺服器已預熱: {workspace.warm()}")
+    if args.socket is not None:
+        serve_socket(workspace, args.socket, log)
+        return 0
+    return 0 if DiagnosticsServer(workspace, JsonRpcConnection(reader, writer), log).serve() else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
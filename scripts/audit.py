@@ -0,0 +1,176 @@
+#!/usr/bin/env python3
+"""
+統一稽核入口
+在同一個行程內執行選定的稽核腳本：只啟動一次直譯器、只走訪一次專案目錄，
+各稽核共用同一個 ProjectIndex（檔案內容與 front matter 解析結果只讀取 / 解析一次），
+並以多個行程同時執行（Linux 以 fork 繼承已預熱的索引）
+
+用法:
+    python3 scripts/audit.py all                 # 全部稽核
+    python3 scripts/audit.py seo design          # 只跑 SEO 與設計系統
+    python3 scripts/audit.py all --jobs 1        # 依序執行（不開子行程）
+    python3 scripts/audit.py all --no-cache --format jsonl
+    python3 scripts/audit.py all --db            # 結果寫入 report/findings.db，以 findings.py 查詢
+    python3 scripts/audit.py all --staged        # pre-commit：只分析暫存區變更的檔案
+"""
+
+import argparse
+import importlib.util
+import sys
+import time
+import traceback
+from pathlib import Path
+from typing import Any, Dict, List, Tuple
+
+from auditkit import (DEFAULT_DB_NAME, MEMORY_TRACE_DEPTH, ProjectIndex, map_in_processes, resolve_jobs,
+                      split_front_matter)
+
+# 專案根目錄
+PROJECT_ROOT = Path(__file__).parent.parent
+SCRIPTS_DIR = Path(__file__).parent
+SRC_DIR = PROJECT_ROOT / "src"
+
+# 稽核名稱 -> [(腳本, 支援的共用參數)]，依此順序執行與輸出
+AUDITORS: Dict[str, List[Tuple[str, Tuple[str, ...]]]] = {
+    'seo': [
+        ('comprehensive-seo-audit.py', ('--no-cache', '--format', '--profile', '--memprofile', '--db', '--since')),
+        ('seo-audit.py', ('--format', '--profile', '--memprofile', '--db')),
+    ],
+    'design': [('design-system-audit.py', ('--no-cache', '--format', '--profile', '--memprofile', '--db', '--since'))],
+    'mobile': [('mobile-responsive-audit.py', ('--format', '--profile', '--memprofile', '--db', '--since'))],
+    'unused': [('find-unused-files.py', ('--no-cache', '--format', '--profile', '--memprofile', '--db'))],
+    'code': [('comprehensive-code-analysis.py', ('--format', '--profile', '--memprofile', '--db'))],
+}
+
+# 已載入的稽核模組（延遲載入，只載入選定的腳本）
+_modules: Dict[str, Any] = {}
+
+
+def load_auditor(script: str):
+    """載入稽核腳本模組（檔名含連字號，無法直接 import）"""
+    if script not in _modules:
+        path = SCRIPTS_DIR / script
+        module_name = 'audit_' + path.stem.replace('-', '_')
+        spec = importlib.util.spec_from_file_location(module_name, path)
+        module = importlib.util.module_from_spec(spec)
+        spec.loader.exec_module(module)
+        _modules[script] = module
+    return _modules[script]
+
+
+def build_argv(script: str, supported: Tuple[str, ...], args: argparse.Namespace) -> List[str]:
+    """只傳入該腳本支援的共用參數"""
+    argv = [str(SCRIPTS_DIR / script)]
+    if '--no-cache' in supported and args.no_cache:
+        argv.append('--no-cache')
+    if '--format' in supported and args.format != 'json':
+        argv.extend(['--format', args.format])
+    if '--profile' in supported and args.profile:
+        argv.append('--profile')
+    if '--memprofile' in supported and args.memprofile:
+        argv.extend(['--memprofile', '--memprofile-depth', str(args.memprofile_depth)])
+    if '--db' in supported and args.db:
+        argv.extend(['--db', str(args.db)])
+    # --since 與 --staged 一併支援
+    if '--since' in supported and args.since:
+        argv.extend(['--since', args.since])
+    if '--since' in supported and args.staged:
+        argv.append('--staged')
+    return argv
+
+
+def run_auditor(task: Tuple[str, str, List[str]]) -> Tuple[str, int, float]:
+    """執行單一稽核腳本的 main()，回傳 (腳本, 退出碼, 耗時秒數)
+
+    例外與 sys.exit 都轉為退出碼，不影響其他稽核
+    """
+    name, script, argv = task
+    print(f"\n{'━' * 60}\n▶️  [{name}] {script}\n{'━' * 60}")
+    start = time.perf_counter()
+    saved_argv = sys.argv
+    sys.argv = argv
+    try:
+        result = load_auditor(script).main()
+        code = result if isinstance(result, int) else 0
+    except SystemExit as e:
+        code = e.code if isinstance(e.code, int) else (0 if e.code is None else 1)
+    except Exception:
+        traceback.print_exc(file=sys.stdout)
+        code = 1
+    finally:
+        sys.argv = saved_argv
+    return script, code, time.perf_counter() - start
+
+
+def prewarm(index: ProjectIndex, names: List[str]):
+    """預先讀取多個稽核共用的檔案（main.css 等樣式表、頁面與其 front matter）
+
+    子行程以 fork 建立時會直接繼承這些快取
+    """
+    index.scan()
+    for entry in index.files(under=SRC_DIR, suffixes={'.css', '.njk'}):
+        try:
+            content = index.read_text(entry)
+        except UnicodeDecodeError:
+            continue
+        if 'seo' in names and entry.suffix == '.njk':
+            page = split_front_matter(content)
+            if page is not None:
+                try:
+                    page.data
+                except Exception:
+                    pass
+
+
+def main():
+    """主函數"""
+    parser = argparse.ArgumentParser(description='統一稽核入口：在同一個行程內執行多個稽核')
+    parser.add_argument('targets', nargs='*', default='all', choices=['all', *AUDITORS],
+                        help='要執行的稽核（預設 all）')
+    parser.add_argument('--jobs', type=int, default=0, metavar='N',
+                        help='同時執行的稽核數（0 = CPU 核心數，預設；1 = 依序在目前行程執行）')
+    parser.add_argument('--no-cache', action='store_true', help='不使用 .cache/audits/ 的結果快取，全部重新分析')
+    parser.add_argument('--format', choices=['json', 'jsonl'], default='json',
+                        help='支援的稽核以 JSON 或 JSON Lines 輸出結果')
+    parser.add_argument('--profile', action='store_true',
+                        help='支援的稽核各自記錄階段與規則耗時，輸出到 report/profile/<腳本>.prof / .folded')
+    parser.add_argument('--memprofile', action='store_true',
+                        help='支援的稽核各自記錄各階段記憶體峰值與主要配置位置，輸出到 report/profile/<腳本>.memory.json')
+    parser.add_argument('--memprofile-depth', type=int, default=MEMORY_TRACE_DEPTH, metavar='N',
+                        help=f'tracemalloc 保留的呼叫層數（預設 {MEMORY_TRACE_DEPTH}，加深可追溯到稽核腳本行但較慢）')
+    parser.add_argument('--db', nargs='?', const=PROJECT_ROOT / 'report' / DEFAULT_DB_NAME, type=Path, metavar='PATH',
+                        help=f'各稽核將問題與分數寫入同一個 SQLite 資料庫（預設 report/{DEFAULT_DB_NAME}）')
+    parser.add_argument('--since', metavar='REV',
+                        help='支援的稽核只重新分析自 REV 以來（git diff）變更的檔案，並列出這些檔案的問題')
+    parser.add_argument('--staged', action='store_true', help='同 --since，但範圍為 git 暫存區的變更（pre-commit 用）')
+    args = parser.parse_args()
+
+    names = list(AUDITORS) if 'all' in args.targets else [n for n in AUDITORS if n in args.targets]
+    if args.since or args.staged:
+        # 範圍模式只執行支援的稽核
+        names = [n for n in names if any('--since' in supported for _, supported in AUDITORS[n])]
+    tasks = [(name, script, build_argv(script, supported, args))
+             for name in names for script, supported in AUDITORS[name]
+             if not (args.since or args.staged) or '--since' in supported]
+    jobs = resolve_jobs(args.jobs)
+
+    start = time.perf_counter()
+    index = ProjectIndex.shared(PROJECT_ROOT)
+    prewarm(index, names)
+    print(f"🧰 執行稽核: {', '.join(names)}（{len(tasks)} 個腳本，"
+          f"{'依序執行' if jobs <= 1 else f'{min(jobs, len(tasks))} 個行程'}，"
+          f"索引 {len(index.files())} 個檔案）")
+
+    results = list(map_in_processes(run_auditor, tasks, jobs))
+
+    print(f"\n{'=' * 60}\n📋 稽核結果\n{'=' * 60}")
+    for script, code, elapsed in results:
+        status = '✅' if code == 0 else '⚠️ '
+        print(f"   {status} {script:<34} 退出碼 {code}  {elapsed:6.2f} 秒")
+    print(f"   總耗時 {time.perf_counter() - start:.2f} 秒")
+
+    return max((code for _, code, _ in results), default=0)
+
+
+if __name__ == '__main__':
+    sys.exit(main())
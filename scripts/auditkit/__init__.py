@@ -0,0 +1,89 @@
+"""
+稽核腳本共用工具
+"""
+
+from .findings_store import DEFAULT_DB_NAME, FindingsStore, record_findings
+from .front_matter import FrontMatter, parse_simple_yaml, split_front_matter
+from .git_scope import GitScope, scope_from_args
+from .html_facts import HtmlFactsParser, PageFacts, parse_html, read_html_facts, scan_source_facts
+from .ignore_rules import DEFAULT_IGNORE_FILES, IgnoreRules
+from .issue import Issue, issue_json
+from .jsonl import RECORD_KEY, JsonlReader, JsonlWriter, read_jsonl
+from .line_index import LineIndex
+from .link_graph import LinkGraph, site_path
+from .minhash import candidate_pairs, minhash_signature, near_duplicates, signature_similarity
+from .parallel import map_in_processes, resolve_jobs
+from .pattern_scanner import MultiPatternScanner, load_patterns
+from .profiler import MEMORY_TRACE_DEPTH, PROFILER, Profiler
+from .project_index import DEFAULT_PRUNE_DIRS, FileEntry, ProjectIndex
+from .rules import Rule, RuleSet, parse_rule_ids
+from .result_cache import CACHE_DIR, MISSING, ResultCache, fingerprint
+from .shard import SHARD_DIR, Shard, load_shards, save_shard, shard_from_args
+from .url_index import LINK_BROKEN, LINK_OK, LINK_REDIRECT, RedirectRules, UrlIndex
+from .walker import WALK_JOBS, DirListing, list_files, walk_roots, walk_tree
+from .watch import FileWatcher, watch_loop
+
+__all__ = [
+    'CACHE_DIR',
+    'DEFAULT_DB_NAME',
+    'DEFAULT_IGNORE_FILES',
+    'DEFAULT_PRUNE_DIRS',
+    'DirListing',
+    'FileEntry',
+    'FileWatcher',
+    'FindingsStore',
+    'FrontMatter',
+    'GitScope',
+    'HtmlFactsParser',
+    'IgnoreRules',
+    'Issue',
+    'JsonlReader',
+    'JsonlWriter',
+    'LINK_BROKEN',
+    'LINK_OK',
+    'LINK_REDIRECT',
+    'LineIndex',
+    'LinkGraph',
+    'MEMORY_TRACE_DEPTH',
+    'MISSING',
+    'MultiPatternScanner',
+    'PROFILER',
+    'PageFacts',
+    'Profiler',
+    'ProjectIndex',
+    'RECORD_KEY',
+    'RedirectRules',
+    'ResultCache',
+    'Rule',
+    'RuleSet',
+    'SHARD_DIR',
+    'Shard',
+    'UrlIndex',
+    'WALK_JOBS',
+    'candidate_pairs',
+    'fingerprint',
+    'issue_json',
+    'list_files',
+    'load_patterns',
+    'load_shards',
+    'map_in_processes',
+    'minhash_signature',
+    'near_duplicates',
+    'parse_html',
+    'parse_rule_ids',
+    'parse_simple_yaml',
+    'read_html_facts',
+    'read_jsonl',
+    'record_findings',
+    'resolve_jobs',
+    'save_shard',
+    'scan_source_facts',
+    'scope_from_args',
+    'shard_from_args',
+    'signature_similarity',
+    'site_path',
+    'split_front_matter',
+    'walk_roots',
+    'walk_tree',
+    'watch_loop',
+]
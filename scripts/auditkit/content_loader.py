@@ -0,0 +1,76 @@
+"""
+二進位檔偵測與位元組層級的內容處理
+只讀取檔案開頭一個區塊判斷是否為二進位檔（NUL 位元組或已知的檔案簽章），
+二進位檔不必解碼就能略過；行數直接在原始位元組上計算，超過大小上限的檔案改以分塊串流處理
+"""
+
+from pathlib import Path
+from typing import Iterable, Iterator, Union
+
+PathLike = Union[str, Path]
+
+# 偵測二進位檔時讀取的開頭位元組數
+SNIFF_SIZE = 8192
+
+# 超過此大小的檔案不整檔讀入記憶體，改為分塊串流
+STREAM_THRESHOLD = 8 << 20
+
+# 串流讀檔的區塊大小
+CHUNK_SIZE = 1 << 20
+
+# 已知的二進位檔簽章（開頭位元組）；TIFF / 相機 RAW、ICO、TrueType、macOS .DS_Store、SQLite 等
+# 簽章本身含 NUL 位元組，已由 NUL 判斷涵蓋
+MAGIC_NUMBERS = (
+    b'\x89PNG\r\n\x1a\n',       # PNG
+    b'\xff\xd8\xff',            # JPEG
+    b'GIF87a', b'GIF89a',       # GIF
+    b'RIFF',                    # WebP / WAV / AVI
+    b'%PDF-',                   # PDF
+    b'PK\x03\x04',              # ZIP / docx / xlsx
+    b'\x1f\x8b',                # gzip
+    b'7z\xbc\xaf\x27\x1c',      # 7z
+    b'wOFF', b'wOF2', b'OTTO',  # WOFF / WOFF2 / OpenType
+    b'\x7fELF',                 # ELF
+    b'ID3',                     # MP3
+)
+
+
+def looks_binary(head: bytes) -> bool:
+    """依檔案開頭判斷是否為二進位檔（與 git 相同以 NUL 位元組為主，再比對檔案簽章）"""
+    if b'\x00' in head:
+        return True
+    if head[4:8] == b'ftyp':
+        # MP4 / MOV / HEIC
+        return True
+    return head.startswith(MAGIC_NUMBERS)
+
+
+def sniff_binary(path: PathLike) -> bool:
+    with open(path, 'rb') as f:
+        return looks_binary(f.read(SNIFF_SIZE))
+
+
+def iter_chunks(path: PathLike, chunk_size: int = CHUNK_SIZE) -> Iterator[bytes]:
+    """分塊讀取檔案"""
+    with open(path, 'rb') as f:
+        while True:
+            chunk = f.read(chunk_size)
+            if not chunk:
+                return
+            yield chunk
+
+
+def count_lines(chunks: Iterable[bytes]) -> int:
+    """在原始位元組上計算行數，結果等同文字模式的 len(f.readlines())（\\n、\\r\\n、\\r 皆視為換行）"""
+    lines = 0
+    last = b''
+    for chunk in chunks:
+        lines += chunk.count(b'\n') + chunk.count(b'\r') - chunk.count(b'\r\n')
+        if last == b'\r' and chunk[:1] == b'\n':
+            # 跨區塊的 \r\n 只算一次
+            lines -= 1
+        last = chunk[-1:]
+    if last and last not in (b'\n', b'\r'):
+        # 最後一行沒有換行符號
+        lines += 1
+    return lines
@@ -0,0 +1,248 @@
+"""
+稽核發現的 SQLite 資料庫
+每次執行寫入一筆 run，問題與分數以單一交易批次寫入 runs / files / issues / scores 表，
+依規則、檔案與嚴重度建立索引。問題以「工具 + 規則 + 檔案 + 訊息（數字正規化）+ 出現序號」的指紋比對，
+不必重新解析大型 JSON 就能查詢兩次執行之間新增 / 修復的問題、分數退步最多的項目與問題首次出現的時間
+"""
+
+import hashlib
+import json
+import re
+import sqlite3
+import subprocess
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Tuple, Union
+
+from .issue import Issue
+
+PathLike = Union[str, Path]
+
+# 預設資料庫檔名（放在 report/ 下）
+DEFAULT_DB_NAME = 'findings.db'
+
+SCHEMA_VERSION = 1
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS runs (
+    id INTEGER PRIMARY KEY,
+    tool TEXT NOT NULL,
+    started_at TEXT NOT NULL,
+    git_commit TEXT,
+    issue_count INTEGER NOT NULL DEFAULT 0,
+    summary TEXT
+);
+CREATE TABLE IF NOT EXISTS files (
+    id INTEGER PRIMARY KEY,
+    path TEXT NOT NULL UNIQUE
+);
+CREATE TABLE IF NOT EXISTS issues (
+    run_id INTEGER NOT NULL REFERENCES runs(id) ON DELETE CASCADE,
+    file_id INTEGER REFERENCES files(id),
+    rule TEXT NOT NULL,
+    severity TEXT NOT NULL,
+    message TEXT NOT NULL,
+    line INTEGER,
+    fingerprint TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS scores (
+    run_id INTEGER NOT NULL REFERENCES runs(id) ON DELETE CASCADE,
+    file_id INTEGER REFERENCES files(id),
+    name TEXT NOT NULL,
+    value REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_runs_tool ON runs(tool, id);
+CREATE INDEX IF NOT EXISTS idx_issues_run ON issues(run_id, fingerprint);
+CREATE INDEX IF NOT EXISTS idx_issues_fingerprint ON issues(fingerprint, run_id);
+CREATE INDEX IF NOT EXISTS idx_issues_rule ON issues(rule);
+CREATE INDEX IF NOT EXISTS idx_issues_file ON issues(file_id);
+CREATE INDEX IF NOT EXISTS idx_issues_severity ON issues(severity);
+CREATE INDEX IF NOT EXISTS idx_scores_run ON scores(run_id, name);
+CREATE INDEX IF NOT EXISTS idx_scores_file ON scores(file_id, name);
+"""
+
+# 查詢結果的問題欄位
+ISSUE_COLUMNS = "i.rule, i.severity, f.path, i.line, i.message, i.fingerprint"
+
+# 訊息中的數字（長度、次數等）不影響指紋，數值變動仍視為同一個問題
+_NUMBER = re.compile(r'\d+(?:\.\d+)?')
+
+
+def issue_fingerprint(tool: str, rule: str, path: Optional[str], message: str, occurrence: int) -> str:
+    key = '\0'.join((tool, rule, path or '', _NUMBER.sub('#', message), str(occurrence)))
+    return hashlib.sha1(key.encode('utf-8')).hexdigest()[:20]
+
+
+def git_commit(root: PathLike) -> Optional[str]:
+    """目前的 commit（非 git 專案或沒有 git 時回傳 None）"""
+    try:
+        return subprocess.run(['git', 'rev-parse', 'HEAD'], cwd=root, capture_output=True,
+                              text=True, check=True).stdout.strip() or None
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+class FindingsStore:
+    """稽核發現資料庫（可作為 context manager 使用）"""
+
+    def __init__(self, path: PathLike):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        # 多個稽核同時寫入（audit.py --jobs）時等待鎖定釋放
+        self.conn = sqlite3.connect(str(self.path), timeout=60)
+        self.conn.row_factory = sqlite3.Row
+        self.conn.execute('PRAGMA foreign_keys = ON')
+        self.conn.execute('PRAGMA journal_mode = WAL')
+        with self.conn:
+            self.conn.executescript(SCHEMA)
+            version = self.conn.execute('PRAGMA user_version').fetchone()[0]
+            if version == 0:
+                self.conn.execute(f'PRAGMA user_version = {SCHEMA_VERSION}')
+            elif version != SCHEMA_VERSION:
+                raise ValueError(f"{self.path}: 資料庫版本 {version} 與目前版本 {SCHEMA_VERSION} 不符")
+        self._file_ids: Dict[str, int] = {}
+
+    def close(self):
+        self.conn.close()
+
+    def __enter__(self) -> 'FindingsStore':
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def _file_id(self, path: Optional[str]) -> Optional[int]:
+        if not path:
+            return None
+        file_id = self._file_ids.get(path)
+        if file_id is None:
+            self.conn.execute('INSERT OR IGNORE INTO files (path) VALUES (?)', (path,))
+            file_id = self.conn.execute('SELECT id FROM files WHERE path = ?', (path,)).fetchone()[0]
+            self._file_ids[path] = file_id
+        return file_id
+
+    def record_run(self, tool: str, issues: Iterable[Union[Issue, Dict[str, Any]]],
+                   scores: Iterable[Tuple[Optional[str], str, float]] = (),
+                   summary: Optional[Dict[str, Any]] = None, commit: Optional[str] = None) -> int:
+        """以單一交易寫入一次執行，回傳 run id
+
+        issues 的每筆為 Issue（或 {'rule', 'severity', 'file', 'message', 'line'(可省略)}），file 為 None 表示專案層級；
+        scores 的每筆為 (檔案或 None, 名稱, 分數)
+        """
+        occurrences: Dict[Tuple[str, str, str], int] = {}
+        with self.conn:
+            run_id = self.conn.execute(
+                'INSERT INTO runs (tool, started_at, git_commit, summary) VALUES (?, ?, ?, ?)',
+                (tool, datetime.now().isoformat(timespec='seconds'), commit,
+                 json.dumps(summary, ensure_ascii=False, default=str) if summary is not None else None)).lastrowid
+
+            rows = []
+            for issue in issues:
+                if not isinstance(issue, Issue):
+                    issue = Issue.from_dict(issue)
+                rule, path, message = issue.rule, issue.file, issue.message or ''
+                key = (rule, path or '', _NUMBER.sub('#', message))
+                occurrence = occurrences[key] = occurrences.get(key, 0) + 1
+                rows.append((run_id, self._file_id(path), rule, issue.severity or 'info', message,
+                             issue.line, issue_fingerprint(tool, rule, path, message, occurrence)))
+            self.conn.executemany(
+                'INSERT INTO issues (run_id, file_id, rule, severity, message, line, fingerprint) '
+                'VALUES (?, ?, ?, ?, ?, ?, ?)', rows)
+            self.conn.executemany(
+                'INSERT INTO scores (run_id, file_id, name, value) VALUES (?, ?, ?, ?)',
+                [(run_id, self._file_id(path), name, float(value)) for path, name, value in scores])
+            self.conn.execute('UPDATE runs SET issue_count = ? WHERE id = ?', (len(rows), run_id))
+        return run_id
+
+    # ── 查詢 ──
+
+    def runs(self, tool: Optional[str] = None, limit: int = 20) -> List[sqlite3.Row]:
+        """最近的執行（新到舊）"""
+        if tool:
+            return self.conn.execute('SELECT * FROM runs WHERE tool = ? ORDER BY id DESC LIMIT ?',
+                                     (tool, limit)).fetchall()
+        return self.conn.execute('SELECT * FROM runs ORDER BY id DESC LIMIT ?', (limit,)).fetchall()
+
+    def tools(self) -> List[str]:
+        return [row[0] for row in self.conn.execute('SELECT DISTINCT tool FROM runs ORDER BY tool')]
+
+    def run(self, run_id: int) -> Optional[sqlite3.Row]:
+        return self.conn.execute('SELECT * FROM runs WHERE id = ?', (run_id,)).fetchone()
+
+    def resolve_runs(self, tool: str, run_id: Optional[int] = None,
+                     base_id: Optional[int] = None) -> Tuple[Optional[int], Optional[int]]:
+        """決定要比較的 (目前, 基準) 執行：預設為該工具最近一次與前一次"""
+        if run_id is None:
+            row = self.conn.execute('SELECT id FROM runs WHERE tool = ? ORDER BY id DESC LIMIT 1', (tool,)).fetchone()
+            run_id = row[0] if row else None
+        if run_id is not None and base_id is None:
+            row = self.conn.execute('SELECT id FROM runs WHERE tool = ? AND id < ? ORDER BY id DESC LIMIT 1',
+                                    (tool, run_id)).fetchone()
+            base_id = row[0] if row else None
+        return run_id, base_id
+
+    def _issues_not_in(self, run_id: int, other_id: Optional[int]) -> List[sqlite3.Row]:
+        return self.conn.execute(
+            f'SELECT {ISSUE_COLUMNS} FROM issues i LEFT JOIN files f ON f.id = i.file_id '
+            'WHERE i.run_id = ? AND NOT EXISTS '
+            '(SELECT 1 FROM issues o WHERE o.run_id = ? AND o.fingerprint = i.fingerprint) '
+            'ORDER BY i.severity, i.rule, f.path', (run_id, other_id if other_id is not None else -1)).fetchall()
+
+    def new_issues(self, run_id: int, base_id: Optional[int]) -> List[sqlite3.Row]:
+        """run_id 有、base_id 沒有的問題"""
+        return self._issues_not_in(run_id, base_id)
+
+    def fixed_issues(self, run_id: int, base_id: Optional[int]) -> List[sqlite3.Row]:
+        """base_id 有、run_id 已沒有的問題"""
+        if base_id is None:
+            return []
+        return self._issues_not_in(base_id, run_id)
+
+    def score_regressions(self, run_id: int, base_id: int, limit: int = 20) -> List[sqlite3.Row]:
+        """分數下降最多的（檔案, 項目）"""
+        return self.conn.execute(
+            'SELECT f.path, s.name, b.value AS before, s.value AS after, s.value - b.value AS delta '
+            'FROM scores s JOIN scores b ON b.run_id = ? AND b.name = s.name AND b.file_id IS s.file_id '
+            'LEFT JOIN files f ON f.id = s.file_id '
+            'WHERE s.run_id = ? AND s.value < b.value ORDER BY delta LIMIT ?', (base_id, run_id, limit)).fetchall()
+
+    def rule_regressions(self, run_id: int, base_id: int, limit: int = 20) -> List[sqlite3.Row]:
+        """問題數增加最多的規則"""
+        return self.conn.execute(
+            'SELECT rule, SUM(run_id = ?) AS after, SUM(run_id = ?) AS before, '
+            'SUM(run_id = ?) - SUM(run_id = ?) AS delta '
+            'FROM issues WHERE run_id IN (?, ?) GROUP BY rule HAVING delta > 0 ORDER BY delta DESC, rule LIMIT ?',
+            (run_id, base_id, run_id, base_id, run_id, base_id, limit)).fetchall()
+
+    def first_seen(self, run_id: int, rule: Optional[str] = None, path: Optional[str] = None) -> List[sqlite3.Row]:
+        """run_id 中每個問題最早出現的執行（同一工具）"""
+        sql = (f'SELECT {ISSUE_COLUMNS}, r.id AS first_run, r.started_at AS first_seen, r.git_commit AS first_commit '
+               'FROM issues i LEFT JOIN files f ON f.id = i.file_id '
+               'JOIN runs r ON r.id = (SELECT MIN(h.run_id) FROM issues h WHERE h.fingerprint = i.fingerprint) '
+               'WHERE i.run_id = ?')
+        params: List[Any] = [run_id]
+        if rule:
+            sql += ' AND i.rule = ?'
+            params.append(rule)
+        if path:
+            sql += ' AND f.path LIKE ?'
+            params.append(f'%{path}%')
+        return self.conn.execute(sql + ' ORDER BY r.id, i.rule, f.path', params).fetchall()
+
+    def prune(self, tool: str, keep: int):
+        """只保留該工具最近 keep 次執行"""
+        with self.conn:
+            self.conn.execute('DELETE FROM runs WHERE tool = ? AND id NOT IN '
+                              '(SELECT id FROM runs WHERE tool = ? ORDER BY id DESC LIMIT ?)', (tool, tool, keep))
+
+
+def record_findings(db_path: PathLike, tool: str, issues: Iterable[Union[Issue, Dict[str, Any]]],
+                    scores: Iterable[Tuple[Optional[str], str, float]] = (),
+                    summary: Optional[Dict[str, Any]] = None, root: Optional[PathLike] = None) -> int:
+    """稽核腳本 --db 的共用流程：寫入一次執行並印出摘要"""
+    with FindingsStore(db_path) as store:
+        run_id = store.record_run(tool, issues, scores, summary=summary,
+                                  commit=git_commit(root) if root is not None else None)
+        count = store.run(run_id)['issue_count']
+    print(f"🗄️  發現已寫入 {db_path}（run #{run_id}，{count} 筆問題）")
+    return run_id
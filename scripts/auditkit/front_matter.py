@@ -0,0 +1,192 @@
+"""
+共用 front matter 解析
+以字串搜尋切出開頭兩個 `---` 分隔線（不對整份內容跑 DOTALL 正規表示式），
+YAML 子集依內容記憶化只解析一次，頁面內文延遲切片，只需要 title / seo 的呼叫端不會複製內文
+"""
+
+from functools import lru_cache
+from typing import Any, Dict, Optional
+
+# 記憶化的 front matter 數量上限（以 front matter 內容為鍵）
+YAML_CACHE_SIZE = 4096
+
+
+class FrontMatter:
+    """切分後的頁面：front matter 文字、解析結果與延遲取得的內文
+
+    切分結果與 re.match(r'^(---\\s*\\n)(.*?)(\\n---\\s*\\n)(.*)$', content, re.DOTALL) 的四個群組相同
+    """
+
+    __slots__ = ('content', 'text_start', 'text_end', 'body_start', '_data')
+
+    def __init__(self, content: str, text_start: int, text_end: int, body_start: int):
+        self.content = content
+        self.text_start = text_start
+        self.text_end = text_end
+        self.body_start = body_start
+        self._data: Optional[Dict[str, Any]] = None
+
+    @property
+    def opening(self) -> str:
+        """開頭分隔線（含換行）"""
+        return self.content[:self.text_start]
+
+    @property
+    def text(self) -> str:
+        """front matter 原始文字"""
+        return self.content[self.text_start:self.text_end]
+
+    @property
+    def closing(self) -> str:
+        """結尾分隔線（含前後換行）"""
+        return self.content[self.text_end:self.body_start]
+
+    @property
+    def data(self) -> Dict[str, Any]:
+        """解析後的 front matter（YAML 子集；格式錯誤時拋出例外）"""
+        if self._data is None:
+            self._data = parse_simple_yaml(self.text)
+        return self._data
+
+    @property
+    def body(self) -> str:
+        """頁面內文（存取時才切片）"""
+        return self.content[self.body_start:]
+
+    @property
+    def body_length(self) -> int:
+        """內文長度（不複製內文）"""
+        return len(self.content) - self.body_start
+
+
+def _fence_end(content: str, start: int) -> int:
+    """`---` 之後的 `\\s*\\n`：回傳空白區段內最後一個換行之後的位置（貪婪比對），沒有換行時回傳 -1"""
+    end = start
+    length = len(content)
+    while end < length and content[end].isspace():
+        end += 1
+    return content.rfind('\n', start, end) + 1 or -1
+
+
+def split_front_matter(content: str) -> Optional[FrontMatter]:
+    """切出 front matter，沒有 front matter 時回傳 None"""
+    if not content.startswith('---'):
+        return None
+
+    open_end = _fence_end(content, 3)
+    # 開頭空白內有多個換行時，與正規表示式的回溯順序相同：由最長的開頭分隔線往回嘗試
+    while open_end > 0:
+        search_from = open_end
+        while True:
+            fence = content.find('\n---', search_from)
+            if fence < 0:
+                break
+            body_start = _fence_end(content, fence + 4)
+            if body_start > 0:
+                return FrontMatter(content, open_end, fence, body_start)
+            search_from = fence + 1
+        open_end = content.rfind('\n', 3, open_end - 1) + 1 or -1
+    return None
+
+
+def parse_simple_yaml(yaml_text: str) -> Dict[str, Any]:
+    """解析 front matter 的 YAML 子集（相同內容只解析一次，回傳獨立副本）"""
+    return _copy(_parse_cached(yaml_text))
+
+
+@lru_cache(maxsize=YAML_CACHE_SIZE)
+def _parse_cached(yaml_text: str) -> Dict[str, Any]:
+    return _parse_yaml_block(yaml_text)
+
+
+def _copy(value: Any) -> Any:
+    if isinstance(value, dict):
+        return {k: _copy(v) for k, v in value.items()}
+    return value
+
+
+def _parse_yaml_block(yaml_text: str) -> Dict[str, Any]:
+    """簡單的 YAML 解析器
+    支持基本格式：key: value、嵌套結構（seo: description: ...）與多行值（| 或 >）
+    """
+    result = {}
+    lines = yaml_text.split('\n')
+    i = 0
+
+    while i < len(lines):
+        line = lines[i]
+        stripped = line.strip()
+
+        # 跳過空行和註釋
+        if not stripped or stripped.startswith('#'):
+            i += 1
+            continue
+
+        # 計算縮進（使用空格數）
+        indent = len(line) - len(line.lstrip())
+
+        # 解析 key: value
+        if ':' in line:
+            colon_idx = line.index(':')
+            key = line[:colon_idx].strip()
+            value_part = line[colon_idx + 1:].strip()
+
+            # 檢查是否是嵌套對象（下一行有更多縮進）
+            is_object = False
+            if i + 1 < len(lines):
+                next_line = lines[i + 1]
+                next_stripped = next_line.strip()
+                if next_stripped and ':' in next_line:
+                    next_indent = len(next_line) - len(next_line.lstrip())
+                    if next_indent > indent:
+                        is_object = True
+
+            if is_object:
+                # 這是一個對象，遞歸解析
+                nested_lines = []
+                i += 1
+                while i < len(lines):
+                    nested_line = lines[i]
+                    nested_stripped = nested_line.strip()
+                    if not nested_stripped or nested_stripped.startswith('#'):
+                        i += 1
+                        continue
+                    nested_indent = len(nested_line) - len(nested_line.lstrip())
+                    if nested_indent <= indent:
+                        break
+                    nested_lines.append(nested_line)
+                    i += 1
+                i -= 1  # 回退一行，因為外層循環會增加
+
+                result[key] = _parse_yaml_block('\n'.join(nested_lines))
+            else:
+                # 處理普通值
+                value = value_part
+
+                # 處理多行值（| 或 >）
+                if value in ('|', '>'):
+                    multiline_lines = []
+                    i += 1
+                    while i < len(lines):
+                        next_line = lines[i]
+                        next_indent = len(next_line) - len(next_line.lstrip())
+                        if next_indent <= indent and next_line.strip():
+                            break
+                        if next_indent > indent:
+                            multiline_lines.append(next_line[indent:])
+                        i += 1
+                    value = '\n'.join(multiline_lines).strip()
+                    if value.startswith('|') or value.startswith('>'):
+                        value = value[1:].lstrip()
+                    i -= 1
+                else:
+                    # 移除引號
+                    if (value.startswith('"') and value.endswith('"')) or \
+                       (value.startswith("'") and value.endswith("'")):
+                        value = value[1:-1]
+
+                result[key] = value
+
+        i += 1
+
+    return result
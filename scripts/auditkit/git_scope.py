@@ -0,0 +1,63 @@
+"""
+git diff 範圍模式（--since <rev> / --staged）
+以 git diff --name-only -z 取得變更的檔案（關閉 core.quotePath，非 ASCII 路徑不會被加上引號與八進位跳脫），
+稽核腳本只重新分析範圍內的檔案，範圍外的檔案沿用結果快取，跨頁檢查（重複標題等）仍以完整的頁面集合計算
+"""
+
+import subprocess
+from pathlib import Path
+from typing import Iterable, List, Optional, Set, Union
+
+PathLike = Union[str, Path]
+
+
+class GitScope:
+    """git diff 範圍內的檔案（相對於專案根目錄的 POSIX 路徑）"""
+
+    def __init__(self, root: PathLike, since: Optional[str] = None, staged: bool = False):
+        self.root = Path(root)
+        self.since = since
+        self.staged = staged
+        if staged:
+            # 暫存區對比 HEAD（稽核讀取的是工作目錄中的內容）
+            changed = self._git('diff', '--name-only', '-z', '--relative', '--cached',
+                                *([since] if since else []))
+        else:
+            # 工作目錄對比 rev，加上尚未追蹤的新檔案
+            changed = self._git('diff', '--name-only', '-z', '--relative', since or 'HEAD')
+            changed += self._git('ls-files', '-z', '--others', '--exclude-standard')
+        self.changed: Set[str] = set(changed)
+
+    def _git(self, *args: str) -> List[str]:
+        """執行 git 並以 NUL 分隔輸出（搭配 -z），路徑與稽核腳本的相對路徑逐字相同"""
+        try:
+            result = subprocess.run(['git', '-c', 'core.quotePath=false', *args], cwd=self.root,
+                                    capture_output=True, encoding='utf-8')
+        except OSError as e:
+            raise ValueError(f"無法執行 git: {e}")
+        if result.returncode != 0:
+            raise ValueError(f"git {' '.join(args)} 失敗: {result.stderr.strip()}")
+        return [path for path in result.stdout.split('\0') if path]
+
+    def __contains__(self, rel: str) -> bool:
+        return rel in self.changed
+
+    def __len__(self) -> int:
+        return len(self.changed)
+
+    def filter(self, rels: Iterable[str]) -> List[str]:
+        return [rel for rel in rels if rel in self.changed]
+
+    def describe(self) -> str:
+        if self.staged:
+            base = f"暫存區對比 {self.since}" if self.since else "暫存區"
+        else:
+            base = f"自 {self.since or 'HEAD'} 以來"
+        return f"{base}變更 {len(self.changed)} 個檔案"
+
+
+def scope_from_args(root: PathLike, since: Optional[str], staged: bool) -> Optional[GitScope]:
+    """--since / --staged 的共用處理：兩者都未指定時回傳 None，git 失敗時以 ValueError 回報"""
+    if since is None and not staged:
+        return None
+    return GitScope(root, since, staged)
@@ -0,0 +1,225 @@
+"""
+HTML 頁面事實擷取
+以 html.parser 分塊餵入建置後的 HTML，一次走訪取得 title、meta、canonical、標題標籤、圖片、連結與純文字，
+各項 SEO 評分直接使用擷取結果，不必對整頁字串反覆套用正規表示式；
+.njk 模板原始碼（不是合法的 HTML）則以單次標籤切分掃描取得相同的事實
+"""
+
+import codecs
+import re
+from html.parser import HTMLParser
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Tuple, Union
+
+from .content_loader import iter_chunks
+
+PathLike = Union[str, Path]
+
+# 串流解析的區塊大小
+PARSE_CHUNK_SIZE = 64 << 10
+
+# 內容不計入純文字的元素
+SKIPPED_TEXT_TAGS = {'script', 'style', 'template'}
+
+HEADING_LEVELS = {f'h{level}': level for level in range(1, 7)}
+
+WHITESPACE_PATTERN = re.compile(r'\s+')
+
+# 模板原始碼的標籤（純文字為以空白取代標籤後的內容）
+SOURCE_TAG_PATTERN = re.compile(r'<[^>]+>')
+
+# 模板原始碼中分析需要的標籤：標題開始（group 1 為層級）、標題結束（group 2）、<img>（group 3）與 <a>
+SOURCE_FACT_TAG_PATTERN = re.compile(r'<(?:h([1-6])[^>]*|/h([1-6])|(img)[^>]*|a[^>]*)>', re.IGNORECASE)
+
+# 原始碼標籤中的連結（取最後一個 href，與原本對整頁套用的 <a[^>]*href=... 相同）與圖片屬性
+SOURCE_LINK_PATTERN = re.compile(r'<a[^>]*href=["\']([^"\']+)["\']', re.IGNORECASE)
+SOURCE_IMG_ATTR_PATTERN = re.compile(r'(alt|src)=["\']([^"\']*)["\']', re.IGNORECASE)
+
+
+def collapse_whitespace(text: str) -> str:
+    return WHITESPACE_PATTERN.sub(' ', text).strip()
+
+
+class PageFacts:
+    """單頁的 HTML 事實
+
+    - meta：name / property（小寫）-> content；None 表示無法得知 <head>（.njk 原始碼的 head 由 base-layout 產生）
+    - heading_counts：h1-h6 開始標籤數；headings：已結束的標題 (層級, 文字)，依文件順序
+    - images：(src, alt)，屬性不存在時為 None；links：<a> 的非空 href
+    """
+
+    FIELDS = ('title', 'meta', 'canonical', 'heading_counts', 'headings', 'images', 'links', 'text')
+    # _link_split：split_links() 的結果（不寫入 to_dict）
+    __slots__ = FIELDS + ('_link_split',)
+
+    def __init__(self, title: str = '', meta: Optional[Dict[str, str]] = None, canonical: Optional[str] = None,
+                 heading_counts: Optional[List[int]] = None, headings: Optional[List[Tuple[int, str]]] = None,
+                 images: Optional[List[Tuple[Optional[str], Optional[str]]]] = None,
+                 links: Optional[List[str]] = None, text: str = ''):
+        self.title = title
+        self.meta = meta
+        self.canonical = canonical
+        self.heading_counts = heading_counts if heading_counts is not None else [0] * 6
+        self.headings = headings if headings is not None else []
+        self.images = images if images is not None else []
+        self.links = links if links is not None else []
+        self.text = text
+        self._link_split: Optional[Tuple[str, List[str], List[str]]] = None
+
+    def split_links(self, site_url: str) -> Tuple[List[str], List[str]]:
+        """將連結分為 (內部連結, 外部連結)：含 site_url 的絕對網址與相對路徑為內部，# 錨點不計；同一網址只分類一次"""
+        if self._link_split is None or self._link_split[0] != site_url:
+            internal: List[str] = []
+            external: List[str] = []
+            for link in self.links:
+                if link.startswith('http://') or link.startswith('https://'):
+                    (internal if site_url in link else external).append(link)
+                elif not link.startswith('#'):
+                    internal.append(link)
+            self._link_split = (site_url, internal, external)
+        return self._link_split[1], self._link_split[2]
+
+    def heading_texts(self, level: int) -> List[str]:
+        return [text for heading_level, text in self.headings if heading_level == level]
+
+    def to_dict(self) -> Dict[str, Any]:
+        """轉為可寫入 JSON / 結果快取的 dict（from_dict 還原）"""
+        return {name: getattr(self, name) for name in self.FIELDS}
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> 'PageFacts':
+        return cls(**data)
+
+
+def scan_source_facts(content: str) -> PageFacts:
+    """單次走訪模板原始碼中的標題、圖片與連結標籤取得事實（meta 為 None：head 由 base-layout 產生，原始碼看不到）
+
+    結果與分別對整頁套用 <hN[^>]*>、<hN[^>]*>(.*?)</hN>、<img[^>]*>、<a[^>]*href=...> 的作法相同：
+    標題文字為開始與結束標籤之間去除標籤的內容，同級標題未結束前出現的開始標籤只計入數量
+    """
+    facts = PageFacts()
+    counts = facts.heading_counts
+    headings = facts.headings
+    images = facts.images
+    links = facts.links
+    # 尚未結束的標題：層級 -> 開始標籤的結束位移
+    open_headings: Dict[int, int] = {}
+    for match in SOURCE_FACT_TAG_PATTERN.finditer(content):
+        opening, closing, img = match.groups()
+        if opening:
+            level = int(opening)
+            counts[level - 1] += 1
+            if level not in open_headings:
+                open_headings[level] = match.end()
+        elif closing:
+            level = int(closing)
+            if level in open_headings:
+                inner = content[open_headings.pop(level):match.start()]
+                headings.append((level, SOURCE_TAG_PATTERN.sub('', inner).strip()))
+        elif img:
+            attrs: Dict[str, str] = {}
+            for name, value in SOURCE_IMG_ATTR_PATTERN.findall(match.group()):
+                attrs.setdefault(name.lower(), value)
+            images.append((attrs.get('src'), attrs.get('alt')))
+        else:
+            link = SOURCE_LINK_PATTERN.match(match.group())
+            if link:
+                links.append(link.group(1))
+    facts.text = collapse_whitespace(SOURCE_TAG_PATTERN.sub(' ', content))
+    return facts
+
+
+class HtmlFactsParser(HTMLParser):
+    """HTML 事實擷取器：feed() 可多次呼叫（逐塊餵入），close() 後由 facts 取得結果"""
+
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.facts = PageFacts(meta={})
+        self._text: List[str] = []
+        self._in_head = False
+        self._skip_depth = 0
+        self._title: Optional[List[str]] = None
+        self._heading: Optional[Tuple[int, List[str]]] = None
+
+    def handle_starttag(self, tag: str, attrs: List[Tuple[str, Optional[str]]]):
+        facts = self.facts
+        # 與原本以空白取代標籤的作法相同，相鄰元素的文字不會黏在一起
+        self._text.append(' ')
+        if tag in SKIPPED_TEXT_TAGS:
+            self._skip_depth += 1
+        elif tag in HEADING_LEVELS:
+            level = HEADING_LEVELS[tag]
+            facts.heading_counts[level - 1] += 1
+            if self._heading is None:
+                self._heading = (level, [])
+        elif tag == 'a':
+            href = dict(attrs).get('href')
+            if href:
+                facts.links.append(href)
+        elif tag == 'img':
+            values = dict(attrs)
+            facts.images.append((values.get('src'), values.get('alt')))
+        elif tag == 'meta':
+            values = dict(attrs)
+            key = values.get('name') or values.get('property')
+            if key and key.lower() not in facts.meta:
+                facts.meta[key.lower()] = values.get('content') or ''
+        elif tag == 'link':
+            values = dict(attrs)
+            if facts.canonical is None and 'canonical' in (values.get('rel') or '').lower().split():
+                facts.canonical = values.get('href') or ''
+        elif tag == 'title':
+            if self._title is None and not facts.title:
+                self._title = []
+        elif tag == 'head':
+            self._in_head = True
+        elif tag == 'body':
+            self._in_head = False
+
+    def handle_endtag(self, tag: str):
+        self._text.append(' ')
+        if tag in SKIPPED_TEXT_TAGS:
+            self._skip_depth = max(0, self._skip_depth - 1)
+        elif tag in HEADING_LEVELS:
+            if self._heading is not None and self._heading[0] == HEADING_LEVELS[tag]:
+                level, parts = self._heading
+                self.facts.headings.append((level, collapse_whitespace(''.join(parts))))
+                self._heading = None
+        elif tag == 'title':
+            if self._title is not None:
+                self.facts.title = collapse_whitespace(''.join(self._title))
+                self._title = None
+        elif tag == 'head':
+            self._in_head = False
+
+    def handle_data(self, data: str):
+        if self._skip_depth:
+            return
+        if self._title is not None:
+            self._title.append(data)
+            return
+        if self._heading is not None:
+            self._heading[1].append(data)
+        if not self._in_head:
+            self._text.append(data)
+
+    def close(self):
+        super().close()
+        self.facts.text = collapse_whitespace(''.join(self._text))
+        self._text = []
+
+
+def parse_html(chunks: Iterable[bytes], encoding: str = 'utf-8-sig') -> PageFacts:
+    """逐塊解碼並餵入 HTML（多位元組字元跨區塊也能正確解碼），回傳擷取結果"""
+    decoder = codecs.getincrementaldecoder(encoding)(errors='replace')
+    parser = HtmlFactsParser()
+    for chunk in chunks:
+        parser.feed(decoder.decode(chunk))
+    parser.feed(decoder.decode(b'', final=True))
+    parser.close()
+    return parser.facts
+
+
+def read_html_facts(path: PathLike, chunk_size: int = PARSE_CHUNK_SIZE) -> PageFacts:
+    """串流讀取 HTML 檔並擷取事實（不需將整個檔案讀入記憶體）"""
+    return parse_html(iter_chunks(path, chunk_size))
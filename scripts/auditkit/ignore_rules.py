@@ -0,0 +1,143 @@
+"""
+.gitignore / .eleventyignore 規則
+將忽略檔的每一行預先編譯成正規表示式（gitignore 語法：`!` 反向、結尾 `/` 只比對目錄、
+含 `/` 的規則相對於忽略檔所在目錄、`*` / `?` / `[...]` / `**`），同一個忽略檔的規則再合併成
+一個 alternation 先行篩選，大多數路徑只需一次比對就能確定不被忽略
+"""
+
+import re
+from pathlib import Path
+from typing import List, Optional, Pattern, Sequence, Tuple, Union
+
+PathLike = Union[str, Path]
+
+# 預設讀取的忽略檔
+DEFAULT_IGNORE_FILES = ('.gitignore', '.eleventyignore')
+
+
+def _translate(pattern: str) -> str:
+    """將 gitignore 萬用字元轉為正規表示式（不含錨點）"""
+    out = []
+    i, n = 0, len(pattern)
+    while i < n:
+        c = pattern[i]
+        if c == '*':
+            if pattern.startswith('**', i):
+                i += 2
+                if i < n and pattern[i] == '/':
+                    # a/**/b：零或多層目錄
+                    out.append('(?:.*/)?')
+                    i += 1
+                else:
+                    out.append('.*')
+                continue
+            out.append('[^/]*')
+        elif c == '?':
+            out.append('[^/]')
+        elif c == '[':
+            end = pattern.find(']', i + 2 if pattern.startswith('[!', i) or pattern.startswith('[^', i) else i + 1)
+            if end < 0:
+                out.append(re.escape(c))
+            else:
+                body = pattern[i + 1:end]
+                if body[:1] in ('!', '^'):
+                    body = '^' + body[1:]
+                out.append(f"[{body.replace(chr(92), chr(92) * 2)}]")
+                i = end
+        elif c == '\\' and i + 1 < n:
+            i += 1
+            out.append(re.escape(pattern[i]))
+        else:
+            out.append(re.escape(c))
+        i += 1
+    return ''.join(out)
+
+
+class IgnoreFile:
+    """單一忽略檔的規則（base 為忽略檔所在目錄的相對路徑）"""
+
+    def __init__(self, base: str, lines: Sequence[str]):
+        self.base = base
+        self.prefix = f"{base}/" if base else ''
+        # (正規表示式, 是否反向, 是否只比對目錄)，依檔案中的順序
+        self.rules: List[Tuple[Pattern, bool, bool]] = []
+        sources = []
+        for line in lines:
+            line = line.rstrip('\n').rstrip('\r')
+            if not line.strip() or line.startswith('#'):
+                continue
+            line = line.rstrip(' ')
+            negate = line.startswith('!')
+            if negate:
+                line = line[1:]
+            elif line.startswith('\\'):
+                line = line[1:]
+            dir_only = line.endswith('/')
+            line = line.rstrip('/')
+            if not line:
+                continue
+            if '/' in line:
+                # 含 / 的規則相對於忽略檔所在目錄
+                source = _translate(line.lstrip('/'))
+            else:
+                source = '(?:.*/)?' + _translate(line)
+            # 比對到目錄時，目錄下的所有路徑一併忽略
+            self.rules.append((re.compile(f"(?:{source})\\Z"), negate, dir_only))
+            sources.append(source)
+        self._any: Optional[Pattern] = re.compile('|'.join(f"(?:{s})" for s in sources) + '\\Z') if sources else None
+
+    def match(self, rel: str, is_dir: bool) -> Optional[bool]:
+        """最後一條符合的規則：True 忽略、False 明確不忽略（!），None 沒有規則符合"""
+        if self._any is None:
+            return None
+        if self.prefix:
+            if not rel.startswith(self.prefix):
+                return None
+            rel = rel[len(self.prefix):]
+        if self._any.match(rel) is None:
+            return None
+        result = None
+        for regex, negate, dir_only in self.rules:
+            if (not dir_only or is_dir) and regex.match(rel):
+                result = not negate
+        return result
+
+
+class IgnoreRules:
+    """一組依序套用的忽略檔（較深層目錄的忽略檔優先），不可變：加入規則時回傳新物件，方便各執行緒共用"""
+
+    def __init__(self, files: Sequence[IgnoreFile] = ()):
+        self.files: Tuple[IgnoreFile, ...] = tuple(files)
+
+    def __bool__(self) -> bool:
+        return bool(self.files)
+
+    def with_dir(self, root: PathLike, rel_dir: str, names: Sequence[str]) -> 'IgnoreRules':
+        """讀取目錄中的忽略檔（names 為要讀取的檔名），回傳加入其規則後的新物件"""
+        added = []
+        for name in names:
+            path = Path(root) / rel_dir / name
+            try:
+                with open(path, 'r', encoding='utf-8', errors='ignore') as f:
+                    ignore_file = IgnoreFile(rel_dir, f.readlines())
+            except OSError:
+                continue
+            if ignore_file.rules:
+                added.append(ignore_file)
+        return IgnoreRules(self.files + tuple(added)) if added else self
+
+    def ignored(self, rel: str, is_dir: bool = False) -> bool:
+        """路徑本身是否被忽略（不檢查上層目錄；走訪時上層目錄被忽略就不會再往下）"""
+        for ignore_file in reversed(self.files):
+            result = ignore_file.match(rel, is_dir)
+            if result is not None:
+                return result
+        return False
+
+    def ignored_path(self, rel: str, is_dir: bool = False) -> bool:
+        """路徑或其任一上層目錄是否被忽略（監看模式的單一路徑更新使用）"""
+        parts = rel.split('/')
+        for i in range(1, len(parts)):
+            if self.ignored('/'.join(parts[:i]), True):
+                return True
+        return self.ignored(rel, is_dir)
@@ -0,0 +1,163 @@
+"""
+共用的問題記錄
+以 __slots__ 取代每筆問題一個 dict（重複的 'priority' / 'message' / 'file' 等鍵），規則 ID 與嚴重度 intern，
+訊息以樣板 + 參數保存、第一次讀取時才格式化；只有在序列化（JSON 報告、JSON Lines、結果快取）時才轉成 dict。
+各稽核腳本以子類別宣告序列化時的鍵名與順序（KEYS），輸出格式與原本的 dict 相同
+"""
+
+import sys
+from typing import Any, Dict, Optional, Tuple, Type
+
+# 結果快取中標記問題記錄的鍵（值為子類別的 kind）
+ISSUE_TAG = '__issue__'
+
+# 核心欄位（其他欄位放在 extra）
+CORE_FIELDS = ('rule', 'severity', 'message', 'file', 'line')
+
+# kind -> 子類別，供結果快取還原
+_KINDS: Dict[str, Type['Issue']] = {}
+
+
+class Issue:
+    """一筆稽核問題
+
+    有 args 時 message 為 str.format 樣板，依序填入 args、具名欄位取自 extra（例如 {count}）；
+    只有具名欄位的樣板以 Issue.template 建立。KEYS 為序列化時的 (輸出鍵, 欄位) 順序（file / line 沒有值時省略），
+    未列出的 extra 欄位依加入順序附在最後
+    """
+    __slots__ = ('rule', 'severity', 'file', 'line', '_message', '_args', 'extra')
+
+    KIND = 'issue'
+    KEYS: Tuple[Tuple[str, str], ...] = (
+        ('rule', 'rule'), ('severity', 'severity'), ('file', 'file'), ('line', 'line'), ('message', 'message'),
+    )
+
+    def __init_subclass__(cls, kind: Optional[str] = None, **kwargs):
+        super().__init_subclass__(**kwargs)
+        if kind is not None:
+            cls.KIND = kind
+        _KINDS[cls.KIND] = cls
+
+    def __init__(self, rule: str, severity: str, message: str = '', *args: Any,
+                 file: Optional[str] = None, line: Optional[int] = None, **extra: Any):
+        self.rule = sys.intern(rule)
+        self.severity = sys.intern(severity)
+        self.file = file
+        self.line = line
+        self._message = message
+        # None 表示 message 已是最終文字
+        self._args = args or None
+        self.extra = extra or None
+
+    @classmethod
+    def template(cls, rule: str, severity: str, message: str, *args: Any, **kwargs: Any) -> 'Issue':
+        """以樣板建立（即使沒有位置參數也在讀取時格式化）"""
+        issue = cls(rule, severity, message, *args, **kwargs)
+        issue._args = args
+        return issue
+
+    @property
+    def message(self) -> str:
+        """格式化後的訊息（第一次讀取時才格式化）"""
+        if self._args is not None:
+            self._message = self._message.format(*self._args, **(self.extra or {}))
+            self._args = None
+        return self._message
+
+    def derive(self, cls: Type['Issue'], **fields: Any) -> 'Issue':
+        """複製為另一個子類別（改用其序列化格式），可覆寫 file / line 等欄位；訊息樣板不會被格式化"""
+        issue = cls.__new__(cls)
+        issue.rule, issue.severity, issue.file, issue.line = self.rule, self.severity, self.file, self.line
+        issue._message, issue._args, issue.extra = self._message, self._args, self.extra
+        for name, value in fields.items():
+            setattr(issue, name, value)
+        return issue
+
+    def get(self, name: str, default: Any = None) -> Any:
+        """讀取 extra 欄位"""
+        if self.extra is None:
+            return default
+        return self.extra.get(name, default)
+
+    def _field(self, name: str) -> Any:
+        if name in CORE_FIELDS:
+            return getattr(self, name)
+        return self.get(name)
+
+    def to_dict(self) -> Dict[str, Any]:
+        """轉成序列化用的 dict（鍵名與順序依 KEYS）"""
+        data = {}
+        used = set()
+        for key, name in self.KEYS:
+            used.add(name)
+            if name in ('file', 'line'):
+                # 位置欄位沒有值時省略（例如專案層級的建議）
+                if getattr(self, name) is not None:
+                    data[key] = getattr(self, name)
+            elif name in CORE_FIELDS or (self.extra is not None and name in self.extra):
+                data[key] = self._field(name)
+        if self.extra is not None:
+            for name, value in self.extra.items():
+                if name not in used:
+                    data[name] = value
+        return data
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any], **defaults: Any) -> 'Issue':
+        """由 to_dict 的輸出（讀回的 JSON / JSON Lines 紀錄）還原；KEYS 未輸出的核心欄位由 defaults 補上"""
+        fields = dict(defaults)
+        extra = {}
+        keys = dict(cls.KEYS)
+        for key, value in data.items():
+            name = keys.get(key, key)
+            if name in CORE_FIELDS:
+                fields[name] = value
+            else:
+                extra[name] = value
+        issue = cls(fields.get('rule') or '', fields.get('severity') or '', fields.get('message') or '',
+                    file=fields.get('file'), line=fields.get('line'))
+        issue.extra = extra or None
+        return issue
+
+    def __getstate__(self):
+        return (self.rule, self.severity, self.file, self.line, self.message, self.extra)
+
+    def __setstate__(self, state):
+        rule, severity, self.file, self.line, self._message, self.extra = state
+        self.rule, self.severity = sys.intern(rule), sys.intern(severity)
+        self._args = None
+
+    def __repr__(self) -> str:
+        location = f" {self.file}" if self.file else ''
+        return f"{type(self).__name__}({self.rule!r}, {self.severity!r}{location}, {self.message!r})"
+
+
+_KINDS[Issue.KIND] = Issue
+
+
+def issue_json(obj: Any) -> Any:
+    """json.dump(default=...)：問題記錄轉成 dict，其他無法序列化的物件轉成字串"""
+    if isinstance(obj, Issue):
+        return obj.to_dict()
+    return str(obj)
+
+
+def encode_cached(obj: Any) -> Any:
+    """結果快取的 json.dump(default=...)：保存全部欄位與 kind 標記，讀回時還原為同一子類別"""
+    if isinstance(obj, Issue):
+        return {ISSUE_TAG: obj.KIND, 'state': obj.__getstate__()}
+    raise TypeError(f"無法序列化 {type(obj).__name__}")
+
+
+def decode_cached(data: Dict[str, Any]) -> Any:
+    """結果快取的 json.load(object_hook=...)"""
+    kind = data.get(ISSUE_TAG)
+    if kind is None:
+        return data
+    cls = _KINDS.get(kind)
+    if cls is None:
+        # 定義該子類別的腳本未載入時保留原本的 dict
+        return data
+    issue = cls.__new__(cls)
+    issue.__setstate__(data['state'])
+    return issue
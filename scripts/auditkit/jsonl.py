@@ -0,0 +1,97 @@
+"""
+JSON Lines 串流輸出
+每筆發現一產生就寫成一行並 flush，下游工具（儀表板匯入等）不必等稽核結束即可開始讀取；
+最後一行固定是 {"record": "summary", ...} 彙總紀錄。讀取端記錄每筆紀錄的位元組位移，
+產生報告時只需保留排序鍵與位移，不必把整份結果載入記憶體
+"""
+
+import json
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, Optional, Tuple, Union
+
+from .issue import Issue, issue_json
+
+PathLike = Union[str, Path]
+
+# 紀錄類型欄位（發現本身常有 type 欄位，因此另外命名）
+RECORD_KEY = 'record'
+
+# 彙總紀錄的類型（每個檔案最後一行）
+SUMMARY_TYPE = 'summary'
+
+
+class JsonlWriter:
+    """逐筆寫入 JSON Lines；每筆紀錄都帶有 record 類型欄位"""
+
+    def __init__(self, path: PathLike, tool: str):
+        self.path = Path(path)
+        self.tool = tool
+        self.counts: Dict[str, int] = {}
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._file = open(self.path, 'w', encoding='utf-8')
+
+    def write(self, record_type: str, record: Union[Dict[str, Any], Issue]):
+        """寫入一筆紀錄（類型放在第一個欄位，方便 grep / jq 過濾；Issue 在此才轉成 dict）"""
+        if isinstance(record, Issue):
+            record = record.to_dict()
+        line = json.dumps({RECORD_KEY: record_type, **record}, ensure_ascii=False, default=issue_json)
+        self._file.write(line + '\n')
+        self._file.flush()
+        self.counts[record_type] = self.counts.get(record_type, 0) + 1
+
+    def write_all(self, record_type: str, records: Iterable[Union[Dict[str, Any], Issue]]):
+        for record in records:
+            self.write(record_type, record)
+
+    def summary(self, record: Dict[str, Any]):
+        """寫入結尾的彙總紀錄（附上各類型紀錄數）"""
+        self.write(SUMMARY_TYPE, {'tool': self.tool, **record, 'record_counts': dict(self.counts)})
+
+    def close(self):
+        if not self._file.closed:
+            self._file.close()
+
+    def __enter__(self) -> 'JsonlWriter':
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+class JsonlReader:
+    """逐行讀取 JSON Lines，可依位移回頭讀取單筆紀錄"""
+
+    def __init__(self, path: PathLike):
+        self.path = Path(path)
+        self._file = open(self.path, 'rb')
+
+    def __iter__(self) -> Iterator[Tuple[int, Dict[str, Any]]]:
+        """依序回傳 (位元組位移, 紀錄)"""
+        self._file.seek(0)
+        offset = 0
+        for line in self._file:
+            if line.strip():
+                yield offset, json.loads(line)
+            offset += len(line)
+
+    def at(self, offset: int) -> Dict[str, Any]:
+        """讀取位於 offset 的紀錄"""
+        self._file.seek(offset)
+        return json.loads(self._file.readline())
+
+    def close(self):
+        self._file.close()
+
+    def __enter__(self) -> 'JsonlReader':
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+def read_jsonl(path: PathLike, record_type: Optional[str] = None) -> Iterator[Dict[str, Any]]:
+    """串流讀取紀錄（可只取特定類型）"""
+    with JsonlReader(path) as reader:
+        for _, record in reader:
+            if record_type is None or record.get(RECORD_KEY) == record_type:
+                yield record
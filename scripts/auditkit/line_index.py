@@ -0,0 +1,48 @@
+"""
+行號索引
+一次記錄文字中每一行的起始位移，之後以二分搜尋將 match 位移轉為行號 / 欄位，
+取代對每個 match 執行 text[:match.start()].count('\\n') 的 O(匹配數 × 檔案大小) 作法
+"""
+
+from bisect import bisect_right
+from typing import List, Tuple
+
+
+class LineIndex:
+    """單一檔案內容的行起始位移索引（建立 O(n)，查詢 O(log 行數)）"""
+
+    __slots__ = ('text', '_starts')
+
+    def __init__(self, text: str):
+        self.text = text
+        starts = [0]
+        find = text.find
+        pos = find('\n')
+        while pos != -1:
+            starts.append(pos + 1)
+            pos = find('\n', pos + 1)
+        self._starts: List[int] = starts
+
+    @property
+    def line_count(self) -> int:
+        """行數（與 text.count('\\n') + 1 相同）"""
+        return len(self._starts)
+
+    def line_of(self, offset: int) -> int:
+        """位移所在的行號（從 1 開始，等同 text[:offset].count('\\n') + 1）"""
+        return bisect_right(self._starts, offset)
+
+    def line_col(self, offset: int) -> Tuple[int, int]:
+        """位移所在的 (行號, 欄位)，皆從 1 開始"""
+        line = bisect_right(self._starts, offset)
+        return line, offset - self._starts[line - 1] + 1
+
+    def line_text(self, line: int) -> str:
+        """取得指定行的內容（不含換行符號）"""
+        start = self._starts[line - 1]
+        end = self._starts[line] - 1 if line < len(self._starts) else len(self.text)
+        return self.text[start:end]
+
+    def context(self, start: int, end: int, radius: int) -> str:
+        """match 前後各 radius 個字元的上下文片段"""
+        return self.text[max(0, start - radius):end + radius]
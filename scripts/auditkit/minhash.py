@@ -0,0 +1,95 @@
+"""
+MinHash / LSH 近似重複內容偵測
+頁面純文字切成字元 shingle（中文沒有空白分詞，以連續字元為單位），以單次雜湊的 MinHash
+（one permutation hashing：每個 shingle 只雜湊一次並分到各個位置，空位置以旋轉補齊）產生固定長度的簽章，
+兩個簽章相同位置的比例即為 Jaccard 相似度的估計值。LSH 將簽章分段放入雜湊桶，只比較至少有一段完全相同的頁面，
+整體約為線性時間，不需要逐對比較全部頁面
+"""
+
+import zlib
+from collections import defaultdict
+from typing import Dict, Iterator, List, Optional, Sequence, Set, Tuple
+
+# 簽章長度（LSH 的段數 × 每段列數）
+NUM_PERM = 128
+
+# 預設 32 段 × 4 列：相似度約 0.42 以上的頁面才會成為候選，0.6 的頁面約 98% 會被找出
+DEFAULT_BANDS = 32
+
+SHINGLE_SIZE = 5
+
+_MASK64 = (1 << 64) - 1
+_MASK32 = (1 << 32) - 1
+
+
+def _mix64(value: int) -> int:
+    """splitmix64 的混合函數，將 32 位元的 CRC 擴散成 64 位元"""
+    value = (value + 0x9E3779B97F4A7C15) & _MASK64
+    value = ((value ^ (value >> 30)) * 0xBF58476D1CE4E5B9) & _MASK64
+    value = ((value ^ (value >> 27)) * 0x94D049BB133111EB) & _MASK64
+    return value ^ (value >> 31)
+
+
+def shingle_hashes(text: str, size: int = SHINGLE_SIZE) -> Set[int]:
+    """文字中全部長度為 size 的字元 shingle 的雜湊（CRC32，與 PYTHONHASHSEED 無關，快取與多行程結果一致）"""
+    text = text.lower()
+    return {zlib.crc32(text[i:i + size].encode('utf-8')) for i in range(len(text) - size + 1)}
+
+
+def minhash_signature(text: str, size: int = SHINGLE_SIZE, num_perm: int = NUM_PERM) -> Optional[List[int]]:
+    """文字的 MinHash 簽章（num_perm 個 32 位元整數），文字短於一個 shingle 時回傳 None"""
+    hashes = shingle_hashes(text, size)
+    if not hashes:
+        return None
+    bins: List[Optional[int]] = [None] * num_perm
+    for value in map(_mix64, hashes):
+        position, rank = value % num_perm, value // num_perm
+        current = bins[position]
+        if current is None or rank < current:
+            bins[position] = rank
+    # 空位置取右邊（循環）第一個非空位置的值，依距離加上偏移，兩份文件的空位置才會以相同方式補齊
+    signature = []
+    for position in range(num_perm):
+        distance = 0
+        value = bins[position]
+        while value is None:
+            distance += 1
+            value = bins[(position + distance) % num_perm]
+        signature.append(_mix64(value + distance) & _MASK32 if distance else value & _MASK32)
+    return signature
+
+
+def signature_similarity(a: Sequence[int], b: Sequence[int]) -> float:
+    """估計的 Jaccard 相似度（相同位置的比例）"""
+    return sum(1 for x, y in zip(a, b) if x == y) / len(a)
+
+
+def candidate_pairs(signatures: Sequence[Optional[Sequence[int]]],
+                    bands: int = DEFAULT_BANDS) -> Iterator[Tuple[int, int]]:
+    """LSH 分段：至少有一段完全相同的簽章組合 (i, j)（i < j，每組只產生一次）"""
+    seen: Set[Tuple[int, int]] = set()
+    for band in range(bands):
+        buckets: Dict[Tuple[int, ...], List[int]] = defaultdict(list)
+        for index, signature in enumerate(signatures):
+            if signature is None:
+                continue
+            rows = len(signature) // bands
+            buckets[tuple(signature[band * rows:(band + 1) * rows])].append(index)
+        for members in buckets.values():
+            for i, first in enumerate(members):
+                for second in members[i + 1:]:
+                    if (first, second) not in seen:
+                        seen.add((first, second))
+                        yield first, second
+
+
+def near_duplicates(signatures: Sequence[Optional[Sequence[int]]], threshold: float,
+                    bands: int = DEFAULT_BANDS) -> List[Tuple[int, int, float]]:
+    """相似度達 threshold 的簽章組合 (i, j, 相似度)，依相似度由高到低排序"""
+    pairs = []
+    for first, second in candidate_pairs(signatures, bands):
+        similarity = signature_similarity(signatures[first], signatures[second])
+        if similarity >= threshold:
+            pairs.append((first, second, similarity))
+    pairs.sort(key=lambda pair: (-pair[2], pair[0], pair[1]))
+    return pairs
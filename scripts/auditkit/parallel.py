@@ -0,0 +1,66 @@
+"""
+多行程平行處理
+以 ProcessPoolExecutor 分派 CPU 密集的單檔分析，結果依輸入順序回傳；
+工作行程的終端輸出會先暫存，再由主行程依相同順序印出，確保輸出可重現
+"""
+
+import io
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import redirect_stdout
+from typing import Any, Callable, Iterator, Optional, Sequence, Tuple
+
+# 工作行程內要執行的函數（由 initializer 設定，避免每個項目重複 pickle）
+_worker_func: Optional[Callable[[Any], Any]] = None
+
+
+def resolve_jobs(jobs: int) -> int:
+    """--jobs 參數轉為行程數（0 或負數 = CPU 核心數）"""
+    if jobs <= 0:
+        return os.cpu_count() or 1
+    return jobs
+
+
+def _init_worker(func: Callable[[Any], Any], initializer: Optional[Callable[..., None]],
+                 initargs: Tuple[Any, ...]):
+    global _worker_func
+    _worker_func = func
+    if initializer is not None:
+        initializer(*initargs)
+
+
+def _call_captured(item: Any) -> Tuple[Any, str]:
+    buffer = io.StringIO()
+    with redirect_stdout(buffer):
+        result = _worker_func(item)
+    return result, buffer.getvalue()
+
+
+def map_in_processes(func: Callable[[Any], Any],
+                     items: Sequence[Any],
+                     jobs: int,
+                     initializer: Optional[Callable[..., None]] = None,
+                     initargs: Tuple[Any, ...] = ()) -> Iterator[Any]:
+    """依輸入順序回傳 func(item) 的結果
+
+    func / initializer 必須是模組層級函數（可被 pickle）；
+    jobs <= 1 或項目不足兩個時直接在目前行程執行
+    """
+    if jobs <= 1 or len(items) < 2:
+        if initializer is not None:
+            initializer(*initargs)
+        for item in items:
+            yield func(item)
+        return
+
+    workers = min(jobs, len(items))
+    # 每個行程分到數個區塊，兼顧負載平衡與 IPC 次數
+    chunksize = max(1, len(items) // (workers * 4))
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                             initargs=(func, initializer, initargs)) as executor:
+        for result, output in executor.map(_call_captured, items, chunksize=chunksize):
+            if output:
+                sys.stdout.write(output)
+            yield result
+
@@ -0,0 +1,127 @@
+"""
+多規則單次掃描引擎
+將所有規則編譯成一個具名群組的 alternation，分塊串流讀檔，每個位元組只掃描一次；
+只有命中的行才逐條規則確認，結果與「每行對每條規則 re.search」完全相同
+"""
+
+import codecs
+import json
+import re
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Pattern, Tuple, Union
+
+PathLike = Union[str, Path]
+
+# 串流讀檔的區塊大小（位元組）
+CHUNK_SIZE = 1 << 20
+
+
+def load_patterns(config_path: PathLike) -> Dict[str, str]:
+    """從 JSON 設定檔讀取額外規則（格式: {"LABEL": "regex", ...}）"""
+    with open(config_path, 'r', encoding='utf-8') as f:
+        data = json.load(f)
+    if not isinstance(data, dict) or not all(isinstance(v, str) for v in data.values()):
+        raise ValueError(f"{config_path}: 規則設定必須是 {{\"LABEL\": \"regex\"}} 物件")
+    for label, pattern in data.items():
+        try:
+            re.compile(pattern)
+        except re.error as e:
+            raise ValueError(f"{config_path}: 規則 {label} 的正規表示式無效: {e}") from e
+    return data
+
+
+class MultiPatternScanner:
+    """以單一 alternation 同時比對多條逐行規則"""
+
+    def __init__(self, patterns: Dict[str, str]):
+        self.labels: List[str] = list(patterns)
+        self._line_patterns: List[Pattern] = [re.compile(p) for p in patterns.values()]
+        self._groups = {f"_{i}": i for i in range(len(self.labels))}
+        alternation = '|'.join(f"(?P<_{i}>{p})" for i, p in enumerate(patterns.values()))
+        try:
+            # MULTILINE 讓 ^ / $ 與逐行比對時的語意一致
+            self._combined: Optional[Pattern] = re.compile(alternation, re.MULTILINE) if patterns else None
+        except re.error:
+            # 規則內含編號反向參照等無法合併的語法時，退回逐行逐規則比對
+            self._combined = None
+
+    def scan_lines(self, lines: List[str]) -> Iterator[Tuple[int, List[int]]]:
+        """逐行比對（無法合併規則時使用），回傳 (行索引, 命中規則索引)"""
+        for i, line in enumerate(lines):
+            hits = [j for j, pattern in enumerate(self._line_patterns) if pattern.search(line)]
+            if hits:
+                yield i, hits
+
+    def scan_text(self, text: str) -> Iterator[Tuple[int, List[int]]]:
+        """掃描一段以換行分隔的文字，依行序回傳 (行索引, 依規則順序排列的命中規則索引)"""
+        if self._combined is None:
+            yield from self.scan_lines(text.split('\n'))
+            return
+
+        # 1. 單次掃描：記錄每行由具名群組直接確認的規則，以及被跨行 match 觸及的行
+        line_no = 0
+        line_pos = 0
+        certain: Dict[int, set] = {}
+        for m in self._combined.finditer(text):
+            start, end = m.start(), m.end()
+            line_no += text.count('\n', line_pos, start)
+            line_pos = start
+            span = text.count('\n', start, end)
+            if span == 0:
+                certain.setdefault(line_no, set()).add(self._groups[m.lastgroup])
+            else:
+                for n in range(line_no, line_no + span + 1):
+                    certain.setdefault(n, set())
+
+        if not certain:
+            return
+
+        # 2. 只對命中的行逐條確認其餘規則（同一位置可能有多條規則成立）
+        lines = text.split('\n')
+        for n in sorted(certain):
+            line = lines[n]
+            found = certain[n]
+            hits = [j for j, pattern in enumerate(self._line_patterns)
+                    if j in found or pattern.search(line)]
+            if hits:
+                yield n, hits
+
+    def scan_file(self, path: PathLike, chunk_size: int = CHUNK_SIZE) -> Iterator[Tuple[int, str, List[str]]]:
+        """串流掃描檔案，回傳 (行號, 行內容, 命中標籤)
+
+        解碼方式與 open(..., encoding='utf-8', errors='ignore') 相同（含通用換行轉換）
+        """
+        decoder = codecs.getincrementaldecoder('utf-8')(errors='ignore')
+        pending = ''
+        base_line = 1
+        with open(path, 'rb') as f:
+            while True:
+                raw = f.read(chunk_size)
+                final = not raw
+                pending += decoder.decode(raw, final=final)
+                if final:
+                    if not pending:
+                        break
+                    block, pending = pending, ''
+                else:
+                    # 切在最後一個完整換行之後；結尾的 '\r' 可能與下一塊的 '\n' 組成 '\r\n'，先保留
+                    search_end = len(pending) - 1 if pending.endswith('\r') else len(pending)
+                    cut = max(pending.rfind('\n', 0, search_end), pending.rfind('\r', 0, search_end))
+                    if cut < 0:
+                        continue
+                    block, pending = pending[:cut + 1], pending[cut + 1:]
+
+                if '\r' in block:
+                    block = block.replace('\r\n', '\n').replace('\r', '\n')
+                # 與 split('\n') 後移除結尾空字串相同
+                if block.endswith('\n'):
+                    block = block[:-1]
+
+                lines = None
+                for i, hits in self.scan_text(block):
+                    if lines is None:
+                        lines = block.split('\n')
+                    yield base_line + i, lines[i], [self.labels[j] for j in hits]
+                base_line += block.count('\n') + 1
+                if final:
+                    break
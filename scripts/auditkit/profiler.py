@@ -0,0 +1,402 @@
+"""
+稽核效能剖析（--profile）
+記錄各階段與各規則的呼叫次數、耗時（含 / 不含子項目）、讀取的檔案數與位元組數、產生的結果數，
+輸出摘要表，並寫出 cProfile 的 pstats 檔與 collapsed stack 檔（可直接給 flamegraph.pl / speedscope 使用）。
+記憶體模式（--memprofile）以 tracemalloc 記錄各階段 / 規則的峰值與保留量，並比較頂層階段前後的快照找出主要配置位置。
+未啟用時 phase() 只多一次旗標判斷，instrument() 不會替換任何函數
+"""
+
+import cProfile
+import functools
+import json
+import time
+import tracemalloc
+import unicodedata
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Tuple, Union
+
+PathLike = Union[str, Path]
+
+# 摘要表顯示的計數欄位
+COUNTERS = ('files', 'bytes', 'matches')
+
+# tracemalloc 預設保留的呼叫層數：只記錄配置所在的行，開銷最小；
+# 需要把 auditkit 內的配置歸到呼叫它的稽核腳本行時以 --memprofile-depth 加深（每多一層都會明顯變慢）
+MEMORY_TRACE_DEPTH = 1
+
+# 每個階段列出的主要配置位置數
+TOP_ALLOCATION_SITES = 10
+
+# 不列入配置位置的檔案（tracemalloc 與剖析器本身）
+_EXCLUDED_FILES = {tracemalloc.__file__, __file__}
+
+AUDITKIT_DIR = str(Path(__file__).resolve().parent)
+SCRIPTS_DIR = str(Path(__file__).resolve().parent.parent)
+
+
+def default_matches(result: Any) -> int:
+    """規則回傳清單 / 集合 / 字典時，以其長度作為結果數"""
+    if isinstance(result, (list, set, dict)):
+        return len(result)
+    return 0
+
+
+def _pad(text: str, width: int, right: bool = False) -> str:
+    """依終端顯示寬度補空白（全形字元佔兩格）"""
+    shown = sum(2 if unicodedata.east_asian_width(ch) in 'WF' else 1 for ch in text)
+    fill = ' ' * max(0, width - shown)
+    return fill + text if right else text + fill
+
+
+def _format_bytes(size: float) -> str:
+    """以 KB / MB 顯示記憶體量（保留量可能為負）"""
+    if abs(size) >= 1024 * 1024:
+        return f"{size / 1024 / 1024:.1f} MB"
+    return f"{size / 1024:.1f} KB"
+
+
+def _allocation_site(traceback: tracemalloc.Traceback) -> str:
+    """配置位置：最內層的行；若在 auditkit 或標準函式庫內，再附上呼叫它的稽核腳本行"""
+    frames = list(traceback)
+    innermost = frames[-1]
+    site = f"{Path(innermost.filename).name}:{innermost.lineno}"
+    if innermost.filename.startswith(SCRIPTS_DIR) and not innermost.filename.startswith(AUDITKIT_DIR):
+        return site
+    for frame in reversed(frames[:-1]):
+        if frame.filename.startswith(SCRIPTS_DIR) and not frame.filename.startswith(AUDITKIT_DIR):
+            return f"{site} ← {Path(frame.filename).name}:{frame.lineno}"
+    return site
+
+
+def _allocation_totals() -> Dict[str, Tuple[int, int]]:
+    """目前所有存活配置依配置位置彙總為 {位置: (位元組, 區塊數)}
+
+    只保留彙總結果（不保留快照本身），避免巢狀階段持有的快照灌大量到的峰值
+    """
+    totals: Dict[str, Tuple[int, int]] = {}
+    for stat in tracemalloc.take_snapshot().statistics('traceback'):
+        # 排除 tracemalloc 與剖析器本身的配置（快照、各階段保留的彙總結果）；
+        # 先分組再依最內層的檔案排除，比逐筆配置比對檔名的 filter_traces 快得多
+        if stat.traceback[-1].filename in _EXCLUDED_FILES:
+            continue
+        site = _allocation_site(stat.traceback)
+        size, count = totals.get(site, (0, 0))
+        totals[site] = (size + stat.size, count + stat.count)
+    return totals
+
+
+def _top_retained(before: Dict[str, Tuple[int, int]], after: Dict[str, Tuple[int, int]]) -> List[Dict[str, Any]]:
+    """兩次彙總之間淨增加最多的配置位置"""
+    growth = []
+    for site, (size, count) in after.items():
+        old_size, old_count = before.get(site, (0, 0))
+        if size > old_size:
+            growth.append({'site': site, 'bytes': size - old_size, 'blocks': count - old_count})
+    growth.sort(key=lambda item: -item['bytes'])
+    return growth[:TOP_ALLOCATION_SITES]
+
+
+class _Frame:
+    __slots__ = ('path', 'start', 'child', 'counters', 'memory_start', 'peak', 'snapshot')
+
+    def __init__(self, path: Tuple[str, ...]):
+        self.path = path
+        self.start = time.perf_counter()
+        self.child = 0.0
+        self.counters: Dict[str, int] = {}
+        self.memory_start = 0
+        self.peak = 0
+        self.snapshot: Optional[Dict[str, Tuple[int, int]]] = None
+
+
+class _Stat:
+    __slots__ = ('calls', 'total', 'child', 'counters', 'memory_start', 'peak', 'peak_growth', 'retained', 'top_sites')
+
+    def __init__(self):
+        self.calls = 0
+        self.total = 0.0
+        self.child = 0.0
+        self.counters: Dict[str, int] = {}
+        self.memory_start = 0
+        self.peak = 0
+        self.peak_growth = 0
+        self.retained = 0
+        self.top_sites: List[Dict[str, Any]] = []
+
+    @property
+    def self_time(self) -> float:
+        return self.total - self.child
+
+
+class Profiler:
+    """階段 / 規則計時器（一個行程一個實例，見 PROFILER）"""
+
+    def __init__(self):
+        self.enabled = False
+        self.timing = False
+        self.memory = False
+        self.tool = ''
+        self._stack: List[_Frame] = []
+        self._stats: Dict[Tuple[str, ...], _Stat] = {}
+        self._cprofile: Optional[cProfile.Profile] = None
+
+    def enable(self, tool: str, timing: bool = True, memory: bool = False, memory_depth: int = MEMORY_TRACE_DEPTH):
+        """開始剖析：timing 同時啟用 cProfile，memory 啟用 tracemalloc（保留 memory_depth 層呼叫）"""
+        self.enabled = True
+        self.timing = timing
+        self.memory = memory
+        self.tool = tool
+        self._stack, self._stats = [], {}
+        if memory and not tracemalloc.is_tracing():
+            tracemalloc.start(max(1, memory_depth))
+        self._enter(tool, snapshot=memory)
+        if timing:
+            self._cprofile = cProfile.Profile()
+            self._cprofile.enable()
+
+    def _enter(self, name: str, snapshot: bool = False):
+        parent = self._stack[-1] if self._stack else None
+        frame = _Frame((parent.path if parent else ()) + (name,))
+        if self.memory:
+            # 峰值計數器是全域的：先把目前的峰值記到上層，再重設給這一層使用
+            current, peak = tracemalloc.get_traced_memory()
+            if parent is not None:
+                parent.peak = max(parent.peak, peak)
+            if snapshot:
+                # 彙總結果本身也佔記憶體，起始量在彙總後才量
+                frame.snapshot = _allocation_totals()
+                current = tracemalloc.get_traced_memory()[0]
+            tracemalloc.reset_peak()
+            frame.memory_start = frame.peak = current
+        self._stack.append(frame)
+
+    def _exit(self):
+        frame = self._stack.pop()
+        elapsed = time.perf_counter() - frame.start
+        stat = self._stats.get(frame.path)
+        if stat is None:
+            stat = self._stats[frame.path] = _Stat()
+        stat.calls += 1
+        stat.total += elapsed
+        stat.child += frame.child
+        if self.memory:
+            current, peak = tracemalloc.get_traced_memory()
+            frame.peak = max(frame.peak, peak)
+            if stat.calls == 1:
+                stat.memory_start = frame.memory_start
+            stat.peak = max(stat.peak, frame.peak)
+            # 多次呼叫的規則以單次呼叫內最大的增量為準
+            stat.peak_growth = max(stat.peak_growth, frame.peak - frame.memory_start)
+            stat.retained += current - frame.memory_start
+            if frame.snapshot is not None:
+                # 監看模式等重複執行的階段只保留最後一次的配置位置
+                stat.top_sites = _top_retained(frame.snapshot, _allocation_totals())
+                frame.snapshot = None
+            if self._stack:
+                self._stack[-1].peak = max(self._stack[-1].peak, frame.peak)
+            tracemalloc.reset_peak()
+        # 計數是累計值：子項目的檔案數 / 位元組數也算進上層階段
+        parent = self._stack[-1] if self._stack else None
+        for key, value in frame.counters.items():
+            stat.counters[key] = stat.counters.get(key, 0) + value
+            if parent is not None:
+                parent.counters[key] = parent.counters.get(key, 0) + value
+        if parent is not None:
+            parent.child += elapsed
+
+    @contextmanager
+    def phase(self, name: str) -> Iterator[None]:
+        """計時一個階段（可巢狀）
+
+        記憶體模式下只有頂層階段（直接位於工具之下）比較前後的配置位置，巢狀階段只記錄峰值與保留量
+        """
+        if not self.enabled:
+            yield
+            return
+        self._enter(name, snapshot=self.memory and len(self._stack) == 1)
+        try:
+            yield
+        finally:
+            self._exit()
+
+    @contextmanager
+    def rule(self, name: str) -> Iterator[None]:
+        """計時一條規則（每個檔案都會呼叫，記憶體模式下不比較配置位置）"""
+        if not self.enabled:
+            yield
+            return
+        self._enter(name)
+        try:
+            yield
+        finally:
+            self._exit()
+
+    def add(self, counter: str, value: int = 1):
+        """累加目前階段 / 規則的計數（files、bytes、matches）"""
+        if self.enabled and self._stack:
+            counters = self._stack[-1].counters
+            counters[counter] = counters.get(counter, 0) + value
+
+    def instrument(self, target: Any, names: Iterable[str],
+                   matches: Optional[Callable[[Any], int]] = default_matches):
+        """以計時包裝取代 target（模組、物件或 dict）上的函數；未啟用時不做任何事
+
+        matches 由回傳值計算結果數，None 表示不計算
+        """
+        if not self.enabled:
+            return
+        for name in names:
+            if isinstance(target, dict):
+                target[name] = self._wrap(target[name], matches)
+            else:
+                setattr(target, name, self._wrap(getattr(target, name), matches))
+
+    def _wrap(self, func: Callable, matches: Optional[Callable[[Any], int]]) -> Callable:
+        # 以函數名稱標示規則（dict 的鍵通常只是分類名稱）
+        label = getattr(func, '__name__', repr(func))
+
+        @functools.wraps(func)
+        def timed(*args, **kwargs):
+            self._enter(label)
+            try:
+                result = func(*args, **kwargs)
+                if matches is not None:
+                    count = matches(result)
+                    if count:
+                        self.add('matches', count)
+                return result
+            finally:
+                self._exit()
+        return timed
+
+    def finish(self, output_dir: PathLike) -> List[Path]:
+        """停止剖析，印出摘要表並寫出輸出檔，回傳寫出的檔案
+
+        計時：<tool>.prof（pstats）與 <tool>.folded（collapsed stacks）；記憶體：<tool>.memory.json
+        """
+        if self._cprofile is not None:
+            self._cprofile.disable()
+        while self._stack:
+            self._exit()
+        self.enabled = False
+
+        output_dir = Path(output_dir)
+        output_dir.mkdir(parents=True, exist_ok=True)
+        written = []
+        if self.timing:
+            written.extend(self._finish_timing(output_dir))
+        if self.memory:
+            tracemalloc.stop()
+            written.append(self._finish_memory(output_dir))
+        return written
+
+    def _finish_timing(self, output_dir: Path) -> Tuple[Path, Path]:
+        prof_path = output_dir / f"{self.tool}.prof"
+        folded_path = output_dir / f"{self.tool}.folded"
+        if self._cprofile is not None:
+            self._cprofile.dump_stats(str(prof_path))
+            self._cprofile = None
+        with open(folded_path, 'w', encoding='utf-8') as f:
+            for path, stat in self._stats.items():
+                micros = int(round(stat.self_time * 1e6))
+                if micros > 0:
+                    f.write(f"{';'.join(path)} {micros}\n")
+
+        print(self.format_table())
+        print(f"💾 剖析結果已保存: {prof_path}（pstats）、{folded_path}（collapsed stacks）")
+        return prof_path, folded_path
+
+    def _finish_memory(self, output_dir: Path) -> Path:
+        memory_path = output_dir / f"{self.tool}.memory.json"
+        with open(memory_path, 'w', encoding='utf-8') as f:
+            json.dump({
+                'tool': self.tool,
+                'phases': [{
+                    'path': list(path),
+                    'calls': stat.calls,
+                    'start_bytes': stat.memory_start,
+                    'peak_bytes': stat.peak,
+                    'peak_growth_bytes': stat.peak_growth,
+                    'retained_bytes': stat.retained,
+                    'top_retained_sites': stat.top_sites,
+                } for path, stat in self._stats.items()],
+            }, f, ensure_ascii=False, indent=2)
+
+        print(self.format_memory_table())
+        print(f"💾 記憶體剖析結果已保存: {memory_path}")
+        return memory_path
+
+    def format_table(self) -> str:
+        """階段 / 規則摘要表（依呼叫階層排列，同層依總耗時排序）"""
+        root = (self.tool,)
+        root_total = self._stats[root].total if root in self._stats else 0.0
+        header = _pad('階段 / 規則', 44) + ''.join(
+            _pad(title, width, right=True) for title, width in
+            (('呼叫', 8), ('總耗時ms', 11), ('自身ms', 10), ('占比', 7), ('檔案', 7), ('位元組', 12), ('結果', 8)))
+        overhead = 'cProfile 與 tracemalloc' if self.memory else 'cProfile'
+        lines = ['', '=' * 107, f"⏱️  效能剖析: {self.tool}（{overhead} 啟用中，耗時含剖析開銷）", '=' * 107, header,
+                 '-' * 107]
+        children = self._children()
+
+        def emit(path: Tuple[str, ...]):
+            stat = self._stats[path]
+            label = '  ' * (len(path) - 1) + path[-1]
+            share = stat.total / root_total * 100 if root_total else 0.0
+            counts = [stat.counters.get(key, 0) for key in COUNTERS]
+            cells = [f"{count:>{width},}" if count else f"{'-':>{width}}"
+                     for count, width in zip(counts, (7, 12, 8))]
+            lines.append(f"{_pad(label[:43], 44)}{stat.calls:>8}{stat.total * 1000:>11.1f}"
+                         f"{stat.self_time * 1000:>10.1f}{share:>6.1f}%" + ''.join(cells))
+            for child in sorted(children.get(path, []), key=lambda p: -self._stats[p].total):
+                emit(child)
+
+        if root in self._stats:
+            emit(root)
+        lines.append('=' * 107)
+        return '\n'.join(lines)
+
+    def format_memory_table(self) -> str:
+        """各階段 / 規則的記憶體峰值與保留量，以及各階段淨增加最多的配置位置"""
+        root = (self.tool,)
+        header = _pad('階段 / 規則', 44) + ''.join(
+            _pad(title, width, right=True) for title, width in
+            (('呼叫', 8), ('起始', 13), ('峰值', 13), ('峰值增量', 13), ('保留', 13)))
+        lines = ['', '=' * 104, f"🧠 記憶體剖析: {self.tool}（tracemalloc，只計 Python 配置）", '=' * 104, header,
+                 '-' * 104]
+        children = self._children()
+        phases_with_sites: List[Tuple[str, ...]] = []
+
+        def emit(path: Tuple[str, ...]):
+            stat = self._stats[path]
+            label = '  ' * (len(path) - 1) + path[-1]
+            lines.append(f"{_pad(label[:43], 44)}{stat.calls:>8}" + ''.join(
+                f"{_format_bytes(value):>13}" for value in
+                (stat.memory_start, stat.peak, stat.peak_growth, stat.retained)))
+            if stat.top_sites:
+                phases_with_sites.append(path)
+            # 依執行順序列出，方便對照記憶體隨階段的變化
+            for child in children.get(path, []):
+                emit(child)
+
+        if root in self._stats:
+            emit(root)
+        lines.append('=' * 104)
+
+        for path in phases_with_sites:
+            stat = self._stats[path]
+            lines.append(f"\n📌 {' › '.join(path)}：保留量最多的配置位置")
+            for site in stat.top_sites[:5]:
+                lines.append(f"   {_format_bytes(site['bytes']):>10}  {site['blocks']:>8,} 塊  {site['site']}")
+        return '\n'.join(lines)
+
+    def _children(self) -> Dict[Tuple[str, ...], List[Tuple[str, ...]]]:
+        children: Dict[Tuple[str, ...], List[Tuple[str, ...]]] = {}
+        for path in self._stats:
+            if len(path) > 1:
+                children.setdefault(path[:-1], []).append(path)
+        return children
+
+
+# 行程內共用的剖析器（各稽核腳本以 --profile 啟用）
+PROFILER = Profiler()
@@ -0,0 +1,365 @@
+"""
+共用專案索引
+只走訪一次專案目錄，記錄檔案 stat 資訊，並延遲讀取、快取解碼後的內容，
+讓所有稽核腳本共用同一份記憶體中的檔案視圖
+"""
+
+import hashlib
+import os
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, List, Optional, Sequence, Set, Tuple, Union
+
+from .content_loader import SNIFF_SIZE, STREAM_THRESHOLD, count_lines, iter_chunks, looks_binary
+from .ignore_rules import DEFAULT_IGNORE_FILES, IgnoreRules
+from .profiler import PROFILER
+from .walker import WALK_JOBS, walk_tree
+
+# 任何稽核都不會掃描的目錄（各腳本的排除清單都包含 .git / node_modules；
+# .cache 存放稽核結果快取，不應被當成專案檔案）
+DEFAULT_PRUNE_DIRS = {'.git', 'node_modules', '.cache'}
+
+PathLike = Union[str, Path]
+
+
+@dataclass
+class FileEntry:
+    """單一檔案的索引記錄"""
+    path: Path          # 絕對路徑
+    rel: str            # 相對於專案根目錄的 POSIX 路徑
+    size: Optional[int]
+    mtime: Optional[float]
+
+    @property
+    def name(self) -> str:
+        return self.path.name
+
+    @property
+    def suffix(self) -> str:
+        return self.path.suffix
+
+    @property
+    def parts(self) -> Tuple[str, ...]:
+        return tuple(self.rel.split('/'))
+
+
+class ProjectIndex:
+    """專案檔案索引（單次走訪 + 內容快取）"""
+
+    _shared: Dict[str, 'ProjectIndex'] = {}
+
+    def __init__(self, root: PathLike, prune_dirs: Optional[Set[str]] = None,
+                 ignore_files: Sequence[str] = DEFAULT_IGNORE_FILES, jobs: int = WALK_JOBS):
+        self.root = Path(os.path.abspath(root))
+        self.prune_dirs = set(DEFAULT_PRUNE_DIRS if prune_dirs is None else prune_dirs)
+        # 依 .gitignore / .eleventyignore 忽略的路徑不會出現在索引中
+        self.ignore_files = tuple(ignore_files)
+        self.jobs = jobs
+        self._entries: List[FileEntry] = []
+        self._by_rel: Dict[str, FileEntry] = {}
+        # 目錄相對路徑 -> (子目錄名稱, 檔案名稱)，保留走訪順序
+        self._dirs: Dict[str, Tuple[List[str], List[str]]] = {}
+        self._text_cache: Dict[str, str] = {}
+        self._lossy_cache: Dict[str, str] = {}
+        self._digest_cache: Dict[str, str] = {}
+        self._binary_cache: Dict[str, bool] = {}
+        # 目錄相對路徑 -> 適用的忽略規則（只在 update() 期間使用，每次呼叫重新讀取忽略檔）
+        self._rules_cache: Dict[str, IgnoreRules] = {}
+        self._scanned = False
+
+    @classmethod
+    def shared(cls, root: PathLike) -> 'ProjectIndex':
+        """取得同一行程內共用的索引實例"""
+        key = os.path.abspath(root)
+        if key not in cls._shared:
+            cls._shared[key] = cls(key)
+        return cls._shared[key]
+
+    def scan(self) -> 'ProjectIndex':
+        """走訪專案目錄（只執行一次；os.scandir 走訪，排除的目錄與被忽略的路徑在進入前剪枝）"""
+        if self._scanned:
+            return self
+
+        root_str = str(self.root)
+        for listing in walk_tree(root_str, self.prune_dirs, self.ignore_files, self.jobs):
+            rel_dir = listing.rel
+            abs_dir = os.path.join(root_str, rel_dir) if rel_dir else root_str
+            self._dirs[rel_dir] = (listing.dirs, [name for name, _, _ in listing.files])
+            for name, size, mtime in listing.files:
+                rel = f"{rel_dir}/{name}" if rel_dir else name
+                entry = FileEntry(Path(os.path.join(abs_dir, name)), rel, size, mtime)
+                self._entries.append(entry)
+                self._by_rel[rel] = entry
+
+        self._scanned = True
+        return self
+
+    def _stat_entry(self, abs_path: str, rel: str) -> FileEntry:
+        try:
+            st = os.stat(abs_path)
+            size, mtime = st.st_size, st.st_mtime
+        except OSError:
+            size, mtime = None, None
+        return FileEntry(Path(abs_path), rel, size, mtime)
+
+    def _forget_content(self, rel: str):
+        self._text_cache.pop(rel, None)
+        self._lossy_cache.pop(rel, None)
+        self._digest_cache.pop(rel, None)
+        self._binary_cache.pop(rel, None)
+
+    def _is_pruned(self, rel: str) -> bool:
+        if any(part in self.prune_dirs for part in rel.split('/')):
+            return True
+        return self._rules_for(rel).ignored_path(rel, os.path.isdir(self.root / rel))
+
+    def _rules_for(self, rel: str) -> IgnoreRules:
+        """rel 所在目錄適用的忽略規則（根目錄與各上層目錄的忽略檔）"""
+        rel_dir = rel.rpartition('/')[0]
+        if rel_dir not in self._rules_cache:
+            if not self.ignore_files:
+                rules = IgnoreRules()
+            else:
+                parent = self._rules_for(rel_dir) if rel_dir else IgnoreRules()
+                rules = parent.with_dir(self.root, rel_dir, self.ignore_files)
+            self._rules_cache[rel_dir] = rules
+        return self._rules_cache[rel_dir]
+
+    def update(self, paths: Iterable[PathLike]) -> List[str]:
+        """依檔案異動事件更新索引（新增 / 修改 / 刪除，目錄會展開），回傳實際變更的相對路徑
+
+        已變更檔案的內容快取會被清除，未變更檔案的快取保留
+        """
+        self.scan()
+        self._rules_cache.clear()
+        changed: List[str] = []
+        for path in paths:
+            try:
+                rel = self._rel_of(path)
+            except ValueError:
+                continue
+            if not rel or self._is_pruned(rel):
+                continue
+            abs_path = str(self.root / rel)
+
+            if os.path.isdir(abs_path):
+                # 新增或移入的目錄：逐一加入其下檔案
+                for listing in walk_tree(abs_path, self.prune_dirs, ()):
+                    base = os.path.join(abs_path, listing.rel)
+                    for name, _, _ in listing.files:
+                        changed.extend(self.update([os.path.join(base, name)]))
+                continue
+
+            prefix = rel + '/'
+            if not os.path.exists(abs_path) and rel not in self._by_rel and any(
+                    r.startswith(prefix) for r in self._by_rel):
+                # 刪除或移出的目錄
+                changed.extend(self.update([r for r in list(self._by_rel) if r.startswith(prefix)]))
+                self._dirs.pop(rel, None)
+                continue
+
+            rel_dir, _, name = rel.rpartition('/')
+            old = self._by_rel.get(rel)
+            if os.path.isfile(abs_path):
+                entry = self._stat_entry(abs_path, rel)
+                if old is not None:
+                    if (old.size, old.mtime) == (entry.size, entry.mtime):
+                        continue
+                    old.size, old.mtime = entry.size, entry.mtime
+                else:
+                    self._entries.append(entry)
+                    self._by_rel[rel] = entry
+                    self._register_dir(rel_dir)
+                    self._dirs[rel_dir][1].append(name)
+            elif old is not None:
+                self._entries.remove(old)
+                del self._by_rel[rel]
+                files = self._dirs.get(rel_dir, ([], []))[1]
+                if name in files:
+                    files.remove(name)
+            else:
+                continue
+            self._forget_content(rel)
+            changed.append(rel)
+        return changed
+
+    def _register_dir(self, rel_dir: str):
+        """確保目錄（及其上層）存在於走訪結構中"""
+        if rel_dir in self._dirs:
+            return
+        parent, _, name = rel_dir.rpartition('/')
+        self._register_dir(parent)
+        self._dirs[parent][0].append(name)
+        self._dirs[rel_dir] = ([], [])
+
+    def rescan(self) -> List[str]:
+        """重新走訪整個專案（無法取得檔案事件時使用），回傳新增 / 修改 / 刪除的相對路徑"""
+        if not self._scanned:
+            self.scan()
+            return [entry.rel for entry in self._entries]
+
+        old_by_rel = self._by_rel
+        self._entries, self._by_rel, self._dirs = [], {}, {}
+        self._scanned = False
+        self.scan()
+
+        changed = []
+        for entry in self._entries:
+            old = old_by_rel.get(entry.rel)
+            if old is None or (old.size, old.mtime) != (entry.size, entry.mtime):
+                changed.append(entry.rel)
+        changed.extend(rel for rel in old_by_rel if rel not in self._by_rel)
+        for rel in changed:
+            self._forget_content(rel)
+        return changed
+
+    def _rel_of(self, path: PathLike) -> str:
+        """將絕對或相對路徑轉為索引使用的相對路徑"""
+        p = Path(path)
+        if p.is_absolute():
+            try:
+                p = p.relative_to(self.root)
+            except ValueError:
+                p = p.resolve().relative_to(self.root.resolve())
+        rel = p.as_posix()
+        return '' if rel == '.' else rel
+
+    def files(self,
+              under: Optional[PathLike] = None,
+              suffixes: Optional[Iterable[str]] = None,
+              exclude_dirs: Optional[Set[str]] = None,
+              lower_suffix: bool = False) -> List[FileEntry]:
+        """依條件篩選檔案，順序與 os.walk / rglob 的走訪順序一致"""
+        self.scan()
+        prefix = self._rel_of(under) if under is not None else ''
+        if prefix:
+            prefix += '/'
+        wanted = set(suffixes) if suffixes is not None else None
+
+        result = []
+        for entry in self._entries:
+            if prefix and not entry.rel.startswith(prefix):
+                continue
+            if wanted is not None:
+                suffix = entry.suffix.lower() if lower_suffix else entry.suffix
+                if suffix not in wanted:
+                    continue
+            if exclude_dirs and any(part in exclude_dirs for part in entry.parts[:-1]):
+                continue
+            result.append(entry)
+        return result
+
+    def get(self, path: PathLike) -> Optional[FileEntry]:
+        """以路徑取得索引記錄"""
+        self.scan()
+        return self._by_rel.get(self._rel_of(path))
+
+    def walk(self, exclude_dirs: Optional[Set[str]] = None) -> Iterator[Tuple[str, List[str], List[str]]]:
+        """模擬 os.walk 的輸出（相對目錄, 子目錄, 檔案），不再觸碰檔案系統"""
+        self.scan()
+        exclude = set(exclude_dirs or ()) | self.prune_dirs
+        stack = ['']
+        while stack:
+            rel_dir = stack.pop()
+            subdirs, files = self._dirs[rel_dir]
+            kept = [d for d in subdirs if d not in exclude]
+            yield rel_dir, kept, list(files)
+            for name in reversed(kept):
+                child = f"{rel_dir}/{name}" if rel_dir else name
+                if child in self._dirs:
+                    stack.append(child)
+
+    def read_bytes(self, path: Union[PathLike, FileEntry]) -> bytes:
+        """讀取原始位元組（不快取）"""
+        entry_path = path.path if isinstance(path, FileEntry) else Path(path)
+        with open(entry_path, 'rb') as f:
+            data = f.read()
+        PROFILER.add('files')
+        PROFILER.add('bytes', len(data))
+        return data
+
+    def read_text(self, path: Union[PathLike, FileEntry], errors: str = 'strict') -> str:
+        """讀取並快取 UTF-8 解碼後的內容
+
+        行為與 open(..., encoding='utf-8') 相同（包含換行符號轉換）；
+        errors='strict' 時無法解碼會拋出 UnicodeDecodeError
+        """
+        rel, abs_path = self._resolve(path)
+        if rel in self._text_cache:
+            return self._text_cache[rel]
+        if errors != 'strict' and rel in self._lossy_cache:
+            return self._lossy_cache[rel]
+
+        raw = self.read_bytes(abs_path)
+        try:
+            text = _translate_newlines(raw.decode('utf-8'))
+        except UnicodeDecodeError:
+            if errors == 'strict':
+                raise
+            text = _translate_newlines(raw.decode('utf-8', errors=errors))
+            self._lossy_cache[rel] = text
+            return text
+
+        self._text_cache[rel] = text
+        return text
+
+    def digest(self, entry: FileEntry) -> str:
+        """檔案內容的 SHA-1（供結果快取在 mtime 改變時確認內容）"""
+        if entry.rel not in self._digest_cache:
+            self._digest_cache[entry.rel] = hashlib.sha1(self.read_bytes(entry)).hexdigest()
+        return self._digest_cache[entry.rel]
+
+    def _resolve(self, path: Union[PathLike, FileEntry]) -> Tuple[str, Path]:
+        if isinstance(path, FileEntry):
+            return path.rel, path.path
+        abs_path = Path(path)
+        if not abs_path.is_absolute():
+            abs_path = self.root / abs_path
+        return self._rel_of(path), abs_path
+
+    def is_binary(self, path: Union[PathLike, FileEntry]) -> bool:
+        """只讀取開頭區塊判斷是否為二進位檔（NUL 位元組或已知的檔案簽章），結果依檔案快取"""
+        rel, abs_path = self._resolve(path)
+        if rel in self._text_cache:
+            return False
+        if rel not in self._binary_cache:
+            with open(abs_path, 'rb') as f:
+                head = f.read(SNIFF_SIZE)
+            PROFILER.add('bytes', len(head))
+            self._binary_cache[rel] = looks_binary(head)
+        return self._binary_cache[rel]
+
+    def line_count(self, path: Union[PathLike, FileEntry]) -> int:
+        """計算行數（等同 len(f.readlines())），二進位檔回傳 0
+
+        內容已快取時直接計算，否則在原始位元組上計算、不解碼也不快取內容；
+        超過 STREAM_THRESHOLD 的檔案分塊串流，不整檔讀入記憶體
+        """
+        rel, abs_path = self._resolve(path)
+        text = self._text_cache.get(rel)
+        if text is not None:
+            if not text:
+                return 0
+            return text.count('\n') + (0 if text.endswith('\n') else 1)
+        if self.is_binary(path):
+            return 0
+        entry = self._by_rel.get(rel)
+        if entry is not None and entry.size is not None and entry.size <= STREAM_THRESHOLD:
+            return count_lines([self.read_bytes(abs_path)])
+        PROFILER.add('files')
+        PROFILER.add('bytes', os.path.getsize(abs_path))
+        return count_lines(iter_chunks(abs_path))
+
+    def clear_content_cache(self):
+        """釋放已快取的檔案內容"""
+        self._text_cache.clear()
+        self._lossy_cache.clear()
+        self._digest_cache.clear()
+        self._binary_cache.clear()
+
+
+def _translate_newlines(text: str) -> str:
+    """與文字模式讀檔相同的通用換行轉換"""
+    if '\r' not in text:
+        return text
+    return text.replace('\r\n', '\n').replace('\r', '\n')
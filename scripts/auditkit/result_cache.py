@@ -0,0 +1,177 @@
+"""
+稽核結果持久化快取
+以「路徑 + 大小 + mtime」判斷檔案是否變更（mtime 不同時改用內容雜湊確認），
+儲存各稽核腳本的單檔分析結果，未變更的檔案在下次執行時直接沿用
+"""
+
+import hashlib
+import json
+import os
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, Optional, Set
+
+from .issue import decode_cached, encode_cached
+from .project_index import FileEntry, ProjectIndex
+
+# 快取目錄（相對於專案根目錄）
+CACHE_DIR = Path('.cache') / 'audits'
+
+# 快取檔格式版本，格式不相容時整份快取作廢（2：問題記錄以 Issue 保存）
+CACHE_FORMAT_VERSION = 2
+
+# 快取未命中的標記（結果本身可能是 None / 空列表）
+MISSING = object()
+
+
+def fingerprint(*parts: Any) -> str:
+    """將規則設定（標準值、網站 URL 等）轉成簡短指紋，設定改變時快取自動失效"""
+    payload = json.dumps(parts, sort_keys=True, ensure_ascii=False, default=str)
+    return hashlib.sha1(payload.encode('utf-8')).hexdigest()[:12]
+
+
+class ResultCache:
+    """單一稽核腳本的結果快取
+
+    每個檔案一筆記錄，記錄內依規則名稱分別保存版本與結果：
+    規則版本改變只會讓該規則的結果失效，其他規則仍可沿用。
+    """
+
+    def __init__(self, index: ProjectIndex, namespace: str, enabled: bool = True,
+                 cache_dir: Optional[Path] = None, persist: bool = True):
+        self.index = index
+        self.namespace = namespace
+        self.enabled = enabled
+        # persist=False 時只保留在記憶體（--watch 搭配 --no-cache）
+        self.persist = persist
+        self.cache_dir = Path(cache_dir) if cache_dir else index.root / CACHE_DIR
+        self.path = self.cache_dir / f"{namespace}.json"
+        self.hits = 0
+        self.misses = 0
+        self._records: Dict[str, Dict[str, Any]] = {}
+        self._validated: Set[str] = set()
+        # git diff 範圍模式：範圍外的檔案只比對大小，不因 mtime 改變而計算雜湊
+        self._scope: Optional[Set[str]] = None
+        self._dirty = False
+        if enabled and persist:
+            self._load()
+
+    def _load(self):
+        """讀取快取檔（損壞或格式不符時視為空快取）"""
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                data = json.load(f, object_hook=decode_cached)
+        except (OSError, ValueError):
+            return
+        if data.get('format') != CACHE_FORMAT_VERSION:
+            return
+        self._records = data.get('files', {})
+
+    def _is_valid(self, entry: FileEntry, record: Dict[str, Any]) -> bool:
+        """檢查記錄是否仍對應目前的檔案內容"""
+        if entry.rel in self._validated:
+            return True
+        if entry.size is None or record.get('size') != entry.size:
+            return False
+        if self._scope is not None and entry.rel not in self._scope:
+            self._validated.add(entry.rel)
+            return True
+        if record.get('mtime') != entry.mtime:
+            # mtime 改變但內容可能相同（例如 git checkout），以雜湊確認
+            if record.get('sha1') != self.index.digest(entry):
+                return False
+            record['mtime'] = entry.mtime
+            self._dirty = True
+        self._validated.add(entry.rel)
+        return True
+
+    def get(self, entry: FileEntry, rule: str, version: str) -> Any:
+        """取得快取結果，未命中時回傳 MISSING"""
+        if not self.enabled:
+            return MISSING
+        record = self._records.get(entry.rel)
+        if record is None or not self._is_valid(entry, record):
+            self.misses += 1
+            return MISSING
+        slot = record['rules'].get(rule)
+        if slot is None or slot.get('version') != version:
+            self.misses += 1
+            return MISSING
+        self.hits += 1
+        return slot['result']
+
+    def put(self, entry: FileEntry, rule: str, version: str, result: Any):
+        """寫入單一規則的結果"""
+        if not self.enabled or entry.size is None:
+            return
+        record = self._records.get(entry.rel)
+        if record is None or entry.rel not in self._validated:
+            # 檔案已變更：舊規則結果全部作廢
+            record = {
+                'size': entry.size,
+                'mtime': entry.mtime,
+                'sha1': self.index.digest(entry),
+                'rules': {},
+            }
+            self._records[entry.rel] = record
+            self._validated.add(entry.rel)
+        record['rules'][rule] = {'version': version, 'result': result}
+        self._dirty = True
+
+    def cached(self, entry: FileEntry, rule: str, version: str, compute: Callable[[], Any]) -> Any:
+        """有快取就沿用，否則計算並寫入"""
+        result = self.get(entry, rule, version)
+        if result is MISSING:
+            result = compute()
+            self.put(entry, rule, version, result)
+        return result
+
+    def export(self, rels: Iterable[str]) -> Dict[str, Dict[str, Any]]:
+        """取出指定檔案的記錄（--shard 寫出部分結果用），沒有記錄的檔案略過"""
+        return {rel: self._records[rel] for rel in rels if rel in self._records}
+
+    def merge(self, records: Dict[str, Dict[str, Any]]):
+        """併入其他來源的記錄（--merge-shards）；仍以大小 / 雜湊驗證，內容不符的記錄不會被沿用"""
+        if not self.enabled:
+            return
+        for rel, record in records.items():
+            self._records[rel] = record
+            self._validated.discard(rel)
+        self._dirty = True
+
+    def limit_to(self, changed: Iterable[str]):
+        """--since / --staged：只重新驗證 git 回報變更的檔案，其餘檔案直接沿用快取結果
+
+        大小不符的記錄仍視為失效（快取來自其他分支等情況），沒有記錄的檔案照常分析
+        """
+        self._scope = set(changed)
+
+    def invalidate(self, rels: Iterable[str]):
+        """檔案異動後重新驗證（內容未變時仍可沿用結果）"""
+        self._validated.difference_update(rels)
+
+    def reset_stats(self):
+        """重設命中統計（--watch 每輪重新計算）"""
+        self.hits = 0
+        self.misses = 0
+
+    def save(self):
+        """寫回快取檔，並移除已不存在檔案的記錄"""
+        if not self.enabled or not self.persist or not self._dirty:
+            return
+        for rel in list(self._records):
+            if self.index.get(rel) is None:
+                del self._records[rel]
+
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.path.with_suffix('.json.tmp')
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump({'format': CACHE_FORMAT_VERSION, 'files': self._records}, f, ensure_ascii=False,
+                      default=encode_cached)
+        os.replace(tmp_path, self.path)
+        self._dirty = False
+
+    def summary(self) -> str:
+        """快取命中統計（供終端輸出）"""
+        if not self.enabled:
+            return "💾 快取已停用 (--no-cache)"
+        return f"💾 快取命中 {self.hits} 次，重新分析 {self.misses} 次"
@@ -0,0 +1,210 @@
+"""
+宣告式規則登錄
+每條規則宣告適用的檔案類型、預先編譯的正規表示式、嚴重度與訊息，取代散落在各檢查方法中的
+re.findall / re.search。RuleSet 依檔案類型（與分類）分組，每個檔案只分派一次、依宣告順序執行所有適用的規則；
+可在執行時停用個別規則，啟用 --profile 時每條規則各自計時
+"""
+
+import re
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Pattern, Sequence, Tuple, Union
+
+from .issue import Issue
+from .pattern_scanner import MultiPatternScanner
+from .profiler import PROFILER
+
+# 規則模式：
+#   each  - 每個（通過 where 的）match 產生一筆
+#   first - 只看第一個 match，通過 where 才產生一筆
+#   count - 通過 where 的 match 數達 min_count 時產生一筆（附 count）
+#   any   - 有任一通過 where 的 match 時產生一筆
+#   none  - 沒有任何通過 where 的 match 時產生一筆
+MODES = ('each', 'first', 'count', 'any', 'none')
+
+PatternSource = Union[str, Pattern]
+
+
+class Rule:
+    """一條宣告式規則
+
+    pattern 可為單一或多個正規表示式（多個時依序串接 match）；message 以 str.format 填入
+    match 的群組（{0}、{1}…，沒有群組時為整段 match）與 {count}，在讀取 Issue.message 時才格式化。
+    absent 列出的字串只要有一個出現在內容中就跳過此規則；view 指定改用 RuleSet 的哪個內容視圖比對
+    """
+    __slots__ = ('id', 'patterns', 'severity', 'message', 'file_types', 'category', 'mode', 'where',
+                 'min_count', 'absent', 'view')
+
+    def __init__(self, rule_id: str, pattern: Union[PatternSource, Sequence[PatternSource]], severity: str,
+                 message: str = '', file_types: Optional[Iterable[str]] = None, category: Optional[str] = None,
+                 flags: int = 0, mode: str = 'any', where: Optional[Callable[[re.Match], bool]] = None,
+                 min_count: int = 1, absent: Sequence[str] = (), view: Optional[str] = None):
+        if mode not in MODES:
+            raise ValueError(f"規則 {rule_id}: 未知的模式 {mode}（可用: {', '.join(MODES)}）")
+        sources = [pattern] if isinstance(pattern, (str, re.Pattern)) else list(pattern)
+        self.id = rule_id
+        self.patterns: Tuple[Pattern, ...] = tuple(
+            p if isinstance(p, re.Pattern) else re.compile(p, flags) for p in sources)
+        self.severity = severity
+        self.message = message
+        self.file_types = frozenset(file_types) if file_types is not None else None
+        self.category = category
+        self.mode = mode
+        self.where = where
+        self.min_count = min_count
+        self.absent = tuple(absent)
+        self.view = view
+
+    def applies_to(self, file_type: Optional[str], category: Optional[str] = None) -> bool:
+        if category is not None and self.category != category:
+            return False
+        return self.file_types is None or file_type in self.file_types
+
+    def _matches(self, text: str) -> Iterator[re.Match]:
+        for pattern in self.patterns:
+            for m in pattern.finditer(text):
+                if self.where is None or self.where(m):
+                    yield m
+
+    def _first(self, text: str) -> Optional[re.Match]:
+        for pattern in self.patterns:
+            m = pattern.search(text)
+            if m is not None:
+                return m
+        return None
+
+    def _issue(self, m: Optional[re.Match] = None, count: Optional[int] = None) -> Issue:
+        """建立發現（訊息樣板與群組一併保存，延遲格式化）"""
+        extra = {} if count is None else {'count': count}
+        if m is None:
+            return Issue.template(self.id, self.severity, self.message, **extra)
+        groups = m.groups() or (m.group(0),)
+        return Issue.template(self.id, self.severity, self.message, *('' if g is None else g for g in groups),
+                              **extra)
+
+    def evaluate(self, content: str, text: str) -> List[Issue]:
+        """對 text（content 或其視圖）執行規則"""
+        if any(s in content for s in self.absent):
+            return []
+        mode = self.mode
+        if mode == 'each':
+            return [self._issue(m) for m in self._matches(text)]
+        if mode == 'first':
+            m = self._first(text)
+            if m is None or (self.where is not None and not self.where(m)):
+                return []
+            return [self._issue(m)]
+        if mode == 'count':
+            count = sum(1 for _ in self._matches(text))
+            if count < self.min_count:
+                return []
+            return [self._issue(count=count)]
+        found = next(self._matches(text), None) is not None
+        if found == (mode == 'any'):
+            return [self._issue()]
+        return []
+
+    def describe(self) -> str:
+        types = ','.join(sorted(self.file_types)) if self.file_types is not None else '*'
+        category = f"[{self.category}] " if self.category else ''
+        return f"{self.id:<32} {self.severity:<9} {types:<14} {category}{self.message}"
+
+
+class RuleSet:
+    """規則登錄：依檔案類型分組，逐檔依宣告順序執行適用的規則
+
+    views 為 {名稱: 函數(內容) -> 文字}，例如移除媒體查詢後的樣式表；同一檔案內只計算一次
+    """
+
+    def __init__(self, rules: Iterable[Rule], views: Optional[Dict[str, Callable[[str], str]]] = None):
+        self.rules: List[Rule] = list(rules)
+        self.views = dict(views or {})
+        seen = set()
+        for rule in self.rules:
+            if rule.id in seen:
+                raise ValueError(f"規則 ID 重複: {rule.id}")
+            if rule.view is not None and rule.view not in self.views:
+                raise ValueError(f"規則 {rule.id}: 未定義的內容視圖 {rule.view}")
+            seen.add(rule.id)
+        self.disabled: set = set()
+        self._groups: Dict[Tuple[Optional[str], Optional[str]], List[Rule]] = {}
+
+    def __iter__(self) -> Iterator[Rule]:
+        return iter(self.rules)
+
+    def __len__(self) -> int:
+        return len(self.rules)
+
+    def ids(self) -> List[str]:
+        return [rule.id for rule in self.rules]
+
+    def add(self, rule: Rule, replace: bool = False):
+        """追加規則（例如由設定檔載入）；replace 時取代同 ID 的規則"""
+        ids = self.ids()
+        if rule.id in ids:
+            if not replace:
+                raise ValueError(f"規則 ID 重複: {rule.id}")
+            self.rules[ids.index(rule.id)] = rule
+        else:
+            self.rules.append(rule)
+        self._groups.clear()
+
+    def disable(self, rule_ids: Iterable[str]):
+        """停用規則；未知的 ID 以 ValueError 回報"""
+        rule_ids = set(rule_ids)
+        unknown = rule_ids - set(self.ids())
+        if unknown:
+            raise ValueError(f"未知的規則: {', '.join(sorted(unknown))}（可用: {', '.join(self.ids())}）")
+        self.disabled |= rule_ids
+        self._groups.clear()
+
+    def for_type(self, file_type: Optional[str] = None, category: Optional[str] = None) -> List[Rule]:
+        """適用於該檔案類型（與分類）的已啟用規則"""
+        key = (file_type, category)
+        rules = self._groups.get(key)
+        if rules is None:
+            rules = self._groups[key] = [rule for rule in self.rules
+                                         if rule.id not in self.disabled and rule.applies_to(file_type, category)]
+        return rules
+
+    def line_scanner(self, file_type: Optional[str] = None, category: Optional[str] = None) -> MultiPatternScanner:
+        """以適用的規則建立逐行單次掃描器（標籤為規則 ID）
+
+        只適用單一、無旗標的逐行規則（模式、where、視圖由呼叫端自行處理）
+        """
+        patterns = {}
+        for rule in self.for_type(file_type, category):
+            if len(rule.patterns) != 1 or rule.patterns[0].flags & ~re.UNICODE:
+                raise ValueError(f"規則 {rule.id}: 逐行掃描只支援單一、無旗標的正規表示式")
+            patterns[rule.id] = rule.patterns[0].pattern
+        return MultiPatternScanner(patterns)
+
+    def run(self, content: str, file_type: Optional[str] = None, category: Optional[str] = None) -> List[Issue]:
+        """對一個檔案的內容執行所有適用的規則，依規則宣告順序回傳發現"""
+        findings: List[Issue] = []
+        views: Dict[str, str] = {}
+        for rule in self.for_type(file_type, category):
+            if rule.view is None:
+                text = content
+            else:
+                text = views.get(rule.view)
+                if text is None:
+                    text = views[rule.view] = self.views[rule.view](content)
+            if PROFILER.enabled:
+                with PROFILER.rule(rule.id):
+                    found = rule.evaluate(content, text)
+                    PROFILER.add('matches', len(found))
+            else:
+                found = rule.evaluate(content, text)
+            findings.extend(found)
+        return findings
+
+    def describe(self) -> List[str]:
+        """--list-rules 的輸出（停用的規則標示 -）"""
+        return [f"{'-' if rule.id in self.disabled else '•'} {rule.describe()}" for rule in self.rules]
+
+
+def parse_rule_ids(value: Optional[Union[str, Sequence[str]]]) -> List[str]:
+    """解析 --disable-rules 的值（逗號分隔，可重複指定）"""
+    if not value:
+        return []
+    values = [value] if isinstance(value, str) else value
+    return [rule_id.strip() for item in values for rule_id in item.split(',') if rule_id.strip()]
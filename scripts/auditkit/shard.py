@@ -0,0 +1,114 @@
+"""
+CI 分片（--shard i/n / --merge-shards）
+以檔案相對路徑的穩定雜湊分配檔案（與 PYTHONHASHSEED、機器與檔案總數無關，新增檔案不會讓其他檔案換分片），
+各 CI 節點只分析自己分片內的檔案，將這些檔案的單檔結果（結果快取的記錄）寫到 report/shards/；
+合併時讀回全部分片併入結果快取後照常執行，單檔階段全部命中快取，只需執行跨檔案的階段，報告與單機執行相同
+"""
+
+import hashlib
+import json
+import os
+import re
+from pathlib import Path
+from typing import Dict, Iterable, Optional, Union
+
+from .issue import decode_cached, encode_cached
+from .result_cache import CACHE_FORMAT_VERSION, ResultCache
+
+PathLike = Union[str, Path]
+
+# 部分結果的目錄（相對於報告目錄）
+SHARD_DIR = 'shards'
+
+_SPEC = re.compile(r'(\d+)/(\d+)\Z')
+
+
+def shard_of(rel: str, count: int) -> int:
+    """檔案所屬的分片（0 起算）"""
+    digest = hashlib.blake2b(rel.encode('utf-8'), digest_size=8).digest()
+    return int.from_bytes(digest, 'big') % count
+
+
+class Shard:
+    """共 count 個分片中的第 index 個（1 起算，與 CI 的 matrix 編號一致）"""
+
+    def __init__(self, index: int, count: int):
+        if count < 1 or not 1 <= index <= count:
+            raise ValueError(f"分片編號須介於 1 與分片數之間: {index}/{count}")
+        self.index = index
+        self.count = count
+
+    @classmethod
+    def parse(cls, spec: str) -> 'Shard':
+        """解析 --shard 的參數（例如 2/4）"""
+        match = _SPEC.match(spec.strip())
+        if match is None:
+            raise ValueError(f"--shard 的格式應為 i/n（例如 1/4）: {spec}")
+        return cls(int(match.group(1)), int(match.group(2)))
+
+    def owns(self, rel: str) -> bool:
+        """檔案（相對於專案根目錄的 POSIX 路徑）是否屬於此分片"""
+        return shard_of(rel, self.count) == self.index - 1
+
+    def path(self, report_dir: PathLike, tool: str) -> Path:
+        """此分片的部分結果檔"""
+        return Path(report_dir) / SHARD_DIR / f"{tool}.{self.index}-of-{self.count}.json"
+
+    def __str__(self) -> str:
+        return f"{self.index}/{self.count}"
+
+
+def shard_from_args(spec: Optional[str]) -> Optional[Shard]:
+    """--shard 的共用處理：未指定時回傳 None，格式錯誤時以 ValueError 回報"""
+    if spec is None:
+        return None
+    return Shard.parse(spec)
+
+
+def save_shard(cache: ResultCache, shard: Shard, rels: Iterable[str], report_dir: PathLike) -> Path:
+    """寫出分片內檔案的結果快取記錄（檔名以快取的 namespace 區分工具）"""
+    path = shard.path(report_dir, cache.namespace)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    data = {
+        'format': CACHE_FORMAT_VERSION,
+        'tool': cache.namespace,
+        'shard': shard.index,
+        'count': shard.count,
+        'files': cache.export(rels),
+    }
+    tmp_path = path.with_suffix('.json.tmp')
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(data, f, ensure_ascii=False, default=encode_cached)
+    os.replace(tmp_path, path)
+    return path
+
+
+def load_shards(cache: ResultCache, report_dir: PathLike) -> int:
+    """讀回 report/shards/ 中該工具的全部分片並併入結果快取，回傳分片數
+
+    找不到分片、分片不齊全、混有不同分片數或格式不符時以 ValueError 回報（避免合併出不完整的報告）
+    """
+    shard_dir = Path(report_dir) / SHARD_DIR
+    shards: Dict[int, Dict[int, Dict]] = {}
+    for path in sorted(shard_dir.glob(f"{cache.namespace}.*-of-*.json")):
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                data = json.load(f, object_hook=decode_cached)
+        except (OSError, ValueError) as e:
+            raise ValueError(f"無法讀取分片 {path}: {e}")
+        if data.get('format') != CACHE_FORMAT_VERSION or data.get('tool') != cache.namespace:
+            raise ValueError(f"分片格式不符（請以相同版本的腳本重新產生）: {path}")
+        shards.setdefault(data['count'], {})[data['shard']] = data['files']
+
+    if not shards:
+        raise ValueError(f"{shard_dir} 中沒有 {cache.namespace} 的分片，請先以 --shard i/n 執行各分片")
+    if len(shards) > 1:
+        raise ValueError(f"{shard_dir} 中混有不同分片數的結果（{', '.join(map(str, sorted(shards)))}），請清除舊的分片")
+    count, found = next(iter(shards.items()))
+    missing = [str(i) for i in range(1, count + 1) if i not in found]
+    if missing:
+        raise ValueError(f"缺少 {cache.namespace} 的分片 {', '.join(missing)}（共 {count} 個）")
+
+    for index in range(1, count + 1):
+        cache.merge(found[index])
+    return count
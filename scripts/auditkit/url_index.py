@@ -0,0 +1,174 @@
+"""
+站內網址索引與轉址規則
+以正規化後的站內路徑（site_path）建立雜湊集合，收錄頁面網址、建置輸出檔案與靜態資源；
+_redirects（Cloudflare Pages / Netlify 格式）的固定路徑與 /prefix/* 規則也以 dict 查詢，
+檢查每條內部連結只需常數次（與路徑長度成正比）的查詢，與頁面數和規則數無關
+"""
+
+import re
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Set, Tuple, Union
+from urllib.parse import unquote
+
+from .link_graph import site_path
+
+PathLike = Union[str, Path]
+
+# 追蹤轉址的次數上限（超過視為轉址迴圈）
+MAX_REDIRECT_HOPS = 5
+
+# 未指定狀態碼的轉址規則
+DEFAULT_REDIRECT_STATUS = 301
+
+# 連結檢查結果
+LINK_OK = 'ok'
+LINK_REDIRECT = 'redirect'
+LINK_BROKEN = 'broken'
+
+# 伺服器對目錄網址補上結尾斜線的轉址（/about -> /about/）
+TRAILING_SLASH_STATUS = 308
+
+_PLACEHOLDER = re.compile(r':([A-Za-z_]\w*)')
+
+
+def output_path(rel: str) -> str:
+    """建置輸出檔案對應的站內路徑（blog/x/index.html -> /blog/x/）"""
+    path = '/' + rel.replace('\\', '/')
+    if path.endswith('/index.html'):
+        path = path[:-len('index.html')]
+    return path
+
+
+class RedirectRules:
+    """_redirects 規則：依檔案中的順序，第一條符合的規則生效
+
+    固定路徑與結尾為 * 的前綴規則各以 dict 保存；含 :placeholder 的規則另外編譯成正規表示式（通常只有少數幾條）
+    """
+
+    def __init__(self):
+        # 路徑 / 前綴 -> (規則順序, 目標, 狀態碼)
+        self._exact: Dict[str, Tuple[int, str, int]] = {}
+        self._prefixes: Dict[str, Tuple[int, str, int]] = {}
+        self._patterns: List[Tuple[int, re.Pattern, str, int]] = []
+        self._max_prefix = 0
+
+    def __len__(self) -> int:
+        return len(self._exact) + len(self._prefixes) + len(self._patterns)
+
+    @classmethod
+    def load(cls, path: PathLike) -> 'RedirectRules':
+        """讀取 _redirects（檔案不存在時為空規則）"""
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                return cls.parse(f)
+        except FileNotFoundError:
+            return cls()
+
+    @classmethod
+    def parse(cls, lines: Iterable[str]) -> 'RedirectRules':
+        """解析「來源 目標 [狀態碼]」格式，忽略空行、# 註解與無法解析的行"""
+        rules = cls()
+        for order, line in enumerate(lines):
+            fields = line.split('#', 1)[0].split()
+            if len(fields) < 2 or not fields[0].startswith('/'):
+                continue
+            status = DEFAULT_REDIRECT_STATUS
+            if len(fields) > 2:
+                try:
+                    status = int(fields[2].rstrip('!'))
+                except ValueError:
+                    continue
+            rules.add(order, unquote(fields[0]), fields[1], status)
+        return rules
+
+    def add(self, order: int, source: str, target: str, status: int):
+        rule = (order, target, status)
+        if source.endswith('*') and ':' not in source and '*' not in source[:-1]:
+            prefix = source[:-1]
+            self._prefixes.setdefault(prefix, rule)
+            self._max_prefix = max(self._max_prefix, len(prefix))
+        elif ':' in source or '*' in source:
+            pattern = '^' + _PLACEHOLDER.sub(r'(?P<\1>[^/]+)', re.escape(source).replace(r'\*', '(?P<splat>.*)')) + '$'
+            self._patterns.append((order, re.compile(pattern), target, status))
+        else:
+            self._exact.setdefault(source, rule)
+
+    def match(self, path: str) -> Optional[Tuple[str, int]]:
+        """符合的規則的 (目標, 狀態碼)，:splat 與 :placeholder 已代入；沒有符合的規則時回傳 None"""
+        best: Optional[Tuple[int, str, int]] = self._exact.get(path)
+        splat = ''
+        # 前綴規則：只需查詢路徑的各個前綴
+        for length in range(min(len(path), self._max_prefix), -1, -1):
+            rule = self._prefixes.get(path[:length])
+            if rule is not None and (best is None or rule[0] < best[0]):
+                best, splat = rule, path[length:]
+        values: Dict[str, str] = {}
+        for order, pattern, target, status in self._patterns:
+            if best is not None and order > best[0]:
+                break
+            found = pattern.match(path)
+            if found:
+                best, values = (order, target, status), found.groupdict()
+                break
+        if best is None:
+            return None
+        _, target, status = best
+        values.setdefault('splat', splat)
+        target = _PLACEHOLDER.sub(lambda m: values.get(m.group(1), m.group(0)), target)
+        return target, status
+
+
+class UrlIndex:
+    """站內網址的雜湊集合 + 轉址規則"""
+
+    def __init__(self, site_url: str, redirects: Optional[RedirectRules] = None):
+        self.site_url = site_url
+        self.site_root = site_url.rstrip('/') + '/'
+        self.redirects = redirects if redirects is not None else RedirectRules()
+        self.paths: Set[str] = set()
+
+    def __len__(self) -> int:
+        return len(self.paths)
+
+    def add_url(self, url: str):
+        """加入頁面網址（絕對網址或以 / 開頭的路徑）"""
+        path = site_path(url, self.site_root, self.site_url)
+        if path is not None:
+            self.paths.add(path)
+
+    def add_files(self, rels: Iterable[str]):
+        """加入建置輸出或靜態資源檔案（相對於網站根目錄的路徑）"""
+        self.paths.update(output_path(rel) for rel in rels)
+
+    def resolve(self, path: str) -> Tuple[str, str, List[int]]:
+        """檢查站內路徑：回傳 (結果, 最終路徑或網址, 途經的轉址狀態碼)
+
+        依 Cloudflare Pages 的順序先套用 _redirects，再查詢網址集合；目錄網址缺少結尾斜線視為一次 308 轉址。
+        狀態碼 200 的規則為改寫（不是轉址），404 規則與找不到的路徑為 broken，轉到外部網址時結果為 redirect
+        """
+        hops: List[int] = []
+        current = path
+        for _ in range(MAX_REDIRECT_HOPS + 1):
+            rule = self.redirects.match(current)
+            if rule is not None:
+                target, status = rule
+                if status == 404:
+                    return LINK_BROKEN, current, hops
+                if status == 200:
+                    return (LINK_REDIRECT if hops else LINK_OK), current, hops
+                hops.append(status)
+                next_path = site_path(target, self.site_root + current.lstrip('/'), self.site_url)
+                if next_path is None:
+                    return LINK_REDIRECT, target, hops
+                if len(hops) > MAX_REDIRECT_HOPS:
+                    break
+                current = next_path
+                continue
+            if current in self.paths:
+                return (LINK_REDIRECT if hops else LINK_OK), current, hops
+            if not current.endswith('/') and current + '/' in self.paths:
+                hops.append(TRAILING_SLASH_STATUS)
+                return LINK_REDIRECT, current + '/', hops
+            return LINK_BROKEN, current, hops
+        # 轉址迴圈
+        return LINK_BROKEN, current, hops
@@ -0,0 +1,133 @@
+"""
+以 os.scandir 走訪專案目錄
+進入目錄前先依排除清單與 .gitignore / .eleventyignore 規則剪枝（node_modules 等目錄不會被走訪），
+檔案大小與修改時間取自 DirEntry.stat()，不另外組路徑呼叫 os.stat；
+多個根目錄（或根目錄下的各個子目錄）可在執行緒中平行走訪，結果依 os.walk 的順序合併
+"""
+
+import os
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Iterable, List, Optional, Sequence, Set, Tuple, Union
+
+from .ignore_rules import DEFAULT_IGNORE_FILES, IgnoreRules
+
+PathLike = Union[str, Path]
+
+# 平行走訪的預設執行緒數（目錄走訪以 I/O 為主，與 ThreadPoolExecutor 的預設值相同但設上限）
+WALK_JOBS = min(8, (os.cpu_count() or 1) + 4)
+
+
+@dataclass
+class DirListing:
+    """單一目錄的走訪結果"""
+    rel: str                                                  # 相對於走訪根目錄的 POSIX 路徑（根目錄為 ''）
+    dirs: List[str] = field(default_factory=list)             # 未被忽略的子目錄（包含排除清單中的目錄，與 os.walk 相同）
+    files: List[Tuple[str, Optional[int], Optional[float]]] = field(default_factory=list)  # (檔名, 大小, 修改時間)
+
+
+def _scan_dir(root: str, rel_dir: str, rules: IgnoreRules, prune_dirs: Set,
+              ignore_files: Sequence[str]) -> Tuple[Optional[DirListing], List[Tuple[str, IgnoreRules]]]:
+    """列出單一目錄，回傳 (走訪結果, 要繼續進入的子目錄與其規則)；無法讀取的目錄回傳 None"""
+    abs_dir = os.path.join(root, rel_dir) if rel_dir else root
+    try:
+        with os.scandir(abs_dir) as it:
+            entries = list(it)
+    except OSError:
+        return None, []
+
+    if ignore_files and any(entry.name in ignore_files for entry in entries):
+        rules = rules.with_dir(root, rel_dir, [name for name in ignore_files
+                                               if any(entry.name == name for entry in entries)])
+
+    listing = DirListing(rel_dir)
+    descend = []
+    for entry in entries:
+        name = entry.name
+        rel = f"{rel_dir}/{name}" if rel_dir else name
+        try:
+            is_dir = entry.is_dir()
+        except OSError:
+            is_dir = False
+
+        if is_dir:
+            if rules and rules.ignored(rel, True):
+                continue
+            listing.dirs.append(name)
+            # 與 os.walk 相同，不進入符號連結的目錄
+            if name not in prune_dirs and not entry.is_symlink():
+                descend.append((rel, rules))
+            continue
+
+        if rules and rules.ignored(rel):
+            continue
+        try:
+            st = entry.stat()
+            listing.files.append((name, st.st_size, st.st_mtime))
+        except OSError:
+            listing.files.append((name, None, None))
+    return listing, descend
+
+
+def _walk_subtree(root: str, rel_dir: str, rules: IgnoreRules, prune_dirs: Set,
+                  ignore_files: Sequence[str]) -> List[DirListing]:
+    """由上而下走訪子樹（順序與 os.walk 相同）"""
+    result = []
+    stack = [(rel_dir, rules)]
+    while stack:
+        current, current_rules = stack.pop()
+        listing, descend = _scan_dir(root, current, current_rules, prune_dirs, ignore_files)
+        if listing is None:
+            continue
+        result.append(listing)
+        stack.extend(reversed(descend))
+    return result
+
+
+def walk_tree(root: PathLike,
+              prune_dirs: Iterable[str] = (),
+              ignore_files: Sequence[str] = DEFAULT_IGNORE_FILES,
+              jobs: int = 1) -> List[DirListing]:
+    """走訪整個目錄樹；jobs > 1 時根目錄下的各個子目錄在執行緒中平行走訪"""
+    root_str = os.path.abspath(root)
+    prune = set(prune_dirs)
+    if jobs <= 1:
+        return _walk_subtree(root_str, '', IgnoreRules(), prune, ignore_files)
+
+    top, descend = _scan_dir(root_str, '', IgnoreRules(), prune, ignore_files)
+    if top is None:
+        return []
+    with ThreadPoolExecutor(max_workers=min(jobs, max(1, len(descend)))) as pool:
+        subtrees = list(pool.map(lambda item: _walk_subtree(root_str, item[0], item[1], prune, ignore_files),
+                                 descend))
+    return [top] + [listing for subtree in subtrees for listing in subtree]
+
+
+def walk_roots(roots: Sequence[PathLike],
+               prune_dirs: Iterable[str] = (),
+               ignore_files: Sequence[str] = DEFAULT_IGNORE_FILES,
+               jobs: int = WALK_JOBS) -> List[List[DirListing]]:
+    """在執行緒中平行走訪多個根目錄，結果依 roots 的順序回傳（各自的路徑相對於自己的根目錄）"""
+    prune = set(prune_dirs)
+    if jobs <= 1 or len(roots) <= 1:
+        return [walk_tree(root, prune, ignore_files, jobs) for root in roots]
+    with ThreadPoolExecutor(max_workers=min(jobs, len(roots))) as pool:
+        return list(pool.map(lambda root: walk_tree(root, prune, ignore_files), roots))
+
+
+def list_files(root: PathLike,
+               suffixes: Optional[Iterable[str]] = None,
+               prune_dirs: Iterable[str] = (),
+               ignore_files: Sequence[str] = DEFAULT_IGNORE_FILES,
+               jobs: int = WALK_JOBS) -> List[Path]:
+    """走訪 root 並回傳符合副檔名（不分大小寫）的檔案絕對路徑，取代 rglob 後再過濾的寫法"""
+    root_path = Path(os.path.abspath(root))
+    wanted = {suffix.lower() for suffix in suffixes} if suffixes is not None else None
+    result = []
+    for listing in walk_tree(root_path, prune_dirs, ignore_files, jobs):
+        base = root_path / listing.rel if listing.rel else root_path
+        for name, _, _ in listing.files:
+            if wanted is None or os.path.splitext(name)[1].lower() in wanted:
+                result.append(base / name)
+    return result
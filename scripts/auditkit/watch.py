@@ -0,0 +1,214 @@
+"""
+監看模式
+Linux 上以 inotify（ctypes 直接呼叫 libc，無額外相依）訂閱檔案異動，其他平台或無法使用時改為定期輪詢；
+異動事件套用到共用的 ProjectIndex 後，只呼叫一次重新稽核的回呼，未變更檔案的內容與分析結果都保留在記憶體
+"""
+
+import contextlib
+import ctypes
+import ctypes.util
+import errno
+import io
+import os
+import select
+import struct
+import sys
+import time
+from pathlib import Path
+from typing import Callable, Dict, Iterable, List, Optional, Set, Union
+
+from .project_index import ProjectIndex
+
+PathLike = Union[str, Path]
+
+# inotify 事件旗標（linux/inotify.h）
+IN_MODIFY = 0x00000002
+IN_ATTRIB = 0x00000004
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_FROM = 0x00000040
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_DELETE = 0x00000200
+IN_DELETE_SELF = 0x00000400
+IN_Q_OVERFLOW = 0x00004000
+IN_IGNORED = 0x00008000
+IN_ISDIR = 0x40000000
+IN_CLOEXEC = 0o2000000
+
+WATCH_MASK = (IN_MODIFY | IN_ATTRIB | IN_CLOSE_WRITE | IN_MOVED_FROM | IN_MOVED_TO
+              | IN_CREATE | IN_DELETE | IN_DELETE_SELF)
+_EVENT_HEADER = struct.Struct('iIII')
+
+# 新目錄在加入監看前就已刪除或被取代（編譯工具的暫存目錄等），略過即可
+_VANISHED_ERRNOS = {errno.ENOENT, errno.ENOTDIR}
+
+# 輪詢間隔與事件合併等待時間（秒）
+POLL_INTERVAL = 1.0
+DEBOUNCE = 0.1
+
+
+class _Inotify:
+    """最小化的 inotify 包裝（遞迴監看目錄）"""
+
+    def __init__(self, roots: List[Path], prune_dirs: Set[str]):
+        libc = ctypes.CDLL(ctypes.util.find_library('c') or 'libc.so.6', use_errno=True)
+        self._add_watch = libc.inotify_add_watch
+        self._add_watch.argtypes = [ctypes.c_int, ctypes.c_char_p, ctypes.c_uint32]
+        self.fd = libc.inotify_init1(IN_CLOEXEC)
+        if self.fd < 0:
+            raise OSError(ctypes.get_errno(), 'inotify_init1 失敗')
+        self.prune_dirs = prune_dirs
+        self._paths: Dict[int, str] = {}
+        try:
+            for root in roots:
+                self._add_tree(str(root))
+        except OSError:
+            self.close()
+            raise
+
+    def _add_tree(self, top: str):
+        """遞迴加入監看；走訪期間已消失的目錄略過，其他錯誤（例如 ENOSPC：超過 max_user_watches）以 OSError 拋出"""
+        for current, dirs, _ in os.walk(top):
+            dirs[:] = [d for d in dirs if d not in self.prune_dirs]
+            wd = self._add_watch(self.fd, os.fsencode(current), WATCH_MASK)
+            if wd < 0:
+                code = ctypes.get_errno()
+                if code in _VANISHED_ERRNOS:
+                    dirs[:] = []
+                    continue
+                raise OSError(code, f'無法監看 {current}（可能超過 max_user_watches）')
+            self._paths[wd] = current
+
+    def read(self, timeout: Optional[float]) -> Optional[Set[str]]:
+        """等待事件，回傳異動路徑；佇列溢位時回傳 None（需要完整重新掃描）
+
+        新目錄無法加入監看（例如超過 max_user_watches）時拋出 OSError，已讀出的事件一併捨棄，由呼叫端改為輪詢
+        """
+        ready, _, _ = select.select([self.fd], [], [], timeout)
+        if not ready:
+            return set()
+        data = os.read(self.fd, 64 * 1024)
+        changed: Set[str] = set()
+        offset = 0
+        while offset < len(data):
+            wd, mask, _, length = _EVENT_HEADER.unpack_from(data, offset)
+            offset += _EVENT_HEADER.size
+            name = data[offset:offset + length].rstrip(b'\0').decode('utf-8', 'surrogateescape')
+            offset += length
+            if mask & IN_Q_OVERFLOW:
+                return None
+            if mask & IN_IGNORED:
+                self._paths.pop(wd, None)
+                continue
+            directory = self._paths.get(wd)
+            if directory is None:
+                continue
+            path = os.path.join(directory, name) if name else directory
+            if mask & IN_ISDIR and mask & (IN_CREATE | IN_MOVED_TO) and name not in self.prune_dirs:
+                self._add_tree(path)
+            changed.add(path)
+        return changed
+
+    def close(self):
+        os.close(self.fd)
+
+
+class FileWatcher:
+    """回傳一批批的檔案異動（inotify，無法使用時改為輪詢）"""
+
+    def __init__(self, index: ProjectIndex, roots: Optional[Iterable[PathLike]] = None,
+                 poll: bool = False, interval: float = POLL_INTERVAL, debounce: float = DEBOUNCE):
+        self.index = index
+        self.roots = [Path(os.path.abspath(r)) for r in (roots or [index.root])]
+        self.interval = interval
+        self.debounce = debounce
+        self._inotify: Optional[_Inotify] = None
+        if not poll and sys.platform.startswith('linux'):
+            try:
+                self._inotify = _Inotify(self.roots, index.prune_dirs)
+            except (OSError, AttributeError):
+                self._inotify = None
+
+    @property
+    def mode(self) -> str:
+        return 'inotify' if self._inotify else f'輪詢（每 {self.interval:g} 秒）'
+
+    def wait(self) -> List[str]:
+        """阻塞直到有檔案異動，套用到索引並回傳變更的相對路徑"""
+        while True:
+            if self._inotify is None:
+                time.sleep(self.interval)
+                changed = self.index.rescan()
+            else:
+                try:
+                    paths = self._read_batch()
+                except OSError as e:
+                    # 無法再監看新目錄時改為輪詢；這一批事件不完整，以完整重新掃描補上
+                    print(f"⚠️  inotify 無法繼續監看（{e}），改為{self._fall_back_to_polling()}")
+                    paths = None
+                changed = self.index.rescan() if paths is None else self.index.update(sorted(paths))
+            if changed:
+                return changed
+
+    def _read_batch(self) -> Optional[Set[str]]:
+        """等待一批事件，合併短時間內的連續事件（編輯器存檔常觸發多個事件）；None 表示需要完整重新掃描"""
+        paths = self._inotify.read(None)
+        while paths is not None:
+            more = self._inotify.read(self.debounce)
+            if more is None:
+                return None
+            if not more:
+                break
+            paths |= more
+        return paths
+
+    def _fall_back_to_polling(self) -> str:
+        self._inotify.close()
+        self._inotify = None
+        return self.mode
+
+    def close(self):
+        if self._inotify:
+            self._inotify.close()
+
+
+def watch_loop(index: ProjectIndex,
+               on_change: Callable[[List[str]], str],
+               roots: Optional[Iterable[PathLike]] = None,
+               ignore: Iterable[PathLike] = (),
+               poll: bool = False):
+    """監看檔案並在相關檔案異動時重新稽核
+
+    on_change 接收變更的相對路徑，回傳一行摘要；其終端輸出會被收起，只顯示摘要與耗時。
+    ignore 為稽核本身的輸出（報告目錄、產生的腳本），避免寫入報告又觸發下一輪
+    """
+    index.scan()
+    watcher = FileWatcher(index, roots, poll=poll)
+    root_prefixes = [index._rel_of(r) for r in watcher.roots]
+    ignored = [index._rel_of(os.path.abspath(p)) for p in ignore]
+
+    def relevant(rel: str) -> bool:
+        if any(rel == p or rel.startswith(p + '/') for p in ignored if p):
+            return False
+        return any(not p or rel == p or rel.startswith(p + '/') for p in root_prefixes)
+
+    print(f"\n👀 監看模式（{watcher.mode}），按 Ctrl+C 結束")
+    try:
+        while True:
+            changed = [rel for rel in watcher.wait() if relevant(rel)]
+            if not changed:
+                continue
+            start = time.perf_counter()
+            buffer = io.StringIO()
+            try:
+                with contextlib.redirect_stdout(buffer):
+                    summary = on_change(changed)
+            except Exception as e:
+                summary = f"❌ 重新稽核失敗: {e}"
+            elapsed = (time.perf_counter() - start) * 1000
+            shown = ', '.join(changed[:3]) + (f" 等 {len(changed)} 個檔案" if len(changed) > 3 else '')
+            print(f"🔄 [{time.strftime('%H:%M:%S')}] {shown} → {summary}（{elapsed:.0f} ms）")
+    except KeyboardInterrupt:
+        print("\n👋 結束監看")
+    finally:
+        watcher.close()
@@ -0,0 +1,398 @@
+#!/usr/bin/env python3
+"""
+稽核腳本基準測試
+依 src/ 的結構產生放大 N 倍的合成網站（含 front matter 的 njk 頁面、main.css 規則、portfolio.json 項目與圖片檔），
+在每個規模下以獨立行程執行各稽核腳本，記錄耗時與最大記憶體用量，結果存成 JSON 以便跨 commit 比較；
+耗時成長明顯超過規模成長時標示為疑似超線性（平方成長）路徑
+
+用法:
+    python3 scripts/benchmark-audits.py                                 # 10× / 100× / 1000×
+    python3 scripts/benchmark-audits.py --scales 10,100 --auditors seo,design
+    python3 scripts/benchmark-audits.py --compare report/benchmarks/benchmark-xxx.json
+    python3 scripts/benchmark-audits.py --generate-only /tmp/synthetic-site --scales 100
+"""
+
+import argparse
+import json
+import os
+import platform
+import re
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, List
+
+# 專案根目錄
+PROJECT_ROOT = Path(__file__).parent.parent
+SRC_DIR = PROJECT_ROOT / "src"
+BENCHMARK_DIR = PROJECT_ROOT / "report" / "benchmarks"
+
+# 受測的稽核腳本（名稱 -> (腳本, 參數)）；每次都在全新的合成網站上以 --no-cache 冷啟動執行
+AUDITORS = {
+    'seo': ('seo-audit.py', []),
+    'comprehensive-seo': ('comprehensive-seo-audit.py', ['--no-cache']),
+    'design': ('design-system-audit.py', ['--no-cache']),
+    'mobile': ('mobile-responsive-audit.py', []),
+    'unused': ('find-unused-files.py', ['--no-cache']),
+    'code': ('comprehensive-code-analysis.py', []),
+    'accessibility': ('check-accessibility-colors.py', []),
+}
+
+DEFAULT_SCALES = [10, 100, 1000]
+DEFAULT_TIMEOUT = 600
+
+# 複製到合成網站的專案根目錄檔案（稽核腳本與設定），src/ 另行依規模產生
+ROOT_FILES = ['package.json', 'README.md', 'eslint.config.js', 'postcss.config.js', 'tailwind.config.js']
+COPY_IGNORE = shutil.ignore_patterns('__pycache__', '*.pyc', '.DS_Store')
+
+# 合成副本放置位置（相對於 src/ 與 src/assets/images/）
+SYNTHETIC_DIR = 'synthetic'
+
+# 圖片以最小的 JPEG（SOI + EOI）代替，只保留檔名與目錄結構
+IMAGE_SUFFIXES = {'.jpg', '.jpeg', '.png', '.webp', '.gif', '.avif'}
+PLACEHOLDER_IMAGE = b'\xff\xd8\xff\xd9'
+
+# 超線性判定：規模放大 k 倍時，耗時超過 k × 此倍數即標示（忽略過短的耗時，避免啟動時間干擾）
+SUPERLINEAR_TOLERANCE = 2.0
+MIN_SECONDS_FOR_RATIO = 0.5
+
+# CSS 選擇器中的 class（後面到下一個 { 之間沒有其他大括號，才是選擇器而不是宣告值）
+CSS_CLASS_IN_SELECTOR = re.compile(r'\.(-?[A-Za-z_][\w-]*)(?=[^{}]*\{)')
+
+
+def _is_page(rel: Path) -> bool:
+    return rel.suffix == '.njk' and rel.parts[0] not in ('_includes', '_data')
+
+
+def _copy_label(k: int) -> str:
+    return f"s{k}"
+
+
+def rewrite_page(content: str, k: int) -> str:
+    """第 k 份頁面副本：標題加上編號、permalink 與圖片路徑移到副本目錄"""
+    label = _copy_label(k)
+    content = content.replace('/assets/images/', f'/assets/images/{SYNTHETIC_DIR}/{label}/')
+    if not content.startswith('---'):
+        return content
+    end = content.find('\n---', 3)
+    if end < 0:
+        return content
+    lines = content[:end].split('\n')
+    for i, line in enumerate(lines):
+        if line.startswith('title:'):
+            value = line[len('title:'):].strip()
+            quote = value[:1] if value[:1] in ('"', "'") and value.endswith(value[:1]) else ''
+            inner = value[1:-1] if quote else value
+            lines[i] = f'title: {quote}{inner}（#{k}）{quote}'
+        elif line.startswith('permalink:'):
+            value = line[len('permalink:'):].strip().strip('"\'')
+            lines[i] = f'permalink: "/{SYNTHETIC_DIR}/{label}{value}"'
+    return '\n'.join(lines) + content[end:]
+
+
+def rewrite_css(css: str, k: int) -> str:
+    """第 k 份樣式表副本：選擇器的 class 加上後綴（不重複 @import）"""
+    label = _copy_label(k)
+    body = '\n'.join(line for line in css.split('\n') if not line.startswith('@import'))
+    return CSS_CLASS_IN_SELECTOR.sub(lambda m: f".{m.group(1)}-{label}", body)
+
+
+def scale_portfolio(data: Dict[str, Any], scale: int) -> Dict[str, Any]:
+    """portfolio.json：每個分類複製 scale 份，圖片指向對應的副本目錄"""
+    result = dict(data)
+    for k in range(1, scale):
+        label = _copy_label(k)
+        for key, group in data.items():
+            copy = dict(group)
+            if isinstance(group.get('items'), list):
+                copy['items'] = [
+                    {**item, 'src': f"{SYNTHETIC_DIR}/{label}/{item['src']}"} if 'src' in item else item
+                    for item in group['items']
+                ]
+            result[f"{key}-{label}"] = copy
+    return result
+
+
+def generate_site(dest: Path, scale: int) -> Dict[str, Any]:
+    """在 dest 產生放大 scale 倍的合成網站，回傳規模統計"""
+    start = time.perf_counter()
+    if dest.exists():
+        shutil.rmtree(dest)
+    dest.mkdir(parents=True)
+
+    # 稽核腳本與根目錄設定檔照原樣複製
+    shutil.copytree(PROJECT_ROOT / 'scripts', dest / 'scripts', ignore=COPY_IGNORE)
+    for name in ROOT_FILES:
+        if (PROJECT_ROOT / name).exists():
+            shutil.copy2(PROJECT_ROOT / name, dest / name)
+
+    stats = {'scale': scale, 'pages': 0, 'css_rules': 0, 'css_bytes': 0, 'portfolio_groups': 0,
+             'images': 0, 'files': 0}
+    dest_src = dest / 'src'
+    images_root = Path('assets') / 'images'
+    main_css = Path('assets') / 'css' / 'main.css'
+    portfolio_json = Path('_data') / 'portfolio.json'
+
+    for current, dirs, files in os.walk(SRC_DIR):
+        dirs[:] = sorted(d for d in dirs if d != SYNTHETIC_DIR)
+        rel_dir = Path(current).relative_to(SRC_DIR)
+        for name in sorted(files):
+            if name == '.DS_Store':
+                continue
+            rel = rel_dir / name
+            source = SRC_DIR / rel
+
+            if rel.suffix.lower() in IMAGE_SUFFIXES:
+                inside_images = rel.parts[:2] == images_root.parts
+                copies = range(scale) if inside_images else range(1)
+                for k in copies:
+                    target = dest_src / rel if k == 0 else \
+                        dest_src / images_root / SYNTHETIC_DIR / _copy_label(k) / rel.relative_to(images_root)
+                    target.parent.mkdir(parents=True, exist_ok=True)
+                    target.write_bytes(PLACEHOLDER_IMAGE)
+                    stats['images'] += 1
+                continue
+
+            target = dest_src / rel
+            target.parent.mkdir(parents=True, exist_ok=True)
+            if _is_page(rel):
+                content = source.read_text(encoding='utf-8')
+                target.write_text(content, encoding='utf-8')
+                for k in range(1, scale):
+                    copy_path = dest_src / SYNTHETIC_DIR / _copy_label(k) / rel
+                    copy_path.parent.mkdir(parents=True, exist_ok=True)
+                    copy_path.write_text(rewrite_page(content, k), encoding='utf-8')
+                stats['pages'] += scale
+            elif rel == main_css:
+                css = source.read_text(encoding='utf-8')
+                with open(target, 'w', encoding='utf-8') as f:
+                    f.write(css)
+                    for k in range(1, scale):
+                        f.write(f"\n\n/* ===== synthetic copy {_copy_label(k)} ===== */\n")
+                        f.write(rewrite_css(css, k))
+                stats['css_rules'] = css.count('{') * scale
+                stats['css_bytes'] = target.stat().st_size
+            elif rel == portfolio_json:
+                data = json.loads(source.read_text(encoding='utf-8'))
+                scaled = scale_portfolio(data, scale)
+                target.write_text(json.dumps(scaled, ensure_ascii=False, indent=2), encoding='utf-8')
+                stats['portfolio_groups'] = len(scaled)
+            else:
+                shutil.copy2(source, target)
+
+    stats['files'] = sum(len(files) for _, _, files in os.walk(dest))
+    stats['generate_seconds'] = round(time.perf_counter() - start, 3)
+    return stats
+
+
+def run_auditor(site: Path, script: str, args: List[str], timeout: float) -> Dict[str, Any]:
+    """在合成網站中以獨立行程執行稽核腳本，回傳耗時、最大記憶體與退出碼"""
+    command = [sys.executable, str(site / 'scripts' / script), *args]
+    with tempfile.TemporaryFile() as stderr:
+        start = time.perf_counter()
+        proc = subprocess.Popen(command, cwd=site, stdout=subprocess.DEVNULL, stderr=stderr)
+        timed_out = False
+        while True:
+            pid, status, usage = os.wait4(proc.pid, os.WNOHANG)
+            if pid:
+                break
+            if time.perf_counter() - start > timeout:
+                proc.kill()
+                _, status, usage = os.wait4(proc.pid, 0)
+                timed_out = True
+                break
+            time.sleep(0.01)
+        elapsed = time.perf_counter() - start
+        proc.returncode = os.waitstatus_to_exitcode(status)
+        stderr.seek(0)
+        error_output = stderr.read().decode('utf-8', 'replace')
+
+    result = {
+        'seconds': round(elapsed, 3),
+        'max_rss_kb': usage.ru_maxrss,
+        'returncode': proc.returncode,
+        'status': 'timeout' if timed_out else 'ok',
+    }
+    # 未使用檔案掃描以退出碼 1 表示「有未使用的檔案」，不算失敗；未捕捉的例外則附上 stderr 最後幾行
+    if not timed_out and (proc.returncode not in (0, 1) or 'Traceback' in error_output):
+        result['status'] = 'error'
+        result['stderr'] = error_output.strip().splitlines()[-3:]
+    return result
+
+
+def git_revision() -> Dict[str, Any]:
+    """目前的 commit（供跨 commit 比較）"""
+    def git(*args: str) -> str:
+        try:
+            return subprocess.run(['git', *args], cwd=PROJECT_ROOT, capture_output=True,
+                                  text=True, check=True).stdout.strip()
+        except (OSError, subprocess.CalledProcessError):
+            return ''
+    return {
+        'commit': git('rev-parse', 'HEAD') or 'unknown',
+        'dirty': bool(git('status', '--porcelain', '--untracked-files=no')),
+    }
+
+
+def find_superlinear(scale_results: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """比較相鄰規模：耗時成長超過規模成長 × SUPERLINEAR_TOLERANCE 的稽核"""
+    flagged = []
+    for previous, current in zip(scale_results, scale_results[1:]):
+        growth = current['scale'] / previous['scale']
+        for name, result in current['auditors'].items():
+            before = previous['auditors'].get(name)
+            if not before or before['status'] != 'ok' or result['status'] == 'error':
+                continue
+            if max(before['seconds'], result['seconds']) < MIN_SECONDS_FOR_RATIO:
+                continue
+            ratio = result['seconds'] / max(before['seconds'], 1e-3)
+            if result['status'] == 'timeout' or ratio > growth * SUPERLINEAR_TOLERANCE:
+                flagged.append({'auditor': name, 'from_scale': previous['scale'], 'to_scale': current['scale'],
+                                'time_ratio': round(ratio, 1), 'scale_ratio': growth,
+                                'status': result['status']})
+    return flagged
+
+
+def print_results(scale_results: List[Dict[str, Any]], auditors: List[str]):
+    print("\n" + "=" * 80)
+    print("📊 稽核基準測試結果（秒 / 最大 RSS MB）")
+    print("=" * 80)
+    header = f"{'稽核':<18}" + ''.join(f"{str(r['scale']) + '×':>20}" for r in scale_results)
+    print(header)
+    print("-" * len(header))
+    for name in auditors:
+        cells = []
+        for r in scale_results:
+            result = r['auditors'].get(name)
+            if result is None:
+                cells.append(f"{'-':>20}")
+            elif result['status'] != 'ok':
+                cells.append(f"{result['status']:>20}")
+            else:
+                cells.append(f"{result['seconds']:>11.2f} / {result['max_rss_kb'] / 1024:>6.0f}")
+        print(f"{name:<20}" + ''.join(cells))
+
+
+def compare_with(baseline_path: Path, scale_results: List[Dict[str, Any]]):
+    """與先前的結果檔比較各稽核耗時"""
+    with open(baseline_path, 'r', encoding='utf-8') as f:
+        baseline = json.load(f)
+    previous = {r['scale']: r for r in baseline.get('scales', [])}
+    print(f"\n🔁 與 {baseline_path.name}（{baseline.get('git', {}).get('commit', 'unknown')[:10]}）比較:")
+    for r in scale_results:
+        old = previous.get(r['scale'])
+        if not old:
+            continue
+        for name, result in r['auditors'].items():
+            before = old['auditors'].get(name)
+            if not before or before['status'] != 'ok' or result['status'] != 'ok':
+                continue
+            ratio = result['seconds'] / max(before['seconds'], 1e-3)
+            marker = '🔴' if ratio > 1.2 else '🟢' if ratio < 0.8 else '⚪'
+            print(f"   {marker} {r['scale']:>5}× {name:<20} {before['seconds']:>9.2f}s → "
+                  f"{result['seconds']:>9.2f}s（×{ratio:.2f}）")
+
+
+def parse_list(value: str) -> List[str]:
+    return [item.strip() for item in value.split(',') if item.strip()]
+
+
+def main():
+    """主函數"""
+    parser = argparse.ArgumentParser(description='以合成網站量測各稽核腳本在不同規模下的耗時')
+    parser.add_argument('--scales', default=','.join(map(str, DEFAULT_SCALES)),
+                        help=f"放大倍數，以逗號分隔（預設 {','.join(map(str, DEFAULT_SCALES))}）")
+    parser.add_argument('--auditors', default='all',
+                        help=f"要量測的稽核，以逗號分隔（{', '.join(AUDITORS)}；預設 all）")
+    parser.add_argument('--timeout', type=float, default=DEFAULT_TIMEOUT,
+                        help=f'單一稽核的逾時秒數（預設 {DEFAULT_TIMEOUT}）')
+    parser.add_argument('--workdir', type=Path, help='合成網站的存放目錄（預設使用暫存目錄並於結束時刪除）')
+    parser.add_argument('--keep', action='store_true', help='保留產生的合成網站')
+    parser.add_argument('--output', type=Path, help='結果 JSON 路徑（預設 report/benchmarks/benchmark-<時間>-<commit>.json）')
+    parser.add_argument('--compare', type=Path, help='與先前的結果 JSON 比較')
+    parser.add_argument('--generate-only', type=Path, metavar='DIR',
+                        help='只在 DIR 產生合成網站（使用 --scales 的第一個倍數），不執行稽核')
+    args = parser.parse_args()
+
+    try:
+        scales = [int(s) for s in parse_list(args.scales)]
+    except ValueError:
+        parser.error('--scales 必須是以逗號分隔的整數')
+    if not scales or min(scales) < 1:
+        parser.error('--scales 必須是正整數')
+    auditors = list(AUDITORS) if args.auditors == 'all' else parse_list(args.auditors)
+    unknown = [name for name in auditors if name not in AUDITORS]
+    if unknown:
+        parser.error(f"未知的稽核: {', '.join(unknown)}（可用: {', '.join(AUDITORS)}）")
+
+    if args.generate_only:
+        stats = generate_site(args.generate_only, scales[0])
+        print(f"✅ 已產生 {scales[0]}× 合成網站: {args.generate_only}")
+        print(json.dumps(stats, ensure_ascii=False, indent=2))
+        return 0
+
+    workdir = args.workdir or Path(tempfile.mkdtemp(prefix='audit-benchmark-'))
+    scale_results = []
+    try:
+        for scale in scales:
+            site = workdir / f"scale-{scale}"
+            print(f"\n🏗️  產生 {scale}× 合成網站...")
+            stats = generate_site(site, scale)
+            print(f"   {stats['pages']} 個頁面、{stats['css_rules']:,} 條 CSS 規則"
+                  f"（{stats['css_bytes'] / 1024 / 1024:.1f} MB）、{stats['images']} 張圖片，"
+                  f"耗時 {stats['generate_seconds']:.1f} 秒")
+
+            results = {}
+            for name in auditors:
+                script, script_args = AUDITORS[name]
+                result = run_auditor(site, script, script_args, args.timeout)
+                results[name] = result
+                status = {'ok': '✅', 'timeout': '⏰', 'error': '❌'}[result['status']]
+                print(f"   {status} {name:<20} {result['seconds']:>9.2f} 秒  "
+                      f"{result['max_rss_kb'] / 1024:>7.0f} MB")
+                for line in result.get('stderr', []):
+                    print(f"      {line}")
+            scale_results.append({**stats, 'auditors': results})
+
+            if not args.keep:
+                shutil.rmtree(site, ignore_errors=True)
+    finally:
+        if not args.keep and not args.workdir:
+            shutil.rmtree(workdir, ignore_errors=True)
+
+    print_results(scale_results, auditors)
+    flagged = find_superlinear(scale_results)
+    if flagged:
+        print("\n⚠️  疑似超線性成長:")
+        for item in flagged:
+            print(f"   • {item['auditor']}: {item['from_scale']}× → {item['to_scale']}× 規模 ×{item['scale_ratio']:g}，"
+                  f"耗時 ×{item['time_ratio']}" + ('（逾時）' if item['status'] == 'timeout' else ''))
+
+    revision = git_revision()
+    output = args.output or BENCHMARK_DIR / (
+        f"benchmark-{datetime.now().strftime('%Y%m%d-%H%M%S')}-{revision['commit'][:10]}.json")
+    output.parent.mkdir(parents=True, exist_ok=True)
+    with open(output, 'w', encoding='utf-8') as f:
+        json.dump({
+            'timestamp': datetime.now().isoformat(),
+            'git': revision,
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'cpu_count': os.cpu_count(),
+            'timeout': args.timeout,
+            'scales': scale_results,
+            'superlinear': flagged,
+        }, f, ensure_ascii=False, indent=2)
+    print(f"\n💾 結果已保存: {output}")
+
+    if args.compare:
+        compare_with(args.compare, scale_results)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
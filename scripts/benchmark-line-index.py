@@ -0,0 +1,136 @@
+#!/usr/bin/env python3
+"""
+行號索引效能基準測試
+以重複 main.css 的方式產生大型樣式表，量測 design-system-audit 所有 extract_* 的耗時，
+驗證改用 LineIndex 後耗時隨檔案大小線性成長，並與舊的逐 match 計算行號作法比較
+
+用法:
+    python3 scripts/benchmark-line-index.py               # 預設量到 5 MB
+    python3 scripts/benchmark-line-index.py --size-mb 10
+"""
+
+import argparse
+import importlib.util
+import re
+import sys
+import time
+from pathlib import Path
+from typing import Callable, List, Tuple
+
+from auditkit import LineIndex
+
+# 專案根目錄
+PROJECT_ROOT = Path(__file__).parent.parent
+SAMPLE_CSS = PROJECT_ROOT / "src" / "assets" / "css" / "main.css"
+
+# 線性判定：大小放大 k 倍時，耗時不應超過 k × 此倍數
+LINEAR_TOLERANCE = 2.0
+
+# 與 design-system-audit 相同的顏色規則，用於新舊行號計算的比較
+HEX_PATTERN = re.compile(r'#([0-9a-fA-F]{3}|[0-9a-fA-F]{6})\b')
+
+
+def load_design_audit():
+    """載入 design-system-audit.py（檔名含連字號，無法直接 import）"""
+    path = Path(__file__).parent / "design-system-audit.py"
+    spec = importlib.util.spec_from_file_location("design_system_audit", path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def build_stylesheet(size_bytes: int) -> str:
+    """重複範例樣式表直到達到指定大小"""
+    if SAMPLE_CSS.exists():
+        sample = SAMPLE_CSS.read_text(encoding='utf-8')
+    else:
+        sample = (
+            ".card { color: #263C6D; padding: 1.5rem; margin: 8px; border-radius: 12px; "
+            "box-shadow: 0 1px 2px rgba(0, 0, 0, 0.05); font-size: 1rem; }\n"
+            ".btn-primary { background: #F7F4EF; gap: 4px; line-height: 1.5; }\n"
+        )
+    repeats = size_bytes // len(sample) + 1
+    return (sample * repeats)[:size_bytes]
+
+
+def timed(func: Callable[[], object]) -> Tuple[float, object]:
+    """執行並回傳 (秒數, 結果)"""
+    start = time.perf_counter()
+    result = func()
+    return time.perf_counter() - start, result
+
+
+def legacy_hex_lines(text: str) -> List[int]:
+    """舊作法：每個 match 都從檔案開頭切片並計算換行"""
+    return [text[:m.start()].count('\n') + 1 for m in HEX_PATTERN.finditer(text)]
+
+
+def indexed_hex_lines(text: str) -> List[int]:
+    """新作法：建立一次 LineIndex 後以二分搜尋查詢"""
+    lines = LineIndex(text)
+    return [lines.line_of(m.start()) for m in HEX_PATTERN.finditer(text)]
+
+
+def main():
+    parser = argparse.ArgumentParser(description='LineIndex 行號查詢效能基準測試')
+    parser.add_argument('--size-mb', type=float, default=5.0, help='最大樣式表大小（MB），預設 5')
+    parser.add_argument('--legacy-max-kb', type=int, default=512,
+                        help='舊作法只量測到此大小（KB），更大時耗時為平方成長，預設 512')
+    args = parser.parse_args()
+
+    audit = load_design_audit()
+    max_bytes = int(args.size_mb * 1024 * 1024)
+    sizes = sorted({max_bytes // 8, max_bytes // 4, max_bytes // 2, max_bytes})
+
+    print("🚀 LineIndex 基準測試")
+    print(f"   樣本: {SAMPLE_CSS.relative_to(PROJECT_ROOT) if SAMPLE_CSS.exists() else '內建範例'}\n")
+
+    # 1. 新舊行號計算比較（只量測小檔案，避免舊作法跑太久）
+    print("📏 行號計算：舊作法 vs LineIndex（#hex 規則）")
+    print(f"   {'大小':>10} {'匹配數':>8} {'舊作法':>10} {'LineIndex':>10} {'加速':>8}")
+    legacy_size = 64 * 1024
+    while legacy_size <= args.legacy_max_kb * 1024:
+        text = build_stylesheet(legacy_size)
+        legacy_time, legacy = timed(lambda: legacy_hex_lines(text))
+        indexed_time, indexed = timed(lambda: indexed_hex_lines(text))
+        if legacy != indexed:
+            print("❌ 行號結果不一致")
+            return 1
+        print(f"   {legacy_size // 1024:>8} KB {len(indexed):>8} {legacy_time:>9.3f}s "
+              f"{indexed_time:>9.3f}s {legacy_time / max(indexed_time, 1e-9):>7.1f}x")
+        legacy_size *= 2
+
+    # 2. design-system-audit 全部 extract_* 的線性驗證
+    print("\n📈 design-system-audit 全部提取規則（共用一份 LineIndex）")
+    print(f"   {'大小':>10} {'匹配數':>8} {'耗時':>10} {'µs/KB':>8}")
+    timings = []
+    for size in sizes:
+        text = build_stylesheet(size)
+
+        def run_all():
+            lines = LineIndex(text)
+            total = 0
+            for extractor in audit.EXTRACTORS.values():
+                values = extractor(text, lines)
+                total += sum(len(v) for v in values.values()) if isinstance(values, dict) else len(values)
+            return total
+
+        elapsed, matches = timed(run_all)
+        timings.append((size, elapsed))
+        print(f"   {size / 1024 / 1024:>7.2f} MB {matches:>8} {elapsed:>9.3f}s "
+              f"{elapsed * 1e6 / (size / 1024):>8.1f}")
+
+    (small_size, small_time), (large_size, large_time) = timings[0], timings[-1]
+    size_ratio = large_size / small_size
+    time_ratio = large_time / max(small_time, 1e-9)
+    print(f"\n   大小 ×{size_ratio:.1f} → 耗時 ×{time_ratio:.1f}")
+
+    if time_ratio > size_ratio * LINEAR_TOLERANCE:
+        print("❌ 耗時成長超過線性範圍")
+        return 1
+    print("✅ 耗時隨檔案大小線性成長")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -4,10 +4,11 @@
 主要清理報告文件、測試檔案等
 """
 
-import os
 from pathlib import Path
 from typing import List, Tuple
 
+from auditkit import walk_tree
+
 # 排除的目錄
 EXCLUDE_DIRS = {
     'node_modules', '_site', '.git', '.cache', '.cursor',
@@ -69,12 +70,10 @@ def find_files_to_cleanup(project_root: Path) -> List[Tuple[Path, str]]:
     """找出需要清理的檔案"""
     files_to_cleanup = []
     
-    for root, dirs, files in os.walk(project_root):
-        # 過濾排除的目錄
-        dirs[:] = [d for d in dirs if d not in EXCLUDE_DIRS]
-        
-        for file in files:
-            file_path = Path(root) / file
+    # 排除的目錄與 .gitignore / .eleventyignore 忽略的路徑在走訪時就剪枝
+    for listing in walk_tree(project_root, EXCLUDE_DIRS):
+        for file, _, _ in listing.files:
+            file_path = project_root / listing.rel / file
             
             if should_skip(file_path):
                 continue
@@ -5,13 +5,17 @@
 生成全方位的分析報告
 """
 
+import argparse
 import ast
 import json
-import os
 import re
 from pathlib import Path
 from collections import defaultdict
-from typing import Dict, List, Tuple
+from typing import Dict, List, Tuple, Optional
+
+from auditkit import (DEFAULT_DB_NAME, MEMORY_TRACE_DEPTH, PROFILER, Issue, JsonlWriter, ProjectIndex, ResultCache,
+                      Rule, RuleSet, Shard, issue_json, load_shards, parse_rule_ids, record_findings, save_shard,
+                      shard_from_args)
 
 # 排除的目錄
 EXCLUDE_DIRS = {
@@ -19,9 +23,75 @@ EXCLUDE_DIRS = {
     'images-original', 'assets/images',
 }
 
+# 單檔分析結果的版本（只在 --shard / --merge-shards 時保存於記憶體中的結果快取）：修改對應分析邏輯時請遞增
+CACHE_RULE_VERSIONS = {
+    'unused_python': 1,
+    'unused_js': 1,
+    'code_quality': 1,
+    'security': 1,
+}
+
+# --profile 逐一計時的規則（RULES 內的正規表示式規則由 RuleSet 各自計時）
+PROFILED_RULES = ['_analyze_python_ast', '_analyze_javascript', '_is_used_in_other_files',
+                  '_calculate_complexity']
+
+
+# 逐檔的正規表示式規則（smell：代碼異味，security：安全性檢查），檔案類型為副檔名
+RULES = RuleSet([
+    Rule('commented_code', r'^\s*//.*\w+.*\(|^\s*#.*\w+.*\(', 'low', '註釋掉的代碼',
+         category='smell', flags=re.MULTILINE),
+    Rule('todo_comments', r'\b(TODO|FIXME|XXX|HACK)\b', 'medium', 'TODO/FIXME 註釋 {count} 處',
+         category='smell', flags=re.IGNORECASE, mode='count'),
+    Rule('hardcoded_secrets', r'(password|secret|api_key|token)\s*=\s*["\'][^"\']+["\']', 'high',
+         '硬編碼的敏感信息', category='smell', flags=re.IGNORECASE),
+    Rule('excessive_console_logs', r'console\.(log|debug|info)', 'low', 'console 調用 {count} 處（生產環境）',
+         file_types={'.js', '.mjs'}, category='smell', mode='count', min_count=6),
+    Rule('dangerous_eval', r'eval\s*\(|exec\s*\(', 'high', '使用 eval / exec',
+         category='security'),
+    Rule('potential_xss', r'<script[^>]*>.*\{\{.*\}\}', 'medium', 'script 內輸出模板變數（XSS 風險）',
+         file_types={'.njk', '.html'}, category='security', flags=re.DOTALL),
+])
+
+
+class CodeIssue(Issue, kind='comprehensive-code-analysis'):
+    """代碼異味與安全性發現（序列化為 {file, type, count, severity}，訊息不輸出、也不格式化）"""
+    __slots__ = ()
+    KEYS = (('file', 'file'), ('type', 'rule'), ('count', 'count'), ('severity', 'severity'))
+
+
+class UnusedName(CodeIssue, kind='comprehensive-code-analysis.unused'):
+    """未使用的函數 / 導入（{file, name, type}）"""
+    __slots__ = ()
+    KEYS = (('file', 'file'), ('name', 'name'), ('type', 'rule'))
+
+
+class LongFile(CodeIssue, kind='comprehensive-code-analysis.long_file'):
+    """過長的文件（{file, lines, severity}）"""
+    __slots__ = ()
+    KEYS = (('file', 'file'), ('lines', 'lines'), ('severity', 'severity'))
+
+
+class Suggestion(CodeIssue, kind='comprehensive-code-analysis.suggestion'):
+    """最佳實踐與性能建議（{file, issue, type}，專案層級的建議沒有 file）"""
+    __slots__ = ()
+    KEYS = (('file', 'file'), ('issue', 'message'), ('type', 'rule'))
+
+
+def _finding_count(result) -> int:
+    """規則產生的發現數（清單長度，或各分類清單長度總和）"""
+    if isinstance(result, list):
+        return len(result)
+    if isinstance(result, dict):
+        return sum(len(v) for v in result.values() if isinstance(v, list))
+    return 0
+
 class CodeAnalyzer:
-    def __init__(self, project_root: Path):
+    def __init__(self, project_root: Path, index: Optional[ProjectIndex] = None, sharding: bool = False):
         self.project_root = project_root.resolve()
+        self.index = index or ProjectIndex.shared(self.project_root)
+        # 分片（--shard / --merge-shards）時在記憶體保留單檔分析結果，合併時沿用各分片的結果
+        self.cache = ResultCache(self.index, 'comprehensive-code-analysis', enabled=sharding, persist=False)
+        self.shard: Optional[Shard] = None
         self.results = {
             'unused_code': {},
             'code_quality': {},
@@ -41,83 +111,144 @@ class CodeAnalyzer:
             'template_files': 0,
         }
         
-    def analyze(self):
-        """執行全面分析"""
+    def analyze(self, stream: Optional[JsonlWriter] = None):
+        """執行全面分析
+
+        指定 stream 時，每個分析階段完成後立即將該階段的發現逐筆寫出為 finding 紀錄，最後寫出 summary 紀錄
+        """
         print("🔍 開始全面代碼分析...\n")
         
         # 1. 收集所有文件
-        print("📁 掃描專案文件...")
-        files = self._collect_files()
-        self.stats['total_files'] = len(files)
-        print(f"   找到 {len(files)} 個文件\n")
+        with PROFILER.phase('1. 收集所有文件'):
+            print("📁 掃描專案文件...")
+            files = self._collect_files()
+            self.stats['total_files'] = len(files)
+            print(f"   找到 {len(files)} 個文件\n")
         
         # 2. 分析未使用的代碼
-        print("🔎 分析未使用的代碼...")
-        self._analyze_unused_code(files)
+        with PROFILER.phase('2. 分析未使用的代碼'):
+            print("🔎 分析未使用的代碼...")
+            self._analyze_unused_code(files)
+            self._stream_section(stream, 'unused_code')
         
         # 3. 代碼質量分析
-        print("📊 分析代碼質量...")
-        self._analyze_code_quality(files)
+        with PROFILER.phase('3. 代碼質量分析'):
+            print("📊 分析代碼質量...")
+            self._analyze_code_quality(files)
+            self._stream_section(stream, 'code_quality')
         
         # 4. 最佳實踐檢查
-        print("✅ 檢查最佳實踐...")
-        self._check_best_practices(files)
+        with PROFILER.phase('4. 最佳實踐檢查'):
+            print("✅ 檢查最佳實踐...")
+            self._check_best_practices(files)
+            self._stream_section(stream, 'best_practices')
         
         # 5. 依賴分析
-        print("📦 分析依賴關係...")
-        self._analyze_dependencies()
+        with PROFILER.phase('5. 依賴分析'):
+            print("📦 分析依賴關係...")
+            self._analyze_dependencies()
+            self._stream_section(stream, 'dependencies')
         
         # 6. 安全性檢查
-        print("🔒 安全性檢查...")
-        self._check_security(files)
+        with PROFILER.phase('6. 安全性檢查'):
+            print("🔒 安全性檢查...")
+            self._check_security(files)
+            self._stream_section(stream, 'security')
         
         # 7. 性能分析
-        print("⚡ 性能分析...")
-        self._analyze_performance(files)
+        with PROFILER.phase('7. 性能分析'):
+            print("⚡ 性能分析...")
+            self._analyze_performance(files)
+            self._stream_section(stream, 'performance')
         
         # 8. 文檔完整性
-        print("📝 檢查文檔完整性...")
-        self._check_documentation(files)
+        with PROFILER.phase('8. 文檔完整性'):
+            print("📝 檢查文檔完整性...")
+            self._check_documentation(files)
+            self._stream_section(stream, 'documentation')
         
         # 9. 計算健康度評分
-        print("💯 計算健康度評分...")
-        self._calculate_health_score()
+        with PROFILER.phase('9. 計算健康度評分'):
+            print("💯 計算健康度評分...")
+            self._calculate_health_score()
+            
+        
+        if stream is not None:
+            stream.summary({
+                'stats': self.stats,
+                'health_score': self.results['health_score'],
+                'health_deductions': self.results['health_deductions'],
+                'documentation_coverage': self.results['documentation'].get('coverage', 0),
+            })
         
         return self.results
     
+    def analyze_shard(self, shard: Shard) -> List[str]:
+        """--shard：只對分片內的檔案執行單檔分析（未使用代碼、代碼質量、安全性），回傳這些檔案
+
+        未使用代碼仍以全部檔案判斷是否在其他檔案中被使用，結果與單機執行相同；彙整與評分在合併時執行
+        """
+        print(f"🔍 代碼分析分片 {shard}...\n")
+        files = self._collect_files()
+        self.shard = shard
+        try:
+            with PROFILER.phase('2. 分析未使用的代碼'):
+                self._analyze_unused_code(files)
+            with PROFILER.phase('3. 代碼質量分析'):
+                self._analyze_code_quality(files)
+            with PROFILER.phase('6. 安全性檢查'):
+                self._check_security(files)
+        finally:
+            self.shard = None
+        return [rel_path for rel_path in files if shard.owns(rel_path)]
+    
+    def _per_file(self, rel_path: str, rule: str, compute):
+        """單檔分析結果：分片執行時分片外的檔案回傳 None，合併時沿用各分片的結果"""
+        if self.shard is not None and not self.shard.owns(rel_path):
+            return None
+        return self.cache.cached(self.index.get(rel_path), rule, CACHE_RULE_VERSIONS[rule], compute)
+    
+    def _stream_section(self, stream: Optional[JsonlWriter], section: str):
+        """將一個分析階段的發現逐筆寫出（section / kind 對應 JSON 結果中的位置）"""
+        if stream is None:
+            return
+        for kind, findings in self.results[section].items():
+            if isinstance(findings, dict):
+                findings = [{'file': file, 'value': value} for file, value in findings.items()]
+            elif not isinstance(findings, list):
+                continue
+            for item in findings:
+                if isinstance(item, Issue):
+                    record = item.to_dict()
+                else:
+                    record = item if isinstance(item, dict) else {'value': item}
+                stream.write('finding', {'section': section, 'kind': kind, **record})
+    
     def _collect_files(self) -> Dict[str, Path]:
         """收集所有代碼文件"""
         files = {}
         
-        for root, dirs, file_list in os.walk(self.project_root):
-            # 過濾排除目錄
-            dirs[:] = [d for d in dirs if d not in EXCLUDE_DIRS]
+        code_exts = {'.py', '.js', '.mjs', '.css', '.njk', '.html'}
+        for entry in self.index.files(suffixes=code_exts, exclude_dirs=EXCLUDE_DIRS, lower_suffix=True):
+            file_path = entry.path
+            ext = file_path.suffix.lower()
+            files[entry.rel] = file_path
             
-            for file in file_list:
-                file_path = Path(root) / file
-                rel_path = file_path.relative_to(self.project_root)
-                
-                # 只收集代碼文件
-                ext = file_path.suffix.lower()
-                if ext in {'.py', '.js', '.mjs', '.css', '.njk', '.html'}:
-                    files[str(rel_path)] = file_path
-                    
-                    # 統計
-                    if ext == '.py':
-                        self.stats['python_files'] += 1
-                    elif ext in {'.js', '.mjs'}:
-                        self.stats['js_files'] += 1
-                    elif ext == '.css':
-                        self.stats['css_files'] += 1
-                    elif ext in {'.njk', '.html'}:
-                        self.stats['template_files'] += 1
-                    
-                    # 計算總行數
-                    try:
-                        with open(file_path, 'r', encoding='utf-8', errors='ignore') as f:
-                            self.stats['total_lines'] += len(f.readlines())
-                    except:
-                        pass
+            # 統計
+            if ext == '.py':
+                self.stats['python_files'] += 1
+            elif ext in {'.js', '.mjs'}:
+                self.stats['js_files'] += 1
+            elif ext == '.css':
+                self.stats['css_files'] += 1
+            elif ext in {'.njk', '.html'}:
+                self.stats['template_files'] += 1
+            
+            # 計算總行數
+            try:
+                self.stats['total_lines'] += self.index.line_count(entry)
+            except:
+                pass
         
         return files
     
@@ -135,37 +266,43 @@ class CodeAnalyzer:
         # Python 文件分析
         for rel_path, file_path in files.items():
             if file_path.suffix == '.py':
-                try:
-                    with open(file_path, 'r', encoding='utf-8') as f:
-                        content = f.read()
-                    
-                    # 解析 AST
-                    try:
-                        tree = ast.parse(content, filename=str(file_path))
-                        unused_in_file = self._analyze_python_ast(tree, file_path, files)
-                        unused['python_functions'].extend(unused_in_file['functions'])
-                        unused['python_imports'].extend(unused_in_file['imports'])
-                        unused['python_variables'].extend(unused_in_file['variables'])
-                    except SyntaxError:
-                        pass
-                except Exception as e:
-                    pass
+                unused_in_file = self._per_file(rel_path, 'unused_python',
+                                                lambda: self._unused_in_python(file_path, files))
+                if unused_in_file:
+                    unused['python_functions'].extend(unused_in_file['functions'])
+                    unused['python_imports'].extend(unused_in_file['imports'])
+                    unused['python_variables'].extend(unused_in_file['variables'])
         
         # JavaScript 文件分析
         for rel_path, file_path in files.items():
             if file_path.suffix in {'.js', '.mjs'}:
-                try:
-                    with open(file_path, 'r', encoding='utf-8') as f:
-                        content = f.read()
-                    
-                    unused_in_file = self._analyze_javascript(content, file_path, files)
+                unused_in_file = self._per_file(rel_path, 'unused_js',
+                                                lambda: self._unused_in_javascript(file_path, files))
+                if unused_in_file:
                     unused['js_functions'].extend(unused_in_file['functions'])
                     unused['js_variables'].extend(unused_in_file['variables'])
-                except Exception as e:
-                    pass
         
         self.results['unused_code'] = unused
     
+    def _unused_in_python(self, file_path: Path, files: Dict[str, Path]) -> Optional[Dict]:
+        """單一 Python 文件的未使用代碼（無法讀取或語法錯誤時回傳 None）"""
+        try:
+            content = self.index.read_text(file_path)
+            
+            # 解析 AST
+            tree = ast.parse(content, filename=str(file_path))
+            return self._analyze_python_ast(tree, file_path, files)
+        except Exception:
+            return None
+    
+    def _unused_in_javascript(self, file_path: Path, files: Dict[str, Path]) -> Optional[Dict]:
+        """單一 JavaScript 文件的未使用代碼（無法讀取時回傳 None）"""
+        try:
+            content = self.index.read_text(file_path)
+            return self._analyze_javascript(content, file_path, files)
+        except Exception:
+            return None
+    
     def _analyze_python_ast(self, tree: ast.AST, file_path: Path, all_files: Dict[str, Path]) -> Dict:
         """分析 Python AST"""
         unused = {
@@ -207,20 +344,14 @@ class CodeAnalyzer:
             if func_name not in used_names and not func_name.startswith('_'):
                 # 檢查是否在其他文件中被使用
                 if not self._is_used_in_other_files(func_name, file_path, all_files):
-                    unused['functions'].append({
-                        'file': str(file_path.relative_to(self.project_root)),
-                        'name': func_name,
-                        'type': 'function'
-                    })
+                    unused['functions'].append(UnusedName(
+                        'function', 'info', file=str(file_path.relative_to(self.project_root)), name=func_name))
         
         # 檢查未使用的導入
         for import_name in defined_imports:
             if import_name not in used_names:
-                unused['imports'].append({
-                    'file': str(file_path.relative_to(self.project_root)),
-                    'name': import_name,
-                    'type': 'import'
-                })
+                unused['imports'].append(UnusedName(
+                    'import', 'info', file=str(file_path.relative_to(self.project_root)), name=import_name))
         
         return unused
     
@@ -247,11 +378,8 @@ class CodeAnalyzer:
             if not re.search(call_pattern, content):
                 # 檢查是否在其他文件中被使用
                 if not self._is_used_in_other_files(func_name, file_path, all_files, is_js=True):
-                    unused['functions'].append({
-                        'file': str(file_path.relative_to(self.project_root)),
-                        'name': func_name,
-                        'type': 'function'
-                    })
+                    unused['functions'].append(UnusedName(
+                        'function', 'info', file=str(file_path.relative_to(self.project_root)), name=func_name))
         
         return unused
     
@@ -262,8 +390,7 @@ class CodeAnalyzer:
                 continue
             
             try:
-                with open(file_path, 'r', encoding='utf-8', errors='ignore') as f:
-                    content = f.read()
+                content = self.index.read_text(file_path, errors='ignore')
                 
                 # 簡單的字符串匹配（可以改進）
                 if is_js:
@@ -289,34 +416,42 @@ class CodeAnalyzer:
         }
         
         for rel_path, file_path in files.items():
-            try:
-                with open(file_path, 'r', encoding='utf-8', errors='ignore') as f:
-                    lines = f.readlines()
-                    content = ''.join(lines)
-                
-                # 文件長度檢查
-                if len(lines) > 500:
-                    quality['long_files'].append({
-                        'file': rel_path,
-                        'lines': len(lines),
-                        'severity': 'high' if len(lines) > 1000 else 'medium'
-                    })
-                
-                # 複雜度分析（簡單版本）
-                if file_path.suffix == '.py':
-                    complexity = self._calculate_complexity(content, 'python')
-                    if complexity > 20:
-                        quality['complexity'][rel_path] = complexity
-                
-                # 代碼異味檢測
-                smells = self._detect_code_smells(content, file_path)
-                quality['code_smells'].extend(smells)
-                
-            except Exception as e:
-                pass
+            found = self._per_file(rel_path, 'code_quality', lambda: self._file_quality(rel_path, file_path))
+            if not found:
+                continue
+            if found['long_file'] is not None:
+                quality['long_files'].append(found['long_file'])
+            if found['complexity'] is not None:
+                quality['complexity'][rel_path] = found['complexity']
+            quality['code_smells'].extend(found['code_smells'])
         
         self.results['code_quality'] = quality
     
+    def _file_quality(self, rel_path: str, file_path: Path) -> Dict:
+        """單一文件的代碼質量（讀取或分析失敗時保留已完成的部分）"""
+        found = {'long_file': None, 'complexity': None, 'code_smells': []}
+        try:
+            content = self.index.read_text(file_path, errors='ignore')
+            line_count = self.index.line_count(file_path)
+            
+            # 文件長度檢查
+            if line_count > 500:
+                found['long_file'] = LongFile(
+                    'long_file', 'high' if line_count > 1000 else 'medium', file=rel_path, lines=line_count)
+            
+            # 複雜度分析（簡單版本）
+            if file_path.suffix == '.py':
+                complexity = self._calculate_complexity(content, 'python')
+                if complexity > 20:
+                    found['complexity'] = complexity
+            
+            # 代碼異味檢測
+            found['code_smells'] = self._detect_code_smells(content, file_path)
+            
+        except Exception:
+            pass
+        return found
+    
     def _calculate_complexity(self, content: str, lang: str) -> int:
         """計算代碼複雜度（簡化版）"""
         complexity = 1  # 基礎複雜度
@@ -328,48 +463,11 @@ class CodeAnalyzer:
         
         return int(complexity)
     
-    def _detect_code_smells(self, content: str, file_path: Path) -> List[Dict]:
+    def _detect_code_smells(self, content: str, file_path: Path) -> List[CodeIssue]:
         """檢測代碼異味"""
-        smells = []
-        
-        # 註釋掉的代碼
-        if re.search(r'^\s*//.*\w+.*\(|^\s*#.*\w+.*\(', content, re.MULTILINE):
-            smells.append({
-                'file': str(file_path.relative_to(self.project_root)),
-                'type': 'commented_code',
-                'severity': 'low'
-            })
-        
-        # TODO/FIXME 註釋
-        todo_count = len(re.findall(r'\b(TODO|FIXME|XXX|HACK)\b', content, re.IGNORECASE))
-        if todo_count > 0:
-            smells.append({
-                'file': str(file_path.relative_to(self.project_root)),
-                'type': 'todo_comments',
-                'count': todo_count,
-                'severity': 'medium'
-            })
-        
-        # 硬編碼的敏感信息
-        if re.search(r'(password|secret|api_key|token)\s*=\s*["\'][^"\']+["\']', content, re.IGNORECASE):
-            smells.append({
-                'file': str(file_path.relative_to(self.project_root)),
-                'type': 'hardcoded_secrets',
-                'severity': 'high'
-            })
-        
-        # console.log 調用（生產環境）
-        if file_path.suffix in {'.js', '.mjs'}:
-            console_logs = len(re.findall(r'console\.(log|debug|info)', content))
-            if console_logs > 5:
-                smells.append({
-                    'file': str(file_path.relative_to(self.project_root)),
-                    'type': 'excessive_console_logs',
-                    'count': console_logs,
-                    'severity': 'low'
-                })
-        
-        return smells
+        rel_path = str(file_path.relative_to(self.project_root))
+        return [finding.derive(CodeIssue, file=rel_path)
+                for finding in RULES.run(content, file_path.suffix, category='smell')]
     
     def _check_best_practices(self, files: Dict[str, Path]):
         """檢查最佳實踐"""
@@ -383,8 +481,7 @@ class CodeAnalyzer:
         for rel_path, file_path in files.items():
             if file_path.suffix == '.py':
                 try:
-                    with open(file_path, 'r', encoding='utf-8') as f:
-                        content = f.read()
+                    content = self.index.read_text(file_path)
                     
                     # 檢查是否有適當的錯誤處理
                     has_try_except = 'try:' in content or 'except' in content
@@ -392,11 +489,8 @@ class CodeAnalyzer:
                     
                     # 檢查文件操作是否有錯誤處理
                     if 'open(' in content and not has_error_handling:
-                        practices['warnings'].append({
-                            'file': rel_path,
-                            'issue': '文件操作缺少錯誤處理',
-                            'type': 'error_handling'
-                        })
+                        practices['warnings'].append(Suggestion(
+                            'error_handling', 'warning', '文件操作缺少錯誤處理', file=rel_path))
                 except:
                     pass
         
@@ -407,10 +501,8 @@ class CodeAnalyzer:
             # 檢查是否有適當的目錄結構
             py_dirs = set(str(f[1].parent) for f in py_files)
             if len(py_dirs) == 1:
-                practices['suggestions'].append({
-                    'issue': '考慮將 Python 文件組織到子目錄中',
-                    'type': 'organization'
-                })
+                practices['suggestions'].append(Suggestion(
+                    'organization', 'info', '考慮將 Python 文件組織到子目錄中'))
         
         self.results['best_practices'] = practices
     
@@ -450,32 +542,22 @@ class CodeAnalyzer:
         }
         
         for rel_path, file_path in files.items():
-            try:
-                with open(file_path, 'r', encoding='utf-8', errors='ignore') as f:
-                    content = f.read()
-                
-                # 檢查 SQL 注入風險
-                if re.search(r'eval\s*\(|exec\s*\(', content):
-                    security['issues'].append({
-                        'file': rel_path,
-                        'type': 'dangerous_eval',
-                        'severity': 'high'
-                    })
-                
-                # 檢查 XSS 風險（在模板中）
-                if file_path.suffix in {'.njk', '.html'}:
-                    if re.search(r'<script[^>]*>.*\{\{.*\}\}', content, re.DOTALL):
-                        security['warnings'].append({
-                            'file': rel_path,
-                            'type': 'potential_xss',
-                            'severity': 'medium'
-                        })
-                
-            except:
-                pass
+            # 高嚴重度列為問題，其餘列為警告
+            for finding in self._per_file(rel_path, 'security', lambda: self._file_security(rel_path, file_path)) or []:
+                bucket = 'issues' if finding.severity == 'high' else 'warnings'
+                security[bucket].append(finding)
         
         self.results['security'] = security
     
+    def _file_security(self, rel_path: str, file_path: Path) -> List[CodeIssue]:
+        """單一文件的安全性問題（無法讀取時回傳空列表）"""
+        try:
+            content = self.index.read_text(file_path, errors='ignore')
+            return [finding.derive(CodeIssue, file=rel_path)
+                    for finding in RULES.run(content, file_path.suffix, category='security')]
+        except Exception:
+            return []
+    
     def _analyze_performance(self, files: Dict[str, Path]):
         """性能分析"""
         performance = {
@@ -483,16 +565,15 @@ class CodeAnalyzer:
             'suggestions': [],
         }
         
-        # 檢查大文件
+        # 檢查大文件（使用索引記錄的 stat 資訊）
         for rel_path, file_path in files.items():
             try:
-                size = file_path.stat().st_size
+                size = self.index.get(file_path).size
+                if size is None:
+                    continue
                 if size > 100 * 1024:  # 100KB
-                    performance['suggestions'].append({
-                        'file': rel_path,
-                        'issue': f'文件較大 ({size/1024:.1f}KB)，考慮拆分',
-                        'type': 'large_file'
-                    })
+                    performance['suggestions'].append(Suggestion(
+                        'large_file', 'info', '文件較大 ({:.1f}KB)，考慮拆分', size / 1024, file=rel_path))
             except:
                 pass
         
@@ -520,8 +601,7 @@ class CodeAnalyzer:
             if file_path.suffix == '.py':
                 py_files_total += 1
                 try:
-                    with open(file_path, 'r', encoding='utf-8') as f:
-                        content = f.read()
+                    content = self.index.read_text(file_path)
                     
                     # 檢查是否有模塊級文檔字符串
                     if '"""' in content or "'''" in content:
@@ -618,21 +698,21 @@ class CodeAnalyzer:
         if unused.get('python_functions'):
             report.append(f"\nPython 未使用函數 ({len(unused['python_functions'])} 個):")
             for item in unused['python_functions'][:10]:  # 只顯示前10個
-                report.append(f"  • {item['file']}: {item['name']}")
+                report.append(f"  • {item.file}: {item.get('name')}")
             if len(unused['python_functions']) > 10:
                 report.append(f"  ... 還有 {len(unused['python_functions']) - 10} 個")
         
         if unused.get('js_functions'):
             report.append(f"\nJavaScript 未使用函數 ({len(unused['js_functions'])} 個):")
             for item in unused['js_functions'][:10]:
-                report.append(f"  • {item['file']}: {item['name']}")
+                report.append(f"  • {item.file}: {item.get('name')}")
             if len(unused['js_functions']) > 10:
                 report.append(f"  ... 還有 {len(unused['js_functions']) - 10} 個")
         
         if unused.get('python_imports'):
             report.append(f"\nPython 未使用導入 ({len(unused['python_imports'])} 個):")
             for item in unused['python_imports'][:10]:
-                report.append(f"  • {item['file']}: {item['name']}")
+                report.append(f"  • {item.file}: {item.get('name')}")
             if len(unused['python_imports']) > 10:
                 report.append(f"  ... 還有 {len(unused['python_imports']) - 10} 個")
         
@@ -648,12 +728,12 @@ class CodeAnalyzer:
         if quality.get('long_files'):
             report.append(f"\n過長的文件 ({len(quality['long_files'])} 個):")
             for item in quality['long_files']:
-                report.append(f"  • {item['file']}: {item['lines']} 行 ({item['severity']})")
+                report.append(f"  • {item.file}: {item.get('lines')} 行 ({item.severity})")
         
         if quality.get('code_smells'):
             report.append(f"\n代碼異味 ({len(quality['code_smells'])} 個):")
             for item in quality['code_smells'][:10]:
-                report.append(f"  • {item['file']}: {item['type']} ({item['severity']})")
+                report.append(f"  • {item.file}: {item.rule} ({item.severity})")
             if len(quality['code_smells']) > 10:
                 report.append(f"  ... 還有 {len(quality['code_smells']) - 10} 個")
         
@@ -669,19 +749,19 @@ class CodeAnalyzer:
         if practices.get('errors'):
             report.append(f"\n❌ 錯誤 ({len(practices['errors'])} 個):")
             for item in practices['errors']:
-                report.append(f"  • {item.get('file', 'N/A')}: {item.get('issue', 'N/A')}")
+                report.append(f"  • {item.file or 'N/A'}: {item.message or 'N/A'}")
         
         if practices.get('warnings'):
             report.append(f"\n⚠️  警告 ({len(practices['warnings'])} 個):")
             for item in practices['warnings'][:5]:
-                report.append(f"  • {item.get('file', 'N/A')}: {item.get('issue', 'N/A')}")
+                report.append(f"  • {item.file or 'N/A'}: {item.message or 'N/A'}")
             if len(practices['warnings']) > 5:
                 report.append(f"  ... 還有 {len(practices['warnings']) - 5} 個")
         
         if practices.get('suggestions'):
             report.append(f"\n💡 建議 ({len(practices['suggestions'])} 個):")
             for item in practices['suggestions']:
-                report.append(f"  • {item.get('issue', 'N/A')}")
+                report.append(f"  • {item.message or 'N/A'}")
         
         if not any(practices.values()):
             report.append("✅ 符合最佳實踐")
@@ -695,12 +775,12 @@ class CodeAnalyzer:
         if security.get('issues'):
             report.append(f"\n❌ 安全問題 ({len(security['issues'])} 個):")
             for item in security['issues']:
-                report.append(f"  • {item['file']}: {item['type']} ({item['severity']})")
+                report.append(f"  • {item.file}: {item.rule} ({item.severity})")
         
         if security.get('warnings'):
             report.append(f"\n⚠️  安全警告 ({len(security['warnings'])} 個):")
             for item in security['warnings']:
-                report.append(f"  • {item['file']}: {item['type']} ({item['severity']})")
+                report.append(f"  • {item.file}: {item.rule} ({item.severity})")
         
         if not security.get('issues') and not security.get('warnings'):
             report.append("✅ 未發現安全問題")
@@ -714,7 +794,7 @@ class CodeAnalyzer:
         if performance.get('suggestions'):
             report.append(f"\n💡 性能建議 ({len(performance['suggestions'])} 個):")
             for item in performance['suggestions']:
-                report.append(f"  • {item['file']}: {item['issue']}")
+                report.append(f"  • {item.file}: {item.message}")
         
         if not performance.get('suggestions'):
             report.append("✅ 性能良好")
@@ -768,22 +848,110 @@ class CodeAnalyzer:
         
         return "\n".join(report)
 
+# --db 以分數（而非問題）記錄的指標：(區段, 項目) -> 分數名稱
+SCORE_KINDS = {('code_quality', 'complexity'): 'complexity'}
+
+
+def collect_findings(results: Dict) -> Tuple[List[Dict], List[Tuple[Optional[str], str, float]]]:
+    """--db：將各分析區段的發現轉為問題（與 --format jsonl 的 finding 相同範圍）
+
+    帶有規則類型的發現（程式碼異味、安全）以規則 ID 為規則名稱，其他以項目名稱；
+    複雜度、文件覆蓋率與健康分數記為分數
+    """
+    messages = {rule.id: rule.message for rule in RULES}
+    issues: List[Dict] = []
+    scores: List[Tuple[Optional[str], str, float]] = [(None, 'health', results['health_score'])]
+    for section, kinds in results.items():
+        if not isinstance(kinds, dict):
+            continue
+        for kind, findings in kinds.items():
+            if (section, kind) in SCORE_KINDS:
+                scores.extend((file, SCORE_KINDS[section, kind], value) for file, value in findings.items())
+                continue
+            if isinstance(findings, (int, float)):
+                scores.append((None, f'{section}.{kind}', findings))
+                continue
+            if not isinstance(findings, list):
+                continue
+            for item in findings:
+                if isinstance(item, Issue):
+                    item = item.to_dict()
+                item = item if isinstance(item, dict) else {'file': item}
+                rule = item.get('type') if item.get('type') in messages else kind
+                if rule in messages:
+                    message = messages[rule].format(count=item.get('count'))
+                else:
+                    message = ', '.join(f'{k}={v}' for k, v in item.items() if k not in ('file', 'line', 'severity'))
+                issues.append({'rule': rule, 'severity': item.get('severity', 'info'), 'file': item.get('file'),
+                               'line': item.get('line'), 'message': message or kind})
+    return issues, scores
+
+
 def main():
     """主函數"""
+    parser = argparse.ArgumentParser(description='全面代碼分析')
+    parser.add_argument('--format', choices=['json', 'jsonl'], default='json',
+                        help='詳細結果格式：json（完整 JSON，預設）或 jsonl（每個分析階段完成即寫出 JSON Lines）')
+    parser.add_argument('--profile', action='store_true', help='記錄各階段與規則耗時，輸出到 report/profile/')
+    parser.add_argument('--memprofile', action='store_true',
+                        help='以 tracemalloc 記錄各階段記憶體峰值、保留量與主要配置位置，輸出到 report/profile/')
+    parser.add_argument('--memprofile-depth', type=int, default=MEMORY_TRACE_DEPTH, metavar='N',
+                        help=f'tracemalloc 保留的呼叫層數（預設 {MEMORY_TRACE_DEPTH}，加深可追溯到稽核腳本行但較慢）')
+    parser.add_argument('--disable-rules', action='append', metavar='ID[,ID...]',
+                        help='停用指定的正規表示式規則（可重複指定，規則 ID 見 --list-rules）')
+    parser.add_argument('--list-rules', action='store_true', help='列出所有正規表示式規則後退出')
+    parser.add_argument('--db', nargs='?', const=Path(__file__).parent.parent / 'report' / DEFAULT_DB_NAME, type=Path,
+                        metavar='PATH',
+                        help=f'將發現與分數寫入 SQLite 資料庫（預設 report/{DEFAULT_DB_NAME}），以 findings.py 查詢')
+    parser.add_argument('--shard', metavar='I/N',
+                        help='CI 分片：只分析 N 個分片中第 I 個分片的檔案，單檔結果寫到 report/shards/（不產生報告）')
+    parser.add_argument('--merge-shards', action='store_true',
+                        help='合併 report/shards/ 中的全部分片後彙整並計算健康度評分，結果與單機執行相同'
+                             '（--disable-rules 須與分片一致）')
+    args = parser.parse_args()
+    try:
+        RULES.disable(parse_rule_ids(args.disable_rules))
+        shard = shard_from_args(args.shard)
+    except ValueError as e:
+        parser.error(str(e))
+    if shard is not None and args.merge_shards:
+        parser.error('--shard 不能與 --merge-shards 同時使用')
+    if args.list_rules:
+        print('\n'.join(RULES.describe()))
+        return 0
+    if args.profile or args.memprofile:
+        PROFILER.enable('comprehensive-code-analysis', timing=args.profile, memory=args.memprofile,
+                        memory_depth=args.memprofile_depth)
+    
     script_dir = Path(__file__).parent
     project_root = script_dir.parent
     
-    analyzer = CodeAnalyzer(project_root)
-    results = analyzer.analyze()
+    # 確保 report 目錄存在
+    report_dir = project_root / 'report'
+    report_dir.mkdir(exist_ok=True)
+    
+    analyzer = CodeAnalyzer(project_root, sharding=shard is not None or args.merge_shards)
+    PROFILER.instrument(analyzer, PROFILED_RULES, matches=_finding_count)
+    if shard is not None:
+        shard_path = save_shard(analyzer.cache, shard, analyzer.analyze_shard(shard), report_dir)
+        print(f"✅ 分片 {shard} 的單檔結果已保存: {shard_path}")
+        return 0
+    if args.merge_shards:
+        try:
+            print(f"🧩 已合併 {load_shards(analyzer.cache, report_dir)} 個分片的單檔結果\n")
+        except ValueError as e:
+            parser.error(str(e))
+    if args.format == 'jsonl':
+        jsonl_file = report_dir / 'code_analysis_results.jsonl'
+        with JsonlWriter(jsonl_file, 'comprehensive-code-analysis') as stream:
+            results = analyzer.analyze(stream)
+    else:
+        results = analyzer.analyze()
     
     # 生成報告
     report = analyzer.generate_report()
     print("\n" + report)
     
-    # 確保 report 目錄存在
-    report_dir = project_root / 'report'
-    report_dir.mkdir(exist_ok=True)
-    
     # 保存報告到文件
     report_file = report_dir / 'CODE_ANALYSIS_REPORT.txt'
     with open(report_file, 'w', encoding='utf-8') as f:
@@ -792,11 +960,22 @@ def main():
     print(f"\n💾 報告已保存到: {report_file}")
     
     # 保存 JSON 結果
-    json_file = report_dir / 'code_analysis_results.json'
-    with open(json_file, 'w', encoding='utf-8') as f:
-        json.dump(results, f, indent=2, ensure_ascii=False, default=str)
+    if args.format == 'jsonl':
+        print(f"💾 詳細結果已保存到: {jsonl_file}")
+    else:
+        json_file = report_dir / 'code_analysis_results.json'
+        with open(json_file, 'w', encoding='utf-8') as f:
+            json.dump(results, f, indent=2, ensure_ascii=False, default=issue_json)
+        
+        print(f"💾 詳細結果已保存到: {json_file}")
+    
+    if args.db:
+        issues, scores = collect_findings(results)
+        record_findings(args.db, 'comprehensive-code-analysis', issues, scores, root=project_root,
+                        summary={'health_score': results['health_score']})
     
-    print(f"💾 詳細結果已保存到: {json_file}")
+    if args.profile or args.memprofile:
+        PROFILER.finish(report_dir / 'profile')
     
     return 0
 
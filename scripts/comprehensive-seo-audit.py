@@ -5,17 +5,28 @@
 """
 
 import re
+import sys
 import json
+import argparse
 from pathlib import Path
-from typing import Dict, List, Tuple, Any, Optional
+from typing import Dict, Iterable, Iterator, List, Tuple, Any, Optional
 from collections import defaultdict, Counter
 from datetime import datetime
+
+from auditkit import (CACHE_DIR, DEFAULT_DB_NAME, LINK_BROKEN, LINK_REDIRECT, MISSING, MEMORY_TRACE_DEPTH, PROFILER,
+                      RECORD_KEY, GitScope, Issue, JsonlReader, JsonlWriter, LinkGraph, PageFacts, ProjectIndex,
+                      RedirectRules, ResultCache, Shard, UrlIndex, fingerprint, issue_json, load_shards,
+                      minhash_signature, near_duplicates, read_html_facts, record_findings, save_shard,
+                      scan_source_facts, scope_from_args, shard_from_args, map_in_processes, resolve_jobs, site_path,
+                      split_front_matter, watch_loop)
 import urllib.parse
 
 # 專案根目錄
 PROJECT_ROOT = Path(__file__).parent.parent
 SRC_DIR = PROJECT_ROOT / "src"
+SITE_DIR = PROJECT_ROOT / "_site"
 REPORT_DIR = PROJECT_ROOT / "report"
+REDIRECTS_FILE = SRC_DIR / "_redirects"
 
 # 網站 URL
 SITE_URL = "https://goldenyearsphoto.com"
@@ -51,92 +62,320 @@ SEO_STANDARDS = {
         'min_internal_links': 2,
         'max_external_links': 10,
     },
+    'duplicate_content': {
+        'threshold': 0.6,  # 估計相似度達此值視為近似重複
+        'high_threshold': 0.8,
+        'min_length': 200,  # 純文字短於此長度的頁面不比對
+    },
+}
+
+# 結果快取的規則版本：修改對應分析邏輯時請遞增，只會讓該規則的快取失效
+CACHE_RULE_VERSIONS = {
+    'parse_page': 1,
+    'comprehensive_analyze': 4,
 }
 
+# 原始碼模式中會原樣輸出到網站的靜態資源（相對於 src/，與 .eleventy.js 的 addPassthroughCopy 及 css 模板一致）
+STATIC_ASSET_PATHS = [
+    'assets/images/ui', 'assets/js', 'assets/css', 'robots.txt', 'favicon.ico', '_redirects', '_headers',
+]
+
+# 單頁分析中只供跨頁檢查使用的欄位（內部連結目標、MinHash 簽章）：保留在結果快取與記憶體中，
+# 不寫入 JSON / JSON Lines 報告
+INTERNAL_ANALYSIS_KEYS = ('link_targets', 'content_signature')
+
+# 內部連結圖報告中列出的頁面數上限
+LINK_GRAPH_REPORT_LIMIT = 20
+
+# --site 模式檢查的 Open Graph 標籤
+OPEN_GRAPH_TAGS = ['og:title', 'og:description', 'og:image', 'og:url']
+
+# --profile 逐一計時的規則（單頁分析的各項評分）
+PROFILED_RULES = [
+    '_analyze_title', '_analyze_description', '_analyze_keywords', '_analyze_headings',
+    '_analyze_heading_structure', '_analyze_content_quality', '_analyze_images', '_analyze_internal_links',
+    '_analyze_external_links', '_analyze_url', '_analyze_meta_tags', '_analyze_mobile_friendliness',
+]
+
+
+class PageIssue(Issue, kind="comprehensive-seo-audit-page"):
+    """單頁的問題或建議（規則為分析項目，例如 title；輸出格式與原本的 dict 相同）"""
+    __slots__ = ()
+    KEYS = (('priority', 'severity'), ('message', 'message'))
+
+
+class SiteIssue(Issue, kind="comprehensive-seo-audit-site"):
+    """跨頁面問題（affected_pages / count 放在 extra）"""
+    __slots__ = ()
+    KEYS = (('type', 'rule'), ('priority', 'severity'), ('message', 'message'))
+
 
 class ComprehensiveSEOAuditor:
     """全面 SEO 審計器"""
     
-    def __init__(self, src_dir: Path, site_url: str):
+    def __init__(self, src_dir: Path, site_url: str, index: Optional[ProjectIndex] = None,
+                 use_cache: bool = True, jobs: int = 1, watch: bool = False, scope: Optional[GitScope] = None,
+                 sharding: bool = False, site_dir: Optional[Path] = None):
         self.src_dir = src_dir
         self.site_url = site_url
+        self.jobs = jobs
+        # --site：審計建置後的 HTML（site_dir 下的 .html），報告與快取與 .njk 原始碼模式分開
+        self.site_dir = site_dir
+        self.report_name = 'comprehensive-seo-audit' if site_dir is None else 'comprehensive-seo-audit-site'
+        if site_dir is None:
+            self.index = index or ProjectIndex.shared(PROJECT_ROOT)
+            cache_dir = None
+        else:
+            # 建置輸出通常被 .gitignore 忽略，另建不套用忽略檔的索引；快取仍放在專案的 .cache/audits/
+            self.index = index or ProjectIndex(site_dir, ignore_files=())
+            cache_dir = PROJECT_ROOT / CACHE_DIR
+        # 監看模式與分片（--shard / --merge-shards）下即使 --no-cache 也在記憶體保留各頁結果
+        self.cache = ResultCache(self.index, self.report_name, enabled=use_cache or watch or sharding,
+                                 cache_dir=cache_dir, persist=use_cache)
+        # git diff 範圍模式：只重新分析變更的頁面，其餘頁面沿用快取（跨頁檢查仍涵蓋全部頁面）
+        if scope is not None:
+            self.cache.limit_to(scope.changed)
         self.pages: List[Dict[str, Any]] = []
         self.issues: List[Dict[str, Any]] = []
         self.page_urls: Dict[str, str] = {}  # file_path -> url mapping
         
-    def audit(self) -> Dict[str, Any]:
-        """執行完整 SEO 審計"""
+    def audit(self, stream: Optional[JsonlWriter] = None) -> Dict[str, Any]:
+        """執行完整 SEO 審計
+
+        指定 stream 時，每頁分析完成即寫出一筆 page 紀錄，記憶體只保留統計與跨頁檢查需要的欄位，
+        最後寫出 issue 與 summary 紀錄
+        """
         print("🔍 開始全面 SEO 審計...\n")
+        self.pages, self.issues, self.page_urls = [], [], {}
+        self.cache.reset_stats()
         
         # 1. 掃描所有頁面
-        print("📁 掃描頁面文件...")
-        page_files = self._scan_pages()
-        print(f"   找到 {len(page_files)} 個頁面文件\n")
-        
-        # 2. 解析所有頁面（第一遍：建立URL映射）
-        print("📄 解析頁面 front matter...")
-        for file_path in page_files:
-            page_data = self._parse_page(file_path)
-            if page_data:
-                self.pages.append(page_data)
-                self.page_urls[page_data['file_path']] = page_data['url']
-        print(f"   成功解析 {len(self.pages)} 個頁面\n")
+        with PROFILER.phase('1. 掃描頁面'):
+            print("📁 掃描頁面文件...")
+            page_files = self._scan_pages()
+            print(f"   找到 {len(page_files)} 個頁面文件\n")
         
-        # 3. 深入分析每個頁面
-        print("🔎 執行全面 SEO 分析...")
-        for page in self.pages:
-            page['seo_analysis'] = self._comprehensive_analyze(page)
-        print("   SEO 分析完成\n")
+        self._analyze_pages(page_files, stream)
         
         # 4. 檢查跨頁面問題
-        print("🔗 檢查跨頁面問題...")
-        self._check_cross_page_issues()
-        print("   檢查完成\n")
-        
-        # 5. 生成統計
-        print("📊 生成統計數據...")
-        stats = self._generate_stats()
-        print("   統計完成\n")
+        with PROFILER.phase('4. 跨頁面問題'):
+            print("🔗 檢查跨頁面問題...")
+            self._check_cross_page_issues()
+            print("   檢查完成\n")
+        
+        # 5. 檢查內部連結是否失效或經過轉址
+        with PROFILER.phase('5. 內部連結檢查'):
+            print("🧷 檢查內部連結...")
+            link_issues = self._check_internal_links()
+            self.issues.extend(link_issues)
+            print(f"   發現 {len(link_issues)} 個失效或經過轉址的連結目標\n")
+        
+        # 6. 內部連結圖
+        with PROFILER.phase('6. 內部連結圖'):
+            print("🕸️  建立內部連結圖...")
+            link_graph = self._analyze_link_graph()
+            print(f"   {link_graph['pages']} 個頁面、{link_graph['links']} 條內部連結，"
+                  f"孤立頁面 {len(link_graph['orphan_pages'])} 個\n")
+        
+        # 7. 生成統計
+        with PROFILER.phase('7. 生成統計'):
+            print("📊 生成統計數據...")
+            stats = self._generate_stats()
+            print("   統計完成\n")
+        
+        timestamp = datetime.now().isoformat()
+        if stream is not None:
+            stream.write_all('issue', self.issues)
+            stream.summary({
+                'timestamp': timestamp,
+                'site_url': self.site_url,
+                **self._source_info(),
+                'total_pages': len(self.pages),
+                'stats': stats,
+                'link_graph': link_graph,
+            })
         
         return {
-            'timestamp': datetime.now().isoformat(),
+            'timestamp': timestamp,
             'site_url': self.site_url,
+            **self._source_info(),
             'total_pages': len(self.pages),
             'pages': self.pages,
             'stats': stats,
             'issues': self.issues,
+            'link_graph': link_graph,
+        }
+    
+    def _source_info(self) -> Dict[str, str]:
+        """--site 模式在結果中記錄審計的建置輸出目錄（原始碼模式不加欄位）"""
+        if self.site_dir is None:
+            return {}
+        return {'site_dir': _display_path(self.site_dir)}
+    
+    def _analyze_pages(self, page_files: List[Path], stream: Optional[JsonlWriter] = None):
+        """解析並分析各頁（單頁結果沿用 / 寫入結果快取），結果依頁面掃描順序加入 self.pages"""
+        if self.jobs > 1:
+            # 2-3. 多行程解析並分析頁面
+            with PROFILER.phase('2-3. 多行程解析與分析'):
+                self._audit_pages_parallel(page_files, stream)
+        else:
+            # 2. 解析所有頁面（第一遍：建立URL映射）
+            with PROFILER.phase('2. 解析頁面'):
+                print("📄 解析頁面 front matter...")
+                page_entries = {}
+                for file_path in page_files:
+                    entry = self.index.get(file_path)
+                    page_data = self._cached_parse_page(entry)
+                    if page_data:
+                        self.pages.append(page_data)
+                        self.page_urls[page_data['file_path']] = page_data['url']
+                        page_entries[page_data['file_path']] = entry
+                print(f"   成功解析 {len(self.pages)} 個頁面\n")
+            
+            # 3. 深入分析每個頁面
+            with PROFILER.phase('3. 全面 SEO 分析'):
+                print("🔎 執行全面 SEO 分析...")
+                analyze_version = self._rule_version('comprehensive_analyze', SEO_STANDARDS)
+                for i, page in enumerate(self.pages):
+                    page['seo_analysis'] = self.cache.cached(
+                        page_entries[page['file_path']], 'comprehensive_analyze', analyze_version,
+                        lambda: self._comprehensive_analyze(page))
+                    if stream is not None:
+                        self.pages[i] = self._stream_page(stream, page)
+        print("   SEO 分析完成")
+        print(f"   {self.cache.summary()}\n")
+        self.cache.save()
+    
+    def audit_shard(self, shard: Shard) -> List[str]:
+        """--shard：只解析並分析分片內的頁面（結果留在結果快取），回傳這些頁面的相對路徑"""
+        print(f"🔍 全面 SEO 審計分片 {shard}...\n")
+        self.pages, self.issues, self.page_urls = [], [], {}
+        self.cache.reset_stats()
+        entries = [entry for entry in map(self.index.get, self._scan_pages()) if shard.owns(entry.rel)]
+        print(f"   分片內有 {len(entries)} 個頁面文件\n")
+        self._analyze_pages([entry.path for entry in entries])
+        return [entry.rel for entry in entries]
+    
+    def _rule_version(self, rule: str, *settings: Any) -> str:
+        """規則版本 + 會影響結果的設定指紋"""
+        return f"{CACHE_RULE_VERSIONS[rule]}:{fingerprint(self.site_url, *settings)}"
+    
+    def _cached_parse_page(self, entry) -> Optional[Dict[str, Any]]:
+        """解析頁面（未變更的檔案直接沿用快取，不重新讀檔）"""
+        version = self._rule_version('parse_page')
+        page_data = self.cache.get(entry, 'parse_page', version)
+        if page_data is MISSING:
+            page_data = self._parse_page(entry.path)
+            # 解析失敗不寫入快取，下次仍會重新解析並顯示警告
+            if page_data:
+                # 存入副本，之後加入的 seo_analysis 不會混進解析結果
+                self.cache.put(entry, 'parse_page', version, dict(page_data))
+        else:
+            page_data = dict(page_data)
+        return page_data
+    
+    @staticmethod
+    def _stream_page(stream: JsonlWriter, page: Dict[str, Any]) -> Dict[str, Any]:
+        """寫出單頁完整結果，回傳只含跨頁檢查與統計所需欄位的精簡版本（不含內文與細節）"""
+        stream.write('page', public_page(page))
+        analysis = page['seo_analysis']
+        return {
+            'file_path': page['file_path'],
+            'url': page['url'],
+            'title': page.get('title', ''),
+            'seo': page.get('seo', {}),
+            'seo_analysis': {
+                'overall_score': analysis['overall_score'],
+                'scores': analysis['scores'],
+                'issues': analysis['issues'],
+                'link_targets': analysis['link_targets'],
+                'content_signature': analysis['content_signature'],
+                # 只保留各項目的問題（--db 以項目作為規則）
+                'details': {key: {'issues': detail['issues']} for key, detail in analysis['details'].items()
+                            if isinstance(detail, dict) and detail.get('issues')},
+            },
         }
     
+    def _audit_pages_parallel(self, page_files: List[Path], stream: Optional[JsonlWriter] = None):
+        """以多個行程解析並分析頁面，依頁面掃描順序合併結果（快取命中的頁面不送出）"""
+        print(f"📄 解析頁面並執行全面 SEO 分析（{self.jobs} 個行程）...")
+        parse_version = self._rule_version('parse_page')
+        analyze_version = self._rule_version('comprehensive_analyze', SEO_STANDARDS)
+        
+        entries = [self.index.get(file_path) for file_path in page_files]
+        results: Dict[str, Optional[Dict[str, Any]]] = {}
+        pending = []
+        for entry in entries:
+            page_data = self.cache.get(entry, 'parse_page', parse_version)
+            if page_data is not MISSING:
+                analysis = self.cache.get(entry, 'comprehensive_analyze', analyze_version)
+                if analysis is not MISSING:
+                    results[entry.rel] = {**page_data, 'seo_analysis': analysis}
+                    continue
+            pending.append(entry)
+        
+        analyzed = map_in_processes(_analyze_page_worker, [entry.path for entry in pending], self.jobs,
+                                    _init_page_worker, (self.src_dir, self.site_url, self.site_dir))
+        for entry, page_data in zip(pending, analyzed):
+            results[entry.rel] = page_data
+            if page_data:
+                parsed = {k: v for k, v in page_data.items() if k != 'seo_analysis'}
+                self.cache.put(entry, 'parse_page', parse_version, parsed)
+                self.cache.put(entry, 'comprehensive_analyze', analyze_version, page_data['seo_analysis'])
+        
+        for entry in entries:
+            page_data = results.pop(entry.rel)
+            if page_data:
+                if stream is not None:
+                    page_data = self._stream_page(stream, page_data)
+                self.pages.append(page_data)
+                self.page_urls[page_data['file_path']] = page_data['url']
+        print(f"   成功解析 {len(self.pages)} 個頁面")
+    
     def _scan_pages(self) -> List[Path]:
-        """掃描所有 .njk 頁面文件"""
-        pages = []
-        for file_path in self.src_dir.rglob("*.njk"):
+        """掃描所有 .njk 頁面文件（--site 模式為建置輸出中的全部 .html）"""
+        if self.site_dir is not None:
+            return sorted(entry.path for entry in self.index.files(suffixes={'.html'}))
+        return sorted(entry.path for entry in self.index.files(under=self.src_dir, suffixes={'.njk'})
+                      if self.is_page(entry.path))
+    
+    def is_page(self, file_path: Path) -> bool:
+        """是否為審計的頁面（src/ 下的 .njk，不含 _includes/ 與 _data/）"""
+        if file_path.suffix != '.njk':
+            return False
+        try:
             rel_path = file_path.relative_to(self.src_dir)
-            if str(rel_path).startswith("_includes/"):
-                continue
-            if str(rel_path).startswith("_data/"):
-                continue
-            pages.append(file_path)
-        return sorted(pages)
+        except ValueError:
+            return False
+        if str(rel_path).startswith("_includes/"):
+            return False
+        if str(rel_path).startswith("_data/"):
+            return False
+        return True
     
     def _parse_page(self, file_path: Path) -> Optional[Dict[str, Any]]:
         """解析頁面的 front matter 和內容"""
+        if self.site_dir is not None:
+            return self._parse_rendered_page(file_path)
+        try:
+            content = self.index.read_text(file_path)
+        except Exception as e:
+            print(f"   ⚠️  解析錯誤 ({file_path.relative_to(PROJECT_ROOT)}): {e}")
+            return None
+        return self.parse_content(file_path, content)
+    
+    def parse_content(self, file_path: Path, content: str) -> Optional[Dict[str, Any]]:
+        """解析頁面內容（編輯器中尚未儲存的內容也可直接傳入）"""
         try:
-            with open(file_path, 'r', encoding='utf-8') as f:
-                content = f.read()
-            
             # 提取 front matter
-            front_matter_match = re.match(r'^---\s*\n(.*?)\n---\s*\n(.*)$', content, re.DOTALL)
+            page = split_front_matter(content)
             
-            if not front_matter_match:
+            if page is None:
                 return None
             
-            front_matter_text = front_matter_match.group(1)
-            body_content = front_matter_match.group(2)
-            
             # 解析 YAML
             try:
-                front_matter = self._parse_simple_yaml(front_matter_text)
+                front_matter = page.data
             except Exception as e:
                 print(f"   ⚠️  YAML 解析錯誤 ({file_path.relative_to(PROJECT_ROOT)}): {e}")
                 return None
@@ -154,90 +393,44 @@ class ComprehensiveSEOAuditor:
                 'front_matter': front_matter,
                 'title': front_matter.get('title', ''),
                 'seo': front_matter.get('seo', {}),
-                'body_content': body_content,
-                'content_length': len(body_content),
+                'body_content': page.body,
+                'content_length': page.body_length,
             }
         except Exception as e:
             print(f"   ⚠️  解析錯誤 ({file_path.relative_to(PROJECT_ROOT)}): {e}")
             return None
     
-    def _parse_simple_yaml(self, yaml_text: str) -> Dict[str, Any]:
-        """簡單的 YAML 解析器"""
-        result = {}
-        lines = yaml_text.split('\n')
-        i = 0
-        
-        while i < len(lines):
-            line = lines[i]
-            stripped = line.strip()
-            
-            if not stripped or stripped.startswith('#'):
-                i += 1
-                continue
-            
-            indent = len(line) - len(line.lstrip())
-            
-            if ':' in line:
-                colon_idx = line.index(':')
-                key = line[:colon_idx].strip()
-                value_part = line[colon_idx + 1:].strip()
-                
-                # 檢查是否是嵌套對象
-                is_object = False
-                if i + 1 < len(lines):
-                    next_line = lines[i + 1]
-                    next_stripped = next_line.strip()
-                    if next_stripped and ':' in next_line:
-                        next_indent = len(next_line) - len(next_line.lstrip())
-                        if next_indent > indent:
-                            is_object = True
-                
-                if is_object:
-                    nested_lines = []
-                    i += 1
-                    while i < len(lines):
-                        nested_line = lines[i]
-                        nested_stripped = nested_line.strip()
-                        if not nested_stripped or nested_stripped.startswith('#'):
-                            i += 1
-                            continue
-                        nested_indent = len(nested_line) - len(nested_line.lstrip())
-                        if nested_indent <= indent:
-                            break
-                        nested_lines.append(nested_line)
-                        i += 1
-                    i -= 1
-                    
-                    nested_text = '\n'.join(nested_lines)
-                    result[key] = self._parse_simple_yaml(nested_text)
-                else:
-                    value = value_part
-                    
-                    if value in ('|', '>'):
-                        multiline_lines = []
-                        i += 1
-                        while i < len(lines):
-                            next_line = lines[i]
-                            next_indent = len(next_line) - len(next_line.lstrip())
-                            if next_indent <= indent and next_line.strip():
-                                break
-                            if next_indent > indent:
-                                multiline_lines.append(next_line[indent:])
-                            i += 1
-                        value = '\n'.join(multiline_lines).strip()
-                        if value.startswith('|') or value.startswith('>'):
-                            value = value[1:].lstrip()
-                        i -= 1
-                    else:
-                        if (value.startswith('"') and value.endswith('"')) or \
-                           (value.startswith("'") and value.endswith("'")):
-                            value = value[1:-1]
-                    
-                    result[key] = value
-            
-            i += 1
+    def _parse_rendered_page(self, file_path: Path) -> Optional[Dict[str, Any]]:
+        """解析建置後的 HTML 頁面：分塊餵入 html.parser，一次走訪取得各項分析需要的事實"""
+        try:
+            facts = read_html_facts(file_path)
+        except OSError as e:
+            print(f"   ⚠️  解析錯誤 ({_display_path(file_path)}): {e}")
+            return None
         
-        return result
+        rel_path = file_path.relative_to(self.site_dir)
+        return {
+            'file_path': _display_path(file_path),
+            'rel_path': str(rel_path),
+            'url': self._rendered_url(rel_path),
+            'page_type': self._infer_page_type(rel_path, {}),
+            'title': facts.title,
+            'seo': {
+                'description': facts.meta.get('description', ''),
+                'keywords': facts.meta.get('keywords', ''),
+            },
+            'content_length': len(facts.text),
+            'facts': facts.to_dict(),
+        }
+    
+    def _rendered_url(self, rel_path: Path) -> str:
+        """由建置輸出路徑推斷 URL（blog/x/index.html -> /blog/x/，404.html 維持原檔名）"""
+        url_path = rel_path.as_posix()
+        if url_path == 'index.html':
+            url_path = ''
+        elif url_path.endswith('/index.html'):
+            url_path = url_path[:-len('index.html')]
+        return f"{self.site_url.rstrip('/')}/{url_path}"
     
     def _infer_url(self, rel_path: Path, front_matter: Dict) -> str:
         """推斷頁面 URL"""
@@ -258,7 +451,7 @@ class ComprehensiveSEOAuditor:
     def _infer_page_type(self, rel_path: Path, front_matter: Dict) -> str:
         """推斷頁面類型"""
         rel_str = str(rel_path).lower()
-        if rel_str == 'index.njk':
+        if rel_str in ('index.njk', 'index.html'):
             return 'home'
         elif 'services/' in rel_str:
             return 'service'
@@ -285,7 +478,12 @@ class ComprehensiveSEOAuditor:
             'details': {},
         }
         
-        body_content = page.get('body_content', '')
+        # 各項分析共用一次擷取的事實：--site 模式解析時已擷取，原始碼模式以單次標籤切分掃描 .njk 內文
+        # （看不到 base-layout 產生的 head）
+        if 'facts' in page:
+            facts = PageFacts.from_dict(page['facts'])
+        else:
+            facts = scan_source_facts(page.get('body_content', ''))
         
         # 1. Title 分析
         title_score, title_details = self._analyze_title(page.get('title', ''))
@@ -305,32 +503,37 @@ class ComprehensiveSEOAuditor:
         analysis['details']['keywords'] = keywords_details
         
         # 4. H1 分析
-        h1_score, h1_details = self._analyze_headings(body_content, 'h1')
+        h1_score, h1_details = self._analyze_headings(facts, 'h1')
         analysis['scores']['h1'] = h1_score
         analysis['details']['h1'] = h1_details
         
         # 5. 標題結構分析 (H1-H6)
-        heading_structure_score, heading_details = self._analyze_heading_structure(body_content)
+        heading_structure_score, heading_details = self._analyze_heading_structure(facts)
         analysis['scores']['heading_structure'] = heading_structure_score
         analysis['details']['heading_structure'] = heading_details
         
         # 6. 內容質量分析
-        content_score, content_details = self._analyze_content_quality(body_content, page.get('title', ''))
+        content_score, content_details = self._analyze_content_quality(facts, page.get('title', ''))
         analysis['scores']['content'] = content_score
         analysis['details']['content'] = content_details
         
         # 7. 圖片分析
-        images_score, images_details = self._analyze_images(body_content)
+        images_score, images_details = self._analyze_images(facts)
         analysis['scores']['images'] = images_score
         analysis['details']['images'] = images_details
         
         # 8. 內部鏈接分析
-        internal_links_score, links_details = self._analyze_internal_links(body_content, page['url'])
+        internal_links_score, links_details = self._analyze_internal_links(facts, page['url'])
         analysis['scores']['internal_links'] = internal_links_score
         analysis['details']['internal_links'] = links_details
+        # 內部連結解析成的站內路徑（不重複），供內部連結圖使用
+        analysis['link_targets'] = self._link_targets(facts, page['url'])
+        # 純文字的 MinHash 簽章，供跨頁近似重複內容比對
+        min_length = SEO_STANDARDS['duplicate_content']['min_length']
+        analysis['content_signature'] = minhash_signature(facts.text) if len(facts.text) >= min_length else None
         
         # 9. 外部鏈接分析
-        external_links_score, external_details = self._analyze_external_links(body_content)
+        external_links_score, external_details = self._analyze_external_links(facts)
         analysis['scores']['external_links'] = external_links_score
         analysis['details']['external_links'] = external_details
         
@@ -339,13 +542,13 @@ class ComprehensiveSEOAuditor:
         analysis['scores']['url'] = url_score
         analysis['details']['url'] = url_details
         
-        # 11. Meta 標籤完整性（從 base-layout 檢查，這裡僅做提示）
-        meta_score, meta_details = self._analyze_meta_tags(page)
+        # 11. Meta 標籤完整性（原始碼模式無法檢查 base-layout，僅做提示）
+        meta_score, meta_details = self._analyze_meta_tags(page, facts)
         analysis['scores']['meta_tags'] = meta_score
         analysis['details']['meta_tags'] = meta_details
         
         # 12. 移動端友好性（檢查 viewport meta）
-        mobile_score, mobile_details = self._analyze_mobile_friendliness(page)
+        mobile_score, mobile_details = self._analyze_mobile_friendliness(page, facts)
         analysis['scores']['mobile'] = mobile_score
         analysis['details']['mobile'] = mobile_details
         
@@ -393,26 +596,19 @@ class ComprehensiveSEOAuditor:
         score = 0
         
         if not title:
-            details['issues'].append({
-                'priority': 'high',
-                'message': '缺少 Title 標籤',
-            })
+            details['issues'].append(PageIssue('title', 'high', '缺少 Title 標籤'))
             return 0, details
         
         std = SEO_STANDARDS['title']
         length = len(title)
         
         if length < std['min_length']:
-            details['issues'].append({
-                'priority': 'high',
-                'message': f'Title 過短（{length} 字符，建議至少 {std["min_length"]} 字符）',
-            })
+            details['issues'].append(PageIssue(
+                'title', 'high', 'Title 過短（{} 字符，建議至少 {} 字符）', length, std["min_length"]))
             score = (length / std['min_length']) * 50
         elif length > std['max_length']:
-            details['issues'].append({
-                'priority': 'medium',
-                'message': f'Title 過長（{length} 字符，建議不超過 {std["max_length"]} 字符）',
-            })
+            details['issues'].append(PageIssue(
+                'title', 'medium', 'Title 過長（{} 字符，建議不超過 {} 字符）', length, std["max_length"]))
             excess = length - std['max_length']
             score = max(50, 100 - (excess * 2))
         else:
@@ -420,17 +616,11 @@ class ComprehensiveSEOAuditor:
                 score = 100
             else:
                 score = 90
-            details['recommendations'].append({
-                'priority': 'low',
-                'message': f'Title 長度良好（{length} 字符）',
-            })
+            details['recommendations'].append(PageIssue('title', 'low', 'Title 長度良好（{} 字符）', length))
         
         # 檢查品牌名
         if '好時有影' not in title and 'Golden Years' not in title:
-            details['recommendations'].append({
-                'priority': 'low',
-                'message': '建議在 Title 中包含品牌名稱',
-            })
+            details['recommendations'].append(PageIssue('title', 'low', '建議在 Title 中包含品牌名稱'))
             score *= 0.9
         
         return round(score, 1), details
@@ -446,43 +636,29 @@ class ComprehensiveSEOAuditor:
         score = 0
         
         if not description:
-            details['issues'].append({
-                'priority': 'high',
-                'message': '缺少 Meta Description',
-            })
+            details['issues'].append(PageIssue('description', 'high', '缺少 Meta Description'))
             return 0, details
         
         std = SEO_STANDARDS['description']
         length = len(description)
         
         if length < std['min_length']:
-            details['issues'].append({
-                'priority': 'high',
-                'message': f'Description 過短（{length} 字符，建議至少 {std["min_length"]} 字符）',
-            })
+            details['issues'].append(PageIssue(
+                'description', 'high', 'Description 過短（{} 字符，建議至少 {} 字符）', length, std["min_length"]))
             score = (length / std['min_length']) * 60
         elif length > std['max_length']:
-            details['issues'].append({
-                'priority': 'medium',
-                'message': f'Description 過長（{length} 字符，可能被截斷）',
-            })
+            details['issues'].append(PageIssue('description', 'medium', 'Description 過長（{} 字符，可能被截斷）', length))
             excess = length - std['max_length']
             score = max(60, 100 - (excess * 2))
         else:
             score = 100
-            details['recommendations'].append({
-                'priority': 'low',
-                'message': f'Description 長度良好（{length} 字符）',
-            })
+            details['recommendations'].append(PageIssue('description', 'low', 'Description 長度良好（{} 字符）', length))
         
         # 檢查 CTA
         cta_words = ['立即', '查看', '預約', '了解更多', '開始']
         has_cta = any(word in description for word in cta_words)
         if not has_cta:
-            details['recommendations'].append({
-                'priority': 'low',
-                'message': '建議在 Description 中包含行動呼籲（CTA）',
-            })
+            details['recommendations'].append(PageIssue('description', 'low', '建議在 Description 中包含行動呼籲（CTA）'))
             score *= 0.95
         
         return round(score, 1), details
@@ -497,10 +673,7 @@ class ComprehensiveSEOAuditor:
         }
         
         if not keywords:
-            details['recommendations'].append({
-                'priority': 'low',
-                'message': '建議添加 keywords（雖然 Google 不再使用，但其他搜索引擎可能使用）',
-            })
+            details['recommendations'].append(PageIssue('keywords', 'low', '建議添加 keywords（雖然 Google 不再使用，但其他搜索引擎可能使用）'))
             return 70, details
         
         if isinstance(keywords, str):
@@ -514,27 +687,20 @@ class ComprehensiveSEOAuditor:
         std = SEO_STANDARDS['keywords']
         
         if len(keyword_list) < std['min_count']:
-            details['recommendations'].append({
-                'priority': 'low',
-                'message': f'關鍵詞數量較少（{len(keyword_list)} 個）',
-            })
+            details['recommendations'].append(PageIssue('keywords', 'low', '關鍵詞數量較少（{} 個）', len(keyword_list)))
             score = 80
         elif len(keyword_list) > std['max_count']:
-            details['recommendations'].append({
-                'priority': 'low',
-                'message': f'關鍵詞數量較多（{len(keyword_list)} 個，建議不超過 {std["max_count"]} 個）',
-            })
+            details['recommendations'].append(PageIssue(
+                'keywords', 'low', '關鍵詞數量較多（{} 個，建議不超過 {} 個）', len(keyword_list), std["max_count"]))
             score = 85
         else:
             score = 100
         
         return round(score, 1), details
     
-    def _analyze_headings(self, content: str, tag: str) -> Tuple[float, Dict[str, Any]]:
+    def _analyze_headings(self, facts: PageFacts, tag: str) -> Tuple[float, Dict[str, Any]]:
         """分析特定標題標籤"""
-        pattern = f'<{tag}[^>]*>(.*?)</{tag}>'
-        matches = re.findall(pattern, content, re.DOTALL | re.IGNORECASE)
-        headings = [re.sub(r'<[^>]+>', '', h).strip() for h in matches]
+        headings = facts.heading_texts(int(tag[1:]))
         
         details = {
             'count': len(headings),
@@ -545,32 +711,20 @@ class ComprehensiveSEOAuditor:
         
         if tag == 'h1':
             if len(headings) == 0:
-                details['issues'].append({
-                    'priority': 'high',
-                    'message': '頁面缺少 H1 標籤',
-                })
+                details['issues'].append(PageIssue('h1', 'high', '頁面缺少 H1 標籤'))
                 return 0, details
             elif len(headings) == 1:
-                details['recommendations'].append({
-                    'priority': 'low',
-                    'message': f'H1 標籤良好: "{headings[0]}"',
-                })
+                details['recommendations'].append(PageIssue('h1', 'low', 'H1 標籤良好: "{}"', headings[0]))
                 return 100, details
             else:
-                details['issues'].append({
-                    'priority': 'medium',
-                    'message': f'頁面包含多個 H1 標籤（{len(headings)} 個），建議只使用一個',
-                })
+                details['issues'].append(PageIssue('h1', 'medium', '頁面包含多個 H1 標籤（{} 個），建議只使用一個', len(headings)))
                 return 50, details
         
         return 100, details
     
-    def _analyze_heading_structure(self, content: str) -> Tuple[float, Dict[str, Any]]:
+    def _analyze_heading_structure(self, facts: PageFacts) -> Tuple[float, Dict[str, Any]]:
         """分析標題結構（H1-H6）"""
-        heading_counts = {f'h{i}': 0 for i in range(1, 7)}
-        for i in range(1, 7):
-            pattern = f'<h{i}[^>]*>'
-            heading_counts[f'h{i}'] = len(re.findall(pattern, content, re.IGNORECASE))
+        heading_counts = {f'h{i}': count for i, count in enumerate(facts.heading_counts, 1)}
         
         details = {
             'counts': heading_counts,
@@ -581,24 +735,15 @@ class ComprehensiveSEOAuditor:
         
         # 檢查 H1 數量
         if heading_counts['h1'] == 0:
-            details['issues'].append({
-                'priority': 'high',
-                'message': '缺少 H1 標籤',
-            })
+            details['issues'].append(PageIssue('heading_structure', 'high', '缺少 H1 標籤'))
             score -= 30
         elif heading_counts['h1'] > 1:
-            details['issues'].append({
-                'priority': 'medium',
-                'message': f'多個 H1 標籤（{heading_counts["h1"]} 個）',
-            })
+            details['issues'].append(PageIssue('heading_structure', 'medium', '多個 H1 標籤（{} 個）', heading_counts["h1"]))
             score -= 20
         
         # 檢查標題順序（H1 後應該有 H2）
         if heading_counts['h1'] == 1 and heading_counts['h2'] == 0:
-            details['recommendations'].append({
-                'priority': 'low',
-                'message': '建議在 H1 後使用 H2 標題來組織內容',
-            })
+            details['recommendations'].append(PageIssue('heading_structure', 'low', '建議在 H1 後使用 H2 標題來組織內容'))
             score -= 10
         
         # 檢查是否有跳級（如 H1 後直接 H3）
@@ -606,25 +751,17 @@ class ComprehensiveSEOAuditor:
         
         total_headings = sum(heading_counts.values())
         if total_headings == 0:
-            details['issues'].append({
-                'priority': 'medium',
-                'message': '頁面沒有任何標題標籤，影響內容結構',
-            })
+            details['issues'].append(PageIssue('heading_structure', 'medium', '頁面沒有任何標題標籤，影響內容結構'))
             score -= 40
         elif total_headings < 3:
-            details['recommendations'].append({
-                'priority': 'low',
-                'message': '建議使用更多標題標籤來組織內容結構',
-            })
+            details['recommendations'].append(PageIssue('heading_structure', 'low', '建議使用更多標題標籤來組織內容結構'))
             score -= 5
         
         return max(0, round(score, 1)), details
     
-    def _analyze_content_quality(self, content: str, title: str) -> Tuple[float, Dict[str, Any]]:
+    def _analyze_content_quality(self, facts: PageFacts, title: str) -> Tuple[float, Dict[str, Any]]:
         """分析內容質量"""
-        # 移除 HTML 標籤獲取純文本
-        text_content = re.sub(r'<[^>]+>', ' ', content)
-        text_content = re.sub(r'\s+', ' ', text_content).strip()
+        text_content = facts.text
         content_length = len(text_content)
         
         details = {
@@ -638,55 +775,40 @@ class ComprehensiveSEOAuditor:
         std = SEO_STANDARDS['content']
         
         if content_length < std['min_length']:
-            details['issues'].append({
-                'priority': 'high',
-                'message': f'內容過短（{content_length} 字符，建議至少 {std["min_length"]} 字符）',
-            })
+            details['issues'].append(PageIssue(
+                'content', 'high', '內容過短（{} 字符，建議至少 {} 字符）', content_length, std["min_length"]))
             score = min(60, (content_length / std['min_length']) * 60)
         elif content_length < std['optimal_length']:
-            details['recommendations'].append({
-                'priority': 'low',
-                'message': f'內容長度可接受（{content_length} 字符），但建議達到 {std["optimal_length"]} 字符以上',
-            })
+            details['recommendations'].append(PageIssue(
+                'content', 'low', '內容長度可接受（{} 字符），但建議達到 {} 字符以上', content_length, std["optimal_length"]))
             score = 80
         else:
-            details['recommendations'].append({
-                'priority': 'low',
-                'message': f'內容長度良好（{content_length} 字符）',
-            })
+            details['recommendations'].append(PageIssue('content', 'low', '內容長度良好（{} 字符）', content_length))
         
         # 檢查是否包含標題相關關鍵詞
         if title:
             title_words = set(re.findall(r'\w+', title.lower()))
-            content_words = set(re.findall(r'\w+', text_content.lower()))
-            overlap = len(title_words & content_words)
-            if overlap == 0 and len(title_words) > 0:
-                details['recommendations'].append({
-                    'priority': 'low',
-                    'message': '建議內容中包含標題中的關鍵詞',
-                })
+            # 內文中是否有與標題詞完全相同的詞（前後不是文字字元），找到第一個即停止，不必切出內文全部的詞
+            overlap = title_words and re.search(
+                r'(?<!\w)(?:' + '|'.join(map(re.escape, title_words)) + r')(?!\w)', text_content.lower())
+            if not overlap and len(title_words) > 0:
+                details['recommendations'].append(PageIssue('content', 'low', '建議內容中包含標題中的關鍵詞'))
                 score *= 0.95
         
         return round(score, 1), details
     
-    def _analyze_images(self, content: str) -> Tuple[float, Dict[str, Any]]:
+    def _analyze_images(self, facts: PageFacts) -> Tuple[float, Dict[str, Any]]:
         """分析圖片"""
-        img_pattern = r'<img[^>]*>'
-        images = re.findall(img_pattern, content, re.IGNORECASE)
-        
-        total_images = len(images)
+        total_images = len(facts.images)
         images_with_alt = 0
         images_without_alt = []
         
-        for img_tag in images:
-            alt_match = re.search(r'alt=["\']([^"\']*)["\']', img_tag, re.IGNORECASE)
-            if alt_match and alt_match.group(1).strip():
+        for src, alt in facts.images:
+            if alt and alt.strip():
                 images_with_alt += 1
             else:
-                # 提取 src 用於報告
-                src_match = re.search(r'src=["\']([^"\']*)["\']', img_tag, re.IGNORECASE)
-                src = src_match.group(1) if src_match else '未知'
-                images_without_alt.append(src)
+                # src 用於報告
+                images_without_alt.append(src if src is not None else '未知')
         
         details = {
             'total': total_images,
@@ -698,43 +820,21 @@ class ComprehensiveSEOAuditor:
         }
         
         if total_images == 0:
-            details['recommendations'].append({
-                'priority': 'low',
-                'message': '頁面沒有圖片，可以考慮添加相關圖片提升用戶體驗',
-            })
+            details['recommendations'].append(PageIssue('images', 'low', '頁面沒有圖片，可以考慮添加相關圖片提升用戶體驗'))
             return 80, details
         
         if images_without_alt:
-            details['issues'].append({
-                'priority': 'high',
-                'message': f'{len(images_without_alt)} 張圖片缺少 alt 屬性',
-            })
+            details['issues'].append(PageIssue('images', 'high', '{} 張圖片缺少 alt 屬性', len(images_without_alt)))
             score = (images_with_alt / total_images) * 100
         else:
-            details['recommendations'].append({
-                'priority': 'low',
-                'message': '所有圖片都包含 alt 屬性，良好！',
-            })
+            details['recommendations'].append(PageIssue('images', 'low', '所有圖片都包含 alt 屬性，良好！'))
             score = 100
         
         return round(score, 1), details
     
-    def _analyze_internal_links(self, content: str, current_url: str) -> Tuple[float, Dict[str, Any]]:
+    def _analyze_internal_links(self, facts: PageFacts, current_url: str) -> Tuple[float, Dict[str, Any]]:
         """分析內部鏈接"""
-        link_pattern = r'<a[^>]*href=["\']([^"\']+)["\'][^>]*>'
-        links = re.findall(link_pattern, content, re.IGNORECASE)
-        
-        internal_links = []
-        external_links = []
-        
-        for link in links:
-            if link.startswith('http://') or link.startswith('https://'):
-                if self.site_url in link:
-                    internal_links.append(link)
-                else:
-                    external_links.append(link)
-            elif link.startswith('/') or not link.startswith('#'):
-                internal_links.append(link)
+        internal_links, _ = facts.split_links(self.site_url)
         
         details = {
             'total': len(internal_links),
@@ -747,28 +847,28 @@ class ComprehensiveSEOAuditor:
         std = SEO_STANDARDS['links']
         
         if len(internal_links) < std['min_internal_links']:
-            details['issues'].append({
-                'priority': 'medium',
-                'message': f'內部鏈接較少（{len(internal_links)} 個，建議至少 {std["min_internal_links"]} 個）',
-            })
+            details['issues'].append(PageIssue(
+                'internal_links', 'medium', '內部鏈接較少（{} 個，建議至少 {} 個）', len(internal_links), std["min_internal_links"]))
             score = min(70, (len(internal_links) / std['min_internal_links']) * 70)
         elif len(internal_links) >= std['min_internal_links']:
-            details['recommendations'].append({
-                'priority': 'low',
-                'message': f'內部鏈接數量良好（{len(internal_links)} 個）',
-            })
+            details['recommendations'].append(PageIssue('internal_links', 'low', '內部鏈接數量良好（{} 個）', len(internal_links)))
         
         return round(score, 1), details
     
-    def _analyze_external_links(self, content: str) -> Tuple[float, Dict[str, Any]]:
+    def _link_targets(self, facts: PageFacts, page_url: str) -> List[str]:
+        """將內部連結解析為站內路徑（相對連結以頁面網址為基準，無法解析的模板運算式略過）"""
+        site_root = self.site_url.rstrip('/') + '/'
+        base_url = urllib.parse.urljoin(site_root, page_url)
+        targets = {}
+        for link in facts.split_links(self.site_url)[0]:
+            path = site_path(link, base_url, self.site_url)
+            if path is not None:
+                targets[path] = None
+        return list(targets)
+    
+    def _analyze_external_links(self, facts: PageFacts) -> Tuple[float, Dict[str, Any]]:
         """分析外部鏈接"""
-        link_pattern = r'<a[^>]*href=["\']([^"\']+)["\'][^>]*>'
-        links = re.findall(link_pattern, content, re.IGNORECASE)
-        
-        external_links = []
-        for link in links:
-            if (link.startswith('http://') or link.startswith('https://')) and self.site_url not in link:
-                external_links.append(link)
+        _, external_links = facts.split_links(self.site_url)
         
         details = {
             'total': len(external_links),
@@ -781,16 +881,11 @@ class ComprehensiveSEOAuditor:
         std = SEO_STANDARDS['links']
         
         if len(external_links) > std['max_external_links']:
-            details['issues'].append({
-                'priority': 'low',
-                'message': f'外部鏈接較多（{len(external_links)} 個），可能影響頁面權重傳遞',
-            })
+            details['issues'].append(PageIssue('external_links', 'low', '外部鏈接較多（{} 個），可能影響頁面權重傳遞', len(external_links)))
             score = max(80, 100 - (len(external_links) - std['max_external_links']) * 2)
         elif len(external_links) > 0:
-            details['recommendations'].append({
-                'priority': 'low',
-                'message': f'外部鏈接數量合理（{len(external_links)} 個），建議添加 rel="nofollow" 屬性',
-            })
+            details['recommendations'].append(PageIssue(
+                'external_links', 'low', '外部鏈接數量合理（{} 個），建議添加 rel="nofollow" 屬性', len(external_links)))
         
         return round(score, 1), details
     
@@ -806,27 +901,18 @@ class ComprehensiveSEOAuditor:
         
         # 檢查長度
         if len(url) > 100:
-            details['issues'].append({
-                'priority': 'medium',
-                'message': f'URL 過長（{len(url)} 字符）',
-            })
+            details['issues'].append(PageIssue('url', 'medium', 'URL 過長（{} 字符）', len(url)))
             score -= 20
         
         # 檢查是否包含參數
         if '?' in url or '&' in url:
-            details['recommendations'].append({
-                'priority': 'low',
-                'message': 'URL 包含查詢參數，建議使用友好的 URL 結構',
-            })
+            details['recommendations'].append(PageIssue('url', 'low', 'URL 包含查詢參數，建議使用友好的 URL 結構'))
             score -= 10
         
         # 檢查深度（斜線數量）
         depth = url.count('/') - 3  # 減去 http://domain.com/
         if depth > 4:
-            details['recommendations'].append({
-                'priority': 'low',
-                'message': f'URL 深度較深（{depth} 層），建議保持淺層結構',
-            })
+            details['recommendations'].append(PageIssue('url', 'low', 'URL 深度較深（{} 層），建議保持淺層結構', depth))
             score -= 5
         
         # 檢查是否包含關鍵詞（相對 URL 部分）
@@ -835,14 +921,11 @@ class ComprehensiveSEOAuditor:
             # 首頁，不需要檢查
             pass
         elif re.match(r'^[a-z0-9\-/]+$', url_path, re.IGNORECASE):
-            details['recommendations'].append({
-                'priority': 'low',
-                'message': 'URL 結構清晰，使用小寫字母和連字符',
-            })
+            details['recommendations'].append(PageIssue('url', 'low', 'URL 結構清晰，使用小寫字母和連字符'))
         
         return max(0, round(score, 1)), details
     
-    def _analyze_meta_tags(self, page: Dict[str, Any]) -> Tuple[float, Dict[str, Any]]:
+    def _analyze_meta_tags(self, page: Dict[str, Any], facts: PageFacts) -> Tuple[float, Dict[str, Any]]:
         """分析 Meta 標籤完整性"""
         details = {
             'has_description': bool(page.get('seo', {}).get('description')),
@@ -852,24 +935,64 @@ class ComprehensiveSEOAuditor:
         }
         score = 100
         
+        if facts.meta is not None:
+            return self._analyze_rendered_meta_tags(page, facts, details)
+        
         # 檢查 Open Graph（需要在模板中檢查，這裡僅提示）
-        details['recommendations'].append({
-            'priority': 'low',
-            'message': '建議添加 Open Graph 標籤以改善社交媒體分享效果',
-        })
+        details['recommendations'].append(PageIssue('meta_tags', 'low', '建議添加 Open Graph 標籤以改善社交媒體分享效果'))
         score -= 10
         
         # 檢查 Twitter Cards
-        details['recommendations'].append({
-            'priority': 'low',
-            'message': '建議添加 Twitter Card 標籤',
-        })
+        details['recommendations'].append(PageIssue('meta_tags', 'low', '建議添加 Twitter Card 標籤'))
         score -= 10
         
         return round(score, 1), details
     
-    def _analyze_mobile_friendliness(self, page: Dict[str, Any]) -> Tuple[float, Dict[str, Any]]:
+    def _analyze_rendered_meta_tags(self, page: Dict[str, Any], facts: PageFacts,
+                                    details: Dict[str, Any]) -> Tuple[float, Dict[str, Any]]:
+        """--site 模式：直接檢查建置後 <head> 中的 canonical、Open Graph 與 Twitter Card"""
+        score = 100
+        details['canonical'] = facts.canonical
+        missing_og = [tag for tag in OPEN_GRAPH_TAGS if not facts.meta.get(tag)]
+        details['missing_open_graph'] = missing_og
+        details['has_twitter_card'] = bool(facts.meta.get('twitter:card'))
+        
+        if not facts.canonical:
+            details['issues'].append(PageIssue('meta_tags', 'medium', '缺少 canonical 連結'))
+            score -= 20
+        elif facts.canonical.rstrip('/') != page['url'].rstrip('/'):
+            details['recommendations'].append(PageIssue('meta_tags', 'low', 'canonical 指向其他網址: {}', facts.canonical))
+            score -= 5
+        
+        if missing_og:
+            details['recommendations'].append(PageIssue(
+                'meta_tags', 'low', '缺少 Open Graph 標籤: {}', ', '.join(missing_og)))
+            score -= 10
+        
+        if not details['has_twitter_card']:
+            details['recommendations'].append(PageIssue('meta_tags', 'low', '缺少 Twitter Card 標籤'))
+            score -= 10
+        
+        return max(0, round(score, 1)), details
+    
+    def _analyze_mobile_friendliness(self, page: Dict[str, Any], facts: PageFacts) -> Tuple[float, Dict[str, Any]]:
         """分析移動端友好性"""
+        if facts.meta is not None:
+            # --site 模式：直接檢查建置後的 viewport meta
+            viewport = facts.meta.get('viewport')
+            details = {
+                'viewport': viewport,
+                'issues': [],
+                'recommendations': [],
+            }
+            if not viewport:
+                details['issues'].append(PageIssue('mobile', 'high', '缺少 viewport meta 標籤'))
+                return 0, details
+            if 'width=device-width' not in viewport.replace(' ', ''):
+                details['recommendations'].append(PageIssue('mobile', 'medium', 'viewport 未設定 width=device-width'))
+                return 70, details
+            return 100, details
+        
         # 檢查 viewport meta（通常在 base-layout 中，這裡假設有）
         details = {
             'viewport_expected': True,  # base-layout.njk 中應該有
@@ -878,15 +1001,19 @@ class ComprehensiveSEOAuditor:
         }
         score = 100
         
-        details['recommendations'].append({
-            'priority': 'low',
-            'message': '建議確保 viewport meta 標籤已設置（通常已在 base-layout 中）',
-        })
+        details['recommendations'].append(PageIssue('mobile', 'low', '建議確保 viewport meta 標籤已設置（通常已在 base-layout 中）'))
         
         return score, details
     
     def _check_cross_page_issues(self):
         """檢查跨頁面問題"""
+        self.issues.extend(issue for issue, _ in self._duplicate_issues())
+    
+    def _duplicate_issues(self) -> Iterator[Tuple[SiteIssue, List[str]]]:
+        """重複的 title / description 與近似重複的內容，逐一產生 (問題, 全部涉及的 URL)（affected_pages 只列出前幾個）
+
+        近似重複以 MinHash 簽章的 LSH 分段找出候選頁面組合，不需逐對比較全部頁面
+        """
         # 檢查重複的 title
         titles = defaultdict(list)
         descriptions = defaultdict(list)
@@ -903,24 +1030,137 @@ class ComprehensiveSEOAuditor:
         # 重複 title
         for title, urls in titles.items():
             if len(urls) > 1:
-                self.issues.append({
-                    'type': 'duplicate_title',
-                    'priority': 'high',
-                    'message': f'標題重複: "{title}"',
-                    'affected_pages': urls[:5],
-                    'count': len(urls),
-                })
+                yield SiteIssue('duplicate_title', 'high', '標題重複: "{}"', title,
+                                affected_pages=urls[:5], count=len(urls)), urls
         
         # 重複 description
         for desc, urls in descriptions.items():
             if len(urls) > 1:
-                self.issues.append({
-                    'type': 'duplicate_description',
-                    'priority': 'medium',
-                    'message': f'描述重複（出現在 {len(urls)} 個頁面）',
-                    'affected_pages': urls[:3],
-                    'count': len(urls),
-                })
+                yield SiteIssue('duplicate_description', 'medium', '描述重複（出現在 {} 個頁面）', len(urls),
+                                affected_pages=urls[:3], count=len(urls)), urls
+        
+        # 近似重複內容
+        standards = SEO_STANDARDS['duplicate_content']
+        signatures = [page.get('seo_analysis', {}).get('content_signature') for page in self.pages]
+        for first, second, similarity in near_duplicates(signatures, standards['threshold']):
+            urls = [self.pages[first]['url'], self.pages[second]['url']]
+            priority = 'high' if similarity >= standards['high_threshold'] else 'medium'
+            yield SiteIssue('near_duplicate_content', priority, '頁面內容高度相似（約 {}%）: {} ↔ {}',
+                            round(similarity * 100), urls[0], urls[1],
+                            affected_pages=urls, count=2, similarity=round(similarity, 3)), urls
+    
+    def check_page(self, file_path: Path, content: Optional[str]) -> List[Issue]:
+        """單頁診斷（編輯器整合）：以傳入的內容分析頁面，並與其他頁面比對重複的 title / description
+
+        新結果取代 self.pages 中該頁的舊結果（content 為 None 表示檔案已刪除），之後的比對都以最新內容為準；
+        需先執行過 audit() 取得其他頁面。回傳的問題規則為分析項目或跨頁問題類型
+        """
+        rel = str(file_path.relative_to(PROJECT_ROOT))
+        page = self.parse_content(file_path, content) if content is not None else None
+        position = next((i for i, p in enumerate(self.pages) if p['file_path'] == rel), None)
+        if page is None:
+            if position is not None:
+                del self.pages[position]
+            self.page_urls.pop(rel, None)
+            return []
+        
+        page['seo_analysis'] = self._comprehensive_analyze(page)
+        if position is None:
+            self.pages.append(page)
+        else:
+            self.pages[position] = page
+        self.page_urls[rel] = page['url']
+        
+        issues: List[Issue] = []
+        for category, detail in page['seo_analysis']['details'].items():
+            if isinstance(detail, dict):
+                issues.extend(issue.derive(Issue, rule=category, file=rel) for issue in detail.get('issues', []))
+        issues.extend(issue.derive(Issue, file=rel) for issue, urls in self._duplicate_issues() if page['url'] in urls)
+        return issues
+    
+    def _build_url_index(self) -> UrlIndex:
+        """全部頁面網址、建置輸出檔案（--site）或靜態資源（原始碼模式）與 src/_redirects 的規則"""
+        url_index = UrlIndex(self.site_url, RedirectRules.load(REDIRECTS_FILE))
+        for url in self.page_urls.values():
+            if isinstance(url, str):
+                url_index.add_url(url)
+        if self.site_dir is not None:
+            url_index.add_files(entry.rel for entry in self.index.files())
+        else:
+            source_index = ProjectIndex.shared(PROJECT_ROOT)
+            for asset in STATIC_ASSET_PATHS:
+                asset_path = self.src_dir / asset
+                if source_index.get(asset_path) is not None:
+                    url_index.add_files([asset])
+                else:
+                    url_index.add_files(str(entry.path.relative_to(self.src_dir))
+                                        for entry in source_index.files(under=asset_path))
+        return url_index
+    
+    def _check_internal_links(self) -> List[SiteIssue]:
+        """以網址索引檢查每條內部連結（每條連結只做雜湊查詢），依目標彙整失效與經過轉址的連結"""
+        url_index = self._build_url_index()
+        # 連結目標 -> (檢查結果, 連到它的頁面)；同一目標只解析一次
+        targets: Dict[str, Tuple[Tuple[str, str, List[int]], List[str]]] = {}
+        for page in self.pages:
+            for target in page['seo_analysis'].get('link_targets', []):
+                if target not in targets:
+                    targets[target] = (url_index.resolve(target), [])
+                targets[target][1].append(page['url'])
+        
+        issues = []
+        for target, ((result, final, hops), pages) in targets.items():
+            if result == LINK_BROKEN and hops:
+                issues.append(SiteIssue('broken_internal_link', 'high', '內部連結經過轉址（{}）後指向不存在的網址: {} → {}',
+                                        ' → '.join(map(str, hops)), target, final,
+                                        affected_pages=pages[:5], count=len(pages), redirects=hops, final=final))
+            elif result == LINK_BROKEN:
+                issues.append(SiteIssue('broken_internal_link', 'high', '內部連結指向不存在的網址: {}', target,
+                                        affected_pages=pages[:5], count=len(pages), redirects=hops, final=final))
+            elif result == LINK_REDIRECT:
+                issues.append(SiteIssue('redirected_internal_link', 'medium', '內部連結經過轉址（{}）: {} → {}',
+                                        ' → '.join(map(str, hops)), target, final,
+                                        affected_pages=pages[:5], count=len(pages), redirects=hops, final=final))
+        return issues
+    
+    def _analyze_link_graph(self) -> Dict[str, Any]:
+        """以各頁的站內連結建立連結圖（頁面網址來自 page_urls），計算入鏈數、孤立頁面、從首頁出發的點擊深度與站內 PageRank
+
+        頁面一律以正規化的站內路徑（/blog/x/，與內部連結檢查的連結目標相同）表示，
+        permalink 與推斷的絕對網址不會混在一起；無法解析為站內路徑的頁面才保留原本的網址
+        """
+        site_root = self.site_url.rstrip('/') + '/'
+        urls = [self.page_urls[page['file_path']] for page in self.pages]
+        nodes = [site_path(url, site_root, self.site_url) or url for url in urls]
+        graph = LinkGraph.build(nodes, (page['seo_analysis'].get('link_targets', []) for page in self.pages))
+        
+        inbound = graph.in_degrees()
+        outbound = graph.out_degrees()
+        home = nodes.index('/') if '/' in nodes else None
+        depths = graph.bfs_depths(home) if home is not None else [-1] * len(nodes)
+        ranks = graph.pagerank()
+        
+        depth_distribution = Counter(depth for depth in depths if depth >= 0)
+        metrics = [{
+            'path': node,
+            'file_path': page['file_path'],
+            'inbound': inbound[i],
+            'outbound': outbound[i],
+            'depth': depths[i] if depths[i] >= 0 else None,
+            # 以全站平均為 1.0 的相對權重
+            'authority': round(ranks[i] * len(nodes), 3),
+        } for i, (node, page) in enumerate(zip(nodes, self.pages))]
+        
+        return {
+            'pages': len(nodes),
+            'links': graph.edge_count,
+            'home': nodes[home] if home is not None else None,
+            'orphan_pages': [m['path'] for i, m in enumerate(metrics) if not m['inbound'] and i != home],
+            'unreachable_pages': [m['path'] for m in metrics if m['depth'] is None] if home is not None else [],
+            'max_depth': max(depth_distribution) if depth_distribution else None,
+            'depth_distribution': {str(depth): count for depth, count in sorted(depth_distribution.items())},
+            'page_metrics': metrics,
+        }
     
     def _generate_stats(self) -> Dict[str, Any]:
         """生成統計數據"""
@@ -950,7 +1190,7 @@ class ComprehensiveSEOAuditor:
         issue_priority_count = {'high': 0, 'medium': 0, 'low': 0}
         for page in self.pages:
             for issue in page['seo_analysis']['issues']:
-                priority = issue.get('priority', 'low')
+                priority = issue.severity
                 issue_priority_count[priority] = issue_priority_count.get(priority, 0) + 1
         
         return {
@@ -968,36 +1208,77 @@ class ComprehensiveSEOAuditor:
         }
 
 
-def generate_detailed_report(audit_result: Dict[str, Any]) -> str:
-    """生成詳細的 Markdown 報告"""
-    lines = []
-    
-    lines.append("# 📊 全面 SEO 審計報告")
-    lines.append("")
-    lines.append(f"**生成時間**: {audit_result['timestamp']}")
-    lines.append(f"**網站 URL**: {audit_result['site_url']}")
-    lines.append(f"**總頁面數**: {audit_result['total_pages']}")
-    lines.append("")
+def _display_path(path: Path) -> str:
+    """報告中顯示的路徑（專案內為相對路徑，--site 指向專案外的目錄時為絕對路徑）"""
+    try:
+        return str(path.relative_to(PROJECT_ROOT))
+    except ValueError:
+        return str(path)
+
+
+def load_site_url() -> str:
+    """讀取網站 URL（src/_data/metadata.json 的 url，讀取失敗時使用預設值）"""
+    metadata_file = PROJECT_ROOT / "src" / "_data" / "metadata.json"
+    site_url = SITE_URL
+    if metadata_file.exists():
+        try:
+            with open(metadata_file, 'r', encoding='utf-8') as f:
+                metadata = json.load(f)
+                site_url = metadata.get('url', SITE_URL)
+        except:
+            pass
+    return site_url
+
+
+# 工作行程內的審計器（每個行程建立一次）
+_worker_auditor: Optional[ComprehensiveSEOAuditor] = None
+
+
+def _init_page_worker(src_dir: Path, site_url: str, site_dir: Optional[Path] = None):
+    """工作行程初始化"""
+    global _worker_auditor
+    _worker_auditor = ComprehensiveSEOAuditor(src_dir, site_url, use_cache=False, site_dir=site_dir)
+
+
+def _analyze_page_worker(file_path: Path) -> Optional[Dict[str, Any]]:
+    """在工作行程中解析並分析單一頁面"""
+    page_data = _worker_auditor._parse_page(file_path)
+    if page_data:
+        page_data['seo_analysis'] = _worker_auditor._comprehensive_analyze(page_data)
+    return page_data
+
+
+def _iter_report_lines(audit_result: Dict[str, Any], sorted_pages: Iterable[Dict[str, Any]],
+                       issues: List[Dict[str, Any]]) -> Iterator[str]:
+    """逐行產生 Markdown 報告（audit_result 只需 timestamp / site_url / total_pages / stats）"""
+    yield "# 📊 全面 SEO 審計報告"
+    yield ""
+    yield f"**生成時間**: {audit_result['timestamp']}"
+    yield f"**網站 URL**: {audit_result['site_url']}"
+    if audit_result.get('site_dir'):
+        yield f"**審計來源**: `{audit_result['site_dir']}/`（建置後的 HTML）"
+    yield f"**總頁面數**: {audit_result['total_pages']}"
+    yield ""
     
     # 總體統計
     stats = audit_result['stats']
     overall_stats = stats.get('overall', {})
     
-    lines.append("## 📈 總體統計")
-    lines.append("")
-    lines.append(f"- **平均 SEO 分數**: {overall_stats.get('average_score', 0)}/100")
-    lines.append(f"- **最低分數**: {overall_stats.get('min_score', 0)}/100")
-    lines.append(f"- **最高分數**: {overall_stats.get('max_score', 0)}/100")
-    lines.append(f"- **中位數分數**: {overall_stats.get('median_score', 0)}/100")
-    lines.append(f"- **有問題的頁面**: {stats.get('pages_with_issues', 0)}/{audit_result['total_pages']}")
-    lines.append(f"- **總問題數**: {stats.get('total_issues', 0)}")
-    lines.append("")
+    yield "## 📈 總體統計"
+    yield ""
+    yield f"- **平均 SEO 分數**: {overall_stats.get('average_score', 0)}/100"
+    yield f"- **最低分數**: {overall_stats.get('min_score', 0)}/100"
+    yield f"- **最高分數**: {overall_stats.get('max_score', 0)}/100"
+    yield f"- **中位數分數**: {overall_stats.get('median_score', 0)}/100"
+    yield f"- **有問題的頁面**: {stats.get('pages_with_issues', 0)}/{audit_result['total_pages']}"
+    yield f"- **總問題數**: {stats.get('total_issues', 0)}"
+    yield ""
     
     # 分類平均分數
     category_averages = stats.get('category_averages', {})
     if category_averages:
-        lines.append("### 分類平均分數")
-        lines.append("")
+        yield "### 分類平均分數"
+        yield ""
         category_names = {
             'title': '標題 (Title)',
             'description': '描述 (Description)',
@@ -1015,26 +1296,24 @@ def generate_detailed_report(audit_result: Dict[str, Any]) -> str:
         
         for key, avg_score in sorted(category_averages.items(), key=lambda x: x[1]):
             name = category_names.get(key, key)
-            lines.append(f"- **{name}**: {avg_score}/100")
-        lines.append("")
+            yield f"- **{name}**: {avg_score}/100"
+        yield ""
     
     # 問題優先級統計
     issue_priority = stats.get('issue_priority_count', {})
     if issue_priority:
-        lines.append("### 問題優先級統計")
-        lines.append("")
-        lines.append(f"- 🔴 **高優先級**: {issue_priority.get('high', 0)} 個")
-        lines.append(f"- 🟡 **中優先級**: {issue_priority.get('medium', 0)} 個")
-        lines.append(f"- 🟢 **低優先級**: {issue_priority.get('low', 0)} 個")
-        lines.append("")
+        yield "### 問題優先級統計"
+        yield ""
+        yield f"- 🔴 **高優先級**: {issue_priority.get('high', 0)} 個"
+        yield f"- 🟡 **中優先級**: {issue_priority.get('medium', 0)} 個"
+        yield f"- 🟢 **低優先級**: {issue_priority.get('low', 0)} 個"
+        yield ""
     
     # 頁面詳情
-    lines.append("## 📄 頁面詳情")
-    lines.append("")
-    lines.append("按 SEO 分數排序（從低到高）")
-    lines.append("")
-    
-    sorted_pages = sorted(audit_result['pages'], key=lambda x: x['seo_analysis']['overall_score'])
+    yield "## 📄 頁面詳情"
+    yield ""
+    yield "按 SEO 分數排序（從低到高）"
+    yield ""
     
     for page in sorted_pages:
         url = page['url']
@@ -1050,16 +1329,16 @@ def generate_detailed_report(audit_result: Dict[str, Any]) -> str:
         else:
             score_badge = f"🔴 {score}"
         
-        lines.append(f"### {title} {score_badge}")
-        lines.append("")
-        lines.append(f"- **URL**: {url}")
-        lines.append(f"- **文件**: `{page['file_path']}`")
-        lines.append(f"- **頁面類型**: {page.get('page_type', 'unknown')}")
-        lines.append("")
+        yield f"### {title} {score_badge}"
+        yield ""
+        yield f"- **URL**: {url}"
+        yield f"- **文件**: `{page['file_path']}`"
+        yield f"- **頁面類型**: {page.get('page_type', 'unknown')}"
+        yield ""
         
         # 各項分數詳情
-        lines.append("#### 📊 分項評分")
-        lines.append("")
+        yield "#### 📊 分項評分"
+        yield ""
         score_names = {
             'title': '標題 (Title)',
             'description': '描述 (Description)',
@@ -1082,101 +1361,319 @@ def generate_detailed_report(audit_result: Dict[str, Any]) -> str:
                 
                 # 根據類別顯示額外信息
                 if key == 'title' and 'length' in detail:
-                    lines.append(f"- **{name}**: {score_val}/100 ({detail['length']} 字符)")
+                    yield f"- **{name}**: {score_val}/100 ({detail['length']} 字符)"
                 elif key == 'description' and 'length' in detail:
-                    lines.append(f"- **{name}**: {score_val}/100 ({detail['length']} 字符)")
+                    yield f"- **{name}**: {score_val}/100 ({detail['length']} 字符)"
                 elif key == 'h1' and 'count' in detail:
-                    lines.append(f"- **{name}**: {score_val}/100 ({detail['count']} 個)")
+                    yield f"- **{name}**: {score_val}/100 ({detail['count']} 個)"
                 elif key == 'content' and 'length' in detail:
-                    lines.append(f"- **{name}**: {score_val}/100 ({detail['length']} 字符)")
+                    yield f"- **{name}**: {score_val}/100 ({detail['length']} 字符)"
                 elif key == 'images' and 'total' in detail:
-                    lines.append(f"- **{name}**: {score_val}/100 ({detail['total']} 張圖片, {detail.get('with_alt', 0)} 張有 alt)")
+                    yield f"- **{name}**: {score_val}/100 ({detail['total']} 張圖片, {detail.get('with_alt', 0)} 張有 alt)"
                 elif key == 'internal_links' and 'total' in detail:
-                    lines.append(f"- **{name}**: {score_val}/100 ({detail['total']} 個內部鏈接)")
+                    yield f"- **{name}**: {score_val}/100 ({detail['total']} 個內部鏈接)"
                 else:
-                    lines.append(f"- **{name}**: {score_val}/100")
+                    yield f"- **{name}**: {score_val}/100"
         
-        lines.append("")
+        yield ""
         
         # 問題
         if analysis['issues']:
-            lines.append("#### ⚠️ 問題")
-            lines.append("")
+            yield "#### ⚠️ 問題"
+            yield ""
             # 按優先級排序
-            sorted_issues = sorted(analysis['issues'], key=lambda x: {'high': 0, 'medium': 1, 'low': 2}.get(x.get('priority', 'low'), 3))
+            sorted_issues = sorted(analysis['issues'], key=lambda x: {'high': 0, 'medium': 1, 'low': 2}.get(x.severity, 3))
             for issue in sorted_issues:
-                priority = issue.get('priority', 'low')
+                priority = issue.severity
                 priority_emoji = {'high': '🔴', 'medium': '🟡', 'low': '🟢'}.get(priority, '⚪')
-                lines.append(f"- {priority_emoji} **{priority.upper()}**: {issue['message']}")
-            lines.append("")
+                yield f"- {priority_emoji} **{priority.upper()}**: {issue.message}"
+            yield ""
         
         # 建議
         if analysis['recommendations']:
-            lines.append("#### 💡 建議")
-            lines.append("")
-            sorted_recs = sorted(analysis['recommendations'], key=lambda x: {'high': 0, 'medium': 1, 'low': 2}.get(x.get('priority', 'low'), 3))
+            yield "#### 💡 建議"
+            yield ""
+            sorted_recs = sorted(analysis['recommendations'], key=lambda x: {'high': 0, 'medium': 1, 'low': 2}.get(x.severity, 3))
             for rec in sorted_recs:
-                priority = rec.get('priority', 'low')
+                priority = rec.severity
                 priority_emoji = {'high': '🔴', 'medium': '🟡', 'low': '🟢'}.get(priority, '⚪')
-                lines.append(f"- {priority_emoji} **{priority.upper()}**: {rec['message']}")
-            lines.append("")
+                yield f"- {priority_emoji} **{priority.upper()}**: {rec.message}"
+            yield ""
         
-        lines.append("---")
-        lines.append("")
+        yield "---"
+        yield ""
     
     # 全局問題
-    if audit_result['issues']:
-        lines.append("## 🔗 全局問題")
-        lines.append("")
-        for issue in audit_result['issues']:
-            priority = issue.get('priority', 'low')
+    if issues:
+        yield "## 🔗 全局問題"
+        yield ""
+        for issue in issues:
+            priority = issue.severity
             priority_emoji = {'high': '🔴', 'medium': '🟡', 'low': '🟢'}.get(priority, '⚪')
-            lines.append(f"### {priority_emoji} {issue['message']}")
-            lines.append("")
-            lines.append(f"**影響頁面數**: {issue.get('count', 0)}")
-            lines.append("")
-            lines.append("**受影響的頁面**:")
+            yield f"### {priority_emoji} {issue.message}"
+            yield ""
+            yield f"**影響頁面數**: {issue.get('count', 0)}"
+            yield ""
+            yield "**受影響的頁面**:"
             for url in issue.get('affected_pages', [])[:5]:
-                lines.append(f"- {url}")
+                yield f"- {url}"
             if issue.get('count', 0) > 5:
-                lines.append(f"- ... 還有 {issue['count'] - 5} 個頁面")
-            lines.append("")
+                yield f"- ... 還有 {issue.get('count') - 5} 個頁面"
+            yield ""
     
-    return '\n'.join(lines)
+    link_graph = audit_result.get('link_graph')
+    if link_graph:
+        yield from _iter_link_graph_lines(link_graph, rendered=bool(audit_result.get('site_dir')))
 
 
-def main():
-    """主函數"""
-    # 讀取網站 URL
-    metadata_file = PROJECT_ROOT / "src" / "_data" / "metadata.json"
-    site_url = SITE_URL
-    if metadata_file.exists():
-        try:
-            with open(metadata_file, 'r', encoding='utf-8') as f:
-                metadata = json.load(f)
-                site_url = metadata.get('url', SITE_URL)
-        except:
-            pass
+def _iter_url_list(urls: List[str]) -> Iterator[str]:
+    for url in urls[:LINK_GRAPH_REPORT_LIMIT]:
+        yield f"- {url}"
+    if len(urls) > LINK_GRAPH_REPORT_LIMIT:
+        yield f"- ... 還有 {len(urls) - LINK_GRAPH_REPORT_LIMIT} 個頁面"
+    yield ""
+
+
+def _iter_link_graph_lines(link_graph: Dict[str, Any], rendered: bool) -> Iterator[str]:
+    """內部連結圖章節"""
+    yield "## 🕸️ 內部連結結構"
+    yield ""
+    if not rendered:
+        yield "> 原始碼模式看不到導覽列、頁尾與 macros 產生的連結，完整的連結結構請以 `--site` 審計建置輸出"
+        yield ""
+    yield f"- **頁面數**: {link_graph['pages']}"
+    yield f"- **內部連結數**: {link_graph['links']}（同一對頁面只計一次）"
+    yield f"- **孤立頁面**: {len(link_graph['orphan_pages'])} 個（沒有其他頁面連結到此頁）"
+    if link_graph['home']:
+        yield f"- **從首頁無法到達**: {len(link_graph['unreachable_pages'])} 個頁面"
+        yield f"- **最大點擊深度**: {link_graph['max_depth']}"
+    else:
+        yield "- **點擊深度**: 找不到首頁（/），未計算"
+    yield ""
     
-    # 確保報告目錄存在
-    REPORT_DIR.mkdir(exist_ok=True)
+    metrics = link_graph['page_metrics']
+    if metrics:
+        yield "### 連結權重最高的頁面"
+        yield ""
+        yield "站內 PageRank，以全站平均為 1.0"
+        yield ""
+        yield "| 頁面 | 權重 | 入鏈 | 出鏈 | 點擊深度 |"
+        yield "|------|------|------|------|----------|"
+        top = sorted(metrics, key=lambda m: -m['authority'])[:LINK_GRAPH_REPORT_LIMIT // 2]
+        for m in top:
+            depth = m['depth'] if m['depth'] is not None else '-'
+            yield f"| {m['path']} | {m['authority']} | {m['inbound']} | {m['outbound']} | {depth} |"
+        yield ""
     
-    # 執行審計
-    auditor = ComprehensiveSEOAuditor(SRC_DIR, site_url)
-    audit_result = auditor.audit()
+    if link_graph['depth_distribution']:
+        yield "### 點擊深度分布"
+        yield ""
+        for depth, count in link_graph['depth_distribution'].items():
+            yield f"- 深度 {depth}: {count} 個頁面"
+        yield ""
+    
+    if link_graph['orphan_pages']:
+        yield "### 🏝️ 孤立頁面"
+        yield ""
+        yield from _iter_url_list(link_graph['orphan_pages'])
     
-    # 保存 JSON 報告
-    json_report_path = REPORT_DIR / "comprehensive-seo-audit.json"
+    if link_graph['unreachable_pages']:
+        yield "### 🧭 從首頁無法到達的頁面"
+        yield ""
+        yield from _iter_url_list(link_graph['unreachable_pages'])
+
+def generate_detailed_report(audit_result: Dict[str, Any]) -> str:
+    """生成詳細的 Markdown 報告"""
+    sorted_pages = sorted(audit_result['pages'], key=lambda x: x['seo_analysis']['overall_score'])
+    return '\n'.join(_iter_report_lines(audit_result, sorted_pages, audit_result['issues']))
+
+
+def _load_page_issues(page: Dict[str, Any]) -> Dict[str, Any]:
+    """將讀回的頁面紀錄中的問題與建議還原為 PageIssue"""
+    analysis = page['seo_analysis']
+    for key in ('issues', 'recommendations'):
+        analysis[key] = [PageIssue.from_dict(item) for item in analysis.get(key, [])]
+    return page
+
+
+def public_page(page: Dict[str, Any]) -> Dict[str, Any]:
+    """報告輸出用的頁面副本：seo_analysis 去掉內部欄位（不修改原本的頁面與快取中的分析結果）"""
+    analysis = page.get('seo_analysis')
+    if not analysis:
+        return page
+    return {**page, 'seo_analysis': {key: value for key, value in analysis.items()
+                                     if key not in INTERNAL_ANALYSIS_KEYS}}
+
+
+def write_report_from_jsonl(jsonl_path: Path, md_report_path: Path):
+    """由 JSON Lines 結果產生 Markdown 報告
+
+    第一遍只記錄各頁分數與位移，排序後逐頁回頭讀取並直接寫入檔案，記憶體用量與頁數無關
+    """
+    with JsonlReader(jsonl_path) as reader:
+        page_offsets, issues, summary = [], [], {}
+        for offset, record in reader:
+            record_type = record[RECORD_KEY]
+            if record_type == 'page':
+                page_offsets.append((record['seo_analysis']['overall_score'], offset))
+            elif record_type == 'issue':
+                issues.append(SiteIssue.from_dict(record))
+            elif record_type == 'summary':
+                summary = record
+        # 只依分數排序（穩定排序），頁面順序與 generate_detailed_report 相同
+        page_offsets.sort(key=lambda x: x[0])
+        sorted_pages = (_load_page_issues(reader.at(offset)) for _, offset in page_offsets)
+        
+        with open(md_report_path, 'w', encoding='utf-8') as f:
+            for i, line in enumerate(_iter_report_lines(summary, sorted_pages, issues)):
+                f.write(f"\n{line}" if i else line)
+
+
+def save_reports(audit_result: Dict[str, Any], report_name: str = 'comprehensive-seo-audit'):
+    """保存 JSON 與 Markdown 報告"""
+    json_report_path = REPORT_DIR / f"{report_name}.json"
     with open(json_report_path, 'w', encoding='utf-8') as f:
-        json.dump(audit_result, f, ensure_ascii=False, indent=2)
+        json.dump({**audit_result, 'pages': [public_page(page) for page in audit_result['pages']]},
+                  f, ensure_ascii=False, indent=2, default=issue_json)
     print(f"✅ JSON 報告已保存: {json_report_path}")
     
-    # 生成並保存 Markdown 報告
     md_report = generate_detailed_report(audit_result)
-    md_report_path = REPORT_DIR / "comprehensive-seo-audit.md"
+    md_report_path = REPORT_DIR / f"{report_name}.md"
     with open(md_report_path, 'w', encoding='utf-8') as f:
         f.write(md_report)
     print(f"✅ Markdown 報告已保存: {md_report_path}")
+
+
+def run_and_save(auditor: ComprehensiveSEOAuditor, output_format: str) -> Dict[str, Any]:
+    """執行審計並依輸出格式保存報告
+
+    jsonl 格式邊分析邊寫出 comprehensive-seo-audit.jsonl，Markdown 報告再由該檔產生；
+    回傳結果中的頁面只含摘要欄位（--site 模式的檔名為 comprehensive-seo-audit-site.*）
+    """
+    if output_format != 'jsonl':
+        audit_result = auditor.audit()
+        save_reports(audit_result, auditor.report_name)
+        return audit_result
+    
+    jsonl_report_path = REPORT_DIR / f"{auditor.report_name}.jsonl"
+    with JsonlWriter(jsonl_report_path, auditor.report_name) as stream:
+        audit_result = auditor.audit(stream)
+    print(f"✅ JSON Lines 報告已保存: {jsonl_report_path}")
+    
+    md_report_path = REPORT_DIR / f"{auditor.report_name}.md"
+    write_report_from_jsonl(jsonl_report_path, md_report_path)
+    print(f"✅ Markdown 報告已保存: {md_report_path}")
+    return audit_result
+
+
+def collect_findings(audit_result: Dict[str, Any]) -> Tuple[List[Issue], List[Tuple[Optional[str], str, float]]]:
+    """--db：逐頁問題（規則為分析項目）、跨頁問題與各項分數"""
+    issues: List[Issue] = []
+    scores: List[Tuple[Optional[str], str, float]] = []
+    for page in audit_result['pages']:
+        path = page['file_path']
+        analysis = page['seo_analysis']
+        for category, detail in analysis.get('details', {}).items():
+            if not isinstance(detail, dict):
+                continue
+            issues.extend(issue.derive(Issue, rule=category, file=path) for issue in detail.get('issues', []))
+        scores.extend((path, name, value) for name, value in analysis['scores'].items())
+        scores.append((path, 'overall', analysis['overall_score']))
+    issues.extend(issue.derive(Issue) for issue in audit_result['issues'])
+    average = audit_result['stats'].get('overall', {}).get('average_score')
+    if average is not None:
+        scores.append((None, 'average', average))
+    return issues, scores
+
+
+def save_findings(audit_result: Dict[str, Any], db_path: Path, tool: str = 'comprehensive-seo-audit'):
+    issues, scores = collect_findings(audit_result)
+    record_findings(db_path, tool, issues, scores, root=PROJECT_ROOT,
+                    summary={'total_pages': audit_result['total_pages'],
+                             'total_issues': audit_result['stats'].get('total_issues', 0)})
+
+
+def print_scoped_issues(audit_result: Dict[str, Any], scope: GitScope) -> int:
+    """--since / --staged：列出變更頁面的問題與涉及變更頁面的跨頁問題，回傳高優先級問題數"""
+    changed_urls = {page['url'] for page in audit_result['pages'] if page['file_path'] in scope}
+    issues = [issue for issue in collect_findings(audit_result)[0] if issue.file in scope]
+    issues += [issue.derive(Issue) for issue in audit_result['issues']
+               if changed_urls & set(issue.get('affected_pages', []))]
+    
+    print(f"\n🔀 git 範圍（{scope.describe()}，其中 {len(changed_urls)} 個頁面）: {len(issues)} 個問題")
+    for issue in sorted(issues, key=lambda x: {'high': 0, 'medium': 1, 'low': 2}.get(x.severity, 3)):
+        icon = {'high': '🔴', 'medium': '🟡', 'low': '🟢'}.get(issue.severity, '⚪')
+        print(f"   {icon} {issue.file or '跨頁面'} [{issue.rule}] {issue.message}")
+    return sum(1 for issue in issues if issue.severity == 'high')
+
+
+def main():
+    """主函數"""
+    parser = argparse.ArgumentParser(description='全面 SEO 審計與評分')
+    parser.add_argument('--no-cache', action='store_true', help='不使用 .cache/audits/ 的結果快取，全部重新分析')
+    parser.add_argument('--jobs', type=int, default=1, metavar='N', help='平行分析頁面的行程數（0 = CPU 核心數，預設 1）')
+    parser.add_argument('--watch', action='store_true', help='完成後持續監看 src/，只重新分析異動的頁面')
+    parser.add_argument('--format', choices=['json', 'jsonl'], default='json',
+                        help='結果格式：json（完整 JSON，預設）或 jsonl（逐頁串流寫出 JSON Lines）')
+    parser.add_argument('--profile', action='store_true',
+                        help='記錄各階段與規則耗時，輸出到 report/profile/（搭配 --no-cache 才會量到快取命中的規則）')
+    parser.add_argument('--memprofile', action='store_true',
+                        help='以 tracemalloc 記錄各階段記憶體峰值、保留量與主要配置位置，輸出到 report/profile/')
+    parser.add_argument('--memprofile-depth', type=int, default=MEMORY_TRACE_DEPTH, metavar='N',
+                        help=f'tracemalloc 保留的呼叫層數（預設 {MEMORY_TRACE_DEPTH}，加深可追溯到稽核腳本行但較慢）')
+    parser.add_argument('--db', nargs='?', const=REPORT_DIR / DEFAULT_DB_NAME, type=Path, metavar='PATH',
+                        help=f'將問題與分數寫入 SQLite 資料庫（預設 report/{DEFAULT_DB_NAME}），以 findings.py 查詢')
+    parser.add_argument('--since', metavar='REV',
+                        help='只重新分析自 REV 以來（git diff）變更的頁面，其餘沿用快取；有高優先級問題時退出碼為 1')
+    parser.add_argument('--staged', action='store_true', help='同 --since，但範圍為 git 暫存區的變更（pre-commit 用）')
+    parser.add_argument('--shard', metavar='I/N',
+                        help='CI 分片：只分析 N 個分片中第 I 個分片的頁面，單頁結果寫到 report/shards/（不產生報告）')
+    parser.add_argument('--merge-shards', action='store_true',
+                        help='合併 report/shards/ 中的全部分片後執行跨頁檢查並產生報告，結果與單機執行相同')
+    parser.add_argument('--site', nargs='?', const=SITE_DIR, type=Path, metavar='DIR',
+                        help='改為審計建置後的 HTML（預設 _site/，需先執行 npm run build），'
+                             '報告寫到 report/comprehensive-seo-audit-site.*')
+    args = parser.parse_args()
+    try:
+        scope = scope_from_args(PROJECT_ROOT, args.since, args.staged)
+        shard = shard_from_args(args.shard)
+    except ValueError as e:
+        parser.error(str(e))
+    if shard is not None and (args.merge_shards or args.watch):
+        parser.error('--shard 不能與 --merge-shards / --watch 同時使用')
+    if args.site is not None:
+        if scope is not None:
+            parser.error('--site 不能與 --since / --staged 同時使用（建置輸出不在 git 版本控制中）')
+        if not args.site.is_dir():
+            parser.error(f'找不到建置輸出目錄 {args.site}，請先執行 npm run build')
+        args.site = args.site.absolute()
+    if args.profile or args.memprofile:
+        PROFILER.enable('comprehensive-seo-audit', timing=args.profile, memory=args.memprofile,
+                        memory_depth=args.memprofile_depth)
+    
+    site_url = load_site_url()
+    
+    # 確保報告目錄存在
+    REPORT_DIR.mkdir(exist_ok=True)
+    
+    # 執行審計
+    auditor = ComprehensiveSEOAuditor(SRC_DIR, site_url, use_cache=not args.no_cache,
+                                      jobs=resolve_jobs(args.jobs), watch=args.watch, scope=scope,
+                                      sharding=shard is not None or args.merge_shards, site_dir=args.site)
+    PROFILER.instrument(auditor, ['_parse_page'], matches=None)
+    PROFILER.instrument(auditor, ['_comprehensive_analyze'], matches=lambda analysis: len(analysis['issues']))
+    PROFILER.instrument(auditor, PROFILED_RULES, matches=None)
+    if shard is not None:
+        shard_path = save_shard(auditor.cache, shard, auditor.audit_shard(shard), REPORT_DIR)
+        print(f"✅ 分片 {shard} 的單頁結果已保存: {shard_path}")
+        return 0
+    if args.merge_shards:
+        try:
+            print(f"🧩 已合併 {load_shards(auditor.cache, REPORT_DIR)} 個分片的單頁結果\n")
+        except ValueError as e:
+            parser.error(str(e))
+    # 保存 JSON（或 JSON Lines）與 Markdown 報告
+    audit_result = run_and_save(auditor, args.format)
     
     # 輸出摘要
     print("\n" + "="*60)
@@ -1198,7 +1695,27 @@ def main():
         print(f"  {i}. {page.get('title', '無標題')[:40]} - {page['seo_analysis']['overall_score']}/100")
     
     print("="*60)
+    
+    if args.db:
+        save_findings(audit_result, args.db, auditor.report_name)
+    
+    blocking = print_scoped_issues(audit_result, scope) if scope is not None else 0
+    
+    if args.profile or args.memprofile:
+        PROFILER.finish(REPORT_DIR / "profile")
+    
+    if args.watch:
+        def reaudit(changed: List[str]) -> str:
+            auditor.cache.invalidate(changed)
+            result = run_and_save(auditor, args.format)
+            overall = result['stats'].get('overall', {})
+            return (f"{result['total_pages']} 頁，平均分數 {overall.get('average_score', 0)}/100，"
+                    f"總問題數 {result['stats'].get('total_issues', 0)}")
+        
+        watch_loop(auditor.index, reaudit, roots=[args.site or SRC_DIR])
+    
+    return 1 if blocking else 0
 
 
 if __name__ == '__main__':
-    main()
+    sys.exit(main())
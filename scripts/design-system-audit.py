@@ -5,13 +5,17 @@
 """
 
 import re
-
+import argparse
 from pathlib import Path
 from collections import defaultdict, Counter
-from typing import Dict, List, Tuple, Any
+from typing import Dict, List, Tuple, Any, Optional
 from datetime import datetime
 import colorsys
 
+from auditkit import (DEFAULT_DB_NAME, MISSING, MEMORY_TRACE_DEPTH, PROFILER, GitScope, Issue, JsonlWriter, LineIndex,
+                      ProjectIndex, ResultCache, Shard, load_shards, record_findings, save_shard, scope_from_args,
+                      shard_from_args, watch_loop)
+
 # 專案根目錄
 PROJECT_ROOT = Path(__file__).parent.parent
 SRC_DIR = PROJECT_ROOT / "src"
@@ -100,13 +104,18 @@ def is_css_variable_definition(context: str) -> bool:
             return True
     return False
 
-def extract_colors_from_text(text: str) -> List[Dict[str, Any]]:
+# 檢查的命名顏色
+NAMED_COLORS = ['white', 'black', 'gray', 'grey', 'red', 'blue', 'green', 'yellow', 'orange', 'purple', 'pink', 'brown']
+NAMED_COLOR_PATTERN = re.compile(rf"\b(?:{'|'.join(NAMED_COLORS)})\b", re.IGNORECASE)
+
+def extract_colors_from_text(text: str, lines: Optional[LineIndex] = None) -> List[Dict[str, Any]]:
     """從文字中提取所有顏色值，排除第三方嵌入代碼"""
+    lines = lines or LineIndex(text)
     colors = []
     
     hex_pattern = r'#([0-9a-fA-F]{3}|[0-9a-fA-F]{6})\b'
     for match in re.finditer(hex_pattern, text):
-        context = text[max(0, match.start()-50):match.end()+50]
+        context = lines.context(match.start(), match.end(), 50)
         # 排除第三方嵌入代碼
         if is_third_party_embed(context):
             continue
@@ -117,14 +126,14 @@ def extract_colors_from_text(text: str) -> List[Dict[str, Any]]:
         colors.append({
             'value': color,
             'type': 'hex',
-            'line': text[:match.start()].count('\n') + 1,
+            'line': lines.line_of(match.start()),
             'context': context
         })
     
     # RGB/RGBA 顏色
     rgb_pattern = r'rgba?\((\d+),\s*(\d+),\s*(\d+)(?:,\s*[\d.]+)?\)'
     for match in re.finditer(rgb_pattern, text):
-        context = text[max(0, match.start()-50):match.end()+50]
+        context = lines.context(match.start(), match.end(), 50)
         # 排除第三方嵌入代碼
         if is_third_party_embed(context):
             continue
@@ -135,45 +144,45 @@ def extract_colors_from_text(text: str) -> List[Dict[str, Any]]:
         colors.append({
             'value': color,
             'type': 'rgb',
-            'line': text[:match.start()].count('\n') + 1,
+            'line': lines.line_of(match.start()),
             'context': context
         })
     
     # HSL/HSLA 顏色
     hsl_pattern = r'hsla?\((\d+),\s*(\d+)%,\s*(\d+)%'
     for match in re.finditer(hsl_pattern, text):
-        context = text[max(0, match.start()-50):match.end()+50]
+        context = lines.context(match.start(), match.end(), 50)
         if is_third_party_embed(context):
             continue
         colors.append({
             'value': match.group(0),
             'type': 'hsl',
-            'line': text[:match.start()].count('\n') + 1,
+            'line': lines.line_of(match.start()),
             'context': context
         })
     
-    # 命名顏色（white, black, gray 等）
-    named_colors = ['white', 'black', 'gray', 'grey', 'red', 'blue', 'green', 'yellow', 'orange', 'purple', 'pink', 'brown']
-    for color_name in named_colors:
-        pattern = rf'\b{color_name}\b'
-        for match in re.finditer(pattern, text, re.IGNORECASE):
-            # 避免匹配到類名中的顏色（如 text-white）
-            context_before = text[max(0, match.start()-10):match.start()]
-            if ':' in context_before or '=' in context_before:
-                context = text[max(0, match.start()-50):match.end()+50]
-                if is_third_party_embed(context):
-                    continue
-                colors.append({
-                    'value': color_name.lower(),
-                    'type': 'named',
-                    'line': text[:match.start()].count('\n') + 1,
-                    'context': context
-                })
+    # 命名顏色（white, black, gray 等）：一次掃描全部名稱，再依名稱順序排列（與逐一掃描各名稱的結果順序相同）
+    named_matches = sorted(NAMED_COLOR_PATTERN.finditer(text),
+                           key=lambda m: (NAMED_COLORS.index(m.group(0).lower()), m.start()))
+    for match in named_matches:
+        # 避免匹配到類名中的顏色（如 text-white）
+        context_before = text[max(0, match.start()-10):match.start()]
+        if ':' in context_before or '=' in context_before:
+            context = lines.context(match.start(), match.end(), 50)
+            if is_third_party_embed(context):
+                continue
+            colors.append({
+                'value': match.group(0).lower(),
+                'type': 'named',
+                'line': lines.line_of(match.start()),
+                'context': context
+            })
     
     return colors
 
-def extract_spacing_values(text: str) -> List[Dict[str, Any]]:
+def extract_spacing_values(text: str, lines: Optional[LineIndex] = None) -> List[Dict[str, Any]]:
     """提取間距值（margin, padding, gap）"""
+    lines = lines or LineIndex(text)
     spacing_values = []
     
     # margin/padding 值
@@ -182,7 +191,7 @@ def extract_spacing_values(text: str) -> List[Dict[str, Any]]:
         spacing_values.append({
             'value': match.group(1) + match.group(2),
             'property': match.group(0).split(':')[0].strip(),
-            'line': text[:match.start()].count('\n') + 1,
+            'line': lines.line_of(match.start()),
         })
     
     # Tailwind spacing 類名（p-4, m-8, gap-6 等）
@@ -191,26 +200,27 @@ def extract_spacing_values(text: str) -> List[Dict[str, Any]]:
         spacing_values.append({
             'value': match.group(2),
             'property': f"tailwind-{match.group(1)}",
-            'line': text[:match.start()].count('\n') + 1,
+            'line': lines.line_of(match.start()),
         })
     
     return spacing_values
 
-def extract_typography_values(text: str) -> List[Dict[str, Any]]:
+def extract_typography_values(text: str, lines: Optional[LineIndex] = None) -> List[Dict[str, Any]]:
     """提取字體相關值，排除第三方嵌入代碼"""
+    lines = lines or LineIndex(text)
     typography = []
     
     # font-size
     font_size_pattern = r'font-size[:\s]+([\d.]+)(px|rem|em|%)'
     for match in re.finditer(font_size_pattern, text, re.IGNORECASE):
-        context = text[max(0, match.start()-50):match.end()+50]
+        context = lines.context(match.start(), match.end(), 50)
         # 排除第三方嵌入代碼
         if is_third_party_embed(context):
             continue
         typography.append({
             'property': 'font-size',
             'value': match.group(1) + match.group(2),
-            'line': text[:match.start()].count('\n') + 1,
+            'line': lines.line_of(match.start()),
         })
     
     # font-weight
@@ -219,7 +229,7 @@ def extract_typography_values(text: str) -> List[Dict[str, Any]]:
         typography.append({
             'property': 'font-weight',
             'value': match.group(1),
-            'line': text[:match.start()].count('\n') + 1,
+            'line': lines.line_of(match.start()),
         })
     
     # line-height
@@ -228,7 +238,7 @@ def extract_typography_values(text: str) -> List[Dict[str, Any]]:
         typography.append({
             'property': 'line-height',
             'value': match.group(1),
-            'line': text[:match.start()].count('\n') + 1,
+            'line': lines.line_of(match.start()),
         })
     
     # font-family
@@ -237,13 +247,14 @@ def extract_typography_values(text: str) -> List[Dict[str, Any]]:
         typography.append({
             'property': 'font-family',
             'value': match.group(1).strip(),
-            'line': text[:match.start()].count('\n') + 1,
+            'line': lines.line_of(match.start()),
         })
     
     return typography
 
-def extract_border_radius(text: str) -> List[Dict[str, Any]]:
+def extract_border_radius(text: str, lines: Optional[LineIndex] = None) -> List[Dict[str, Any]]:
     """提取圓角值"""
+    lines = lines or LineIndex(text)
     radius_values = []
     
     # border-radius
@@ -251,7 +262,7 @@ def extract_border_radius(text: str) -> List[Dict[str, Any]]:
     for match in re.finditer(radius_pattern, text, re.IGNORECASE):
         radius_values.append({
             'value': match.group(1) + match.group(2),
-            'line': text[:match.start()].count('\n') + 1,
+            'line': lines.line_of(match.start()),
         })
     
     # rounded-* Tailwind 類名
@@ -260,13 +271,14 @@ def extract_border_radius(text: str) -> List[Dict[str, Any]]:
         radius_values.append({
             'value': match.group(1) if match.group(1) else 'default',
             'type': 'tailwind',
-            'line': text[:match.start()].count('\n') + 1,
+            'line': lines.line_of(match.start()),
         })
     
     return radius_values
 
-def extract_shadows(text: str) -> List[Dict[str, Any]]:
+def extract_shadows(text: str, lines: Optional[LineIndex] = None) -> List[Dict[str, Any]]:
     """提取陰影值"""
+    lines = lines or LineIndex(text)
     shadows = []
     
     # box-shadow
@@ -274,13 +286,14 @@ def extract_shadows(text: str) -> List[Dict[str, Any]]:
     for match in re.finditer(shadow_pattern, text, re.IGNORECASE):
         shadows.append({
             'value': match.group(1).strip(),
-            'line': text[:match.start()].count('\n') + 1,
+            'line': lines.line_of(match.start()),
         })
     
     return shadows
 
-def extract_ui_components(text: str) -> Dict[str, List[Dict[str, Any]]]:
+def extract_ui_components(text: str, lines: Optional[LineIndex] = None) -> Dict[str, List[Dict[str, Any]]]:
     """提取 UI 元件相關的類名和樣式"""
+    lines = lines or LineIndex(text)
     components = defaultdict(list)
     
     # Button 相關
@@ -292,7 +305,7 @@ def extract_ui_components(text: str) -> Dict[str, List[Dict[str, Any]]]:
         for match in re.finditer(pattern, text, re.IGNORECASE):
             components['button'].append({
                 'classes': match.group(0),
-                'line': text[:match.start()].count('\n') + 1,
+                'line': lines.line_of(match.start()),
             })
     
     # Card 相關
@@ -303,11 +316,31 @@ def extract_ui_components(text: str) -> Dict[str, List[Dict[str, Any]]]:
         for match in re.finditer(pattern, text, re.IGNORECASE):
             components['card'].append({
                 'classes': match.group(0),
-                'line': text[:match.start()].count('\n') + 1,
+                'line': lines.line_of(match.start()),
             })
     
     return dict(components)
 
+# 各檔案要執行的提取規則（結果依規則分別快取）
+EXTRACTORS = {
+    'colors': extract_colors_from_text,
+    'spacing': extract_spacing_values,
+    'typography': extract_typography_values,
+    'borderRadius': extract_border_radius,
+    'shadows': extract_shadows,
+    'components': extract_ui_components,
+}
+
+# 結果快取的規則版本：修改對應的 extract_* 函數時請遞增
+CACHE_RULE_VERSIONS = {
+    'colors': 1,
+    'spacing': 1,
+    'typography': 1,
+    'borderRadius': 1,
+    'shadows': 1,
+    'components': 1,
+}
+
 def load_design_tokens():
     """從 tailwind.config.js 和 main.css 載入設計 token"""
     # 這裡簡化處理，實際應該解析 JS 和 CSS 檔案
@@ -361,8 +394,9 @@ def load_design_tokens():
     }
     return tokens
 
-def scan_project():
-    """掃描整個專案"""
+def scan_project(index: Optional[ProjectIndex] = None, cache: Optional[ResultCache] = None,
+                 shard: Optional[Shard] = None):
+    """掃描整個專案（指定 shard 時只掃描分片內的檔案）"""
     results = {
         'colors': [],
         'spacing': [],
@@ -375,49 +409,71 @@ def scan_project():
     
     design_tokens = load_design_tokens()
     
+    index = index or ProjectIndex.shared(PROJECT_ROOT)
+    cache = cache or ResultCache(index, 'design-system-audit', enabled=False)
+    
     # 掃描所有相關檔案
-    for file_path in SRC_DIR.rglob('*'):
-        if file_path.suffix in SCAN_EXTENSIONS:
-            try:
-                with open(file_path, 'r', encoding='utf-8') as f:
-                    content = f.read()
-                    relative_path = file_path.relative_to(PROJECT_ROOT)
-                    results['files_scanned'].append(str(relative_path))
-                    
-                    # 提取各種值
-                    results['colors'].extend([
-                        {**c, 'file': str(relative_path)} 
-                        for c in extract_colors_from_text(content)
-                    ])
-                    results['spacing'].extend([
-                        {**s, 'file': str(relative_path)} 
-                        for s in extract_spacing_values(content)
-                    ])
-                    results['typography'].extend([
-                        {**t, 'file': str(relative_path)} 
-                        for t in extract_typography_values(content)
-                    ])
-                    results['borderRadius'].extend([
-                        {**r, 'file': str(relative_path)} 
-                        for r in extract_border_radius(content)
-                    ])
-                    results['shadows'].extend([
-                        {**s, 'file': str(relative_path)} 
-                        for s in extract_shadows(content)
-                    ])
-                    
-                    # UI 元件
-                    components = extract_ui_components(content)
-                    for comp_type, comp_list in components.items():
-                        results['components'][comp_type].extend([
-                            {**c, 'file': str(relative_path)} 
-                            for c in comp_list
-                        ])
-            except Exception as e:
-                print(f"Error scanning {file_path}: {e}")
+    for entry in index.files(under=SRC_DIR, suffixes=SCAN_EXTENSIONS):
+        if shard is not None and not shard.owns(entry.rel):
+            continue
+        file_path = entry.path
+        try:
+            # 只有快取未命中的規則才需要讀取檔案內容
+            extracted = {}
+            lines = None
+            for key, extractor in EXTRACTORS.items():
+                version = CACHE_RULE_VERSIONS[key]
+                values = cache.get(entry, key, version)
+                if values is MISSING:
+                    # 同一檔案的所有規則共用一份行號索引
+                    lines = lines or LineIndex(index.read_text(entry))
+                    values = extractor(lines.text, lines)
+                    cache.put(entry, key, version, values)
+                extracted[key] = values
+            _add_file_values(results, str(file_path.relative_to(PROJECT_ROOT)), extracted)
+        except Exception as e:
+            print(f"Error scanning {file_path}: {e}")
     
     return results, design_tokens
 
+def _add_file_values(results: Dict, relative_path: str, extracted: Dict[str, Any]):
+    """將單一檔案提取的值加入掃描結果"""
+    results['files_scanned'].append(relative_path)
+    
+    # 提取各種值
+    for key in ('colors', 'spacing', 'typography', 'borderRadius', 'shadows'):
+        results[key].extend([
+            {**v, 'file': relative_path} 
+            for v in extracted[key]
+        ])
+    
+    # UI 元件
+    for comp_type, comp_list in extracted['components'].items():
+        results['components'][comp_type].extend([
+            {**c, 'file': relative_path} 
+            for c in comp_list
+        ])
+
+def is_scanned_file(relative_path: str) -> bool:
+    """是否為 scan_project 掃描的檔案（src/ 下的 .njk / .css / .js / .html）"""
+    return relative_path.startswith('src/') and Path(relative_path).suffix in SCAN_EXTENSIONS
+
+def update_file(results: Dict, relative_path: str, content: Optional[str]):
+    """以傳入的內容重新提取單一檔案的值，取代 scan_project 結果中的舊值（編輯器整合）
+
+    content 為 None 表示檔案已刪除；之後的 collect_issues 以更新後的全部檔案判斷未定義的值
+    """
+    for key in ('colors', 'spacing', 'typography', 'borderRadius', 'shadows'):
+        results[key] = [v for v in results[key] if v['file'] != relative_path]
+    for comp_type, comp_list in results['components'].items():
+        results['components'][comp_type] = [c for c in comp_list if c['file'] != relative_path]
+    results['files_scanned'] = [f for f in results['files_scanned'] if f != relative_path]
+    if content is None:
+        return
+    
+    lines = LineIndex(content)
+    _add_file_values(results, relative_path, {key: extractor(content, lines) for key, extractor in EXTRACTORS.items()})
+
 def analyze_colors(colors: List[Dict], tokens: Dict) -> Dict[str, Any]:
     """分析顏色一致性"""
     # 統計顏色使用頻率
@@ -942,12 +998,135 @@ def generate_report(results: Dict, tokens: Dict) -> str:
     
     return report
 
+def save_report(results: Dict, tokens: Dict) -> Path:
+    """生成並儲存稽核報告"""
+    report = generate_report(results, tokens)
+    
+    # 確保 report 目錄存在
+    report_dir = PROJECT_ROOT / 'report'
+    report_dir.mkdir(exist_ok=True)
+    
+    # 儲存報告
+    report_path = report_dir / "DESIGN_SYSTEM_AUDIT_REPORT.md"
+    with open(report_path, 'w', encoding='utf-8') as f:
+        f.write(report)
+    return report_path
+
+def save_jsonl(results: Dict, tokens: Dict) -> Path:
+    """--format jsonl：逐筆寫出每一處不一致（issue 紀錄），最後寫出一致性分數與各類值數量的 summary"""
+    jsonl_path = PROJECT_ROOT / 'report' / 'design-system-audit.jsonl'
+    with JsonlWriter(jsonl_path, 'design-system-audit') as stream:
+        stream.write_all('issue', collect_issues(results, tokens))
+        stream.summary({
+            'timestamp': datetime.now().isoformat(),
+            'files_scanned': len(results['files_scanned']),
+            'values': {key: len(results[key])
+                       for key in ('colors', 'spacing', 'typography', 'borderRadius', 'shadows')},
+            'scores': calculate_consistency_score(results, tokens),
+        })
+    return jsonl_path
+
+def collect_issues(results: Dict, tokens: Dict) -> List[Issue]:
+    """報告列出的未定義顏色、未定義字體大小與非標準間距的每一處使用（--db 與 git 範圍模式共用）"""
+    undefined_colors = {c['color'] for c in analyze_colors(results['colors'], tokens)['undefined_colors']}
+    non_standard = {s['value'] for s in analyze_spacing(results['spacing'], tokens)['non_standard']}
+    undefined_sizes = {t['size'] for t in analyze_typography(results['typography'], tokens)['font_sizes']['undefined']}
+    
+    issues = []
+    for color in results['colors']:
+        if color['value'] in undefined_colors:
+            issues.append(Issue('undefined-color', 'warning', '未定義的顏色 {}', color['value'],
+                                file=color['file'], line=color.get('line')))
+    for spacing in results['spacing']:
+        if spacing['value'] in non_standard:
+            issues.append(Issue('non-standard-spacing', 'info', '非標準間距 {}: {}', spacing['property'],
+                                spacing['value'], file=spacing['file'], line=spacing.get('line')))
+    for typography in results['typography']:
+        if typography['property'] == 'font-size' and typography['value'] in undefined_sizes:
+            issues.append(Issue('undefined-font-size', 'warning', '未定義的字體大小 {}', typography['value'],
+                                file=typography['file'], line=typography.get('line')))
+    return issues
+
+def save_findings(results: Dict, tokens: Dict, db_path: Path):
+    """--db：逐處問題與一致性分數"""
+    scores = [(None, name, value) for name, value in calculate_consistency_score(results, tokens).items()]
+    record_findings(db_path, 'design-system-audit', collect_issues(results, tokens), scores, root=PROJECT_ROOT,
+                    summary={'files_scanned': len(results['files_scanned'])})
+
+def print_scoped_issues(results: Dict, tokens: Dict, scope: GitScope, limit: int = 30):
+    """--since / --staged：列出變更檔案中的問題（僅供參考，不影響退出碼）"""
+    issues = [issue for issue in collect_issues(results, tokens) if issue.file in scope]
+    print(f"\n🔀 git 範圍（{scope.describe()}）: {len(issues)} 處不一致")
+    for issue in issues[:limit]:
+        print(f"   • {issue.file}:{issue.line} [{issue.rule}] {issue.message}")
+    if len(issues) > limit:
+        print(f"   ... 還有 {len(issues) - limit} 處")
+
 def main():
     """主函數"""
+    parser = argparse.ArgumentParser(description='設計系統一致性稽核')
+    parser.add_argument('--no-cache', action='store_true', help='不使用 .cache/audits/ 的結果快取，全部重新分析')
+    parser.add_argument('--watch', action='store_true', help='完成後持續監看 src/，只重新提取異動檔案的值')
+    parser.add_argument('--format', choices=['markdown', 'jsonl'], default='markdown',
+                        help='結果格式：markdown（只輸出報告，預設）或 jsonl（另外逐筆寫出每一處不一致的 JSON Lines）')
+    parser.add_argument('--profile', action='store_true',
+                        help='記錄各階段與規則耗時，輸出到 report/profile/（搭配 --no-cache 才會量到快取命中的規則）')
+    parser.add_argument('--memprofile', action='store_true',
+                        help='以 tracemalloc 記錄各階段記憶體峰值、保留量與主要配置位置，輸出到 report/profile/')
+    parser.add_argument('--memprofile-depth', type=int, default=MEMORY_TRACE_DEPTH, metavar='N',
+                        help=f'tracemalloc 保留的呼叫層數（預設 {MEMORY_TRACE_DEPTH}，加深可追溯到稽核腳本行但較慢）')
+    parser.add_argument('--db', nargs='?', const=PROJECT_ROOT / "report" / DEFAULT_DB_NAME, type=Path, metavar='PATH',
+                        help=f'將問題與分數寫入 SQLite 資料庫（預設 report/{DEFAULT_DB_NAME}），以 findings.py 查詢')
+    parser.add_argument('--since', metavar='REV', help='只重新提取自 REV 以來（git diff）變更的檔案，其餘沿用快取')
+    parser.add_argument('--staged', action='store_true', help='同 --since，但範圍為 git 暫存區的變更（pre-commit 用）')
+    parser.add_argument('--shard', metavar='I/N',
+                        help='CI 分片：只提取 N 個分片中第 I 個分片的檔案，結果寫到 report/shards/（不產生報告）')
+    parser.add_argument('--merge-shards', action='store_true',
+                        help='合併 report/shards/ 中的全部分片後分析並產生報告，結果與單機執行相同')
+    args = parser.parse_args()
+    try:
+        scope = scope_from_args(PROJECT_ROOT, args.since, args.staged)
+        shard = shard_from_args(args.shard)
+    except ValueError as e:
+        parser.error(str(e))
+    if shard is not None and (args.merge_shards or args.watch):
+        parser.error('--shard 不能與 --merge-shards / --watch 同時使用')
+    if args.profile or args.memprofile:
+        PROFILER.enable('design-system-audit', timing=args.profile, memory=args.memprofile,
+                        memory_depth=args.memprofile_depth)
+        PROFILER.instrument(EXTRACTORS, list(EXTRACTORS))
+        PROFILER.instrument(globals(), ['load_design_tokens', 'analyze_colors', 'analyze_spacing',
+                                        'analyze_typography'], matches=None)
+    
+    index = ProjectIndex.shared(PROJECT_ROOT)
+    # 監看模式與分片（--shard / --merge-shards）下即使 --no-cache 也在記憶體保留各檔案的提取結果
+    cache = ResultCache(index, 'design-system-audit',
+                        enabled=not args.no_cache or args.watch or shard is not None or args.merge_shards,
+                        persist=not args.no_cache)
+    if scope is not None:
+        cache.limit_to(scope.changed)
+    report_dir = PROJECT_ROOT / "report"
+    if shard is not None:
+        print(f"🔍 開始掃描專案（分片 {shard}）...")
+        results, _ = scan_project(index, cache, shard)
+        cache.save()
+        print(f"✅ 掃描完成！共掃描 {len(results['files_scanned'])} 個檔案")
+        shard_path = save_shard(cache, shard, results['files_scanned'], report_dir)
+        print(f"✅ 分片 {shard} 的提取結果已保存: {shard_path}")
+        return
+    if args.merge_shards:
+        try:
+            print(f"🧩 已合併 {load_shards(cache, report_dir)} 個分片的提取結果")
+        except ValueError as e:
+            parser.error(str(e))
+    
     print("🔍 開始掃描專案...")
-    results, tokens = scan_project()
+    with PROFILER.phase('1. 掃描專案'):
+        results, tokens = scan_project(index, cache)
+        cache.save()
     
     print(f"✅ 掃描完成！共掃描 {len(results['files_scanned'])} 個檔案")
+    print(f"   {cache.summary()}")
     print(f"   - 顏色: {len(results['colors'])} 處")
     print(f"   - 間距: {len(results['spacing'])} 處")
     print(f"   - 字體: {len(results['typography'])} 處")
@@ -955,20 +1134,39 @@ def main():
     print(f"   - 陰影: {len(results['shadows'])} 處")
     
     print("\n📊 生成稽核報告...")
-    report = generate_report(results, tokens)
-    
-    # 確保 report 目錄存在
-    report_dir = PROJECT_ROOT / 'report'
-    report_dir.mkdir(exist_ok=True)
-    
-    # 儲存報告
-    report_path = report_dir / "DESIGN_SYSTEM_AUDIT_REPORT.md"
-    with open(report_path, 'w', encoding='utf-8') as f:
-        f.write(report)
+    with PROFILER.phase('2. 生成報告'):
+        report_path = save_report(results, tokens)
+        jsonl_path = save_jsonl(results, tokens) if args.format == 'jsonl' else None
     
     print(f"✅ 報告已儲存至: {report_path}")
-    print(f"\n📈 總體一致性分數: {calculate_consistency_score(results, tokens)['overall']}/100")
+    if jsonl_path is not None:
+        print(f"✅ JSON Lines 已儲存至: {jsonl_path}")
+    with PROFILER.phase('3. 一致性評分'):
+        score = calculate_consistency_score(results, tokens)['overall']
+    print(f"\n📈 總體一致性分數: {score}/100")
+    
+    if args.db:
+        save_findings(results, tokens, args.db)
+    
+    if scope is not None:
+        print_scoped_issues(results, tokens, scope)
+    
+    if args.profile or args.memprofile:
+        PROFILER.finish(PROJECT_ROOT / "report" / "profile")
+    
+    if args.watch:
+        def reaudit(changed: List[str]) -> str:
+            cache.invalidate(changed)
+            cache.reset_stats()
+            results, tokens = scan_project(index, cache)
+            cache.save()
+            save_report(results, tokens)
+            if args.format == 'jsonl':
+                save_jsonl(results, tokens)
+            score = calculate_consistency_score(results, tokens)['overall']
+            return f"{len(results['files_scanned'])} 個檔案，一致性分數 {score}/100，{cache.summary()}"
+        
+        watch_loop(index, reaudit, roots=[SRC_DIR])
 
 if __name__ == '__main__':
     main()
-
@@ -6,9 +6,14 @@
 
 import os
 import re
+import argparse
 from pathlib import Path
 from collections import defaultdict
-from typing import Set, Dict, List, Tuple
+from typing import Set, Dict, List, Tuple, Optional
+
+from auditkit import (DEFAULT_DB_NAME, MISSING, MEMORY_TRACE_DEPTH, PROFILER, SHARD_DIR, Issue, JsonlWriter,
+                      ProjectIndex, ResultCache, Shard, load_shards, record_findings, save_shard, shard_from_args,
+                      watch_loop)
 
 # 排除的目錄和檔案
 EXCLUDE_DIRS = {
@@ -36,6 +41,11 @@ REQUIRED_FILES = {
     '.stylelintrc.json',  # 樣式檢查配置
 }
 
+# 結果快取的規則版本：修改 _extract_from_content 時請遞增
+CACHE_RULE_VERSIONS = {
+    'references': 1,
+}
+
 # 需要手動檢查的檔案（可能是誤報）
 MANUAL_REVIEW_FILES = {
     'src/_data/',  # 數據檔案可能被 Eleventy 使用
@@ -43,11 +53,15 @@ MANUAL_REVIEW_FILES = {
 }
 
 class UnusedFileFinder:
-    def __init__(self, project_root: str):
+    def __init__(self, project_root: str, index: Optional[ProjectIndex] = None,
+                 use_cache: bool = True, watch: bool = False, sharding: bool = False):
         self.project_root = Path(project_root).resolve()
+        self.index = index or ProjectIndex.shared(self.project_root)
+        # 監看模式與分片（--shard / --merge-shards）下即使 --no-cache 也在記憶體保留各檔案的引用集合
+        self.cache = ResultCache(self.index, 'find-unused-files', enabled=use_cache or watch or sharding,
+                                 persist=use_cache)
         self.all_files: Dict[str, Path] = {}
         self.references: Set[str] = set()
-        self.file_content_cache: Dict[Path, str] = {}
         
     def should_skip(self, path: Path) -> bool:
         """判斷是否應該跳過此路徑"""
@@ -70,83 +84,93 @@ class UnusedFileFinder:
         """收集所有要檢查的檔案"""
         print("📁 掃描專案檔案...")
         
-        for root, dirs, files in os.walk(self.project_root):
-            # 過濾排除的目錄
-            dirs[:] = [d for d in dirs if d not in EXCLUDE_DIRS]
+        # 排除的目錄在共用索引中過濾，不再重新走訪
+        for entry in self.index.files(exclude_dirs=EXCLUDE_DIRS):
+            file_path = entry.path
             
-            for file in files:
-                file_path = Path(root) / file
-                rel_path = file_path.relative_to(self.project_root)
-                
-                if self.should_skip(file_path):
-                    continue
-                
-                # 只收集資源檔案和模板檔案
-                ext = file_path.suffix.lower()
-                if ext in IMAGE_EXTENSIONS | CODE_EXTENSIONS | TEMPLATE_EXTENSIONS | DATA_EXTENSIONS:
-                    # 使用相對路徑作為 key
-                    key = str(rel_path).replace('\\', '/')
-                    self.all_files[key] = file_path
+            if self.should_skip(file_path):
+                continue
+            # --shard 寫出的部分結果是稽核腳本的輸出，不列入比對
+            if entry.rel.startswith(f"report/{SHARD_DIR}/"):
+                continue
+            
+            # 只收集資源檔案和模板檔案
+            ext = file_path.suffix.lower()
+            if ext in IMAGE_EXTENSIONS | CODE_EXTENSIONS | TEMPLATE_EXTENSIONS | DATA_EXTENSIONS:
+                # 使用相對路徑作為 key
+                self.all_files[entry.rel] = file_path
         
         print(f"   找到 {len(self.all_files)} 個檔案")
     
     def read_file_content(self, file_path: Path) -> str:
-        """讀取檔案內容（帶快取）"""
-        if file_path not in self.file_content_cache:
-            try:
-                with open(file_path, 'r', encoding='utf-8', errors='ignore') as f:
-                    self.file_content_cache[file_path] = f.read()
-            except Exception as e:
-                print(f"   警告: 無法讀取 {file_path}: {e}")
-                return ""
-        return self.file_content_cache[file_path]
+        """讀取檔案內容（由共用索引快取）"""
+        try:
+            return self.index.read_text(file_path, errors='ignore')
+        except Exception as e:
+            print(f"   警告: 無法讀取 {file_path}: {e}")
+            return ""
     
-    def extract_references(self):
-        """從所有檔案中提取引用"""
+    def extract_references(self, shard: Optional[Shard] = None) -> List[str]:
+        """從所有檔案（指定 shard 時只有分片內的檔案）中提取引用，回傳提取過的檔案"""
         print("🔍 分析檔案引用...")
         
+        extracted = []
         for rel_path, file_path in self.all_files.items():
             ext = file_path.suffix.lower()
+            if shard is not None and not shard.owns(rel_path):
+                continue
             
             # 讀取模板、程式碼和數據檔案來找引用
             if ext in TEMPLATE_EXTENSIONS | CODE_EXTENSIONS | DATA_EXTENSIONS:
-                content = self.read_file_content(file_path)
-                self._extract_from_content(content, file_path)
+                entry = self.index.get(rel_path)
+                version = CACHE_RULE_VERSIONS['references']
+                refs = self.cache.get(entry, 'references', version)
+                if refs is MISSING:
+                    content = self.read_file_content(file_path)
+                    refs = sorted(self._extract_from_content(content, file_path))
+                    self.cache.put(entry, 'references', version, refs)
+                self.references.update(refs)
+                extracted.append(rel_path)
+        
+        self.cache.save()
+        print(f"   {self.cache.summary()}")
+        return extracted
     
-    def _extract_from_content(self, content: str, source_file: Path):
+    def _extract_from_content(self, content: str, source_file: Path) -> Set[str]:
         """從內容中提取所有可能的檔案引用"""
+        refs: Set[str] = set()
         
         # 1. r2img filter 引用: 'portfolio/xxx.jpg' | r2img
         r2img_pattern = r"['\"]([^'\"]+\.(jpg|jpeg|png|gif|webp|svg))['\"]\s*\|\s*r2img"
         for match in re.finditer(r2img_pattern, content, re.IGNORECASE):
             ref = match.group(1)
-            self.references.add(ref)
+            refs.add(ref)
             # 也加入 assets/images/ 前綴的版本
-            self.references.add(f"assets/images/{ref}")
+            refs.add(f"assets/images/{ref}")
         
         # 2. 直接路徑引用: /assets/images/xxx.jpg 或 assets/images/xxx.jpg
         direct_path_pattern = r"['\"](/?assets/images/[^'\"]+\.(jpg|jpeg|png|gif|webp|svg))['\"]"
         for match in re.finditer(direct_path_pattern, content, re.IGNORECASE):
             ref = match.group(1).lstrip('/')
-            self.references.add(ref)
+            refs.add(ref)
             # 移除 assets/images/ 前綴，保留相對路徑
             if ref.startswith('assets/images/'):
-                self.references.add(ref.replace('assets/images/', ''))
+                refs.add(ref.replace('assets/images/', ''))
         
         url_pattern = r"url\(['\"]?([^)'\"]+\.(jpg|jpeg|png|gif|webp|svg|css))['\"]?\)"
         for match in re.finditer(url_pattern, content, re.IGNORECASE):
             ref = match.group(1).lstrip('/')
-            self.references.add(ref)
+            refs.add(ref)
             if ref.startswith('assets/'):
-                self.references.add(ref.replace('assets/', ''))
+                refs.add(ref.replace('assets/', ''))
         
         # 4. JS/CSS 引用: <script src="/assets/js/main.js">
         script_pattern = r"(src|href)=['\"]([^'\"]+\.(js|css|mjs))['\"]"
         for match in re.finditer(script_pattern, content, re.IGNORECASE):
             ref = match.group(2).lstrip('/')
-            self.references.add(ref)
+            refs.add(ref)
             if ref.startswith('assets/'):
-                self.references.add(ref.replace('assets/', ''))
+                refs.add(ref.replace('assets/', ''))
         
         # 5. 模板引用: {% include "partials/navigation.njk" %}
         include_pattern = r"(include|extends|import)\s+['\"]([^'\"]+\.njk)['\"]"
@@ -156,32 +180,34 @@ class UnusedFileFinder:
             if not ref.startswith('/'):
                 # 嘗試從 source_file 計算相對路徑
                 if 'partials' in ref or 'macros' in ref:
-                    self.references.add(f"src/_includes/{ref}")
+                    refs.add(f"src/_includes/{ref}")
                 else:
-                    self.references.add(f"src/{ref}")
+                    refs.add(f"src/{ref}")
             else:
-                self.references.add(ref.lstrip('/'))
+                refs.add(ref.lstrip('/'))
         
         js_string_pattern = r"['\"](portfolio/[^'\"]+\.(jpg|jpeg|png|gif|webp|svg))['\"]"
         for match in re.finditer(js_string_pattern, content, re.IGNORECASE):
             ref = match.group(1)
-            self.references.add(ref)
-            self.references.add(f"assets/images/{ref}")
+            refs.add(ref)
+            refs.add(f"assets/images/{ref}")
         
         # 7. JSON 檔案中的路徑引用
         json_path_pattern = r"['\"]([^'\"]+\.(jpg|jpeg|png|gif|webp|svg|js|css))['\"]"
         if source_file.suffix.lower() == '.json':
             for match in re.finditer(json_path_pattern, content, re.IGNORECASE):
                 ref = match.group(1)
-                self.references.add(ref)
+                refs.add(ref)
                 if not ref.startswith('http'):
                     if ref.startswith('/'):
-                        self.references.add(ref.lstrip('/'))
+                        refs.add(ref.lstrip('/'))
                     else:
-                        self.references.add(f"assets/{ref}")
-                        self.references.add(f"src/assets/{ref}")
+                        refs.add(f"assets/{ref}")
+                        refs.add(f"src/assets/{ref}")
         
         # 這個比較複雜，暫時跳過，因為資料檔案通常都會被使用
+        
+        return refs
     
     def normalize_path(self, file_path: str) -> List[str]:
         """將檔案路徑標準化為多種可能的引用格式"""
@@ -211,8 +237,8 @@ class UnusedFileFinder:
         
         return variants
     
-    def find_unused_files(self) -> Dict[str, List[Tuple[str, Path]]]:
-        """找出未使用的檔案"""
+    def find_unused_files(self, stream: Optional[JsonlWriter] = None) -> Dict[str, List[Tuple[str, Path]]]:
+        """找出未使用的檔案（指定 stream 時每找到一個即寫出一筆 file 紀錄）"""
         print("🔎 比對檔案與引用...")
         
         unused = defaultdict(list)
@@ -238,17 +264,18 @@ class UnusedFileFinder:
                 # 模板檔案可能通過 Eleventy 的檔案系統自動使用
                 # 檢查是否在 src/ 目錄下（會被 Eleventy 處理）
                 if str(rel_path).startswith('src/') and not str(rel_path).startswith('src/_includes/'):
-                    # 檢查是否有 permalink（表示是有效頁面）
-                    try:
-                        content = self.read_file_content(file_path)
-                        if 'permalink:' in content or 'permalink =' in content:
-                            is_referenced = True
-                        # 頁面模板通常會被使用（除非是明確的測試檔案）
-                        elif 'test' not in rel_path.lower() and 'example' not in rel_path.lower():
-                            is_referenced = True
-                    except:
-                        # 如果無法讀取，保守處理，視為已使用
+                    # 頁面模板通常會被使用（除非是明確的測試檔案）
+                    if 'test' not in rel_path.lower() and 'example' not in rel_path.lower():
                         is_referenced = True
+                    else:
+                        # 測試檔案只有在設定 permalink 時才視為有效頁面
+                        try:
+                            content = self.read_file_content(file_path)
+                            if 'permalink:' in content or 'permalink =' in content:
+                                is_referenced = True
+                        except:
+                            # 如果無法讀取，保守處理，視為已使用
+                            is_referenced = True
             
             # 必須保留的檔案（配置和構建腳本）
             if rel_path in REQUIRED_FILES or file_path.name in REQUIRED_FILES:
@@ -265,6 +292,12 @@ class UnusedFileFinder:
             if not is_referenced:
                 category = self._categorize_file(rel_path, ext)
                 unused[category].append((rel_path, file_path))
+                if stream is not None:
+                    try:
+                        size = file_path.stat().st_size
+                    except OSError:
+                        size = None
+                    stream.write('file', {'file': rel_path, 'category': category, 'size': size})
         
         return unused
     
@@ -379,25 +412,120 @@ class UnusedFileFinder:
         print(f"\n💡 清理腳本已生成: {script_path}")
         print("   請檢查報告後，手動執行清理腳本")
     
-    def run(self):
-        """執行完整分析流程"""
+    def run(self, stream: Optional[JsonlWriter] = None):
+        """執行完整分析流程（指定 stream 時逐筆寫出未使用的檔案，最後寫出各分類數量的 summary）"""
         print("🚀 開始分析未使用檔案...\n")
-        
-        self.collect_files()
-        self.extract_references()
-        unused = self.find_unused_files()
-        self.generate_report(unused)
+        self.all_files = {}
+        self.references = set()
+        self.cache.reset_stats()
+        
+        with PROFILER.phase('1. 收集檔案'):
+            self.collect_files()
+        with PROFILER.phase('2. 提取引用'):
+            self.extract_references()
+        with PROFILER.phase('3. 比對未使用檔案'):
+            unused = self.find_unused_files(stream)
+        with PROFILER.phase('4. 生成報告'):
+            self.generate_report(unused)
+            if stream is not None:
+                stream.summary({
+                    'total_unused': sum(len(files) for files in unused.values()),
+                    'categories': {category: len(files) for category, files in sorted(unused.items())},
+                })
         
         return unused
+    
+    def run_shard(self, shard: Shard) -> List[str]:
+        """--shard：只提取分片內檔案的引用（結果留在結果快取），不比對也不產生報告，回傳提取過的檔案"""
+        print(f"🚀 分析檔案引用（分片 {shard}）...\n")
+        self.all_files = {}
+        self.references = set()
+        self.cache.reset_stats()
+        
+        self.collect_files()
+        return self.extract_references(shard)
+
+def save_findings(unused: Dict[str, List[Tuple[str, Path]]], db_path: Path, project_root: Path):
+    """--db：每個未使用的檔案一筆問題（規則為檔案分類）"""
+    issues = [Issue(f"unused-{category.replace('_', '-')}", 'info', '檔案未被任何程式碼或內容引用', file=str(rel_path))
+              for category, files in unused.items() for rel_path, _ in files]
+    record_findings(db_path, 'find-unused-files', issues, root=project_root,
+                    summary={category: len(files) for category, files in unused.items()})
+
+def run_and_save(finder: UnusedFileFinder, output_format: str, report_dir: Path):
+    """執行分析；jsonl 格式另外將未使用的檔案逐筆寫到 report/find-unused-files.jsonl"""
+    if output_format != 'jsonl':
+        return finder.run()
+    jsonl_path = report_dir / 'find-unused-files.jsonl'
+    with JsonlWriter(jsonl_path, 'find-unused-files') as stream:
+        unused = finder.run(stream)
+    print(f"💾 JSON Lines 已保存: {jsonl_path}")
+    return unused
 
 def main():
     """主函數"""
+    parser = argparse.ArgumentParser(description='找出專案中未使用的檔案')
+    parser.add_argument('--no-cache', action='store_true', help='不使用 .cache/audits/ 的結果快取，全部重新分析')
+    parser.add_argument('--watch', action='store_true', help='完成後持續監看專案，只重新分析異動檔案的引用')
+    parser.add_argument('--format', choices=['text', 'jsonl'], default='text',
+                        help='結果格式：text（終端報告與清理腳本，預設）或 jsonl（另外逐筆寫出未使用檔案的 JSON Lines）')
+    parser.add_argument('--profile', action='store_true',
+                        help='記錄各階段耗時，輸出到 report/profile/（搭配 --no-cache 才會量到快取命中的檔案）')
+    parser.add_argument('--memprofile', action='store_true',
+                        help='以 tracemalloc 記錄各階段記憶體峰值、保留量與主要配置位置，輸出到 report/profile/')
+    parser.add_argument('--memprofile-depth', type=int, default=MEMORY_TRACE_DEPTH, metavar='N',
+                        help=f'tracemalloc 保留的呼叫層數（預設 {MEMORY_TRACE_DEPTH}，加深可追溯到稽核腳本行但較慢）')
+    parser.add_argument('--db', nargs='?', const=Path(__file__).parent.parent / 'report' / DEFAULT_DB_NAME, type=Path,
+                        metavar='PATH',
+                        help=f'將未使用的檔案寫入 SQLite 資料庫（預設 report/{DEFAULT_DB_NAME}），以 findings.py 查詢')
+    parser.add_argument('--shard', metavar='I/N',
+                        help='CI 分片：只提取 N 個分片中第 I 個分片的檔案引用，結果寫到 report/shards/（不產生報告）')
+    parser.add_argument('--merge-shards', action='store_true',
+                        help='合併 report/shards/ 中的全部分片後比對未使用的檔案並產生報告，結果與單機執行相同')
+    args = parser.parse_args()
+    try:
+        shard = shard_from_args(args.shard)
+    except ValueError as e:
+        parser.error(str(e))
+    if shard is not None and (args.merge_shards or args.watch):
+        parser.error('--shard 不能與 --merge-shards / --watch 同時使用')
+    if args.profile or args.memprofile:
+        PROFILER.enable('find-unused-files', timing=args.profile, memory=args.memprofile,
+                        memory_depth=args.memprofile_depth)
+    
     # 獲取專案根目錄（腳本所在目錄的父目錄）
     script_dir = Path(__file__).parent
     project_root = script_dir.parent
     
-    finder = UnusedFileFinder(project_root)
-    unused = finder.run()
+    finder = UnusedFileFinder(project_root, use_cache=not args.no_cache, watch=args.watch,
+                              sharding=shard is not None or args.merge_shards)
+    report_dir = project_root / 'report'
+    if shard is not None:
+        shard_path = save_shard(finder.cache, shard, finder.run_shard(shard), report_dir)
+        print(f"✅ 分片 {shard} 的引用已保存: {shard_path}")
+        return 0
+    if args.merge_shards:
+        try:
+            print(f"🧩 已合併 {load_shards(finder.cache, report_dir)} 個分片的檔案引用\n")
+        except ValueError as e:
+            parser.error(str(e))
+    unused = run_and_save(finder, args.format, report_dir)
+    
+    if args.db:
+        save_findings(unused, args.db, project_root)
+    
+    if args.profile or args.memprofile:
+        PROFILER.finish(project_root / 'report' / 'profile')
+    
+    if args.watch:
+        def reaudit(changed: List[str]) -> str:
+            finder.cache.invalidate(changed)
+            unused = run_and_save(finder, args.format, report_dir)
+            return f"未使用檔案 {sum(len(files) for files in unused.values())} 個，{finder.cache.summary()}"
+        
+        # 報告與清理腳本是本腳本的輸出，不觸發重新分析
+        watch_loop(finder.index, reaudit,
+                   ignore=[project_root / 'report', script_dir / 'cleanup-unused-files.sh'])
     
     # 返回退出碼
     total_unused = sum(len(files) for files in unused.values())
@@ -0,0 +1,181 @@
+#!/usr/bin/env python3
+"""
+稽核發現查詢
+查詢各稽核腳本以 --db 寫入的 SQLite 資料庫（預設 report/findings.db），
+不必重新解析大型 JSON 報告就能比較兩次執行
+
+用法:
+    python3 scripts/findings.py runs                          # 最近的執行
+    python3 scripts/findings.py new                           # 各工具最近一次執行新增的問題
+    python3 scripts/findings.py fixed --tool design-system-audit
+    python3 scripts/findings.py regressions --limit 10        # 分數退步最多的頁面 / 檔案與問題增加最多的規則
+    python3 scripts/findings.py first-seen --rule title       # 問題首次出現的執行與 commit
+    python3 scripts/findings.py new --run 12 --base 8 --json  # 指定兩次執行，輸出 JSON
+"""
+
+import argparse
+import json
+import sqlite3
+import sys
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+from auditkit import DEFAULT_DB_NAME, FindingsStore
+
+# 專案根目錄
+PROJECT_ROOT = Path(__file__).parent.parent
+DEFAULT_DB = PROJECT_ROOT / "report" / DEFAULT_DB_NAME
+
+SEVERITY_ICONS = {'critical': '🔴', 'high': '🔴', 'warning': '⚠️ ', 'medium': '⚠️ ', 'low': 'ℹ️ ', 'info': 'ℹ️ '}
+
+
+def describe_run(row: Optional[sqlite3.Row]) -> str:
+    if row is None:
+        return '（無）'
+    commit = f" @ {row['git_commit'][:10]}" if row['git_commit'] else ''
+    return f"#{row['id']} {row['started_at']}{commit}"
+
+
+def print_issues(rows: List[sqlite3.Row], limit: int):
+    for row in rows[:limit]:
+        icon = SEVERITY_ICONS.get(row['severity'], '• ')
+        location = row['path'] or '（專案）'
+        if row['line']:
+            location += f":{row['line']}"
+        print(f"   {icon} [{row['rule']}] {location} - {row['message']}")
+    if len(rows) > limit:
+        print(f"   ... 還有 {len(rows) - limit} 筆")
+
+
+def selected_tools(store: FindingsStore, args: argparse.Namespace) -> List[str]:
+    tools = [args.tool] if args.tool else store.tools()
+    if (args.run is not None or args.base is not None) and len(tools) > 1:
+        # 指定執行編號時以該執行的工具為準
+        row = store.run(args.run if args.run is not None else args.base)
+        tools = [row['tool']] if row else []
+    return tools
+
+
+def cmd_runs(store: FindingsStore, args: argparse.Namespace) -> List[Dict[str, Any]]:
+    rows = store.runs(args.tool, args.limit)
+    if not args.json:
+        print(f"🗄️  最近 {len(rows)} 次執行:")
+        for row in rows:
+            print(f"   {describe_run(row):<45} {row['tool']:<30} {row['issue_count']:>6} 筆問題")
+    return [dict(row) for row in rows]
+
+
+def cmd_diff(store: FindingsStore, args: argparse.Namespace) -> List[Dict[str, Any]]:
+    """new / fixed"""
+    output = []
+    for tool in selected_tools(store, args):
+        run_id, base_id = store.resolve_runs(tool, args.run, args.base)
+        if run_id is None:
+            continue
+        if args.command == 'new':
+            rows = store.new_issues(run_id, base_id)
+            title = '新增的問題'
+        else:
+            rows = store.fixed_issues(run_id, base_id)
+            title = '已修復的問題'
+        if args.severity:
+            rows = [row for row in rows if row['severity'] in args.severity]
+        output.append({'tool': tool, 'run': run_id, 'base': base_id, 'issues': [dict(row) for row in rows]})
+        if not args.json:
+            print(f"\n📋 {tool}: {title} {len(rows)} 筆"
+                  f"（{describe_run(store.run(run_id))} 對比 {describe_run(store.run(base_id) if base_id else None)}）")
+            print_issues(rows, args.limit)
+    return output
+
+
+def cmd_regressions(store: FindingsStore, args: argparse.Namespace) -> List[Dict[str, Any]]:
+    output = []
+    for tool in selected_tools(store, args):
+        run_id, base_id = store.resolve_runs(tool, args.run, args.base)
+        if run_id is None or base_id is None:
+            continue
+        scores = store.score_regressions(run_id, base_id, args.limit)
+        rules = store.rule_regressions(run_id, base_id, args.limit)
+        output.append({'tool': tool, 'run': run_id, 'base': base_id,
+                       'scores': [dict(row) for row in scores], 'rules': [dict(row) for row in rules]})
+        if args.json:
+            continue
+        print(f"\n📉 {tool}（{describe_run(store.run(run_id))} 對比 {describe_run(store.run(base_id))}）")
+        if not scores and not rules:
+            print("   沒有退步 ✅")
+        for row in scores:
+            print(f"   {row['delta']:+7.1f}  {row['path'] or '（專案）'} {row['name']}: "
+                  f"{row['before']:g} → {row['after']:g}")
+        for row in rules:
+            print(f"   {row['delta']:+7d}  規則 {row['rule']}: {row['before']} → {row['after']} 筆")
+    return output
+
+
+def cmd_first_seen(store: FindingsStore, args: argparse.Namespace) -> List[Dict[str, Any]]:
+    output = []
+    for tool in selected_tools(store, args):
+        run_id, _ = store.resolve_runs(tool, args.run)
+        if run_id is None:
+            continue
+        rows = store.first_seen(run_id, args.rule, args.file)
+        output.append({'tool': tool, 'run': run_id, 'issues': [dict(row) for row in rows]})
+        if args.json:
+            continue
+        print(f"\n🕰️  {tool}: {len(rows)} 筆問題（{describe_run(store.run(run_id))}）")
+        for row in rows[:args.limit]:
+            commit = f" @ {row['first_commit'][:10]}" if row['first_commit'] else ''
+            print(f"   #{row['first_run']} {row['first_seen']}{commit}  [{row['rule']}] "
+                  f"{row['path'] or '（專案）'} - {row['message']}")
+        if len(rows) > args.limit:
+            print(f"   ... 還有 {len(rows) - args.limit} 筆")
+    return output
+
+
+def cmd_prune(store: FindingsStore, args: argparse.Namespace) -> List[Dict[str, Any]]:
+    for tool in selected_tools(store, args):
+        store.prune(tool, args.keep)
+    if not args.json:
+        print(f"🧹 每個工具只保留最近 {args.keep} 次執行")
+    return []
+
+
+COMMANDS = {
+    'runs': (cmd_runs, '列出最近的執行'),
+    'new': (cmd_diff, '新增的問題（預設為各工具最近一次對比前一次）'),
+    'fixed': (cmd_diff, '已修復的問題'),
+    'regressions': (cmd_regressions, '分數退步最多的項目與問題數增加最多的規則'),
+    'first-seen': (cmd_first_seen, '目前各問題首次出現的執行'),
+    'prune': (cmd_prune, '刪除舊的執行'),
+}
+
+
+def main():
+    """主函數"""
+    parser = argparse.ArgumentParser(description='查詢稽核發現資料庫（各稽核腳本以 --db 寫入）')
+    parser.add_argument('command', choices=list(COMMANDS),
+                        help='; '.join(f'{name}: {text}' for name, (_, text) in COMMANDS.items()))
+    parser.add_argument('--db', type=Path, default=DEFAULT_DB, help=f'資料庫路徑（預設 report/{DEFAULT_DB_NAME}）')
+    parser.add_argument('--tool', help='只查詢指定的稽核腳本（例如 comprehensive-seo-audit）')
+    parser.add_argument('--run', type=int, help='目前執行的編號（預設最近一次）')
+    parser.add_argument('--base', type=int, help='比較基準的執行編號（預設 --run 的前一次）')
+    parser.add_argument('--severity', action='append', help='只列出指定嚴重度的問題（可重複指定）')
+    parser.add_argument('--rule', help='first-seen：只列出指定規則')
+    parser.add_argument('--file', help='first-seen：只列出路徑包含此字串的檔案')
+    parser.add_argument('--keep', type=int, default=20, help='prune：每個工具保留的執行數（預設 20）')
+    parser.add_argument('--limit', type=int, default=30, help='每個工具最多列出的筆數（預設 30）')
+    parser.add_argument('--json', action='store_true', help='以 JSON 輸出')
+    args = parser.parse_args()
+
+    if not args.db.exists():
+        print(f"❌ 找不到資料庫 {args.db}，請先以 --db 執行稽核腳本")
+        return 1
+    with FindingsStore(args.db) as store:
+        handler, _ = COMMANDS[args.command]
+        output = handler(store, args)
+    if args.json:
+        print(json.dumps(output, ensure_ascii=False, indent=2))
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -10,6 +10,8 @@ from pathlib import Path
 from collections import defaultdict
 from typing import Dict, List, Tuple
 
+from auditkit import LineIndex
+
 # 專案根目錄
 PROJECT_ROOT = Path(__file__).parent.parent
 SRC_DIR = PROJECT_ROOT / "src"
@@ -86,14 +88,13 @@ def find_color_occurrences(color: str) -> List[Dict]:
                 with open(file_path, 'r', encoding='utf-8') as f:
                     content = f.read()
                     relative_path = file_path.relative_to(PROJECT_ROOT)
+                    lines = LineIndex(content)
                     
                     # 查找顏色（不區分大小寫）
                     pattern = re.escape(color)
                     for match in re.finditer(pattern, content, re.IGNORECASE):
                         # 獲取上下文
-                        start = max(0, match.start() - 30)
-                        end = min(len(content), match.end() + 30)
-                        context = content[start:end]
+                        context = lines.context(match.start(), match.end(), 30)
                         
                         # 檢查是否在第三方嵌入代碼中
                         if 'instagram-media' in context.lower() or 'data-instgrm' in context.lower():
@@ -101,7 +102,7 @@ def find_color_occurrences(color: str) -> List[Dict]:
                         
                         occurrences.append({
                             'file': str(relative_path),
-                            'line': content[:match.start()].count('\n') + 1,
+                            'line': lines.line_of(match.start()),
                             'context': context,
                             'match': match.group(0)
                         })
@@ -8,6 +8,8 @@ import re
 from pathlib import Path
 from typing import Dict, List
 
+from auditkit import LineIndex
+
 # 專案根目錄
 PROJECT_ROOT = Path(__file__).parent.parent
 SRC_DIR = PROJECT_ROOT / "src"
@@ -35,6 +37,7 @@ def find_migration_opportunities(file_path: Path) -> List[Dict]:
             content = f.read()
         
         opportunities = []
+        lines = LineIndex(content)
         
         for pattern_info in MIGRATION_PATTERNS:
             pattern = re.compile(pattern_info['pattern'])
@@ -42,8 +45,8 @@ def find_migration_opportunities(file_path: Path) -> List[Dict]:
             
             if matches:
                 for match in matches:
-                    line_num = content[:match.start()].count('\n') + 1
-                    context = content[max(0, match.start()-50):match.end()+50]
+                    line_num = lines.line_of(match.start())
+                    context = lines.context(match.start(), match.end(), 50)
                     
                     opportunities.append({
                         'file': str(file_path.relative_to(PROJECT_ROOT)),
@@ -7,146 +7,259 @@
 import os
 import re
 import json
+import argparse
 from pathlib import Path
-from typing import Dict, List, Tuple, Any
+from typing import Dict, List, Tuple, Any, Optional
 from collections import defaultdict
 import sys
 
+from auditkit import (DEFAULT_DB_NAME, MISSING, MEMORY_TRACE_DEPTH, PROFILER, GitScope, Issue, JsonlWriter,
+                      ProjectIndex, ResultCache, Rule, RuleSet, Shard, issue_json, load_shards, parse_rule_ids,
+                      read_jsonl, record_findings, save_shard, scope_from_args, shard_from_args, watch_loop)
+
+# 监看模式内存缓存的版本
+FILE_CACHE_VERSION = '2'
+
+# --profile 计时的检查阶段与单文件检查（RULES 内的各条规则由 RuleSet 计时并计数）
+PROFILED_PHASES = ['_check_viewport_meta', '_check_html_files', '_check_css_files', '_check_njk_files']
+PROFILED_RULES = ['_check_file_responsive', '_check_css_responsive']
+
+# 常见的断点值和容器宽度（CSS 固定宽度检查不报告）
+COMMON_BREAKPOINTS = {320, 375, 390, 414, 768, 900, 992, 993, 1024, 1140, 1200, 1400}
+
+# 按钮/链接上确保触摸目标的 padding 类
+PADDING_CLASS = re.compile(r'p-\d+|px-\d+|py-\d+')
+
+# 媒体查询块（CSS 固定宽度检查前移除）
+MEDIA_BLOCK = re.compile(r'@media[^{]*\{[^}]*\}', re.DOTALL)
+
+# 检查 viewport 设置的布局文件，以及 HTML 检查排除的构建输出目录
+VIEWPORT_LAYOUT = "src/_includes/base-layout.njk"
+HTML_EXCLUDE_DIRS = {"_site", "node_modules", ".git", "dist", "build"}
+
+
+def _is_small_touch_target(m: re.Match) -> bool:
+    element = m.group(0)
+    return "min-w" not in element and "min-h" not in element and not PADDING_CLASS.search(element)
+
+
+# 文件检查规则（规则 ID 即问题类型），按声明顺序执行；html / njk 由 _check_file_responsive、css 由 _check_css_responsive 检查
+RULES = RuleSet([
+    # 内联样式中的固定宽度
+    Rule("fixed-width", r'style="[^"]*width:\s*(\d+)px', "warning",
+         "内联样式中发现固定宽度: {0}px，建议使用响应式类", file_types={"html", "njk"}, mode="each",
+         where=lambda m: 400 < int(m.group(1)) < 2000),
+    # 大字体没有响应式断点
+    Rule("large-text-no-breakpoint", r'text-(5xl|6xl|7xl|8xl|9xl)(?!\s+md:|sm:)', "warning",
+         "发现大字体类 {0} 没有移动端断点", file_types={"njk"}, mode="first"),
+    # 固定 padding/margin（只看第一个间距类）
+    Rule("large-spacing-no-breakpoint", r'(p|m|px|py|pt|pb|pl|pr|mx|my|mt|mb|ml|mr)-(\d+)(?!\s+md:|sm:)', "info",
+         "大间距值建议添加移动端断点", file_types={"njk"}, mode="first", where=lambda m: int(m.group(2)) > 8),
+    # 触摸目标大小
+    Rule("touch-target-size", [r'<button[^>]*>', r'<a[^>]*class="[^"]*btn[^"]*"[^>]*>'], "warning",
+         "按钮/链接可能触摸目标太小（建议至少44x44px）", file_types={"njk"}, flags=re.IGNORECASE, mode="each",
+         where=_is_small_touch_target),
+    # 水平滚动风险（已设置 overflow 的文件不检查）
+    Rule("overflow-risk", r'(w-\[.*?\]|width:\s*\d+px|min-width:\s*\d+px)', "warning",
+         "可能存在水平滚动风险，建议添加overflow-x: hidden", file_types={"html", "njk"},
+         absent=("overflow-x", "overflow-hidden")),
+    # 移动端隐藏的元素
+    Rule("mobile-hidden", r'hidden\s+(?!md:|lg:)(sm:|)', "info",
+         "发现移动端隐藏的元素，请确认是否合理", file_types={"html", "njk"}),
+    # 缺少移动端媒体查询
+    Rule("no-mobile-breakpoints", r'@media\s+([^{]+)\{', "warning",
+         "CSS文件中缺少移动端媒体查询", file_types={"css"}, mode="none",
+         where=lambda m: "max-width" in m.group(1)),
+    # 固定宽度（排除媒体查询中的断点，且不检查 max-width / min-width）
+    Rule("css-fixed-width", r'(?<!max-)(?<!min-)width:\s*(\d+)px(?!\s*\/\*)', "warning",
+         "CSS中发现固定宽度: {0}px，可能影响移动端显示", file_types={"css"}, mode="each",
+         view="without_media", where=lambda m: int(m.group(1)) > 400 and int(m.group(1)) not in COMMON_BREAKPOINTS),
+    # 触摸目标最小尺寸
+    Rule("touch-target-too-small", r'min-(width|height):\s*(\d+)px', "critical",
+         "{0} 最小尺寸 {1}px 小于WCAG建议的44px", file_types={"css"}, mode="each",
+         where=lambda m: int(m.group(2)) < 44),
+    # 字体大小
+    Rule("font-too-small", r'font-size:\s*(\d+(?:\.\d+)?)px', "warning",
+         "字体大小 {0}px 可能在小屏幕上难以阅读", file_types={"css"}, mode="each",
+         where=lambda m: float(m.group(1)) < 12),
+    # overflow 设置
+    Rule("no-overflow-x-hidden", r'overflow-x: ?hidden', "info",
+         "建议在body/html添加overflow-x: hidden防止水平滚动", file_types={"css"}, mode="none"),
+    # box-sizing（文件开头有通配选择器也算）
+    Rule("box-sizing", r'\*', "info", "建议使用box-sizing: border-box", file_types={"css"}, mode="none",
+         view="head", absent=("box-sizing: border-box",)),
+    # 安全区域支持
+    Rule("safe-area-inset", r'safe-area-inset', "info",
+         "建议添加iOS安全区域支持 (env(safe-area-inset-*))", file_types={"css"}, mode="none"),
+], views={
+    # 移除所有媒体查询块
+    "without_media": lambda content: MEDIA_BLOCK.sub('', content),
+    "head": lambda content: content[:500],
+})
+
+
+class MobileIssue(Issue, kind="mobile-responsive-audit"):
+    """移动端问题（序列化为 {severity, type, file, message}）"""
+    __slots__ = ()
+    KEYS = (("severity", "severity"), ("type", "rule"), ("file", "file"), ("message", "message"))
+
+
 class MobileResponsiveAuditor:
-    def __init__(self, root_dir: str = "."):
+    def __init__(self, root_dir: str = ".", index: Optional[ProjectIndex] = None, watch: bool = False,
+                 scope: Optional[GitScope] = None, sharding: bool = False):
         self.root_dir = Path(root_dir)
+        self.index = index or ProjectIndex.shared(self.root_dir)
+        # 监看模式与分片（--shard / --merge-shards）才在内存保留各文件的检查结果（问题列表），未变更的文件直接重放
+        self.cache = ResultCache(self.index, 'mobile-responsive-audit', enabled=watch or sharding, persist=False)
+        # git diff 范围模式：各项检查都只针对单个文件，只检查变更的文件即可
+        self.scope = scope
+        # --shard：只检查分片内的文件（checked 记录检查过的文件）
+        self.shard: Optional[Shard] = None
+        self.checked: List[str] = []
+        self._recording: Optional[List[MobileIssue]] = None
+        self._stream: Optional[JsonlWriter] = None
+        self._reset()
+    
+    def _reset(self):
         self.issues = defaultdict(list)
         self.stats = {
             "files_checked": 0,
             "total_issues": 0,
             "critical_issues": 0,
             "warnings": 0,
+            "info": 0,
         }
         
-    def audit(self) -> Dict[str, Any]:
-        """执行全面审计"""
+    def audit(self, stream: Optional[JsonlWriter] = None) -> Dict[str, Any]:
+        """执行全面审计
+
+        指定 stream 时每个问题立即写出一笔 issue 记录、不保留在内存，最后写出 summary 记录
+        """
         print("🔍 开始移动响应式设计健康检查...\n")
+        self._reset()
+        self.checked = []
+        self._stream = stream
         
-        # 检查所有相关文件
-        self._check_viewport_meta()
-        self._check_html_files()
-        self._check_css_files()
-        self._check_njk_files()
+        try:
+            # 检查所有相关文件
+            self._check_viewport_meta()
+            self._check_html_files()
+            self._check_css_files()
+            self._check_njk_files()
+        finally:
+            self._stream = None
         
         # 生成报告
-        return self._generate_report()
+        report = self._generate_report()
+        if stream is not None:
+            stream.summary({"summary": report["summary"], "recommendations": report["recommendations"]})
+        return report
+    
+    def audit_shard(self, shard: Shard) -> List[str]:
+        """--shard：只检查分片内的文件（结果留在内存中的结果缓存），返回检查过的文件"""
+        self.shard = shard
+        try:
+            self.audit()
+        finally:
+            self.shard = None
+        return self.checked
     
     def _check_viewport_meta(self):
         """检查viewport meta标签"""
         print("📱 检查viewport设置...")
         
-        layout_file = self.root_dir / "src" / "_includes" / "base-layout.njk"
-        if layout_file.exists():
-            content = layout_file.read_text(encoding="utf-8")
-            
-            # 检查viewport是否存在
-            if "viewport" not in content:
-                self._add_issue("critical", "viewport-missing", 
-                              "base-layout.njk", 
-                              "缺少viewport meta标签")
-            else:
-                # 检查viewport配置
-                viewport_match = re.search(r'content="([^"]+)"', content)
-                if viewport_match:
-                    viewport_content = viewport_match.group(1)
-                    if "viewport-fit=cover" not in viewport_content:
-                        self._add_issue("warning", "viewport-safe-area",
-                                       "base-layout.njk",
-                                       "建议添加viewport-fit=cover以支持iOS安全区域")
+        layout_entry = self.index.get(self.root_dir / VIEWPORT_LAYOUT)
+        if layout_entry and (self.scope is None or layout_entry.rel in self.scope):
+            for issue in self._viewport_issues(self.index.read_text(layout_entry)):
+                self._add(issue)
+    
+    @staticmethod
+    def _viewport_issues(content: str) -> List[MobileIssue]:
+        """布局文件的 viewport 问题"""
+        # 检查viewport是否存在
+        if "viewport" not in content:
+            return [MobileIssue("viewport-missing", "critical", "缺少viewport meta标签", file="base-layout.njk")]
+        # 检查viewport配置
+        viewport_match = re.search(r'content="([^"]+)"', content)
+        if viewport_match and "viewport-fit=cover" not in viewport_match.group(1):
+            return [MobileIssue("viewport-safe-area", "warning", "建议添加viewport-fit=cover以支持iOS安全区域",
+                                file="base-layout.njk")]
+        return []
     
     def _check_html_files(self):
         """检查HTML文件"""
         print("📄 检查HTML文件...")
         
         # 排除构建输出目录
-        exclude_dirs = {"_site", "node_modules", ".git", "dist", "build"}
-        html_files = [
-            f for f in self.root_dir.rglob("*.html")
-            if not any(excluded in f.parts for excluded in exclude_dirs)
-        ]
-        for file_path in html_files:
-            self._check_file_responsive(file_path, "html")
+        html_files = self.index.files(suffixes={".html"}, exclude_dirs=HTML_EXCLUDE_DIRS)
+        for entry in html_files:
+            file_path = entry.path
+            self._check_cached(entry, "html", lambda: self._check_file_responsive(file_path, "html"))
     
     def _check_njk_files(self):
         """检查NJK模板文件"""
         print("📝 检查NJK模板文件...")
         
-        njk_files = list((self.root_dir / "src").rglob("*.njk"))
-        for file_path in njk_files:
-            self._check_file_responsive(file_path, "njk")
+        njk_files = self.index.files(under=self.root_dir / "src", suffixes={".njk"})
+        for entry in njk_files:
+            self._check_cached(entry, "njk", lambda: self._check_file_responsive(entry.path, "njk"))
     
     def _check_css_files(self):
         """检查CSS文件"""
         print("🎨 检查CSS文件...")
         
-        css_files = list((self.root_dir / "src" / "assets" / "css").rglob("*.css"))
-        for file_path in css_files:
-            self._check_css_responsive(file_path)
+        css_files = self.index.files(under=self.root_dir / "src" / "assets" / "css", suffixes={".css"})
+        for entry in css_files:
+            self._check_cached(entry, "css", lambda: self._check_css_responsive(entry.path))
+    
+    def file_type(self, rel_path: str) -> Optional[str]:
+        """文件在审计中的检查类型（html / njk / css），不检查的文件返回 None"""
+        parts = rel_path.split("/")
+        if rel_path.endswith(".html") and not any(part in HTML_EXCLUDE_DIRS for part in parts[:-1]):
+            return "html"
+        if rel_path.endswith(".njk") and parts[0] == "src":
+            return "njk"
+        if rel_path.endswith(".css") and parts[:3] == ["src", "assets", "css"]:
+            return "css"
+        return None
+    
+    def check_content(self, rel_path: str, content: str) -> List[MobileIssue]:
+        """以传入的内容检查单个文件（编辑器集成，不计入统计也不写入结果缓存）"""
+        issues = self._viewport_issues(content) if rel_path == VIEWPORT_LAYOUT else []
+        file_type = self.file_type(rel_path)
+        if file_type is not None:
+            issues.extend(finding.derive(MobileIssue, file=rel_path) for finding in RULES.run(content, file_type))
+        return issues
+    
+    def _check_cached(self, entry, rule: str, check):
+        """执行单个文件的检查；监看模式下未变更的文件直接重放上一轮的问题"""
+        if self.scope is not None and entry.rel not in self.scope:
+            return
+        if self.shard is not None and not self.shard.owns(entry.rel):
+            return
+        self.checked.append(entry.rel)
+        recorded = self.cache.get(entry, rule, FILE_CACHE_VERSION)
+        if recorded is MISSING:
+            self._recording = []
+            checked_before = self.stats["files_checked"]
+            check()
+            recorded = {
+                "issues": self._recording,
+                "files_checked": self.stats["files_checked"] - checked_before,
+            }
+            self._recording = None
+            self.cache.put(entry, rule, FILE_CACHE_VERSION, recorded)
+        else:
+            for issue in recorded["issues"]:
+                self._add(issue)
+            self.stats["files_checked"] += recorded["files_checked"]
     
     def _check_file_responsive(self, file_path: Path, file_type: str):
         """检查单个文件的响应式问题"""
         try:
-            content = file_path.read_text(encoding="utf-8")
+            content = self.index.read_text(file_path)
             self.stats["files_checked"] += 1
-            
-            # 检查内联样式中的固定宽度
-            inline_styles = re.findall(r'style="[^"]*width:\s*(\d+)px', content)
-            for width in inline_styles:
-                width_val = int(width)
-                if width_val > 400 and width_val < 2000:
-                    self._add_issue("warning", "fixed-width",
-                                  str(file_path.relative_to(self.root_dir)),
-                                  f"内联样式中发现固定宽度: {width}px，建议使用响应式类")
-            
-            # 检查缺少响应式类的情况
-            if file_type == "njk":
-                # 检查大字体没有响应式断点
-                large_text = re.findall(r'text-(5xl|6xl|7xl|8xl|9xl)(?!\s+md:|sm:)', content)
-                if large_text:
-                    self._add_issue("warning", "large-text-no-breakpoint",
-                                  str(file_path.relative_to(self.root_dir)),
-                                  f"发现大字体类 {large_text[0]} 没有移动端断点")
-                
-                # 检查固定padding/margin
-                fixed_spacing = re.findall(r'(p|m|px|py|pt|pb|pl|pr|mx|my|mt|mb|ml|mr)-(\d+)(?!\s+md:|sm:)', content)
-                if fixed_spacing and int(fixed_spacing[0][1]) > 8:
-                    self._add_issue("info", "large-spacing-no-breakpoint",
-                                  str(file_path.relative_to(self.root_dir)),
-                                  "大间距值建议添加移动端断点")
-                
-                # 检查触摸目标大小
-                buttons = re.findall(r'<button[^>]*>', content, re.IGNORECASE)
-                links = re.findall(r'<a[^>]*class="[^"]*btn[^"]*"[^>]*>', content, re.IGNORECASE)
-                
-                for element in buttons + links:
-                    if "min-w" not in element and "min-h" not in element:
-                        # 检查是否有padding确保触摸目标
-                        if not re.search(r'p-\d+|px-\d+|py-\d+', element):
-                            self._add_issue("warning", "touch-target-size",
-                                          str(file_path.relative_to(self.root_dir)),
-                                          "按钮/链接可能触摸目标太小（建议至少44x44px）")
-            
-            # 检查水平滚动风险
-            if "overflow-x" not in content and "overflow-hidden" not in content:
-                # 检查是否有可能导致溢出的元素
-                wide_elements = re.findall(r'(w-\[.*?\]|width:\s*\d+px|min-width:\s*\d+px)', content)
-                if wide_elements:
-                    self._add_issue("warning", "overflow-risk",
-                                  str(file_path.relative_to(self.root_dir)),
-                                  "可能存在水平滚动风险，建议添加overflow-x: hidden")
-            
-            # 检查移动端隐藏的元素
-            mobile_hidden = re.findall(r'hidden\s+(?!md:|lg:)(sm:|)', content)
-            if mobile_hidden:
-                self._add_issue("info", "mobile-hidden",
-                              str(file_path.relative_to(self.root_dir)),
-                              "发现移动端隐藏的元素，请确认是否合理")
-                
+            self._add_findings(RULES.run(content, file_type), file_path)
         except Exception as e:
             self._add_issue("warning", "file-read-error",
                           str(file_path.relative_to(self.root_dir)),
@@ -155,90 +268,41 @@ class MobileResponsiveAuditor:
     def _check_css_responsive(self, file_path: Path):
         """检查CSS文件的响应式问题"""
         try:
-            content = file_path.read_text(encoding="utf-8")
+            content = self.index.read_text(file_path)
             self.stats["files_checked"] += 1
-            
-            # 检查媒体查询
-            media_queries = re.findall(r'@media\s+([^{]+)\{', content)
-            mobile_breakpoints = []
-            for query in media_queries:
-                if "max-width" in query:
-                    mobile_breakpoints.append(query)
-            
-            if not mobile_breakpoints:
-                self._add_issue("warning", "no-mobile-breakpoints",
-                              str(file_path.relative_to(self.root_dir)),
-                              "CSS文件中缺少移动端媒体查询")
-            
-            # 检查固定宽度（排除媒体查询中的断点和max-width）
-            # 先移除所有媒体查询块
-            content_without_media = re.sub(r'@media[^{]*\{[^}]*\}', '', content, flags=re.DOTALL)
-            # 只检查width，不检查max-width（max-width通常是响应式的）
-            fixed_widths = re.findall(r'(?<!max-)(?<!min-)width:\s*(\d+)px(?!\s*\/\*)', content_without_media)
-            for width in fixed_widths:
-                width_val = int(width)
-                # 只报告可能影响移动端的固定宽度（排除常见的断点值和容器宽度）
-                common_breakpoints = [320, 375, 390, 414, 768, 900, 992, 993, 1024, 1140, 1200, 1400]
-                if width_val > 400 and width_val not in common_breakpoints:
-                    self._add_issue("warning", "css-fixed-width",
-                                  str(file_path.relative_to(self.root_dir)),
-                                  f"CSS中发现固定宽度: {width}px，可能影响移动端显示")
-            
-            # 检查触摸目标
-            min_sizes = re.findall(r'min-(width|height):\s*(\d+)px', content)
-            for prop, size in min_sizes:
-                if int(size) < 44:
-                    self._add_issue("critical", "touch-target-too-small",
-                                  str(file_path.relative_to(self.root_dir)),
-                                  f"{prop} 最小尺寸 {size}px 小于WCAG建议的44px")
-            
-            # 检查字体大小
-            font_sizes = re.findall(r'font-size:\s*(\d+(?:\.\d+)?)px', content)
-            for size in font_sizes:
-                if float(size) < 12:
-                    self._add_issue("warning", "font-too-small",
-                                  str(file_path.relative_to(self.root_dir)),
-                                  f"字体大小 {size}px 可能在小屏幕上难以阅读")
-            
-            # 检查overflow设置
-            if "overflow-x: hidden" not in content and "overflow-x:hidden" not in content:
-                self._add_issue("info", "no-overflow-x-hidden",
-                              str(file_path.relative_to(self.root_dir)),
-                              "建议在body/html添加overflow-x: hidden防止水平滚动")
-            
-            # 检查box-sizing
-            if "box-sizing: border-box" not in content and "*" not in content[:500]:
-                self._add_issue("info", "box-sizing",
-                              str(file_path.relative_to(self.root_dir)),
-                              "建议使用box-sizing: border-box")
-            
-            # 检查安全区域支持
-            if "safe-area-inset" not in content:
-                self._add_issue("info", "safe-area-inset",
-                              str(file_path.relative_to(self.root_dir)),
-                              "建议添加iOS安全区域支持 (env(safe-area-inset-*))")
-            
+            self._add_findings(RULES.run(content, "css"), file_path)
         except Exception as e:
             self._add_issue("warning", "css-read-error",
                           str(file_path.relative_to(self.root_dir)),
                           f"读取CSS文件时出错: {str(e)}")
     
+    def _add_findings(self, findings: List[Issue], file_path: Path):
+        """将规则结果记录为问题（规则 ID 即问题类型，消息仍延迟格式化）"""
+        rel_path = str(file_path.relative_to(self.root_dir))
+        for finding in findings:
+            self._add(finding.derive(MobileIssue, file=rel_path))
+    
     def _add_issue(self, severity: str, issue_type: str, file_path: str, message: str):
         """添加问题记录"""
-        issue = {
-            "severity": severity,
-            "type": issue_type,
-            "file": file_path,
-            "message": message
-        }
+        self._add(MobileIssue(issue_type, severity, message, file=file_path))
+    
+    def _add(self, issue: MobileIssue):
+        if self._recording is not None:
+            self._recording.append(issue)
         
-        self.issues[severity].append(issue)
+        if self._stream is not None:
+            self._stream.write("issue", issue)
+        else:
+            self.issues[issue.severity].append(issue)
         self.stats["total_issues"] += 1
         
+        severity = issue.severity
         if severity == "critical":
             self.stats["critical_issues"] += 1
         elif severity == "warning":
             self.stats["warnings"] += 1
+        elif severity == "info":
+            self.stats["info"] += 1
     
     def _generate_report(self) -> Dict[str, Any]:
         """生成审计报告"""
@@ -248,7 +312,7 @@ class MobileResponsiveAuditor:
                 "total_issues": self.stats["total_issues"],
                 "critical_issues": self.stats["critical_issues"],
                 "warnings": self.stats["warnings"],
-                "info": len(self.issues.get("info", []))
+                "info": self.stats["info"]
             },
             "issues": {
                 "critical": self.issues.get("critical", []),
@@ -298,19 +362,19 @@ class MobileResponsiveAuditor:
         
         # 关键问题
         if report["issues"]["critical"]:
-            print(f"\n🔴 关键问题 ({len(report['issues']['critical'])}):")
+            print(f"\n🔴 关键问题 ({summary['critical_issues']}):")
             for issue in report["issues"]["critical"]:
-                print(f"   • [{issue['type']}] {issue['file']}")
-                print(f"     {issue['message']}")
+                print(f"   • [{issue.rule}] {issue.file}")
+                print(f"     {issue.message}")
         
         # 警告
         if report["issues"]["warning"]:
-            print(f"\n⚠️  警告 ({len(report['issues']['warning'])}):")
+            print(f"\n⚠️  警告 ({summary['warnings']}):")
             for issue in report["issues"]["warning"][:10]:  # 只显示前10个
-                print(f"   • [{issue['type']}] {issue['file']}")
-                print(f"     {issue['message']}")
-            if len(report["issues"]["warning"]) > 10:
-                print(f"   ... 还有 {len(report['issues']['warning']) - 10} 个警告")
+                print(f"   • [{issue.rule}] {issue.file}")
+                print(f"     {issue.message}")
+            if summary["warnings"] > 10:
+                print(f"   ... 还有 {summary['warnings'] - 10} 个警告")
         
         # 建议
         if report["recommendations"]:
@@ -326,22 +390,124 @@ class MobileResponsiveAuditor:
         output_path.parent.mkdir(exist_ok=True)
         
         with open(output_path, "w", encoding="utf-8") as f:
-            json.dump(report, f, indent=2, ensure_ascii=False)
+            json.dump(report, f, indent=2, ensure_ascii=False, default=issue_json)
         
         print(f"\n💾 报告已保存到: {output_path}")
 
 
+def load_printable_issues(jsonl_path: Path, warning_limit: int = 10) -> Dict[str, List[MobileIssue]]:
+    """从 JSON Lines 流式读回 print_report 会显示的问题（全部关键问题与前几个警告）"""
+    issues: Dict[str, List[MobileIssue]] = {"critical": [], "warning": [], "info": []}
+    for record in read_jsonl(jsonl_path, "issue"):
+        severity = record["severity"]
+        if severity == "critical" or (severity == "warning" and len(issues["warning"]) < warning_limit):
+            issues[severity].append(MobileIssue.from_dict({k: v for k, v in record.items() if k != "record"}))
+    return issues
+
+
+def save_findings(report: Dict[str, Any], db_path: Path, project_root: Path, jsonl_path: Optional[Path] = None):
+    """--db：写入全部问题（jsonl 格式时从 JSON Lines 流式读回）"""
+    if jsonl_path is not None:
+        issues = (MobileIssue.from_dict({k: v for k, v in record.items() if k != "record"})
+                  for record in read_jsonl(jsonl_path, "issue"))
+    else:
+        issues = (issue for severity in ("critical", "warning", "info") for issue in report["issues"][severity])
+    record_findings(db_path, "mobile-responsive-audit", issues, root=project_root, summary=report["summary"])
+
+
 def main():
     """主函数"""
     # 获取项目根目录
     script_dir = Path(__file__).parent
     project_root = script_dir.parent
     
-    auditor = MobileResponsiveAuditor(str(project_root))
-    report = auditor.audit()
+    parser = argparse.ArgumentParser(description='移动响应式设计健康检查')
+    parser.add_argument('--watch', action='store_true', help='完成后持续监看项目文件，只重新检查变更的文件')
+    parser.add_argument('--format', choices=['json', 'jsonl'], default='json',
+                        help='结果格式：json（完整 JSON，默认）或 jsonl（每个问题流式写出 JSON Lines）')
+    parser.add_argument('--profile', action='store_true', help='记录各检查阶段与规则耗时，输出到 report/profile/')
+    parser.add_argument('--memprofile', action='store_true',
+                        help='以 tracemalloc 记录各阶段内存峰值、保留量与主要分配位置，输出到 report/profile/')
+    parser.add_argument('--memprofile-depth', type=int, default=MEMORY_TRACE_DEPTH, metavar='N',
+                        help=f'tracemalloc 保留的调用层数（默认 {MEMORY_TRACE_DEPTH}，加深可追溯到审计脚本行但较慢）')
+    parser.add_argument('--disable-rules', action='append', metavar='ID[,ID...]',
+                        help='停用指定的检查规则（可重复指定，规则 ID 见 --list-rules）')
+    parser.add_argument('--list-rules', action='store_true', help='列出所有检查规则后退出')
+    parser.add_argument('--db', nargs='?', const=project_root / "report" / DEFAULT_DB_NAME, type=Path, metavar='PATH',
+                        help=f'将问题写入 SQLite 数据库（默认 report/{DEFAULT_DB_NAME}），以 findings.py 查询')
+    parser.add_argument('--since', metavar='REV', help='只检查自 REV 以来（git diff）变更的文件，有关键问题时退出码为 1')
+    parser.add_argument('--staged', action='store_true', help='同 --since，但范围为 git 暂存区的变更（pre-commit 用）')
+    parser.add_argument('--shard', metavar='I/N',
+                        help='CI 分片：只检查 N 个分片中第 I 个分片的文件，结果写到 report/shards/（不生成报告）')
+    parser.add_argument('--merge-shards', action='store_true',
+                        help='合并 report/shards/ 中的全部分片后生成报告，结果与单机执行相同（--disable-rules 须与分片一致）')
+    args = parser.parse_args()
+    try:
+        RULES.disable(parse_rule_ids(args.disable_rules))
+        scope = scope_from_args(project_root, args.since, args.staged)
+        shard = shard_from_args(args.shard)
+    except ValueError as e:
+        parser.error(str(e))
+    if shard is not None and (args.merge_shards or args.watch):
+        parser.error('--shard 不能与 --merge-shards / --watch 同时使用')
+    if args.list_rules:
+        print("\n".join(RULES.describe()))
+        return
+    if args.profile or args.memprofile:
+        PROFILER.enable('mobile-responsive-audit', timing=args.profile, memory=args.memprofile,
+                        memory_depth=args.memprofile_depth)
+    
+    auditor = MobileResponsiveAuditor(str(project_root), watch=args.watch, scope=scope,
+                                      sharding=shard is not None or args.merge_shards)
+    if scope is not None:
+        print(f"🔀 git 范围: {scope.describe()}（只检查变更的文件）")
+    PROFILER.instrument(auditor, PROFILED_PHASES + PROFILED_RULES, matches=None)
+    if shard is not None:
+        shard_path = save_shard(auditor.cache, shard, auditor.audit_shard(shard), project_root / "report")
+        print(f"✅ 分片 {shard} 的检查结果已保存: {shard_path}")
+        return
+    if args.merge_shards:
+        try:
+            print(f"🧩 已合并 {load_shards(auditor.cache, project_root / 'report')} 个分片的检查结果\n")
+        except ValueError as e:
+            parser.error(str(e))
+    jsonl_path = project_root / "report" / "mobile-responsive-audit.jsonl"
+    
+    def run_audit() -> Dict[str, Any]:
+        if args.format != "jsonl":
+            return auditor.audit()
+        with JsonlWriter(jsonl_path, "mobile-responsive-audit") as stream:
+            report = auditor.audit(stream)
+        report["issues"] = load_printable_issues(jsonl_path)
+        return report
+    
+    def save(report: Dict[str, Any]):
+        if args.format == "jsonl":
+            print(f"\n💾 报告已保存到: {jsonl_path}")
+        else:
+            auditor.save_report(report)
+    
+    report = run_audit()
     
     auditor.print_report(report)
-    auditor.save_report(report)
+    save(report)
+    
+    if args.db:
+        save_findings(report, args.db, project_root, jsonl_path if args.format == "jsonl" else None)
+    
+    if args.profile or args.memprofile:
+        PROFILER.finish(project_root / "report" / "profile")
+    
+    if args.watch:
+        def reaudit(changed: List[str]) -> str:
+            auditor.cache.invalidate(changed)
+            report = run_audit()
+            save(report)
+            summary = report["summary"]
+            return (f"检查 {summary['files_checked']} 个文件，问题 {summary['total_issues']} 个"
+                    f"（关键 {summary['critical_issues']}）")
+        
+        watch_loop(auditor.index, reaudit, ignore=[project_root / "report"])
     
     # 如果有关键问题，返回非零退出码
     if report["summary"]["critical_issues"] > 0:
@@ -7,11 +7,16 @@ SEO 審計腳本
 
 import re
 import json
+import argparse
 from pathlib import Path
 from typing import Dict, List, Tuple, Any, Optional
 from collections import defaultdict
 from datetime import datetime
 
+from auditkit import (DEFAULT_DB_NAME, MISSING, MEMORY_TRACE_DEPTH, PROFILER, FileEntry, Issue, JsonlWriter,
+                      ProjectIndex, ResultCache, Shard, issue_json, load_shards, map_in_processes, record_findings,
+                      resolve_jobs, save_shard, shard_from_args, split_front_matter, watch_loop)
+
 # 專案根目錄
 PROJECT_ROOT = Path(__file__).parent.parent
 SRC_DIR = PROJECT_ROOT / "src"
@@ -39,52 +44,85 @@ SEO_STANDARDS = {
 }
 
 
+# H1 標籤
+H1_PATTERN = re.compile(r'<h1[^>]*>(.*?)</h1>', re.DOTALL | re.IGNORECASE)
+
+# 監看模式記憶體快取的版本
+PAGE_CACHE_VERSION = '2'
+
+# --profile 個別計時的分析規則
+PROFILED_RULES = ['_analyze_title', '_analyze_description', '_analyze_keywords', '_analyze_h1', '_recommend_schema']
+
+
+class PageIssue(Issue, kind="seo-audit-page"):
+    """單頁的問題或建議（規則為分析項目，例如 title；輸出格式與原本的 dict 相同）"""
+    __slots__ = ()
+    KEYS = (('priority', 'severity'), ('message', 'message'))
+
+
+class SiteIssue(Issue, kind="seo-audit-site"):
+    """跨頁面問題（affected_pages 放在 extra）"""
+    __slots__ = ()
+    KEYS = (('type', 'rule'), ('priority', 'severity'), ('message', 'message'))
+
+
 class SEOAuditor:
     """SEO 審計器"""
     
-    def __init__(self, src_dir: Path, site_url: str):
+    def __init__(self, src_dir: Path, site_url: str, index: Optional[ProjectIndex] = None,
+                 jobs: int = 1, watch: bool = False, sharding: bool = False):
         self.src_dir = src_dir
         self.site_url = site_url
+        self.jobs = jobs
+        self.index = index or ProjectIndex.shared(PROJECT_ROOT)
+        # 監看模式與分片（--shard / --merge-shards）才在記憶體保留各頁分析結果，一般執行維持每次重新分析
+        self.cache = ResultCache(self.index, 'seo-audit', enabled=watch or sharding, persist=False)
         self.pages: List[Dict[str, Any]] = []
         self.issues: List[Dict[str, Any]] = []
         self.schema_recommendations: Dict[str, Any] = {}
         
-    def audit(self) -> Dict[str, Any]:
-        """執行完整 SEO 審計"""
+    def audit(self, stream: Optional[JsonlWriter] = None) -> Dict[str, Any]:
+        """執行完整 SEO 審計
+
+        指定 stream 時，每頁分析完成即寫出一筆 page 紀錄，最後寫出 issue 與 summary 紀錄
+        （頁面只含 front matter 的分析結果，仍保留在記憶體中供重複檢查與 Markdown 報告使用）
+        """
         print("🔍 開始 SEO 審計...\n")
+        self.pages, self.issues, self.schema_recommendations = [], [], {}
         
         # 1. 掃描所有 .njk 頁面文件
-        print("📁 掃描頁面文件...")
-        page_files = self._scan_pages()
-        print(f"   找到 {len(page_files)} 個頁面文件\n")
-        
-        # 2. 解析每個頁面的 front matter
-        print("📄 解析頁面 front matter...")
-        for file_path in page_files:
-            page_data = self._parse_page(file_path)
-            if page_data:
-                self.pages.append(page_data)
-        print(f"   成功解析 {len(self.pages)} 個頁面\n")
-        
-        # 3. 分析 SEO 元素
-        print("🔎 分析 SEO 元素...")
-        for page in self.pages:
-            page['seo_analysis'] = self._analyze_seo(page)
-            page['schema_recommendation'] = self._recommend_schema(page)
-        print("   SEO 分析完成\n")
+        with PROFILER.phase('1. 掃描頁面'):
+            print("📁 掃描頁面文件...")
+            page_files = self._scan_pages()
+            print(f"   找到 {len(page_files)} 個頁面文件\n")
+        
+        self._analyze_pages([self.index.get(file_path) for file_path in page_files], stream)
         
         # 4. 檢查重複和一致性
-        print("🔗 檢查重複和一致性...")
-        self._check_duplicates()
-        print("   檢查完成\n")
+        with PROFILER.phase('4. 重複檢查'):
+            print("🔗 檢查重複和一致性...")
+            self._check_duplicates()
+            print("   檢查完成\n")
         
         # 5. 生成總體統計
-        print("📊 生成統計數據...")
-        stats = self._generate_stats()
-        print("   統計完成\n")
+        with PROFILER.phase('5. 生成統計'):
+            print("📊 生成統計數據...")
+            stats = self._generate_stats()
+            print("   統計完成\n")
+        
+        timestamp = datetime.now().isoformat()
+        if stream is not None:
+            stream.write_all('issue', self.issues)
+            stream.summary({
+                'timestamp': timestamp,
+                'site_url': self.site_url,
+                'total_pages': len(self.pages),
+                'stats': stats,
+                'schema_recommendations': self.schema_recommendations,
+            })
         
         return {
-            'timestamp': datetime.now().isoformat(),
+            'timestamp': timestamp,
             'site_url': self.site_url,
             'total_pages': len(self.pages),
             'pages': self.pages,
@@ -93,11 +131,70 @@ class SEOAuditor:
             'schema_recommendations': self.schema_recommendations,
         }
     
+    def _analyze_pages(self, entries: List[FileEntry], stream: Optional[JsonlWriter] = None):
+        """解析並分析各頁（監看模式與分片時沿用 / 寫入記憶體中的結果），結果依頁面掃描順序加入 self.pages
+
+        指定 stream 時依相同順序寫出 page 紀錄
+        """
+        memo = {entry.rel: self.cache.get(entry, 'page', PAGE_CACHE_VERSION) for entry in entries}
+        
+        if self.jobs > 1:
+            # 2-3. 多行程解析並分析頁面，依頁面掃描順序合併
+            with PROFILER.phase('2-3. 多行程解析與分析'):
+                print(f"📄 解析頁面並分析 SEO 元素（{self.jobs} 個行程）...")
+                pending = [entry for entry in entries if memo[entry.rel] is MISSING]
+                analyzed = map_in_processes(_analyze_page_worker, [entry.path for entry in pending], self.jobs,
+                                            _init_page_worker, (self.src_dir, self.site_url))
+                for entry, page_data in zip(pending, analyzed):
+                    memo[entry.rel] = page_data
+                    if page_data:
+                        self.cache.put(entry, 'page', PAGE_CACHE_VERSION, page_data)
+                self.pages.extend(memo[entry.rel] for entry in entries if memo[entry.rel])
+                if stream is not None:
+                    stream.write_all('page', self.pages)
+                print(f"   成功解析 {len(self.pages)} 個頁面")
+        else:
+            # 2. 解析每個頁面的 front matter（監看模式下未異動的頁面沿用上一輪結果）
+            with PROFILER.phase('2. 解析頁面'):
+                print("📄 解析頁面 front matter...")
+                parsed = []
+                for entry in entries:
+                    page_data = memo[entry.rel]
+                    is_fresh = page_data is MISSING
+                    if is_fresh:
+                        page_data = self._parse_page(entry.path)
+                    if page_data:
+                        self.pages.append(page_data)
+                        parsed.append((entry, page_data, is_fresh))
+                print(f"   成功解析 {len(self.pages)} 個頁面\n")
+            
+            # 3. 分析 SEO 元素（沿用的頁面已含分析結果）
+            with PROFILER.phase('3. SEO 分析'):
+                print("🔎 分析 SEO 元素...")
+                for entry, page, is_fresh in parsed:
+                    if is_fresh:
+                        page['seo_analysis'] = self._analyze_seo(page)
+                        page['schema_recommendation'] = self._recommend_schema(page)
+                        self.cache.put(entry, 'page', PAGE_CACHE_VERSION, page)
+                    if stream is not None:
+                        stream.write('page', page)
+        print("   SEO 分析完成\n")
+    
+    def audit_shard(self, shard: Shard) -> List[str]:
+        """--shard：只解析並分析分片內的頁面（結果留在記憶體中的結果快取），回傳這些頁面的相對路徑"""
+        print(f"🔍 SEO 審計分片 {shard}...\n")
+        self.pages, self.issues, self.schema_recommendations = [], [], {}
+        entries = [entry for entry in map(self.index.get, self._scan_pages()) if shard.owns(entry.rel)]
+        print(f"   分片內有 {len(entries)} 個頁面文件\n")
+        self._analyze_pages(entries)
+        return [entry.rel for entry in entries]
+    
     def _scan_pages(self) -> List[Path]:
         """掃描所有 .njk 頁面文件"""
         pages = []
         
-        for file_path in self.src_dir.rglob("*.njk"):
+        for entry in self.index.files(under=self.src_dir, suffixes={'.njk'}):
+            file_path = entry.path
             # 排除模板和部分文件
             rel_path = file_path.relative_to(self.src_dir)
             if str(rel_path).startswith("_includes/"):
@@ -111,21 +208,17 @@ class SEOAuditor:
     def _parse_page(self, file_path: Path) -> Optional[Dict[str, Any]]:
         """解析頁面的 front matter"""
         try:
-            with open(file_path, 'r', encoding='utf-8') as f:
-                content = f.read()
+            content = self.index.read_text(file_path)
             
             # 提取 front matter（YAML 在 --- 之間）
-            front_matter_match = re.match(r'^---\s*\n(.*?)\n---\s*\n(.*)$', content, re.DOTALL)
+            page = split_front_matter(content)
             
-            if not front_matter_match:
+            if page is None:
                 return None
             
-            front_matter_text = front_matter_match.group(1)
-            body_content = front_matter_match.group(2)
-            
-            # 解析 YAML（使用簡單解析器）
+            # 解析 YAML（使用共用的簡單解析器）
             try:
-                front_matter = self._parse_simple_yaml(front_matter_text)
+                front_matter = page.data
             except Exception as e:
                 print(f"   ⚠️  YAML 解析錯誤 ({file_path.relative_to(PROJECT_ROOT)}): {e}")
                 return None
@@ -137,8 +230,8 @@ class SEOAuditor:
             # 推斷頁面類型
             page_type = self._infer_page_type(rel_path, front_matter)
             
-            # 提取 H1 標籤（如果有的話）
-            h1_tags = self._extract_h1_tags(body_content)
+            # 提取 H1 標籤（如果有的話），直接從內文起點搜尋，不複製內文
+            h1_tags = self._extract_h1_tags(content, page.body_start)
             
             return {
                 'file_path': str(file_path.relative_to(PROJECT_ROOT)),
@@ -149,7 +242,7 @@ class SEOAuditor:
                 'title': front_matter.get('title', ''),
                 'seo': front_matter.get('seo', {}),
                 'h1_tags': h1_tags,
-                'body_length': len(body_content),
+                'body_length': page.body_length,
             }
         except Exception as e:
             print(f"   ⚠️  解析錯誤 ({file_path.relative_to(PROJECT_ROOT)}): {e}")
@@ -199,97 +292,9 @@ class SEOAuditor:
         else:
             return 'other'
     
-    def _parse_simple_yaml(self, yaml_text: str) -> Dict[str, Any]:
-        """簡單的 YAML 解析器（用於解析 front matter）
-        支持基本格式：key: value 和嵌套結構（seo: description: ...）
-        """
-        result = {}
-        lines = yaml_text.split('\n')
-        i = 0
-        
-        while i < len(lines):
-            line = lines[i]
-            stripped = line.strip()
-            
-            # 跳過空行和註釋
-            if not stripped or stripped.startswith('#'):
-                i += 1
-                continue
-            
-            # 計算縮進（使用空格數）
-            indent = len(line) - len(line.lstrip())
-            
-            # 解析 key: value
-            if ':' in line:
-                colon_idx = line.index(':')
-                key = line[:colon_idx].strip()
-                value_part = line[colon_idx + 1:].strip()
-                
-                # 檢查是否是嵌套對象（下一行有更多縮進）
-                is_object = False
-                if i + 1 < len(lines):
-                    next_line = lines[i + 1]
-                    next_stripped = next_line.strip()
-                    if next_stripped and ':' in next_line:
-                        next_indent = len(next_line) - len(next_line.lstrip())
-                        if next_indent > indent:
-                            is_object = True
-                
-                if is_object:
-                    # 這是一個對象，遞歸解析
-                    nested_lines = []
-                    i += 1
-                    while i < len(lines):
-                        nested_line = lines[i]
-                        nested_stripped = nested_line.strip()
-                        if not nested_stripped or nested_stripped.startswith('#'):
-                            i += 1
-                            continue
-                        nested_indent = len(nested_line) - len(nested_line.lstrip())
-                        if nested_indent <= indent:
-                            break
-                        nested_lines.append(nested_line)
-                        i += 1
-                    i -= 1  # 回退一行，因為外層循環會增加
-                    
-                    nested_text = '\n'.join(nested_lines)
-                    result[key] = self._parse_simple_yaml(nested_text)
-                else:
-                    # 處理普通值
-                    value = value_part
-                    
-                    # 處理多行值（| 或 >）
-                    if value in ('|', '>'):
-                        multiline_lines = []
-                        i += 1
-                        while i < len(lines):
-                            next_line = lines[i]
-                            next_indent = len(next_line) - len(next_line.lstrip())
-                            if next_indent <= indent and next_line.strip():
-                                break
-                            if next_indent > indent:
-                                multiline_lines.append(next_line[indent:])
-                            i += 1
-                        value = '\n'.join(multiline_lines).strip()
-                        if value.startswith('|') or value.startswith('>'):
-                            value = value[1:].lstrip()
-                        i -= 1
-                    else:
-                        # 移除引號
-                        if (value.startswith('"') and value.endswith('"')) or \
-                           (value.startswith("'") and value.endswith("'")):
-                            value = value[1:-1]
-                    
-                    result[key] = value
-            
-            i += 1
-        
-        return result
-    
-    def _extract_h1_tags(self, content: str) -> List[str]:
-        """提取 H1 標籤"""
-        h1_pattern = r'<h1[^>]*>(.*?)</h1>'
-        matches = re.findall(h1_pattern, content, re.DOTALL | re.IGNORECASE)
+    def _extract_h1_tags(self, content: str, pos: int = 0) -> List[str]:
+        """提取 H1 標籤（從 content[pos:] 開始搜尋）"""
+        matches = H1_PATTERN.findall(content, pos)
         # 清理 HTML 標籤
         h1_tags = [re.sub(r'<[^>]+>', '', h1).strip() for h1 in matches]
         return h1_tags
@@ -369,10 +374,7 @@ class SEOAuditor:
         }
         
         if not title:
-            analysis['issues'].append({
-                'priority': 'high',
-                'message': '缺少 Title 標籤',
-            })
+            analysis['issues'].append(PageIssue('title', 'high', '缺少 Title 標籤'))
             return analysis
         
         # 長度檢查
@@ -380,16 +382,12 @@ class SEOAuditor:
         std = SEO_STANDARDS['title']
         
         if length < std['min_length']:
-            analysis['issues'].append({
-                'priority': 'high',
-                'message': f'Title 過短（{length} 字符，建議至少 {std["min_length"]} 字符）',
-            })
+            analysis['issues'].append(PageIssue(
+                'title', 'high', 'Title 過短（{} 字符，建議至少 {} 字符）', length, std["min_length"]))
             score = (length / std['min_length']) * 50
         elif length > std['max_length']:
-            analysis['issues'].append({
-                'priority': 'medium',
-                'message': f'Title 過長（{length} 字符，建議不超過 {std["max_length"]} 字符）',
-            })
+            analysis['issues'].append(PageIssue(
+                'title', 'medium', 'Title 過長（{} 字符，建議不超過 {} 字符）', length, std["max_length"]))
             # 超過長度時分數遞減
             excess = length - std['max_length']
             score = max(50, 100 - (excess * 2))
@@ -400,17 +398,11 @@ class SEOAuditor:
             else:
                 # 在 optimal 和 max 之間，分數略微降低
                 score = 90
-            analysis['recommendations'].append({
-                'priority': 'low',
-                'message': f'Title 長度良好（{length} 字符）',
-            })
+            analysis['recommendations'].append(PageIssue('title', 'low', 'Title 長度良好（{} 字符）', length))
         
         # 檢查是否包含品牌名
         if '好時有影' not in title and 'Golden Years' not in title:
-            analysis['recommendations'].append({
-                'priority': 'low',
-                'message': '建議在 Title 中包含品牌名稱',
-            })
+            analysis['recommendations'].append(PageIssue('title', 'low', '建議在 Title 中包含品牌名稱'))
             score *= 0.9
         
         # 檢查特殊字符
@@ -418,10 +410,7 @@ class SEOAuditor:
             # 分隔符使用良好
             pass
         else:
-            analysis['recommendations'].append({
-                'priority': 'low',
-                'message': '可以考慮使用分隔符（｜或 |）分隔品牌和頁面標題',
-            })
+            analysis['recommendations'].append(PageIssue('title', 'low', '可以考慮使用分隔符（｜或 |）分隔品牌和頁面標題'))
         
         analysis['score'] = round(score, 1)
         return analysis
@@ -437,10 +426,7 @@ class SEOAuditor:
         }
         
         if not description:
-            analysis['issues'].append({
-                'priority': 'high',
-                'message': '缺少 Meta Description',
-            })
+            analysis['issues'].append(PageIssue('description', 'high', '缺少 Meta Description'))
             return analysis
         
         # 長度檢查
@@ -448,34 +434,24 @@ class SEOAuditor:
         std = SEO_STANDARDS['description']
         
         if length < std['min_length']:
-            analysis['issues'].append({
-                'priority': 'high',
-                'message': f'Description 過短（{length} 字符，建議至少 {std["min_length"]} 字符）',
-            })
+            analysis['issues'].append(PageIssue(
+                'description', 'high', 'Description 過短（{} 字符，建議至少 {} 字符）', length, std["min_length"]))
             score = (length / std['min_length']) * 60
         elif length > std['max_length']:
-            analysis['issues'].append({
-                'priority': 'medium',
-                'message': f'Description 過長（{length} 字符，建議不超過 {std["max_length"]} 字符，可能被截斷）',
-            })
+            analysis['issues'].append(PageIssue(
+                'description', 'medium', 'Description 過長（{} 字符，建議不超過 {} 字符，可能被截斷）', length, std["max_length"]))
             excess = length - std['max_length']
             score = max(60, 100 - (excess * 2))
         else:
             score = 100
-            analysis['recommendations'].append({
-                'priority': 'low',
-                'message': f'Description 長度良好（{length} 字符）',
-            })
+            analysis['recommendations'].append(PageIssue('description', 'low', 'Description 長度良好（{} 字符）', length))
         
         # 檢查內容質量
         # 是否包含 CTA 詞彙
         cta_words = ['立即', '查看', '預約', '了解更多', '開始', 'Get', 'Try', 'Learn']
         has_cta = any(word in description for word in cta_words)
         if not has_cta:
-            analysis['recommendations'].append({
-                'priority': 'low',
-                'message': '建議在 Description 中包含行動呼籲（CTA）',
-            })
+            analysis['recommendations'].append(PageIssue('description', 'low', '建議在 Description 中包含行動呼籲（CTA）'))
             score *= 0.95
         
         # 檢查是否包含關鍵詞
@@ -498,10 +474,8 @@ class SEOAuditor:
         
         if not keywords:
             # Keywords 不是必須的，但建議提供
-            analysis['recommendations'].append({
-                'priority': 'low',
-                'message': '建議添加 keywords 字段（雖然 Google 不再使用，但其他搜索引擎可能使用）',
-            })
+            analysis['recommendations'].append(PageIssue(
+                'keywords', 'low', '建議添加 keywords 字段（雖然 Google 不再使用，但其他搜索引擎可能使用）'))
             analysis['score'] = 70  # 不影響太大
             return analysis
         
@@ -517,16 +491,12 @@ class SEOAuditor:
         std = SEO_STANDARDS['keywords']
         
         if len(keyword_list) < std['min_count']:
-            analysis['recommendations'].append({
-                'priority': 'low',
-                'message': f'關鍵詞數量較少（{len(keyword_list)} 個，建議 {std["min_count"]}-{std["max_count"]} 個）',
-            })
+            analysis['recommendations'].append(PageIssue(
+                'keywords', 'low', '關鍵詞數量較少（{} 個，建議 {}-{} 個）', len(keyword_list), std["min_count"], std["max_count"]))
             score = 80
         elif len(keyword_list) > std['max_count']:
-            analysis['recommendations'].append({
-                'priority': 'low',
-                'message': f'關鍵詞數量較多（{len(keyword_list)} 個，建議不超過 {std["max_count"]} 個）',
-            })
+            analysis['recommendations'].append(PageIssue(
+                'keywords', 'low', '關鍵詞數量較多（{} 個，建議不超過 {} 個）', len(keyword_list), std["max_count"]))
             score = 85
         else:
             score = 100
@@ -545,23 +515,14 @@ class SEOAuditor:
         }
         
         if len(h1_tags) == 0:
-            analysis['issues'].append({
-                'priority': 'medium',
-                'message': '頁面缺少 H1 標籤',
-            })
+            analysis['issues'].append(PageIssue('h1', 'medium', '頁面缺少 H1 標籤'))
             analysis['score'] = 0
         elif len(h1_tags) == 1:
             analysis['score'] = 100
-            analysis['recommendations'].append({
-                'priority': 'low',
-                'message': f'H1 標籤良好: "{h1_tags[0]}"',
-            })
+            analysis['recommendations'].append(PageIssue('h1', 'low', 'H1 標籤良好: "{}"', h1_tags[0]))
         else:
             # 多個 H1（不推薦）
-            analysis['issues'].append({
-                'priority': 'medium',
-                'message': f'頁面包含多個 H1 標籤（{len(h1_tags)} 個），建議只使用一個',
-            })
+            analysis['issues'].append(PageIssue('h1', 'medium', '頁面包含多個 H1 標籤（{} 個），建議只使用一個', len(h1_tags)))
             analysis['score'] = 50
         
         return analysis
@@ -735,22 +696,13 @@ class SEOAuditor:
         # 檢查重複的 title
         for title, urls in titles.items():
             if len(urls) > 1:
-                self.issues.append({
-                    'type': 'duplicate_title',
-                    'priority': 'high',
-                    'message': f'標題重複: "{title}"',
-                    'affected_pages': urls,
-                })
+                self.issues.append(SiteIssue('duplicate_title', 'high', '標題重複: "{}"', title, affected_pages=urls))
         
         # 檢查重複的 description
         for desc, urls in descriptions.items():
             if len(urls) > 1:
-                self.issues.append({
-                    'type': 'duplicate_description',
-                    'priority': 'medium',
-                    'message': f'描述重複（出現在 {len(urls)} 個頁面）',
-                    'affected_pages': urls[:3],  # 只顯示前3個
-                })
+                self.issues.append(SiteIssue(
+                    'duplicate_description', 'medium', '描述重複（出現在 {} 個頁面）', len(urls), affected_pages=urls[:3]))
     
     def _generate_stats(self) -> Dict[str, Any]:
         """生成統計數據"""
@@ -769,6 +721,25 @@ class SEOAuditor:
         }
 
 
+# 工作行程內的審計器（每個行程建立一次）
+_worker_auditor: Optional[SEOAuditor] = None
+
+
+def _init_page_worker(src_dir: Path, site_url: str):
+    """工作行程初始化"""
+    global _worker_auditor
+    _worker_auditor = SEOAuditor(src_dir, site_url)
+
+
+def _analyze_page_worker(file_path: Path) -> Optional[Dict[str, Any]]:
+    """在工作行程中解析並分析單一頁面"""
+    page_data = _worker_auditor._parse_page(file_path)
+    if page_data:
+        page_data['seo_analysis'] = _worker_auditor._analyze_seo(page_data)
+        page_data['schema_recommendation'] = _worker_auditor._recommend_schema(page_data)
+    return page_data
+
+
 def generate_markdown_report(audit_result: Dict[str, Any]) -> str:
     """生成 Markdown 格式的報告"""
     lines = []
@@ -833,8 +804,8 @@ def generate_markdown_report(audit_result: Dict[str, Any]) -> str:
             lines.append("#### ⚠️ 問題")
             lines.append("")
             for issue in analysis['issues']:
-                priority_emoji = {'high': '🔴', 'medium': '🟡', 'low': '🟢'}.get(issue['priority'], '⚪')
-                lines.append(f"- {priority_emoji} **{issue['priority'].upper()}**: {issue['message']}")
+                priority_emoji = {'high': '🔴', 'medium': '🟡', 'low': '🟢'}.get(issue.severity, '⚪')
+                lines.append(f"- {priority_emoji} **{issue.severity.upper()}**: {issue.message}")
             lines.append("")
         
         # 建議
@@ -842,8 +813,8 @@ def generate_markdown_report(audit_result: Dict[str, Any]) -> str:
             lines.append("#### 💡 建議")
             lines.append("")
             for rec in analysis['recommendations']:
-                priority_emoji = {'high': '🔴', 'medium': '🟡', 'low': '🟢'}.get(rec['priority'], '⚪')
-                lines.append(f"- {priority_emoji} **{rec['priority'].upper()}**: {rec['message']}")
+                priority_emoji = {'high': '🔴', 'medium': '🟡', 'low': '🟢'}.get(rec.severity, '⚪')
+                lines.append(f"- {priority_emoji} **{rec.severity.upper()}**: {rec.message}")
             lines.append("")
         
         # Schema.org 建議
@@ -868,21 +839,101 @@ def generate_markdown_report(audit_result: Dict[str, Any]) -> str:
         lines.append("## 🔗 全局問題")
         lines.append("")
         for issue in audit_result['issues']:
-            priority_emoji = {'high': '🔴', 'medium': '🟡', 'low': '🟢'}.get(issue['priority'], '⚪')
-            lines.append(f"### {priority_emoji} {issue['message']}")
+            priority_emoji = {'high': '🔴', 'medium': '🟡', 'low': '🟢'}.get(issue.severity, '⚪')
+            lines.append(f"### {priority_emoji} {issue.message}")
             lines.append("")
             lines.append("**受影響的頁面**:")
             for url in issue.get('affected_pages', [])[:5]:
                 lines.append(f"- {url}")
             if len(issue.get('affected_pages', [])) > 5:
-                lines.append(f"- ... 還有 {len(issue['affected_pages']) - 5} 個頁面")
+                lines.append(f"- ... 還有 {len(issue.get('affected_pages')) - 5} 個頁面")
             lines.append("")
     
     return '\n'.join(lines)
 
 
+def save_reports(audit_result: Dict[str, Any], write_json: bool = True):
+    """保存 JSON 與 Markdown 報告（write_json 為 False 時只寫 Markdown，JSON Lines 已在審計時寫出）"""
+    if write_json:
+        json_report_path = REPORT_DIR / "seo-audit-report.json"
+        with open(json_report_path, 'w', encoding='utf-8') as f:
+            json.dump(audit_result, f, ensure_ascii=False, indent=2, default=issue_json)
+        print(f"✅ JSON 報告已保存: {json_report_path}")
+    
+    md_report = generate_markdown_report(audit_result)
+    md_report_path = REPORT_DIR / "seo-audit-report.md"
+    with open(md_report_path, 'w', encoding='utf-8') as f:
+        f.write(md_report)
+    print(f"✅ Markdown 報告已保存: {md_report_path}")
+
+
+# --db 記錄的分析項目（項目名稱即規則名稱）
+FINDING_SECTIONS = ('title', 'description', 'keywords', 'h1')
+
+
+def save_findings(audit_result: Dict[str, Any], db_path: Path):
+    """--db：逐頁問題（規則為分析項目）、跨頁問題與各項分數"""
+    issues: List[Issue] = []
+    scores: List[Tuple[Optional[str], str, float]] = []
+    for page in audit_result['pages']:
+        path = page['file_path']
+        analysis = page['seo_analysis']
+        for section in FINDING_SECTIONS:
+            issues.extend(issue.derive(Issue, rule=section, file=path)
+                          for issue in analysis.get(section, {}).get('issues', []))
+            scores.append((path, section, analysis[f'{section}_score']))
+        scores.append((path, 'overall', analysis['overall_score']))
+    issues.extend(issue.derive(Issue) for issue in audit_result['issues'])
+    record_findings(db_path, 'seo-audit', issues, scores, root=PROJECT_ROOT,
+                    summary={'total_pages': audit_result['total_pages'],
+                             'total_issues': audit_result['stats'].get('total_issues', 0)})
+
+
+def run_and_save(auditor: SEOAuditor, output_format: str) -> Dict[str, Any]:
+    """執行審計並依輸出格式保存報告（jsonl 格式邊分析邊寫出 seo-audit-report.jsonl，取代完整 JSON）"""
+    if output_format != 'jsonl':
+        audit_result = auditor.audit()
+        save_reports(audit_result)
+        return audit_result
+    
+    jsonl_report_path = REPORT_DIR / "seo-audit-report.jsonl"
+    with JsonlWriter(jsonl_report_path, 'seo-audit') as stream:
+        audit_result = auditor.audit(stream)
+    print(f"✅ JSON Lines 報告已保存: {jsonl_report_path}")
+    save_reports(audit_result, write_json=False)
+    return audit_result
+
+
 def main():
     """主函數"""
+    parser = argparse.ArgumentParser(description='SEO 審計')
+    parser.add_argument('--jobs', type=int, default=1, metavar='N', help='平行分析頁面的行程數（0 = CPU 核心數，預設 1）')
+    parser.add_argument('--watch', action='store_true', help='完成後持續監看 src/，只重新分析異動的頁面')
+    parser.add_argument('--format', choices=['json', 'jsonl'], default='json',
+                        help='結果格式：json（完整 JSON，預設）或 jsonl（逐頁串流寫出 JSON Lines）')
+    parser.add_argument('--profile', action='store_true',
+                        help='記錄各階段與規則耗時，輸出到 report/profile/（--jobs N 時只量到階段總耗時）')
+    parser.add_argument('--memprofile', action='store_true',
+                        help='以 tracemalloc 記錄各階段記憶體峰值、保留量與主要配置位置，輸出到 report/profile/')
+    parser.add_argument('--memprofile-depth', type=int, default=MEMORY_TRACE_DEPTH, metavar='N',
+                        help=f'tracemalloc 保留的呼叫層數（預設 {MEMORY_TRACE_DEPTH}，加深可追溯到稽核腳本行但較慢）')
+    parser.add_argument('--db', nargs='?', const=REPORT_DIR / DEFAULT_DB_NAME, type=Path, metavar='PATH',
+                        help=f'將問題與分數寫入 SQLite 資料庫（預設 report/{DEFAULT_DB_NAME}），以 findings.py 查詢')
+    parser.add_argument('--shard', metavar='I/N',
+                        help='CI 分片：只分析 N 個分片中第 I 個分片的頁面，單頁結果寫到 report/shards/（不產生報告）')
+    parser.add_argument('--merge-shards', action='store_true',
+                        help='合併 report/shards/ 中的全部分片後執行重複檢查並產生報告，結果與單機執行相同')
+    args = parser.parse_args()
+    try:
+        shard = shard_from_args(args.shard)
+    except ValueError as e:
+        parser.error(str(e))
+    if shard is not None and (args.merge_shards or args.watch):
+        parser.error('--shard 不能與 --merge-shards / --watch 同時使用')
+    if args.profile or args.memprofile:
+        PROFILER.enable('seo-audit', timing=args.profile, memory=args.memprofile,
+                        memory_depth=args.memprofile_depth)
+    
     # 讀取 metadata.json 獲取網站 URL
     metadata_file = PROJECT_ROOT / "src" / "_data" / "metadata.json"
     site_url = SITE_URL
@@ -898,21 +949,22 @@ def main():
     REPORT_DIR.mkdir(exist_ok=True)
     
     # 執行審計
-    auditor = SEOAuditor(SRC_DIR, site_url)
-    audit_result = auditor.audit()
-    
-    # 保存 JSON 報告
-    json_report_path = REPORT_DIR / "seo-audit-report.json"
-    with open(json_report_path, 'w', encoding='utf-8') as f:
-        json.dump(audit_result, f, ensure_ascii=False, indent=2)
-    print(f"✅ JSON 報告已保存: {json_report_path}")
-    
-    # 生成並保存 Markdown 報告
-    md_report = generate_markdown_report(audit_result)
-    md_report_path = REPORT_DIR / "seo-audit-report.md"
-    with open(md_report_path, 'w', encoding='utf-8') as f:
-        f.write(md_report)
-    print(f"✅ Markdown 報告已保存: {md_report_path}")
+    auditor = SEOAuditor(SRC_DIR, site_url, jobs=resolve_jobs(args.jobs), watch=args.watch,
+                         sharding=shard is not None or args.merge_shards)
+    PROFILER.instrument(auditor, ['_parse_page'], matches=None)
+    PROFILER.instrument(auditor, ['_analyze_seo'], matches=lambda analysis: len(analysis['issues']))
+    PROFILER.instrument(auditor, PROFILED_RULES, matches=None)
+    if shard is not None:
+        shard_path = save_shard(auditor.cache, shard, auditor.audit_shard(shard), REPORT_DIR)
+        print(f"✅ 分片 {shard} 的單頁結果已保存: {shard_path}")
+        return
+    if args.merge_shards:
+        try:
+            print(f"🧩 已合併 {load_shards(auditor.cache, REPORT_DIR)} 個分片的單頁結果\n")
+        except ValueError as e:
+            parser.error(str(e))
+    # 保存 JSON（或 JSON Lines）與 Markdown 報告
+    audit_result = run_and_save(auditor, args.format)
     
     # 輸出摘要
     print("\n" + "="*60)
@@ -924,6 +976,21 @@ def main():
     print(f"有問題的頁面: {stats.get('pages_with_issues', 0)}/{audit_result['total_pages']}")
     print(f"總問題數: {stats.get('total_issues', 0)}")
     print("="*60)
+    
+    if args.db:
+        save_findings(audit_result, args.db)
+    
+    if args.profile or args.memprofile:
+        PROFILER.finish(REPORT_DIR / "profile")
+    
+    if args.watch:
+        def reaudit(changed: List[str]) -> str:
+            auditor.cache.invalidate(changed)
+            result = run_and_save(auditor, args.format)
+            return (f"{result['total_pages']} 頁，平均分數 {result['stats'].get('average_score', 0)}/100，"
+                    f"總問題數 {result['stats'].get('total_issues', 0)}")
+        
+        watch_loop(auditor.index, reaudit, roots=[SRC_DIR])
 
 
 if __name__ == '__main__':
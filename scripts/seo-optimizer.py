@@ -4,10 +4,11 @@ SEO 優化腳本
 根據 SEO 改善方案自動優化頁面的 front matter
 """
 
-import re
 from pathlib import Path
 from typing import Dict, Tuple, Optional
 
+from auditkit import split_front_matter
+
 PROJECT_ROOT = Path(__file__).parent.parent
 SRC_DIR = PROJECT_ROOT / "src"
 
@@ -68,72 +69,12 @@ SEO_IMPROVEMENTS = {
 
 def parse_front_matter(content: str) -> Tuple[Dict, str, str]:
     """解析 front matter，返回 (front_matter_dict, front_matter_text, body)"""
-    front_matter_match = re.match(r'^(---\s*\n)(.*?)(\n---\s*\n)(.*)$', content, re.DOTALL)
+    page = split_front_matter(content)
     
-    if not front_matter_match:
+    if page is None:
         return {}, '', content
     
-    front_matter_start = front_matter_match.group(1)
-    front_matter_text = front_matter_match.group(2)
-    front_matter_end = front_matter_match.group(3)
-    body = front_matter_match.group(4)
-    
-    # 簡單解析 YAML
-    front_matter = {}
-    current_key = None
-    current_value = []
-    in_nested = False
-    nested_key = None
-    nested_level = 0
-    
-    for line in front_matter_text.split('\n'):
-        stripped = line.strip()
-        if not stripped or stripped.startswith('#'):
-            if current_value:
-                current_value.append('')
-            continue
-        
-        indent = len(line) - len(line.lstrip())
-        
-        # 檢查是否是嵌套結構（如 seo:）
-        if ':' in line and not line.strip().startswith('|'):
-            colon_idx = line.index(':')
-            key = line[:colon_idx].strip()
-            value_part = line[colon_idx + 1:].strip()
-            
-            if not value_part or value_part in ('|', '>'):
-                # 這是嵌套對象的開始
-                in_nested = True
-                nested_key = key
-                nested_level = indent
-                if key not in front_matter:
-                    front_matter[key] = {}
-                continue
-            else:
-                # 普通鍵值對
-                if in_nested and indent > nested_level:
-                    # 嵌套對象內的鍵值對
-                    if nested_key:
-                        value = value_part.strip('"\'')
-                        front_matter[nested_key][key] = value
-                    continue
-                else:
-                    # 頂層鍵值對
-                    in_nested = False
-                    nested_key = None
-                    if current_key:
-                        front_matter[current_key] = '\n'.join(current_value).strip().strip('"\'')
-                    current_key = key
-                    current_value = [value_part]
-        else:
-            # 繼續當前的值（可能是多行字符串）
-            if current_key:
-                current_value.append(line[indent:])
-    
-    if current_key:
-        front_matter[current_key] = '\n'.join(current_value).strip().strip('"\'')
-    
-    return front_matter, front_matter_text, body
+    return page.data, page.text, page.body
 
 
 def update_seo_fields(front_matter_text: str, improvements: Dict) -> str:
@@ -204,22 +145,17 @@ def optimize_page(file_path: Path, improvements: Dict) -> bool:
             content = f.read()
         
         # 解析 front matter
-        front_matter_match = re.match(r'^(---\s*\n)(.*?)(\n---\s*\n)(.*)$', content, re.DOTALL)
+        page = split_front_matter(content)
         
-        if not front_matter_match:
+        if page is None:
             print(f"  ⚠️  無法解析 front matter: {file_path.name}")
             return False
         
-        front_matter_start = front_matter_match.group(1)
-        front_matter_text = front_matter_match.group(2)
-        front_matter_end = front_matter_match.group(3)
-        body = front_matter_match.group(4)
-        
         # 更新 SEO 字段
-        updated_front_matter = update_seo_fields(front_matter_text, improvements)
+        updated_front_matter = update_seo_fields(page.text, improvements)
         
         # 重組內容
-        new_content = f"{front_matter_start}{updated_front_matter}{front_matter_end}{body}"
+        new_content = f"{page.opening}{updated_front_matter}{page.closing}{page.body}"
         
         # 寫回文件
         with open(file_path, 'w', encoding='utf-8') as f:
@@ -4,11 +4,14 @@
 驗證 macro 使用、語法正確性、樣式一致性等
 """
 
+import argparse
 import re
 from pathlib import Path
 from typing import Dict, List
 from collections import defaultdict
 
+from auditkit import Issue, Rule, RuleSet, parse_rule_ids
+
 PROJECT_ROOT = Path(__file__).parent.parent
 SRC_DIR = PROJECT_ROOT / "src"
 MACROS_DIR = PROJECT_ROOT / "src" / "_includes" / "macros"
@@ -39,6 +42,16 @@ AVAILABLE_MACROS = {
     'flex': 'flex.njk',
 }
 
+# 硬編碼樣式規則（命中次數即結果中的計數）
+RULES = RuleSet([
+    Rule('hardcoded_cards',
+         r'class=["\'][^"\']*bento-card[^"\']*(?:bg-white|bg-sand-50|rounded-2xl|border\s+border-sand-200)[^"\']*["\']',
+         'warning', "發現 {count} 處硬編碼卡片樣式，建議使用 card macro", file_types={'.njk'}, mode='count'),
+    Rule('hardcoded_buttons',
+         r'class=["\'][^"\']*(?:btn-primary|btn-secondary|btn-ghost)[^"\']*(?:px-8\s+py-4|rounded-full)[^"\']*["\']',
+         'warning', "發現 {count} 處硬編碼按鈕樣式，建議使用 button macro", file_types={'.njk'}, mode='count'),
+])
+
 class MigrationTester:
     def __init__(self):
         self.errors = []
@@ -56,6 +69,10 @@ class MigrationTester:
             self.errors.append(f"無法讀取文件: {e}")
             return {'status': 'error', 'errors': [str(e)]}
         
+        return self.test_content(file_path, content)
+    
+    def test_content(self, file_path: Path, content: str) -> Dict:
+        """以傳入的內容測試單個文件（編輯器中尚未儲存的內容也可直接傳入）"""
         results = {
             'file': str(file_path.relative_to(PROJECT_ROOT)),
             'status': 'pass',
@@ -98,6 +115,18 @@ class MigrationTester:
         
         return results
     
+    def collect_issues(self, results: Dict) -> List[Issue]:
+        """test_content 結果中的問題（缺少的 macro 導入、macro 參數、硬編碼樣式與 Nunjucks 語法）"""
+        file = results['file']
+        issues = [Issue('missing-macro-import', 'warning', '缺少 macro 導入: {}', missing, file=file)
+                  for missing in results['macro_imports']['missing']]
+        issues += [Issue('macro-usage', 'warning', message, file=file) for message in results['macro_usage']['issues']]
+        issues += [Issue('hardcoded-styles', 'warning', message, file=file)
+                   for message in results['hardcoded_styles']['issues']]
+        issues += [Issue('nunjucks-syntax', 'error', message, file=file)
+                   for message in results['syntax_errors']['issues']]
+        return issues
+    
     def check_macro_imports(self, content: str, file_path: Path) -> Dict:
         """檢查 macro 導入"""
         imports = {}
@@ -168,26 +197,13 @@ class MigrationTester:
     
     def check_hardcoded_styles(self, content: str, file_path: Path) -> Dict:
         """檢查是否還有硬編碼的樣式"""
-        issues = []
-        
-        # 檢查硬編碼的卡片樣式
-        hardcoded_card_pattern = r'class=["\'][^"\']*bento-card[^"\']*(?:bg-white|bg-sand-50|rounded-2xl|border\s+border-sand-200)[^"\']*["\']'
-        hardcoded_cards = re.findall(hardcoded_card_pattern, content)
-        
-        if hardcoded_cards:
-            issues.append(f"發現 {len(hardcoded_cards)} 處硬編碼卡片樣式，建議使用 card macro")
-        
-        # 檢查硬編碼的按鈕樣式
-        hardcoded_button_pattern = r'class=["\'][^"\']*(?:btn-primary|btn-secondary|btn-ghost)[^"\']*(?:px-8\s+py-4|rounded-full)[^"\']*["\']'
-        hardcoded_buttons = re.findall(hardcoded_button_pattern, content)
-        
-        if hardcoded_buttons:
-            issues.append(f"發現 {len(hardcoded_buttons)} 處硬編碼按鈕樣式，建議使用 button macro")
+        findings = RULES.run(content, file_path.suffix)
+        counts = {finding.rule: finding.get('count') for finding in findings}
         
         return {
-            'hardcoded_cards': len(hardcoded_cards),
-            'hardcoded_buttons': len(hardcoded_buttons),
-            'issues': issues
+            'hardcoded_cards': counts.get('hardcoded_cards', 0),
+            'hardcoded_buttons': counts.get('hardcoded_buttons', 0),
+            'issues': [finding.message for finding in findings]
         }
     
     def check_syntax(self, content: str, file_path: Path) -> Dict:
@@ -357,6 +373,19 @@ class MigrationTester:
 
 def main():
     """主函數"""
+    parser = argparse.ArgumentParser(description='測試遷移後的代碼')
+    parser.add_argument('--disable-rules', action='append', metavar='ID[,ID...]',
+                        help='停用指定的硬編碼樣式規則（可重複指定，規則 ID 見 --list-rules）')
+    parser.add_argument('--list-rules', action='store_true', help='列出硬編碼樣式規則後退出')
+    args = parser.parse_args()
+    try:
+        RULES.disable(parse_rule_ids(args.disable_rules))
+    except ValueError as e:
+        parser.error(str(e))
+    if args.list_rules:
+        print('\n'.join(RULES.describe()))
+        return
+    
     print("🧪 開始測試遷移後的代碼...\n")
     
     tester = MigrationTester()